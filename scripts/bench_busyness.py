@@ -0,0 +1,119 @@
+"""
+Busyness benchmark: the vectorized engine (src/busyness.py) versus a per-event Python loop.
+
+Generates --years of synthetic history (--per-day timed events per day, some crossing
+midnight, plus a weekly all-day event) as GoogleCalendarEvent models, then aggregates them
+by 'day', 'hour' and 'weekday':
+  - loop: walks every event and splits it across local days/hours with datetime arithmetic,
+    the way a straightforward Python implementation would.
+  - engine: busyness.aggregate (epoch arrays, searchsorted, bincount).
+
+The loop is the reference: both must produce the same counts and minutes.
+
+Usage:
+    python scripts/bench_busyness.py [--years 3] [--per-day 12] [--time-zone Europe/Berlin] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time as time_module
+from collections import defaultdict
+from datetime import datetime, timedelta, time
+from zoneinfo import ZoneInfo
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from src import busyness  # noqa: E402
+from src.models import GoogleCalendarEvent  # noqa: E402
+
+
+def synthetic_events(start: datetime, days: int, per_day: int) -> list:
+    events = []
+    for day in range(days):
+        midnight = start + timedelta(days=day)
+        for slot in range(per_day):
+            begin = midnight + timedelta(hours=8, minutes=50 * slot)
+            length = timedelta(minutes=25 + 15 * (slot % 4))
+            if slot == per_day - 1:
+                begin, length = midnight + timedelta(hours=23, minutes=15), timedelta(hours=2) # Crosses midnight
+            events.append({
+                'id': f'e{day}-{slot}', 'status': 'confirmed',
+                'start': {'dateTime': begin.isoformat()}, 'end': {'dateTime': (begin + length).isoformat()},
+            })
+        if day % 7 == 0:
+            date_value = midnight.date()
+            events.append({'id': f'a{day}', 'status': 'confirmed', 'start': {'date': date_value.isoformat()},
+                           'end': {'date': (date_value + timedelta(days=1)).isoformat()}})
+    return [GoogleCalendarEvent.from_google(event) for event in events]
+
+
+def loop_aggregate(events, time_min, time_max, tz, bucket):
+    """Per-event reference: walks each event across local day (or hour) boundaries."""
+    totals = defaultdict(lambda: [0, 0.0])
+    step = timedelta(hours=1) if bucket == 'hour' else timedelta(days=1)
+    for event in events:
+        if event.start.dateTime is not None:
+            start, end = max(event.start.dateTime, time_min), min(event.end.dateTime, time_max)
+            timed = True
+        else:
+            if bucket == 'hour':
+                continue
+            start = max(datetime.combine(event.start.date, time(), tzinfo=tz), time_min)
+            end = min(datetime.combine(event.end.date, time(), tzinfo=tz), time_max)
+            timed = False
+        if end <= start:
+            continue
+        local = start.astimezone(tz)
+        cursor = local.replace(minute=0, second=0, microsecond=0) if bucket == 'hour' else local.replace(hour=0, minute=0, second=0, microsecond=0)
+        while cursor < end:
+            following = (cursor.replace(tzinfo=None) + step).replace(tzinfo=tz) # Wall-clock step
+            if following.timestamp() <= cursor.timestamp(): # Fall-back hour repeats
+                following = (cursor + step).astimezone(tz)
+            overlap = min(end, following) - max(start, cursor)
+            if overlap.total_seconds() > 0:
+                key = cursor.hour if bucket == 'hour' else (cursor.weekday() if bucket == 'weekday' else cursor.date())
+                totals[key][0] += 1
+                totals[key][1] += overlap.total_seconds() / 60 if timed else 0.0
+            cursor = following
+    return {key: (count, round(minutes, 3)) for key, (count, minutes) in totals.items() if count}
+
+
+def best_of(repeat: int, run) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time_module.perf_counter()
+        run()
+        timings.append(time_module.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--years', type=int, default=3, help='Years of history.')
+    arg_parser.add_argument('--per-day', type=int, default=12, help='Timed events per day.')
+    arg_parser.add_argument('--time-zone', default='Europe/Berlin', help='Analysis time zone (exercise DST days).')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Runs per mode; the best is reported.')
+    args = arg_parser.parse_args()
+
+    tz = ZoneInfo(args.time_zone)
+    time_min = datetime(2024, 1, 1, tzinfo=tz)
+    time_max = datetime(2024 + args.years, 1, 1, tzinfo=tz)
+    events = synthetic_events(time_min, (time_max - time_min).days, args.per_day)
+    print(f"{len(events)} events over {args.years} years in {args.time_zone} (best of {args.repeat})")
+
+    convert_s = best_of(args.repeat, lambda: busyness.event_arrays(events, tz))
+    print(f"event_arrays (once per analysis): {convert_s * 1000:.1f} ms")
+    print(f"{'bucket':<10}{'buckets':>9}{'loop ms':>10}{'engine ms':>11}{'speedup':>10}")
+    for bucket in busyness.BUCKETS:
+        result = busyness.aggregate(events, time_min, time_max, tz, bucket)
+        engine = {key: (stats['event_count'], stats['total_duration_minutes']) for key, stats in result.items() if stats['event_count']}
+        reference = loop_aggregate(events, time_min, time_max, tz, bucket)
+        assert engine == reference, f"{bucket}: engine and loop disagree"
+        loop_s = best_of(args.repeat, lambda: loop_aggregate(events, time_min, time_max, tz, bucket))
+        engine_s = best_of(args.repeat, lambda: busyness.aggregate(events, time_min, time_max, tz, bucket))
+        print(f"{bucket:<10}{len(result):>9}{loop_s * 1000:>10.1f}{engine_s * 1000:>11.1f}{loop_s / engine_s:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
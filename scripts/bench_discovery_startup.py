@@ -0,0 +1,74 @@
+"""
+Startup benchmark: building Calendar v3 / Gmail v1 clients with googleapiclient's build()
+versus build_from_document() on the bundled, pre-parsed discovery documents.
+
+Each mode runs in a fresh interpreter so the "first build" number reflects cold start.
+
+Usage:
+    python scripts/bench_discovery_startup.py [--iterations 50] [--remote]
+
+--remote additionally measures build(static_discovery=False), which fetches the
+discovery document over the network (what restricted-egress hosts cannot do).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_WORKER = r'''
+import json, sys, time
+from google.oauth2.credentials import Credentials
+mode, iterations = sys.argv[1], int(sys.argv[2])
+creds = Credentials(token="bench-token")
+
+if mode == "bundled":
+    from googleapiclient.discovery import build_from_document
+    from src.google_services import get_discovery_document
+    def build_once(api, version):
+        return build_from_document(get_discovery_document(api, version), credentials=creds)
+else:
+    from googleapiclient.discovery import build
+    static = mode != "remote"
+    def build_once(api, version):
+        return build(api, version, credentials=creds, static_discovery=static, cache_discovery=False)
+
+t0 = time.perf_counter()
+build_once("calendar", "v3"); build_once("gmail", "v1")
+first_ms = (time.perf_counter() - t0) * 1000
+
+t0 = time.perf_counter()
+for _ in range(iterations):
+    build_once("calendar", "v3"); build_once("gmail", "v1")
+per_build_ms = (time.perf_counter() - t0) * 1000 / (iterations * 2)
+print(json.dumps({"first_ms": first_ms, "per_build_ms": per_build_ms}))
+'''
+
+
+def run_mode(mode: str, iterations: int) -> dict:
+    output = subprocess.check_output(
+        [sys.executable, "-c", _WORKER, mode, str(iterations)],
+        cwd=PROJECT_DIR,
+        env={**os.environ, "PYTHONPATH": PROJECT_DIR},
+        stderr=subprocess.DEVNULL,
+    )
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--iterations", type=int, default=50)
+    arg_parser.add_argument("--remote", action="store_true", help="Also benchmark network discovery.")
+    args = arg_parser.parse_args()
+
+    modes = ["discovery", "bundled"] + (["remote"] if args.remote else [])
+    print(f"{'mode':<12}{'first build (cal+gmail) ms':>30}{'per build ms':>16}")
+    for mode in modes:
+        result = run_mode(mode, args.iterations if mode != "remote" else 1)
+        print(f"{mode:<12}{result['first_ms']:>30.2f}{result['per_build_ms']:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
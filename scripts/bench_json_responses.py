@@ -0,0 +1,117 @@
+"""
+Response serialization benchmark: FastAPI's default path versus FastJSONResponse.
+
+Measures only the work between an endpoint returning and the response body being ready:
+  - events (model): an EventsResponse with --events events returned from an endpoint with
+    response_model=EventsResponse. Default path: FastAPI's serialize_response (dump, validate
+    against the response model, serialize) plus JSONResponse (stdlib json). New path:
+    FastJSONResponse(model), as find_events now returns.
+  - message (dict): a Gmail-style dict of about the same size. Default path: jsonable_encoder
+    plus JSONResponse. New path: FastJSONResponse(dict) (orjson).
+
+Both paths are checked to produce the same JSON document.
+
+Usage:
+    python scripts/bench_json_responses.py [--events 5000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import APIRoute, serialize_response  # noqa: E402
+
+from src.models import EventsResponse  # noqa: E402
+from src.json_responses import FastJSONResponse  # noqa: E402
+
+
+def synthetic_events(count: int) -> dict:
+    return {
+        'kind': 'calendar#events',
+        'timeZone': 'Europe/Berlin',
+        'items': [
+            {
+                'kind': 'calendar#event',
+                'id': f'event{i:06d}',
+                'status': 'confirmed',
+                'htmlLink': f'https://www.google.com/calendar/event?eid=event{i:06d}',
+                'created': '2026-01-01T09:00:00.000Z',
+                'updated': '2026-01-02T09:30:00.000Z',
+                'summary': f'Meeting {i}',
+                'description': 'Agenda: ' + 'x' * 200,
+                'organizer': {'email': 'organizer@example.com', 'self': True},
+                'start': {'dateTime': f'2026-03-{1 + i % 28:02d}T10:00:00+01:00'},
+                'end': {'dateTime': f'2026-03-{1 + i % 28:02d}T11:00:00+01:00'},
+                'attendees': [{'email': f'attendee{j}@example.com', 'responseStatus': 'accepted'} for j in range(4)],
+                'reminders': {'useDefault': True},
+            }
+            for i in range(count)
+        ],
+    }
+
+
+def synthetic_message(parts: int) -> dict:
+    return {
+        'id': '18c0ffee', 'threadId': '18c0ffee', 'labelIds': ['INBOX', 'UNREAD'], 'snippet': 'Hello',
+        'internalDate': '1767225600000', 'sizeEstimate': 123456,
+        'payload': {
+            'mimeType': 'multipart/mixed',
+            'headers': [{'name': f'X-Header-{i}', 'value': 'v' * 40} for i in range(50)],
+            'parts': [
+                {'partId': str(i), 'mimeType': 'text/plain', 'headers': [{'name': 'Content-Type', 'value': 'text/plain'}],
+                 'body': {'size': 300, 'data': 'SGVsbG8g' * 50}}
+                for i in range(parts)
+            ],
+        },
+    }
+
+
+def best_of(repeat: int, run) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--events', type=int, default=5000, help='Events in the events response.')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='Runs per mode; the best is reported.')
+    args = arg_parser.parse_args()
+
+    model = EventsResponse.from_google(synthetic_events(args.events))
+    message = synthetic_message(args.events)
+    route = APIRoute('/bench', endpoint=lambda: None, response_model=EventsResponse)
+
+    def default_model_body() -> bytes:
+        content = asyncio.run(serialize_response(field=route.response_field, response_content=model, is_coroutine=True))
+        return JSONResponse(content).body
+
+    def default_dict_body() -> bytes:
+        return JSONResponse(jsonable_encoder(message)).body
+
+    cases = [
+        ('events (model)', default_model_body, lambda: FastJSONResponse(model).body),
+        ('message (dict)', default_dict_body, lambda: FastJSONResponse(message).body),
+    ]
+    print(f"{args.events} events / message parts (best of {args.repeat})")
+    print(f"{'payload':<16}{'size KB':>10}{'default ms':>13}{'fast ms':>10}{'speedup':>10}")
+    for name, default_body, fast_body in cases:
+        assert json.loads(default_body()) == json.loads(fast_body()), f"{name}: outputs differ"
+        default_s = best_of(args.repeat, default_body)
+        fast_s = best_of(args.repeat, fast_body)
+        size_kb = len(fast_body()) / 1024
+        print(f"{name:<16}{size_kb:>10.0f}{default_s * 1000:>13.1f}{fast_s * 1000:>10.1f}{default_s / fast_s:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Recurrence projection benchmark: cold (parse every rule) versus warm (compiled rulesets cached).
+
+Builds --series synthetic master events (daily, weekly and monthly rules, some with EXDATEs,
+drawn from a small pool of rule strings the way real calendars share them) starting within
+--history-days before a --days window, and projects them:
+  - cold: the ruleset cache is cleared before each run, so every rule is parsed.
+  - warm: the same projection repeated; rulesets come from the cache.
+
+Both must produce the same occurrences. The cache removes parsing only; long-running series
+are fast-forwarded to the window by src/recurrence.py in both modes (raise --history-days to
+check that the cost stays flat).
+
+Usage:
+    python scripts/bench_recurrence_cache.py [--series 2000] [--days 30] [--history-days 28] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import src.calendar_actions  # noqa: E402,F401 (imported first: analysis imports it back)
+from src import analysis  # noqa: E402
+from src.models import GoogleCalendarEvent  # noqa: E402
+
+RULES = [
+    'RRULE:FREQ=DAILY;BYDAY=MO,TU,WE,TH,FR',
+    'RRULE:FREQ=WEEKLY;BYDAY=MO',
+    'RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=TH',
+    'RRULE:FREQ=MONTHLY;BYMONTHDAY=1',
+    'RRULE:FREQ=DAILY;UNTIL=20271231T000000Z',
+]
+
+
+def synthetic_masters(count: int, first_start: datetime, history_days: int) -> list:
+    events = []
+    for index in range(count):
+        start = first_start + timedelta(days=index % max(history_days, 1), minutes=30 * (index % 16))
+        recurrence = [RULES[index % len(RULES)]]
+        if index % 3 == 0:
+            recurrence.append(f"EXDATE:{(start + timedelta(days=7)).strftime('%Y%m%dT%H%M%SZ')}")
+        events.append(GoogleCalendarEvent.from_google({
+            'id': f'series{index:05d}', 'etag': f'"{index}"', 'summary': f'Series {index}', 'recurrence': recurrence,
+            'start': {'dateTime': start.isoformat()}, 'end': {'dateTime': (start + timedelta(minutes=25)).isoformat()},
+        }))
+    return events
+
+
+def best_of(repeat: int, run) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--series', type=int, default=2000, help='Master recurring events.')
+    arg_parser.add_argument('--days', type=int, default=30, help='Projection window length.')
+    arg_parser.add_argument('--history-days', type=int, default=28, help='Series start up to this many days before the window.')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='Runs per mode; the best is reported.')
+    args = arg_parser.parse_args()
+
+    time_min = datetime(2026, 3, 2, tzinfo=timezone.utc)
+    time_max = time_min + timedelta(days=args.days)
+    masters = synthetic_masters(args.series, time_min - timedelta(days=args.history_days) + timedelta(hours=9), args.history_days)
+    cache = analysis._ruleset_cache
+
+    def cold():
+        cache.clear()
+        return analysis.project_occurrences(masters, time_min, time_max)
+
+    def warm():
+        return analysis.project_occurrences(masters, time_min, time_max)
+
+    signature = lambda occurrences: [(o.original_event_id, o.occurrence_start) for o in occurrences]
+    reference = cold()
+    assert signature(warm()) == signature(reference), "Cached projection differs"
+
+    cold_s = best_of(args.repeat, cold)
+    warm_s = best_of(args.repeat, warm)
+    print(f"{args.series} series started up to {args.history_days} days earlier, {len(reference)} occurrences over {args.days} days (best of {args.repeat})")
+    print(f"cold: {cold_s * 1000:.1f} ms   warm: {warm_s * 1000:.1f} ms   speedup: {cold_s / warm_s:.1f}x")
+    print(f"cache: {analysis.get_recurrence_cache_stats()}")
+
+
+if __name__ == '__main__':
+    main()
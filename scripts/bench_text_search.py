@@ -0,0 +1,94 @@
+"""
+Mirror text search benchmark: the full-text indexes versus the previous full scan.
+
+Fills a mirror with --events synthetic events, then times select_events(query=...) for a
+selective word, a prefix and a phrase query:
+  - scan: decode every stored event and check each term against its text (the pre-index path).
+  - store: a mirror backed by an in-memory event store, answered from the FTS5 table.
+  - memory: an in-memory mirror, answered from a TextIndex (built before timing).
+
+All three are checked to return the same events for the word query.
+
+Usage:
+    python scripts/bench_text_search.py [--events 20000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from src.calendar_sync import CalendarMirror  # noqa: E402
+from src.event_store import EventStore  # noqa: E402
+from src.text_search import event_text_fields  # noqa: E402
+
+WORDS = 'alpha beta gamma delta epsilon zeta eta theta iota kappa lambda omicron'.split()
+
+
+def synthetic_event(index: int) -> dict:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(hours=index)
+    return {
+        'id': f'event{index:06d}',
+        'status': 'confirmed',
+        'summary': f'{WORDS[index % len(WORDS)]} sync {index}',
+        'description': ' '.join(WORDS[(index * 7 + k) % len(WORDS)] for k in range(40)),
+        'location': f'Room {index % 40}',
+        'attendees': [{'email': f'person{(index + j) % 500}@example.com'} for j in range(4)],
+        'start': {'dateTime': start.isoformat()},
+        'end': {'dateTime': (start + timedelta(minutes=30)).isoformat()},
+    }
+
+
+def scan(store: EventStore, query: str) -> list:
+    terms = query.casefold().split()
+    matched = []
+    for event, _, _ in store.select_events('bench', True):
+        text = ' '.join(event_text_fields(event)).casefold()
+        if all(term in text for term in terms):
+            matched.append(event)
+    return matched
+
+
+def best_of(repeat: int, run) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--events', type=int, default=20000, help='Events in the mirror.')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='Runs per mode; the best is reported.')
+    args = arg_parser.parse_args()
+
+    page = [{'items': [synthetic_event(i) for i in range(args.events)], 'nextSyncToken': 'bench'}]
+    store = EventStore(':memory:')
+    stored = CalendarMirror('bench', store=store)
+    start = time.perf_counter()
+    stored.apply_pages(None, page)
+    print(f"{args.events} events; store sync with indexing took {time.perf_counter() - start:.2f} s")
+    in_memory = CalendarMirror('bench')
+    in_memory.apply_pages(None, page)
+    in_memory.select_events(query='warmup') # Builds the TextIndex
+
+    word = 'person123@example.com'
+    assert [e['id'] for e in stored.select_events(query=word)] == [e['id'] for e in in_memory.select_events(query=word)] \
+        == sorted(e['id'] for e in scan(store, word)), "Backends disagree"
+
+    print(f"{'query':<26}{'matches':>9}{'scan ms':>10}{'store ms':>10}{'memory ms':>11}")
+    for query in (word, 'kap*', '"kappa sync"'):
+        matches = len(stored.select_events(query=query))
+        scan_s = best_of(args.repeat, lambda: scan(store, query.strip('"*')))
+        store_s = best_of(args.repeat, lambda: stored.select_events(query=query))
+        memory_s = best_of(args.repeat, lambda: in_memory.select_events(query=query))
+        print(f"{query:<26}{matches:>9}{scan_s * 1000:>10.1f}{store_s * 1000:>10.1f}{memory_s * 1000:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
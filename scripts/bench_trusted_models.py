@@ -0,0 +1,83 @@
+"""
+Model construction benchmark: strict validation (EventsResponse(**data)) versus the trusted
+path used for Google API responses (EventsResponse.from_google(data)), on large synthetic
+events().list responses.
+
+Each event has a creator, an organizer and --attendees attendees, so the email checks the
+trusted path skips are present in realistic numbers. The script also checks that both paths
+produce the same model.
+
+Usage:
+    python scripts/bench_trusted_models.py [--events 2500] [--attendees 6] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from src.models import EventsResponse  # noqa: E402
+
+
+def synthetic_event(index: int, attendees: int) -> dict:
+    day = 1 + index % 28
+    return {
+        'kind': 'calendar#event',
+        'etag': f'"{index}"',
+        'id': f'event{index:06d}',
+        'status': 'confirmed',
+        'htmlLink': f'https://www.google.com/calendar/event?eid=event{index:06d}',
+        'created': '2026-01-01T09:00:00.000Z',
+        'updated': '2026-01-02T09:30:00.000Z',
+        'summary': f'Meeting {index}',
+        'description': 'Agenda: ' + 'x' * 200,
+        'creator': {'email': 'organizer@example.com', 'self': True},
+        'organizer': {'email': 'organizer@example.com', 'displayName': 'Organizer', 'self': True},
+        'start': {'dateTime': f'2026-03-{day:02d}T10:00:00-05:00', 'timeZone': 'America/New_York'},
+        'end': {'dateTime': f'2026-03-{day:02d}T11:00:00-05:00', 'timeZone': 'America/New_York'},
+        'iCalUID': f'event{index:06d}@google.com',
+        'sequence': 0,
+        'attendees': [
+            {'email': f'attendee{j}.{index % 50}@example.com', 'responseStatus': 'accepted'}
+            for j in range(attendees)
+        ],
+        'reminders': {'useDefault': True},
+    }
+
+
+def best_of(repeat: int, build) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--events', type=int, default=2500, help='Events per response (2500 is the API page maximum).')
+    arg_parser.add_argument('--attendees', type=int, default=6, help='Attendees per event.')
+    arg_parser.add_argument('--repeat', type=int, default=5, help='Runs per mode; the best is reported.')
+    args = arg_parser.parse_args()
+
+    data = {'kind': 'calendar#events', 'timeZone': 'America/New_York',
+            'items': [synthetic_event(i, args.attendees) for i in range(args.events)]}
+
+    strict = EventsResponse(**data)
+    trusted = EventsResponse.from_google(data)
+    assert strict == trusted, "Trusted construction produced a different model"
+
+    strict_s = best_of(args.repeat, lambda: EventsResponse(**data))
+    trusted_s = best_of(args.repeat, lambda: EventsResponse.from_google(data))
+    print(f"{args.events} events, {args.attendees} attendees each (best of {args.repeat})")
+    print(f"{'mode':<10}{'total ms':>12}{'us/event':>12}")
+    for mode, seconds in (('strict', strict_s), ('trusted', trusted_s)):
+        print(f"{mode:<10}{seconds * 1000:>12.1f}{seconds * 1e6 / args.events:>12.1f}")
+    print(f"speedup: {strict_s / trusted_s:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
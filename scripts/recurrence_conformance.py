@@ -0,0 +1,323 @@
+"""
+Recurrence conformance: projected occurrences versus Google's own expansion of the same series.
+
+Each case in scripts/recurrence_cases/*.json holds a master event (as returned by events.get),
+a timeMin/timeMax window and the instances Google returns for it (events.instances with
+showDeleted=True). The runner projects the master through analysis.project_occurrences and
+compares every projected occurrence with the instances by originalStartTime:
+  - missing: Google has an instance the projection does not (cancelled instances count too,
+    since the projection reflects the rule, not per-instance exceptions).
+  - unexpected: the projection has an occurrence Google does not.
+  - wrong end: both have the occurrence, but the projected end differs from the instance end
+    (checked for unmodified instances only; moved or resized instances are exceptions). An
+    instance counts as modified when its start differs from its originalStartTime or it is
+    listed in the case's "modified" keys (record-suite lists the instances it changed).
+
+Cases record their "source": captured from the API with the record subcommands, or derived
+by hand from RFC 5545 (the section 3.8.5.3 examples and hand-computed edge cases). Hand-derived
+cases list the instances in the same shape as a capture.
+
+record captures an existing series. record-suite creates the series in SUITE in a scratch
+calendar (TZID rules across DST changes, EXDATEs, RDATEs, and moved, resized and cancelled
+instances), captures each as recorded_<name>.json and deletes them again (unless --keep). Use
+a secondary calendar created for this: the series are real events.
+
+Usage:
+    python scripts/recurrence_conformance.py [run] [--cases scripts/recurrence_cases] [--case NAME]
+    python scripts/recurrence_conformance.py record --event-id ID --time-min 2026-01-01T00:00:00Z \\
+        --time-max 2026-04-01T00:00:00Z --name my_case [--calendar-id primary] [--description TEXT]
+    python scripts/recurrence_conformance.py record-suite --calendar-id CALENDAR_ID [--keep]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+import src.calendar_actions  # noqa: E402,F401 (imported first: analysis imports it back)
+from src import analysis  # noqa: E402
+from src.models import GoogleCalendarEvent  # noqa: E402
+
+DEFAULT_CASES_DIR = os.path.join(PROJECT_DIR, 'scripts', 'recurrence_cases')
+
+# Series created by record-suite. Each has an events.insert body (without summary), the window
+# to capture and the instance exceptions to make first, keyed by original start (UTC):
+# ('move', minutes) shifts start and end, ('resize', minutes) changes the end, ('cancel',)
+# deletes the instance.
+SUITE = {
+    'tzid_weekly_us_dst': {
+        'description': 'Weekly Monday 09:00 America/New_York across the 2027-03-14 DST change',
+        'event': {
+            'start': {'dateTime': '2027-02-22T09:00:00', 'timeZone': 'America/New_York'},
+            'end': {'dateTime': '2027-02-22T09:30:00', 'timeZone': 'America/New_York'},
+            'recurrence': ['RRULE:FREQ=WEEKLY;BYDAY=MO;COUNT=8'],
+        },
+        'timeMin': '2027-02-01T00:00:00Z', 'timeMax': '2027-05-01T00:00:00Z',
+    },
+    'tzid_daily_eu_dst_exdate': {
+        'description': 'Daily 23:30 Europe/Berlin across the 2027-03-28 DST change, with TZID EXDATEs',
+        'event': {
+            'start': {'dateTime': '2027-03-24T23:30:00', 'timeZone': 'Europe/Berlin'},
+            'end': {'dateTime': '2027-03-25T00:15:00', 'timeZone': 'Europe/Berlin'},
+            'recurrence': [
+                'RRULE:FREQ=DAILY;UNTIL=20270403T000000Z',
+                'EXDATE;TZID=Europe/Berlin:20270328T233000,20270330T233000',
+            ],
+        },
+        'timeMin': '2027-03-20T00:00:00Z', 'timeMax': '2027-04-10T00:00:00Z',
+    },
+    'modified_instances_london': {
+        'description': 'Weekly Wednesday 14:00 Europe/London across both 2027 DST changes, with moved, resized and cancelled instances',
+        'event': {
+            'start': {'dateTime': '2027-03-03T14:00:00', 'timeZone': 'Europe/London'},
+            'end': {'dateTime': '2027-03-03T15:00:00', 'timeZone': 'Europe/London'},
+            'recurrence': ['RRULE:FREQ=WEEKLY;BYDAY=WE;UNTIL=20271110T000000Z'],
+        },
+        'timeMin': '2027-03-01T00:00:00Z', 'timeMax': '2027-11-15T00:00:00Z',
+        'exceptions': {
+            '2027-03-31T13:00:00Z': ('move', 60),
+            '2027-04-07T13:00:00Z': ('resize', 30),
+            '2027-04-14T13:00:00Z': ('cancel',),
+            '2027-11-03T14:00:00Z': ('move', -120),
+        },
+    },
+    'all_day_last_day_exdate': {
+        'description': 'All-day on the last day of each month, with a VALUE=DATE EXDATE',
+        'event': {
+            'start': {'date': '2027-01-31'},
+            'end': {'date': '2027-02-01'},
+            'recurrence': ['RRULE:FREQ=MONTHLY;BYMONTHDAY=-1;COUNT=12', 'EXDATE;VALUE=DATE:20270430'],
+        },
+        'timeMin': '2027-01-01T00:00:00Z', 'timeMax': '2028-02-01T00:00:00Z',
+    },
+    'rdate_tzid_kolkata': {
+        'description': 'Weekly Friday 10:00 Asia/Kolkata with a TZID RDATE and an EXDATE',
+        'event': {
+            'start': {'dateTime': '2027-05-07T10:00:00', 'timeZone': 'Asia/Kolkata'},
+            'end': {'dateTime': '2027-05-07T11:00:00', 'timeZone': 'Asia/Kolkata'},
+            'recurrence': [
+                'RRULE:FREQ=WEEKLY;BYDAY=FR;COUNT=6',
+                'RDATE;TZID=Asia/Kolkata:20270512T160000',
+                'EXDATE;TZID=Asia/Kolkata:20270521T100000',
+            ],
+        },
+        'timeMin': '2027-05-01T00:00:00Z', 'timeMax': '2027-07-01T00:00:00Z',
+    },
+}
+
+
+def parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def instance_key(event_time: dict) -> str:
+    """Normalizes an API start/end/originalStartTime to a comparable string."""
+    if 'date' in event_time:
+        return event_time['date']
+    return parse_timestamp(event_time['dateTime']).astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def projected_key(value: datetime, all_day: bool) -> str:
+    if all_day:
+        return value.date().isoformat()
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def run_case(path: str) -> bool:
+    with open(path) as case_file:
+        case = json.load(case_file)
+    name = os.path.splitext(os.path.basename(path))[0]
+    master = GoogleCalendarEvent.from_google(case['master'])
+    all_day = 'date' in case['master']['start']
+    time_min, time_max = parse_timestamp(case['timeMin']), parse_timestamp(case['timeMax'])
+
+    started = time.perf_counter()
+    occurrences = analysis.project_occurrences([master], time_min, time_max, workers=1)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    expected = {instance_key(instance['originalStartTime']): instance for instance in case['instances']}
+    modified = set(case.get('modified', []))
+    projected = {projected_key(o.occurrence_start, all_day): projected_key(o.occurrence_end, all_day) for o in occurrences}
+    missing = sorted(set(expected) - set(projected))
+    unexpected = sorted(set(projected) - set(expected))
+    duplicates = len(occurrences) - len(projected)
+    wrong_end = sorted(
+        f"{key} (expected end {instance_key(instance['end'])}, projected {projected[key]})"
+        for key, instance in expected.items()
+        if key in projected and key not in modified and instance['start'] == instance['originalStartTime']
+        and instance_key(instance['end']) != projected[key]
+    )
+
+    passed = not missing and not unexpected and not duplicates and not wrong_end
+    print(f"{'PASS' if passed else 'FAIL'} {name}: {len(expected)} instances, {elapsed_ms:.2f} ms ({case.get('source', 'unknown source')})")
+    if missing:
+        print(f"    missing:    {', '.join(missing)}")
+    if unexpected:
+        print(f"    unexpected: {', '.join(unexpected)}")
+    if wrong_end:
+        print(f"    wrong end:  {', '.join(wrong_end)}")
+    if duplicates:
+        print(f"    duplicates: {duplicates}")
+    return passed
+
+
+def run(args) -> int:
+    pattern = f'{args.case}.json' if args.case else '*.json'
+    paths = sorted(glob.glob(os.path.join(args.cases, pattern)))
+    if not paths:
+        print(f"No cases matching {pattern} in {args.cases}")
+        return 1
+    failures = [path for path in paths if not run_case(path)]
+    print(f"{len(paths) - len(failures)}/{len(paths)} cases passed")
+    return 1 if failures else 0
+
+
+def _calendar_service():
+    from src.auth import get_credentials
+    from src.google_services import get_service
+
+    credentials = get_credentials()
+    if not credentials:
+        print("No credentials; authenticate through the server first.")
+        return None
+    return get_service('calendar', 'v3', credentials)
+
+
+def fetch_instances(service, calendar_id: str, event_id: str, time_min: str, time_max: str) -> list:
+    instances, page_token = [], None
+    while True:
+        response = service.events().instances(
+            calendarId=calendar_id, eventId=event_id, timeMin=time_min, timeMax=time_max,
+            showDeleted=True, maxResults=2500, pageToken=page_token,
+        ).execute()
+        instances.extend(response.get('items', []))
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return instances
+
+
+def capture_case(service, calendar_id: str, event_id: str, time_min: str, time_max: str, description: str, source: str) -> dict:
+    master = service.events().get(calendarId=calendar_id, eventId=event_id).execute()
+    return {
+        'description': description or master.get('summary', event_id),
+        'source': f"Recorded from Google Calendar events.instances on {datetime.now(timezone.utc).date().isoformat()}{source}",
+        'timeMin': time_min,
+        'timeMax': time_max,
+        'master': master,
+        'instances': fetch_instances(service, calendar_id, event_id, time_min, time_max),
+    }
+
+
+def write_case(cases_dir: str, name: str, case: dict) -> None:
+    path = os.path.join(cases_dir, f'{name}.json')
+    with open(path, 'w') as case_file:
+        json.dump(case, case_file, indent=2)
+        case_file.write('\n')
+    print(f"Recorded {len(case['instances'])} instances to {path}")
+
+
+def record(args) -> int:
+    service = _calendar_service()
+    if service is None:
+        return 1
+    write_case(args.cases, args.name, capture_case(
+        service, args.calendar_id, args.event_id, args.time_min, args.time_max, args.description, ''
+    ))
+    return 0
+
+
+def shifted(event_time: dict, minutes: int) -> dict:
+    moved = parse_timestamp(event_time['dateTime']) + timedelta(minutes=minutes)
+    return {'dateTime': moved.isoformat(), **({'timeZone': event_time['timeZone']} if 'timeZone' in event_time else {})}
+
+
+def apply_exceptions(service, calendar_id: str, event_id: str, series: dict) -> None:
+    """Moves, resizes or cancels instances of a created series as listed in its 'exceptions'."""
+    exceptions = series.get('exceptions', {})
+    if not exceptions:
+        return
+    instances = fetch_instances(service, calendar_id, event_id, series['timeMin'], series['timeMax'])
+    by_start = {instance_key(instance['originalStartTime']): instance for instance in instances}
+    for original_start, (action, *amount) in exceptions.items():
+        instance = by_start.get(original_start)
+        if instance is None:
+            raise RuntimeError(f"Series {event_id} has no instance at {original_start}")
+        if action == 'cancel':
+            service.events().delete(calendarId=calendar_id, eventId=instance['id']).execute()
+        else:
+            body = {'end': shifted(instance['end'], amount[0])}
+            if action == 'move':
+                body['start'] = shifted(instance['start'], amount[0])
+            service.events().patch(calendarId=calendar_id, eventId=instance['id'], body=body).execute()
+
+
+def record_suite(args) -> int:
+    service = _calendar_service()
+    if service is None:
+        return 1
+    names = [args.case] if args.case else list(SUITE)
+    unknown = [name for name in names if name not in SUITE]
+    if unknown:
+        print(f"Unknown suite series: {', '.join(unknown)} (choose from {', '.join(SUITE)})")
+        return 1
+    created = []
+    try:
+        for name in names:
+            series = SUITE[name]
+            event = service.events().insert(
+                calendarId=args.calendar_id, body={'summary': f'Recurrence conformance: {name}', **series['event']}
+            ).execute()
+            created.append(event['id'])
+            apply_exceptions(service, args.calendar_id, event['id'], series)
+            case = capture_case(
+                service, args.calendar_id, event['id'], series['timeMin'], series['timeMax'],
+                series['description'], ' (series created by record-suite)'
+            )
+            case['modified'] = sorted(start for start, (action, *_) in series.get('exceptions', {}).items() if action != 'cancel')
+            write_case(args.cases, f'recorded_{name}', case)
+    finally:
+        if not args.keep:
+            for event_id in created:
+                service.events().delete(calendarId=args.calendar_id, eventId=event_id).execute()
+            print(f"Deleted {len(created)} scratch series from {args.calendar_id}")
+    return 0
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--cases', default=DEFAULT_CASES_DIR, help='Directory of case files.')
+    subparsers = arg_parser.add_subparsers(dest='command')
+
+    run_parser = subparsers.add_parser('run', help='Check every case (the default).')
+    run_parser.add_argument('--case', help='Only run this case (file name without .json).')
+
+    record_parser = subparsers.add_parser('record', help='Capture a case from the Calendar API.')
+    record_parser.add_argument('--event-id', required=True, help='Master recurring event ID.')
+    record_parser.add_argument('--calendar-id', default='primary')
+    record_parser.add_argument('--time-min', required=True, help='RFC3339 window start.')
+    record_parser.add_argument('--time-max', required=True, help='RFC3339 window end.')
+    record_parser.add_argument('--name', required=True, help='Case file name (without .json).')
+    record_parser.add_argument('--description', help='Defaults to the event summary.')
+
+    suite_parser = subparsers.add_parser('record-suite', help='Create the SUITE series in a scratch calendar and capture them.')
+    suite_parser.add_argument('--calendar-id', required=True, help='Scratch calendar to create the series in (not your primary calendar).')
+    suite_parser.add_argument('--case', help='Only this SUITE series.')
+    suite_parser.add_argument('--keep', action='store_true', help='Leave the created series in the calendar.')
+
+    args = arg_parser.parse_args()
+    if args.command == 'record':
+        sys.exit(record(args))
+    if args.command == 'record-suite':
+        sys.exit(record_suite(args))
+    if args.command is None:
+        args.case = None
+    sys.exit(run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Local stand-in for Google's push notification senders.
+
+Posts synthetic Calendar (events.watch) and Gmail (users.watch via Pub/Sub) notifications to
+the server's receivers, the way Google would, so the receiver -> mirror sync path can be
+exercised without a public HTTPS address.
+
+Usage:
+    # Against a running server (channel defaults to the first Calendar channel it reports;
+    # the token defaults to PUSH_CHANNEL_TOKEN, which the server must share):
+    python scripts/simulate_push_notifications.py calendar [--channel-id ID] [--token T] [--count 3]
+    python scripts/simulate_push_notifications.py gmail --email me@example.com --history-id 12345
+
+    # In-process, without Google or a running server: registers a synthetic Calendar channel, a
+    # mirror of its calendar and a Gmail channel, stands in for the Calendar and Gmail API calls,
+    # then posts sync/change/duplicate/bad-token/unknown-channel notifications and prints the
+    # replies, the background syncs they triggered and the resulting mirror and channel state.
+    python scripts/simulate_push_notifications.py local
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import sys
+import uuid
+
+import httpx
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def calendar_headers(channel_id: str, token: str, state: str, message_number: int, calendar_id: str = 'primary') -> dict:
+    return {
+        'X-Goog-Channel-ID': channel_id,
+        'X-Goog-Channel-Token': token,
+        'X-Goog-Resource-State': state,
+        'X-Goog-Message-Number': str(message_number),
+        'X-Goog-Resource-ID': f"synthetic-{calendar_id}",
+        'X-Goog-Resource-URI': f"https://www.googleapis.com/calendar/v3/calendars/{calendar_id}/events",
+    }
+
+
+def gmail_envelope(email: str, history_id: int) -> dict:
+    data = base64.b64encode(json.dumps({'emailAddress': email, 'historyId': history_id}).encode()).decode()
+    return {'message': {'data': data, 'messageId': str(uuid.uuid4())}, 'subscription': 'projects/local/subscriptions/simulated'}
+
+
+def show(label: str, response) -> None:
+    print(f"{label:<34} {response.status_code} {response.text}")
+
+
+def send_calendar(client, channel_id: str, token: str, count: int) -> None:
+    if not channel_id:
+        channels = [c for c in client.get('/notifications/channels').json() if c['kind'] == 'calendar']
+        if not channels:
+            sys.exit("The server has no Calendar channels; pass --channel-id or open one with POST /notifications/channels.")
+        channel_id = channels[0]['channel_id']
+    show('sync', client.post('/notifications/calendar', headers=calendar_headers(channel_id, token, 'sync', 1)))
+    for number in range(2, count + 2):
+        show(f'exists #{number}', client.post('/notifications/calendar', headers=calendar_headers(channel_id, token, 'exists', number)))
+
+
+async def run_local() -> None:
+    sys.path.insert(0, PROJECT_DIR)
+    from google.oauth2.credentials import Credentials
+    from src import calendar_sync, push_notifications, server
+
+    # Synthetic credentials (a token without expiry counts as valid), used by the Gmail receiver
+    credentials = Credentials(token='local')
+    server.global_credentials = credentials
+    mirror = calendar_sync.get_mirror(credentials, 'primary')
+    calls = {'calendar_syncs': 0, 'history_lists': 0}
+
+    # Stand-ins for the Google API calls made by the background syncs
+    async def sync_mirror(sync_credentials, sync_mirror, max_staleness=None):
+        calls['calendar_syncs'] += 1
+        number = calls['calendar_syncs']
+        sync_mirror.apply_pages(sync_mirror.sync_token, [{
+            'timeZone': 'UTC',
+            'nextSyncToken': f'local-{number}',
+            'items': [{
+                'id': f'local-event-{number}', 'status': 'confirmed', 'summary': f'Synthetic change {number}',
+                'start': {'dateTime': '2026-01-05T09:00:00Z'}, 'end': {'dateTime': '2026-01-05T10:00:00Z'},
+            }],
+        }])
+        return sync_mirror
+
+    async def list_history(history_credentials, user_id, start_history_id):
+        calls['history_lists'] += 1
+        return [{'id': '150', 'messagesAdded': [{'message': {'id': 'm1'}}], 'labelsAdded': [{'message': {'id': 'm2'}}]}], '150'
+
+    calendar_sync.async_sync_mirror = sync_mirror
+    push_notifications._list_history = list_history
+
+    channel = push_notifications.register_channel(push_notifications.WatchChannel(
+        kind='calendar', channel_id=str(uuid.uuid4()), expiration=None, calendar_id='primary', token='local-token',
+    ))
+    push_notifications.register_channel(push_notifications.WatchChannel(
+        kind='gmail', channel_id='gmail:me', expiration=None, user_id='me', history_id='100', synced_history_id='100',
+    ))
+    # ASGI transport without lifespan: the server's startup (OAuth) does not run, and background
+    # syncs run on this event loop
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://local') as client:
+        headers = lambda state, number, token='local-token', channel_id=channel.channel_id: calendar_headers(channel_id, token, state, number)
+        show('calendar sync', await client.post('/notifications/calendar', headers=headers('sync', 1)))
+        show('calendar exists #2', await client.post('/notifications/calendar', headers=headers('exists', 2)))
+        show('calendar exists #3 (sync pending)', await client.post('/notifications/calendar', headers=headers('exists', 3)))
+        show('calendar exists #3 (duplicate)', await client.post('/notifications/calendar', headers=headers('exists', 3)))
+        show('calendar bad token', await client.post('/notifications/calendar', headers=headers('exists', 4, token='wrong')))
+        show('calendar unknown channel', await client.post('/notifications/calendar', headers=headers('exists', 4, channel_id='nope')))
+        show('gmail historyId 150', await client.post('/notifications/gmail', json=gmail_envelope('me@example.com', 150)))
+        show('gmail malformed', await client.post('/notifications/gmail', json={'message': {}}))
+        await asyncio.gather(*push_notifications._pending_syncs.values())
+        print(f"{'background syncs':<34} {calls}")
+        print(f"{'mirror':<34} {mirror.stats()}")
+        show('channels', await client.get('/notifications/channels'))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server base URL.')
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+    calendar = commands.add_parser('calendar', help='Post Calendar notifications.')
+    calendar.add_argument('--channel-id', default='')
+    calendar.add_argument('--token', default=os.getenv('PUSH_CHANNEL_TOKEN', ''))
+    calendar.add_argument('--count', type=int, default=1, help='Number of change notifications after the sync message.')
+    gmail = commands.add_parser('gmail', help='Post a Gmail Pub/Sub notification.')
+    gmail.add_argument('--email', required=True)
+    gmail.add_argument('--history-id', type=int, required=True)
+    gmail.add_argument('--token', default=os.getenv('GMAIL_PUSH_TOKEN', ''))
+    commands.add_parser('local', help='Exercise the receivers in-process, without Google.')
+    args = arg_parser.parse_args()
+
+    if args.command == 'local':
+        asyncio.run(run_local())
+        return
+    with httpx.Client(base_url=args.url) as client:
+        if args.command == 'calendar':
+            send_calendar(client, args.channel_id, args.token, args.count)
+        else:
+            params = {'token': args.token} if args.token else None
+            show('gmail', client.post('/notifications/gmail', params=params, json=gmail_envelope(args.email, args.history_id)))
+
+
+if __name__ == '__main__':
+    main()
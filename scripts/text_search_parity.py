@@ -0,0 +1,116 @@
+"""
+Text search parity: the same queries against an in-memory mirror and a store-backed mirror.
+
+Mirrors answer text queries from a TextIndex (in memory) or the event store's FTS5 table; both
+must return the same events (see src/text_search.py). This loads a fixed set of events into
+one mirror of each kind and runs every query against both:
+  - mismatch: the two backends return different events.
+  - wrong: both agree, but not on the expected events (the query is listed with what it must
+    find, covering case folding, accents, compatibility characters, prefixes and phrases).
+
+The store is an in-memory SQLite database, so nothing is written to EVENT_STORE_PATH.
+
+Usage:
+    python scripts/text_search_parity.py [--verbose]
+"""
+import argparse
+import os
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from src.calendar_sync import CalendarMirror  # noqa: E402
+from src.event_store import EventStore  # noqa: E402
+
+EVENTS = {
+    'street': {'summary': 'Straße fest', 'location': 'Hauptstraße 5'},
+    'ligature': {'summary': 'ﬁnance sync', 'description': 'Quarterly ﬂow review'},
+    'superscript': {'summary': 'Solve x²y', 'description': 'Room ①'},
+    'accents': {'summary': 'Café Smørrebrød', 'description': 'Crème brûlée tasting'},
+    'greek': {'summary': 'ΣΊΣΥΦΟΣ reading group'},
+    'turkish': {'summary': 'İstanbul offsite'},
+    'fullwidth': {'summary': 'ＡＢＣ planning'},
+    'people': {
+        'summary': 'Design review',
+        'organizer': {'email': 'bob@example.com', 'displayName': 'Bob Ödegaard'},
+        'attendees': [{'email': 'ana@example.com', 'displayName': 'Ana Núñez'}],
+    },
+    'phrase': {'summary': 'Weekly design', 'description': 'review of the roadmap'},
+    'snake': {'summary': 'deploy_window check'},
+}
+
+# (query, event IDs it must find)
+QUERIES = [
+    ('Straße', {'street'}),
+    ('straße', {'street'}),
+    ('strasse', {'street'}),
+    ('STRASSE', {'street'}),
+    ('hauptstrasse', {'street'}),
+    ('stras*', {'street'}),
+    ('finance', {'ligature'}),
+    ('ﬁnance', {'ligature'}),
+    ('fin*', {'ligature'}),
+    ('flow', {'ligature'}),
+    ('x2y', {'superscript'}),
+    ('x²y', {'superscript'}),
+    ('1', {'superscript'}),
+    ('cafe', {'accents'}),
+    ('CAFÉ', {'accents'}),
+    ('creme brulee', {'accents'}),
+    ('"crème brûlée"', {'accents'}),
+    ('smørrebrød', {'accents'}),
+    ('σίσυφος', {'greek'}),
+    ('sisyphos', set()),
+    ('istanbul', {'turkish'}),
+    ('abc', {'fullwidth'}),
+    ('bob@example.com', {'people'}),
+    ('odegaard', {'people'}),
+    ('nunez', {'people'}),
+    ('"design review"', {'people'}),
+    ('design review', {'people', 'phrase'}),
+    ('"design rev"*', {'people'}),
+    ('deploy', {'snake'}),
+    ('deploy_window', {'snake'}),
+    ('"weekly design review"', set()),
+]
+
+
+def load(mirror: CalendarMirror):
+    items = [
+        {
+            'id': event_id, 'status': 'confirmed', **fields,
+            'start': {'dateTime': f'2026-03-{day:02d}T09:00:00Z'}, 'end': {'dateTime': f'2026-03-{day:02d}T10:00:00Z'},
+        }
+        for day, (event_id, fields) in enumerate(EVENTS.items(), start=1)
+    ]
+    mirror.apply_pages(None, [{'timeZone': 'UTC', 'nextSyncToken': 'parity', 'items': items}])
+    return mirror
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--verbose', action='store_true', help='Print passing queries too.')
+    args = arg_parser.parse_args()
+
+    memory = load(CalendarMirror('parity', single_events=True))
+    stored = load(CalendarMirror('parity', single_events=True, store=EventStore(':memory:')))
+
+    failures = 0
+    for query, expected in QUERIES:
+        in_memory = {event['id'] for event in memory.select_events(query=query)}
+        in_store = {event['id'] for event in stored.select_events(query=query)}
+        if in_memory != in_store:
+            failures += 1
+            print(f"MISMATCH {query!r}: memory {sorted(in_memory)}, store {sorted(in_store)}")
+        elif in_memory != expected:
+            failures += 1
+            print(f"WRONG    {query!r}: both {sorted(in_memory)}, expected {sorted(expected)}")
+        elif args.verbose:
+            print(f"PASS     {query!r}: {sorted(in_memory)}")
+    print(f"{len(QUERIES) - failures}/{len(QUERIES)} queries agree")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,28 @@
+import heapq
+import importlib
 import logging
-from datetime import datetime, date, timedelta
-from typing import Optional, List, Dict, Any
-from collections import defaultdict
+import multiprocessing
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, date, timedelta, timezone, tzinfo
+from typing import Optional, List, Dict, Any, Tuple, Iterator
 
 from google.oauth2.credentials import Credentials
-from dateutil import rrule
+from googleapiclient.errors import HttpError
 from dateutil import parser as date_parser # Alias to avoid confusion with our parser module if any
 
 # Import find_events from the sibling module
 try:
     # Use absolute imports for consistency
     import src.calendar_actions as calendar_actions  # Changed from .calendar_actions for compatibility
+    import src.calendar_sync as calendar_sync
+    import src.field_masks as field_masks
+    import src.busyness as busyness
+    import src.recurrence as recurrence
+    from src.field_masks import EVENT_FIELD_PRESETS
     from src.models import GoogleCalendarEvent        # Changed from .models for compatibility
 except ImportError:
     # Handle potential path issues if run directly or structured differently
@@ -22,24 +34,240 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# --- Compiled Recurrence Cache ---
+# Occurrences are computed locally by the recurrence engine (see recurrence), and compiling a
+# series (parsing its RRULE/EXRULE/RDATE/EXDATE lines) is repeated for the same series again and
+# again (dashboards re-asking for the same windows). Compiled series are kept in a bounded LRU
+# keyed by (event id, etag or updated, recurrence strings, start and end), so a projection over
+# unchanged series skips parsing entirely. Compiled series are only read after compilation, so
+# one instance is safely shared by concurrent projections.
+#
+# Configuration (environment variables):
+#   RECURRENCE_CACHE_SIZE: Maximum compiled series kept (default 4096; 0 disables the cache).
+
+RECURRENCE_CACHE_SIZE = int(os.getenv('RECURRENCE_CACHE_SIZE', 4096))
+
+# --- Master Event Selection ---
+# Projections only need the master events of series that can have an occurrence in the
+# window. events().list with singleEvents=false and timeMin/timeMax leaves out series that
+# ended before the window or start after it (the API bounds a master by its whole series), and
+# the 'recurrence' field preset trims each item to what expansion reads. Non-recurring events
+# in the window still come back (the API cannot filter them out); they are dropped as each page
+# arrives, and pages are followed past the 2500-event API maximum.
+# Mirrors bound a master by its first instance, so mirror reads select masters starting before
+# time_max and rely on series_in_window to drop series whose RRULE ended (UNTIL) before time_min.
+
+# --- Parallel Expansion ---
+# Expanding thousands of series is CPU-bound pure Python. Projections with at least
+# RECURRENCE_PARALLEL_MIN_SERIES recurring masters are split into chunks expanded in a process
+# pool, and the sorted chunk results are merged. The pool is spawned on first use and reused.
+# Workers return compact (start timestamp, series index, start, end) tuples; the series' ID and
+# summary are attached in this process as occurrences are merged. Every chunk must finish before
+# the first occurrence can be yielded, since any chunk may hold the earliest one.
+# Each worker process keeps its own ruleset cache, so pooled runs bypass this process's cache:
+# get_recurrence_cache_stats (and /health) count neither hits nor misses for them.
+#
+# Configuration (environment variables):
+#   RECURRENCE_WORKERS: Expansion processes (default: CPU count, at most 4; 0 or 1 expands in-process).
+#   RECURRENCE_PARALLEL_MIN_SERIES: Smaller projections are expanded in-process (default 1000).
+
+RECURRENCE_WORKERS = int(os.getenv('RECURRENCE_WORKERS') or min(os.cpu_count() or 1, 4))
+RECURRENCE_PARALLEL_MIN_SERIES = int(os.getenv('RECURRENCE_PARALLEL_MIN_SERIES', 1000))
+MASTER_PAGE_SIZE = 2500 # API maximum
+
 # Define a structure for projected occurrences (can be a TypedDict or Pydantic model later)
 class ProjectedEventOccurrence:
+    # Slotted: a year of daily series across many calendars projects hundreds of thousands
+    __slots__ = ('original_event_id', 'original_summary', 'occurrence_start', 'occurrence_end')
+
     def __init__(self, original_event_id: str, original_summary: str, occurrence_start: datetime, occurrence_end: datetime):
         self.original_event_id = original_event_id
         self.original_summary = original_summary
         self.occurrence_start = occurrence_start
         self.occurrence_end = occurrence_end
 
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns the fields as a dict (the shape of ProjectedEventOccurrenceModel)."""
+        return {
+            'original_event_id': self.original_event_id,
+            'original_summary': self.original_summary,
+            'occurrence_start': self.occurrence_start,
+            'occurrence_end': self.occurrence_end,
+        }
+
     def __repr__(self):
         return f"ProjectedOccurrence(id='{self.original_event_id}', summary='{self.original_summary}', start='{self.occurrence_start}', end='{self.occurrence_end}')"
 
 
+def _as_datetime(value: Any) -> datetime:
+    """Returns a datetime from an EventDateTime.dateTime value (already parsed by Pydantic, or an RFC3339 string)."""
+    if isinstance(value, datetime):
+        return value
+    return date_parser.isoparse(value)
+
+
+def _as_date(value: Any) -> date:
+    """Returns a date from an EventDateTime.date value (already parsed by Pydantic, or a YYYY-MM-DD string)."""
+    if isinstance(value, date):
+        return value
+    return date_parser.parse(value).date()
+
+
+def _event_time_key(value: Any) -> Optional[Tuple]:
+    return (value.dateTime, value.date, value.timeZone) if value is not None else None
+
+
+class RulesetCache:
+    """Bounded LRU cache of compiled recurrences, shared by all projections in the process."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._rulesets: "OrderedDict[Tuple, recurrence.RecurrenceSet]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def key(event: GoogleCalendarEvent) -> Tuple:
+        """Identifies one version of a series: a changed event gets a new etag (or updated time).
+
+        The recurrence strings, start and end are part of the key too, so events fetched
+        without etag or updated (field masks) still never reuse a stale series.
+        """
+        return (event.id, event.etag or event.updated, tuple(event.recurrence), _event_time_key(event.start), _event_time_key(event.end))
+
+    def get(self, event: GoogleCalendarEvent) -> Optional['recurrence.RecurrenceSet']:
+        """Returns the compiled recurrence of a master event, compiling it on a miss.
+
+        Returns:
+            The RecurrenceSet, or None if the event has no RRULE or RDATE (not cached).
+
+        Raises:
+            ValueError: If the start or a recurrence line cannot be parsed.
+        """
+        if self.max_size <= 0:
+            return recurrence.compile_recurrence(event.recurrence, event.start, event.end)
+        key = self.key(event)
+        with self._lock:
+            series = self._rulesets.get(key)
+            if series is not None:
+                self._rulesets.move_to_end(key)
+                self._hits += 1
+                return series
+            self._misses += 1
+        # Compiled outside the lock; a concurrent miss on the same key just compiles it twice
+        series = recurrence.compile_recurrence(event.recurrence, event.start, event.end)
+        if series is None:
+            return None
+        with self._lock:
+            self._rulesets[key] = series
+            self._rulesets.move_to_end(key)
+            while len(self._rulesets) > self.max_size:
+                self._rulesets.popitem(last=False)
+        return series
+
+    def clear(self):
+        """Drops all compiled series (counters are kept)."""
+        with self._lock:
+            self._rulesets.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the cache size and hit/miss counters."""
+        with self._lock:
+            hits, misses, size = self._hits, self._misses, len(self._rulesets)
+        total = hits + misses
+        return {
+            'size': size,
+            'max_size': self.max_size,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': (hits / total) if total else 0.0,
+        }
+
+
+_ruleset_cache = RulesetCache(RECURRENCE_CACHE_SIZE)
+
+
+def get_recurrence_cache_stats() -> Dict[str, Any]:
+    """Returns compiled-recurrence cache metrics (size, hits, misses, hit_rate).
+
+    Only this process's cache is counted; series expanded in the worker pool use the workers'
+    own caches and do not appear here.
+    """
+    return _ruleset_cache.stats()
+
+
+_UNTIL_PATTERN = re.compile(r'UNTIL=(\d{8})(?:T(\d{6}))?')
+_DAY = timedelta(days=1) # Slack for all-day and floating times, whose UTC offset is unknown here
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treats naive datetimes as UTC, matching how find_events formats them for the API."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def series_in_window(event: GoogleCalendarEvent, time_min: datetime, time_max: datetime) -> bool:
+    """Returns False for master events that cannot have an occurrence in [time_min, time_max].
+
+    The check is conservative: it rules out non-recurring events, series starting after the
+    window and series whose every RRULE ends (UNTIL) before it. Series bounded by COUNT, and
+    series with RDATEs, are kept.
+    """
+    if not event.recurrence or not event.start or not (event.start.dateTime or event.start.date):
+        return False
+    try:
+        if event.start.dateTime:
+            first_start = _as_utc(_as_datetime(event.start.dateTime))
+            slack = timedelta(0)
+        else:
+            first_start = datetime.combine(_as_date(event.start.date), datetime.min.time(), tzinfo=timezone.utc)
+            slack = _DAY
+        if first_start - slack > _as_utc(time_max):
+            return False
+        if any(line.startswith('RDATE') for line in event.recurrence):
+            return True
+        untils = []
+        for line in event.recurrence:
+            if not line.startswith('RRULE'):
+                continue
+            match = _UNTIL_PATTERN.search(line)
+            if not match:
+                return True # Unbounded, or bounded by COUNT
+            day, clock = match.groups()
+            until = datetime.strptime(day + (clock or '235959'), '%Y%m%d%H%M%S').replace(tzinfo=timezone.utc)
+            untils.append(until)
+        if not untils:
+            return True # No RRULE; project_occurrences reports it
+        if event.end and event.end.dateTime and event.start.dateTime:
+            duration = _as_datetime(event.end.dateTime) - _as_datetime(event.start.dateTime)
+        elif event.end and event.end.date and event.start.date:
+            duration = _as_date(event.end.date) - _as_date(event.start.date)
+        else:
+            duration = _DAY
+        return max(untils) + duration + _DAY > _as_utc(time_min)
+    except (ValueError, TypeError):
+        return True # Let project_occurrences report the unparsable event
+
+
+def select_mirror_series(mirror, time_min: datetime, time_max: datetime, event_query: Optional[str] = None) -> List[GoogleCalendarEvent]:
+    """Returns the master events of a (single_events=False) mirror that can occur in the window."""
+    masters = []
+    for event in mirror.select_events(time_max=time_max, query=event_query, order_by=None):
+        if not event.get('recurrence'):
+            continue # Skip building models for plain events
+        master = GoogleCalendarEvent.from_google(field_masks.project(event, EVENT_FIELD_PRESETS['recurrence']))
+        if series_in_window(master, time_min, time_max):
+            masters.append(master)
+    return masters
+
+
 def project_recurring_events(
     credentials: Credentials,
     time_min: datetime,
     time_max: datetime,
     calendar_id: str = 'primary',
-    event_query: Optional[str] = None
+    event_query: Optional[str] = None,
+    use_mirror: bool = False
 ) -> List[ProjectedEventOccurrence]:
     """Finds recurring events and projects their occurrences within a time window.
 
@@ -49,198 +277,316 @@ def project_recurring_events(
         time_max: End of the projection window (timezone-aware recommended).
         calendar_id: The calendar to search within.
         event_query: Optional text query to filter master recurring events (e.g., "Birthday").
+        use_mirror: Read master events from the calendar's local mirror instead of Google.
 
     Returns:
-        A list of ProjectedEventOccurrence objects representing calculated occurrences.
+        A list of ProjectedEventOccurrence objects representing calculated occurrences
+        (empty if the master events could not be fetched).
     """
-    projected_occurrences: List[ProjectedEventOccurrence] = []
-
     logger.info(f"Starting projection of recurring events for calendar '{calendar_id}'")
     logger.info(f"Projection window: {time_min} to {time_max}. Query: '{event_query or 'None'}'")
 
-    # 1. Find master recurring events (not single instances)
-    # We need events *within* the window OR whose recurrence *starts* before the window ends
-    # and *might* generate instances within the window.
-    # Finding events without timeMin/timeMax might be too broad.
-    # A safe approach is to find master events potentially active *before* the window ends.
-    master_events_response = calendar_actions.find_events(
-        credentials=credentials,
-        calendar_id=calendar_id,
-        # timeMax=time_max, # Find masters that haven't ended before our window
-        q=event_query,
-        single_events=False, # Crucial: Get the master event definition
-        showDeleted=False,
-        max_results=2500 # Adjust as needed, API max is 2500
-    )
+    # 1. Find the master events (not single instances) of series active in the window
+    try:
+        if use_mirror:
+            mirror = calendar_sync.ensure_fresh(credentials, calendar_id, single_events=False)
+            master_events = select_mirror_series(mirror, time_min, time_max, event_query)
+        else:
+            master_events = []
+            fetched = 0
+            for page in calendar_actions.iter_event_pages(
+                credentials,
+                calendar_id=calendar_id,
+                time_min=time_min,
+                time_max=time_max,
+                query=event_query,
+                single_events=False, # Crucial: Get the master event definition
+                showDeleted=False,
+                page_size=MASTER_PAGE_SIZE,
+                fields='recurrence' # Expansion only reads the series definition
+            ):
+                fetched += len(page.items)
+                master_events.extend(event for event in page.items if series_in_window(event, time_min, time_max))
+            logger.debug(f"Kept {len(master_events)} recurring master events of {fetched} fetched.")
+    except HttpError as error:
+        logger.error(f"Google API error while fetching master events for calendar '{calendar_id}': {error}", exc_info=True)
+        return []
 
-    if not master_events_response or not master_events_response.items:
+    if not master_events:
         logger.info("No master recurring events found matching the criteria.")
         return []
 
-    logger.debug(f"Found {len(master_events_response.items)} potential master events.")
+    # 2. Expand the recurrence rules of the master events within the window
+    return project_occurrences(master_events, time_min, time_max)
 
-    # 2. Iterate through master events and parse recurrence rules
-    for event in master_events_response.items:
-        if not event.recurrence:
-            # logger.debug(f"Skipping non-recurring event: {event.summary} ({event.id})")
-            continue # Skip non-recurring events
 
-        if not event.start or not (event.start.dateTime or event.start.date):
-             logger.warning(f"Skipping recurring event without start time: {event.summary} ({event.id})")
-             continue
+def project_occurrences(
+    master_events: List[GoogleCalendarEvent],
+    time_min: datetime,
+    time_max: datetime,
+    workers: Optional[int] = None,
+) -> List[ProjectedEventOccurrence]:
+    """Projects the occurrences of already-fetched master recurring events within a time window.
 
-        # Determine the start datetime of the recurrence series (dtstart)
-        # Handle both date and dateTime cases
-        dtstart_obj: Optional[datetime] = None
-        event_duration: Optional[timedelta] = None
+    Args:
+        master_events: Events fetched with single_events=False. Non-recurring events are skipped.
+        time_min: Start of the projection window.
+        time_max: End of the projection window.
+        workers: Expansion processes (None for RECURRENCE_WORKERS). Projections with fewer
+            than RECURRENCE_PARALLEL_MIN_SERIES recurring events are expanded in-process.
 
-        if event.start.dateTime:
-            try:
-                # Use dateutil parser for robust ISO parsing
-                dtstart_obj = date_parser.isoparse(event.start.dateTime)
-                if event.end and event.end.dateTime:
-                    dtend_obj = date_parser.isoparse(event.end.dateTime)
-                    event_duration = dtend_obj - dtstart_obj
-                else:
-                    # Default duration for dateTime events if end is missing (e.g., 1 hour)
-                    event_duration = timedelta(hours=1)
-                    logger.warning(f"Recurring event '{event.summary}' missing end.dateTime, assuming {event_duration} duration.")
-            except ValueError as e:
-                 logger.error(f"Could not parse dateTime for event {event.summary} ({event.id}): {e}")
-                 continue
-        elif event.start.date:
-            try:
-                # All-day event - parse date and set time to midnight
-                start_date = date_parser.parse(event.start.date).date()
-                # Make dtstart timezone-aware if time_min is, otherwise naive UTC
-                dtstart_obj = datetime.combine(start_date, datetime.min.time())
-                if time_min.tzinfo:
-                     # Try to use the target window's timezone, otherwise UTC fallback
-                     dtstart_obj = dtstart_obj.replace(tzinfo=time_min.tzinfo)
-                # else:
-                     # dtstart_obj = dtstart_obj.replace(tzinfo=timezone.utc) # Requires import
-
-                # Duration for all-day events is typically 1 day
-                if event.end and event.end.date:
-                    end_date = date_parser.parse(event.end.date).date()
-                    event_duration = end_date - start_date # This includes the start day but excludes the end day
-                else:
-                    event_duration = timedelta(days=1) # Assume single all-day event
-            except ValueError as e:
-                 logger.error(f"Could not parse date for event {event.summary} ({event.id}): {e}")
-                 continue
-
-        if not dtstart_obj or event_duration is None:
-             logger.error(f"Could not determine dtstart or duration for event {event.summary} ({event.id})")
-             continue
-
-        # Extract RRULE, EXDATE, RDATE strings
-        # Google Calendar API returns recurrence as a list of strings
-        # e.g., ['RRULE:FREQ=WEEKLY;UNTIL=20110701T170000Z', 'EXDATE:20110610T100000Z']
-        rrule_str: Optional[str] = None
-        exdate_strs: List[str] = []
-        rdate_strs: List[str] = []
-        for rule_str in event.recurrence:
-            if rule_str.startswith('RRULE:'):
-                rrule_str = rule_str # Assume only one RRULE per event
-            elif rule_str.startswith('EXDATE'):
-                exdate_strs.append(rule_str)
-            elif rule_str.startswith('RDATE'):
-                rdate_strs.append(rule_str)
-
-        if not rrule_str:
-            logger.warning(f"Recurring event '{event.summary}' ({event.id}) has no RRULE string. Skipping.")
-            continue
+    Returns:
+        A list of ProjectedEventOccurrence objects sorted by occurrence start.
+    """
+    return list(iter_projected_occurrences(master_events, time_min, time_max, workers))
 
-        try:
-            # Parse the main recurrence rule
-            # Pass dtstart, which is essential for rrule calculations
-            ruleset = rrule.rruleset()
-            # Use rrulestr which handles RRULE and dtstart implicitly if not provided otherwise
-            # We need to make sure the timezone handling matches dtstart_obj
-            main_rule = rrule.rrulestr(rrule_str, dtstart=dtstart_obj, forceset=True) # forceset=True to handle COUNT/UNTIL easily
-            ruleset.rrule(main_rule[0]) # Add the parsed rule to the set
-
-            # Add exception dates (EXDATE)
-            for exdate_str in exdate_strs:
-                # EXDATE format: "EXDATE;TZID=Europe/Zurich:20110426T080000,20110428T080000"
-                # Or "EXDATE:20240101" (all-day)
-                # Or "EXDATE:20240101T100000Z" (UTC)
-                # dateutil.rrule.rrulestr can parse EXDATE directly if part of the string,
-                # but Google separates them. We need to parse dates/datetimes manually.
-                # Split by ':' and then by ','
-                parts = exdate_str.split(':', 1)
-                if len(parts) == 2:
-                    param_str, dates_str = parts
-                    dates = dates_str.split(',')
-                    params = {}
-                    if ';' in param_str: # Check for TZID or VALUE=DATE
-                       param_parts = param_str.split(';')[1:] # Skip EXDATE itself
-                       for part in param_parts:
-                           if '=' in part:
-                               key, value = part.split('=', 1)
-                               params[key.upper()] = value
-
-                    is_all_day = params.get('VALUE') == 'DATE'
-                    tz_id = params.get('TZID')
-                    # TODO: Handle TZID properly using pytz if needed
-
-                    for date_str in dates:
-                        try:
-                            if is_all_day:
-                                ex_date = date_parser.parse(date_str).date()
-                                # Create datetime at midnight for comparison/ruleset
-                                ex_dt = datetime.combine(ex_date, datetime.min.time())
-                                if dtstart_obj.tzinfo: # Match tzinfo
-                                    ex_dt = ex_dt.replace(tzinfo=dtstart_obj.tzinfo)
-                            else:
-                                ex_dt = date_parser.isoparse(date_str)
-                                # TODO: Apply TZID if present
-
-                            ruleset.exdate(ex_dt)
-                        except ValueError:
-                            logger.warning(f"Could not parse EXDATE value '{date_str}' for event {event.id}")
-
-            # Add explicit recurrence dates (RDATE) - Less common?
-            # Similar parsing logic as EXDATE if needed.
-            # for rdate_str in rdate_strs: ... ruleset.rdate(...)
-
-            # Generate occurrences within the desired window [time_min, time_max)
-            # Note: rruleset.between includes dates equal to dtstart/until
-            occurrences = ruleset.between(time_min, time_max, inc=True) # inc=True includes time_min
-
-            logger.debug(f"Event '{event.summary}' ({event.id}): Found {len(occurrences)} occurrences via rrule.")
-
-            for occ_start_dt in occurrences:
-                 # Ensure timezone consistency if needed
-                 if dtstart_obj.tzinfo and occ_start_dt.tzinfo is None:
-                      occ_start_dt = occ_start_dt.replace(tzinfo=dtstart_obj.tzinfo)
-                 elif not dtstart_obj.tzinfo and occ_start_dt.tzinfo:
-                      occ_start_dt = occ_start_dt.replace(tzinfo=None)
-
-                 # Calculate occurrence end time
-                 occ_end_dt = occ_start_dt + event_duration
-
-                 # Double check if the occurrence actually overlaps the window
-                 # ruleset.between should handle this, but an extra check might be useful
-                 # if occ_start_dt < time_max and occ_end_dt > time_min:
-                 projected_occurrences.append(
-                      ProjectedEventOccurrence(
-                           original_event_id=event.id,
-                           original_summary=event.summary or "No Summary",
-                           occurrence_start=occ_start_dt,
-                           occurrence_end=occ_end_dt
-                      )
-                 )
 
+def iter_projected_occurrences(
+    master_events: List[GoogleCalendarEvent],
+    time_min: datetime,
+    time_max: datetime,
+    workers: Optional[int] = None,
+) -> Iterator[ProjectedEventOccurrence]:
+    """Yields the occurrences of master recurring events in start order, without collecting them.
+
+    Each series is expanded into its own sorted list of (start, end) pairs, and the series are
+    merged through a heap; occurrence objects are only created as they are yielded. Expansion
+    starts on the first next(), so callers can run it off the event loop. Arguments are the
+    same as for project_occurrences.
+
+    Pooled expansion (see Parallel Expansion) waits for every chunk before the first yield and
+    uses the workers' ruleset caches instead of this process's.
+    """
+    recurring = [event for event in master_events if event.recurrence]
+    workers = RECURRENCE_WORKERS if workers is None else workers
+    if workers > 1 and len(recurring) >= RECURRENCE_PARALLEL_MIN_SERIES:
+        try:
+            chunks = _expand_in_pool(recurring, time_min, time_max, workers)
         except Exception as e:
-            logger.error(f"Failed to parse/process recurrence for event '{event.summary}' ({event.id}): {e}", exc_info=True)
-            continue # Skip this event
+            logger.warning(f"Parallel recurrence expansion failed ({e}); expanding in-process.", exc_info=True)
+            shutdown_expansion_pool()
+        else:
+            # Tuples order by start, then series index: ties keep the order of master_events
+            for _, index, start, end in heapq.merge(*chunks):
+                event = recurring[index]
+                yield ProjectedEventOccurrence(event.id, event.summary or "No Summary", start, end)
+            return
+    yield from _merge_series(recurring, time_min, time_max)
+
+
+def _series_instances(event: GoogleCalendarEvent, time_min: datetime, time_max: datetime) -> List[Tuple[datetime, datetime]]:
+    """Returns one master event's (start, end) pairs in the window, sorted; [] if it cannot be expanded."""
+    if not event.start or not (event.start.dateTime or event.start.date):
+        logger.warning(f"Skipping recurring event without start time: {event.summary} ({event.id})")
+        return []
+
+    try:
+        series = _ruleset_cache.get(event)
+    except (ValueError, TypeError) as e:
+        logger.error(f"Failed to parse recurrence for event '{event.summary}' ({event.id}): {e}")
+        return []
+    if series is None:
+        logger.warning(f"Recurring event '{event.summary}' ({event.id}) has no RRULE or RDATE. Skipping.")
+        return []
+
+    try:
+        instances = series.between(time_min, time_max)
+    except Exception as e:
+        logger.error(f"Failed to expand recurrence for event '{event.summary}' ({event.id}): {e}", exc_info=True)
+        return []
+    logger.debug(f"Event '{event.summary}' ({event.id}): Found {len(instances)} occurrences.")
+    return instances
+
 
-    logger.info(f"Finished projection. Found {len(projected_occurrences)} total occurrences.")
-    # Sort occurrences chronologically?
-    projected_occurrences.sort(key=lambda x: x.occurrence_start)
-    return projected_occurrences 
+def _merge_series(
+    master_events: List[GoogleCalendarEvent],
+    time_min: datetime,
+    time_max: datetime,
+) -> Iterator[ProjectedEventOccurrence]:
+    """Expands master events in this process and merges their occurrences by start."""
+    series: List[Tuple[str, str, List[Tuple[datetime, datetime]], List[float]]] = []
+    heap: List[Tuple[float, int, int]] = [] # (start timestamp, series index, position) of each series' next occurrence
+    total = 0
+    for event in master_events:
+        if not event.recurrence:
+            continue # Skip non-recurring events
+        instances = _series_instances(event, time_min, time_max)
+        if instances:
+            # Timestamps compare far faster than aware datetimes in the heap; naive all-day
+            # starts are treated as UTC, like window bounds
+            keys = [_as_utc(start).timestamp() for start, _ in instances]
+            heap.append((keys[0], len(series), 0))
+            series.append((event.id, event.summary or "No Summary", instances, keys))
+            total += len(instances)
+
+    logger.info(f"Finished projection. Found {total} total occurrences in {len(series)} series.")
+    heapq.heapify(heap)
+    while heap:
+        _, index, position = heap[0] # Ties keep the order of master_events, as a stable sort would
+        event_id, summary, instances, keys = series[index]
+        start, end = instances[position]
+        yield ProjectedEventOccurrence(event_id, summary, start, end)
+        position += 1
+        if position < len(instances):
+            heapq.heapreplace(heap, (keys[position], index, position))
+        else:
+            heapq.heappop(heap)
+
+
+# A pooled occurrence: (start timestamp, series index in the projection, start, end)
+PooledOccurrence = Tuple[float, int, datetime, datetime]
+
+
+def _expand_series(
+    master_events: List[GoogleCalendarEvent],
+    time_min: datetime,
+    time_max: datetime,
+    first_index: int = 0,
+) -> List[PooledOccurrence]:
+    """Expands a chunk of recurring master events in a pool worker; returns sorted compact occurrences.
+
+    first_index is the projection index of the chunk's first event, so the parent can look up
+    each occurrence's series without its ID and summary being pickled once per occurrence.
+    """
+    occurrences: List[PooledOccurrence] = []
+    for offset, event in enumerate(master_events):
+        # Naive all-day starts are keyed as UTC, like in _merge_series
+        occurrences.extend(
+            (_as_utc(start).timestamp(), first_index + offset, start, end)
+            for start, end in _series_instances(event, time_min, time_max)
+        )
+    occurrences.sort()
+    return occurrences
+
+
+_expansion_pool: Optional[ProcessPoolExecutor] = None
+_expansion_pool_workers = 0
+_expansion_pool_lock = threading.Lock()
+
+
+def _get_expansion_pool(workers: int) -> ProcessPoolExecutor:
+    global _expansion_pool, _expansion_pool_workers
+    with _expansion_pool_lock:
+        if _expansion_pool is None or _expansion_pool_workers != workers:
+            if _expansion_pool is not None:
+                _expansion_pool.shutdown(wait=False)
+            # Spawned workers start clean (no inherited threads or locks). calendar_actions is
+            # imported first, because importing this module first trips its circular import.
+            _expansion_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=importlib.import_module,
+                initargs=(f'{__package__}.calendar_actions',),
+            )
+            _expansion_pool_workers = workers
+            logger.info(f"Started recurrence expansion pool with {workers} worker processes.")
+        return _expansion_pool
+
+
+def _expand_in_pool(
+    master_events: List[GoogleCalendarEvent],
+    time_min: datetime,
+    time_max: datetime,
+    workers: int,
+) -> List[List[PooledOccurrence]]:
+    """Expands recurring master events in the pool; returns the sorted compact occurrences of each chunk."""
+    pool = _get_expansion_pool(workers)
+    chunk_size = -(-len(master_events) // (workers * 2)) # Two chunks per worker evens out uneven series
+    futures = [
+        pool.submit(_expand_series, master_events[offset:offset + chunk_size], time_min, time_max, offset)
+        for offset in range(0, len(master_events), chunk_size)
+    ]
+    chunks = [future.result() for future in futures]
+    logger.info(f"Finished projection. Found {sum(map(len, chunks))} total occurrences in {len(master_events)} series ({len(chunks)} chunks across {workers} processes).")
+    return chunks
+
+
+def shutdown_expansion_pool():
+    """Stops the recurrence expansion worker processes (called on server shutdown)."""
+    global _expansion_pool
+    with _expansion_pool_lock:
+        if _expansion_pool is not None:
+            _expansion_pool.shutdown(wait=False, cancel_futures=True)
+            _expansion_pool = None
+
+
+# Expanded instances per accumulator batch on mirror reads (the API page maximum)
+BUSYNESS_BATCH_SIZE = 2500
+
+
+def fold_mirror_busyness(mirror, accumulator: 'busyness.BusynessAccumulator', time_min: datetime, time_max: datetime) -> None:
+    """Adds a mirror's events in the window to an accumulator, in BUSYNESS_BATCH_SIZE batches.
+
+    Store-backed mirrors are read one batch at a time (see CalendarMirror.iter_pages), so a
+    long window never loads all of its events at once.
+    """
+    for page in mirror.iter_pages(BUSYNESS_BATCH_SIZE, time_min=time_min, time_max=time_max):
+        accumulator.add([
+            GoogleCalendarEvent.from_google(field_masks.project(event, EVENT_FIELD_PRESETS['timing-only']))
+            for event in page
+        ])
+
+
+def busyness_report(
+    total: Optional['busyness.BusynessAccumulator'],
+    tz: tzinfo,
+    calendars: Dict[str, Dict[str, int]],
+    errors: Dict[str, str]
+) -> Dict[str, Any]:
+    """Builds the analyze_busyness result from the merged accumulator and per-calendar stats."""
+    return {
+        'time_zone': busyness.time_zone_name(tz),
+        'buckets': total.result() if total is not None else {},
+        'calendars': calendars,
+        'errors': errors,
+    }
+
+
+def _fold_calendar_busyness(
+    credentials: Credentials,
+    calendar_id: str,
+    time_min: datetime,
+    time_max: datetime,
+    use_mirror: bool,
+    bucket: str,
+    tz: Optional[tzinfo]
+) -> Tuple['busyness.BusynessAccumulator', int]:
+    """Folds one calendar's events into a new accumulator, one page at a time.
+
+    Args:
+        tz: Time zone of the buckets; None for the calendar's own.
+        Other arguments are as in analyze_busyness.
+
+    Returns:
+        The accumulator, and the number of pages fetched from Google (0 for mirror reads).
+
+    Raises:
+        googleapiclient.errors.HttpError: If a request fails.
+    """
+    if use_mirror:
+        mirror = calendar_sync.ensure_fresh(credentials, calendar_id, single_events=True)
+        accumulator = busyness.BusynessAccumulator(time_min, time_max, tz or mirror.calendar_tz(), bucket)
+        fold_mirror_busyness(mirror, accumulator, time_min, time_max)
+        return accumulator, 0
+
+    accumulator = None
+    pages = 0
+    # Pages are fetched one at a time as the loop asks for them; only the current one is in memory
+    for page in calendar_actions.iter_event_pages(
+        credentials,
+        calendar_id=calendar_id,
+        time_min=time_min,
+        time_max=time_max,
+        single_events=True, # Get individual instances
+        showDeleted=False,
+        page_size=2500, # API maximum, fewest round-trips
+        fields='timing-only' # Aggregation only reads start/end
+    ):
+        if accumulator is None:
+            accumulator = busyness.BusynessAccumulator(time_min, time_max, tz or calendar_sync.resolve_time_zone(page.timeZone), bucket)
+        accumulator.add(page.items)
+        pages += 1
+    return accumulator, pages
 
 
 def analyze_busyness(
@@ -248,98 +594,92 @@ def analyze_busyness(
     time_min: datetime,
     time_max: datetime,
     calendar_id: str = 'primary',
-) -> Dict[date, Dict[str, Any]]:
-    """Analyzes event count and total duration per day within a time window.
+    use_mirror: bool = False,
+    bucket: str = 'day',
+    time_zone: Optional[str] = None,
+    calendar_ids: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """Analyzes event count and busy minutes per time bucket within a time window.
+
+    Events are folded into the totals one page at a time, so memory does not grow with the
+    length of the window, and every page is consumed (nothing is truncated).
 
     Args:
         credentials: Valid Google OAuth2 credentials.
         time_min: Start of the analysis window (timezone-aware recommended).
         time_max: End of the analysis window (timezone-aware recommended).
         calendar_id: The calendar to analyze.
+        use_mirror: Read events from the calendars' local mirrors instead of Google.
+        bucket: 'day', 'hour' (hour-of-day profile) or 'weekday' (weekday profile).
+        time_zone: IANA time zone defining day and hour boundaries (default: the time zone of
+            the first calendar; UTC if that calendar cannot be read).
+        calendar_ids: Calendars to analyze together, instead of calendar_id.
 
     Returns:
-        A dictionary mapping each date within the window to its busyness stats:
-        {'event_count': int, 'total_duration_minutes': float}
+        A dictionary with:
+          - 'time_zone': the time zone used for the buckets.
+          - 'buckets': {key: {'event_count': int, 'total_duration_minutes': float}} summed over
+            the calendars. Keys are dates for 'day', hours 0-23 for 'hour' and weekdays 0-6
+            (0 = Monday) for 'weekday' (see busyness).
+          - 'calendars': {calendar_id: {'pages': int, 'events': int}} for each calendar analyzed.
+          - 'errors': {calendar_id: message} for calendars that could not be read (left out of the totals).
     """
-    busyness_by_date: Dict[date, Dict[str, Any]] = defaultdict(lambda: {'event_count': 0, 'total_duration_minutes': 0.0})
-
-    logger.info(f"Starting busyness analysis for calendar '{calendar_id}'")
+    calendar_ids = list(dict.fromkeys(calendar_ids or [calendar_id]))
+    logger.info(f"Starting busyness analysis for {len(calendar_ids)} calendar(s) (bucket: {bucket})")
     logger.info(f"Analysis window: {time_min} to {time_max}")
 
-    # 1. Find all event instances in the range
-    events_response = calendar_actions.find_events(
-        credentials=credentials,
-        calendar_id=calendar_id,
-        time_min=time_min,
-        time_max=time_max,
-        single_events=True, # Get individual instances
-        showDeleted=False,
-        max_results=2500 # Consider pagination for very long ranges
-    )
-
-    if not events_response or not events_response.items:
-        logger.info("No events found in the specified time range for busyness analysis.")
-        return dict(busyness_by_date) # Return empty default dict converted to regular dict
-
-    logger.debug(f"Found {len(events_response.items)} event instances for analysis.")
-
-    # 2. Process events and aggregate stats by date
-    for event in events_response.items:
-        start_dt: Optional[datetime] = None
-        end_dt: Optional[datetime] = None
-        event_date: Optional[date] = None
-
-        # Determine start and end datetimes/dates
-        if event.start:
-            if event.start.dateTime:
-                try:
-                    start_dt = date_parser.isoparse(event.start.dateTime)
-                    event_date = start_dt.date()
-                except ValueError: logger.warning(f"Could not parse start dateTime: {event.start.dateTime}"); continue
-            elif event.start.date:
-                try:
-                    event_date = date_parser.parse(event.start.date).date()
-                    # All-day events don't have a specific duration from start/end times typically
-                except ValueError: logger.warning(f"Could not parse start date: {event.start.date}"); continue
-
-        if not event_date:
-            logger.warning(f"Event '{event.summary}' ({event.id}) missing valid start information. Skipping.")
-            continue
-
-        # Ensure the event actually starts within our analysis window bounds
-        # (API might return events overlapping the start/end)
-        # Need to compare dates correctly (timezone awareness)
-        if not (time_min.date() <= event_date < time_max.date()):
-             # Basic date check; refine if timezone crossing near midnight is critical
-             # logger.debug(f"Skipping event {event.id} starting outside date range: {event_date}")
-             continue
-
-        # Increment event count for the date
-        busyness_by_date[event_date]['event_count'] += 1
-
-        # Calculate duration for non-all-day events
-        if start_dt and event.end and event.end.dateTime:
-            try:
-                end_dt = date_parser.isoparse(event.end.dateTime)
-                duration = end_dt - start_dt
-                # Add duration in minutes, handle potential negative duration if times are swapped?
-                busyness_by_date[event_date]['total_duration_minutes'] += max(0, duration.total_seconds() / 60.0)
-            except ValueError:
-                logger.warning(f"Could not parse end dateTime: {event.end.dateTime} for event {event.id}")
-            except TypeError:
-                logger.warning(f"Could not calculate duration for event {event.id} (start: {start_dt}, end: {end_dt})")
-
-
-    # Fill in days with zero events within the range?
-    # Optional: Iterate from time_min.date() to time_max.date() and ensure all keys exist
-    # current_date = time_min.date()
-    # while current_date < time_max.date():
-    #     if current_date not in busyness_by_date:
-    #         busyness_by_date[current_date] = {'event_count': 0, 'total_duration_minutes': 0.0}
-    #     current_date += timedelta(days=1)
-
-    # Convert defaultdict back to regular dict and sort by date
-    sorted_busyness = dict(sorted(busyness_by_date.items()))
-
-    logger.info(f"Finished busyness analysis. Analyzed {len(sorted_busyness)} days.")
-    return sorted_busyness 
\ No newline at end of file
+    tz = calendar_sync.resolve_time_zone(time_zone) if time_zone else None
+    total = None
+    calendars: Dict[str, Dict[str, int]] = {}
+    errors: Dict[str, str] = {}
+    for index, current_id in enumerate(calendar_ids):
+        try:
+            accumulator, pages = _fold_calendar_busyness(credentials, current_id, time_min, time_max, use_mirror, bucket, tz)
+        except HttpError as error:
+            logger.error(f"Google API error while analyzing busyness of calendar '{current_id}': {error}", exc_info=True)
+            errors[current_id] = f"Google API error {error.resp.status}"
+        else:
+            tz = accumulator.tz # The first calendar's time zone applies to the rest
+            calendars[current_id] = {'pages': pages, 'events': accumulator.events}
+            if total is None:
+                total = accumulator
+            else:
+                total.merge(accumulator)
+        if tz is None:
+            tz = timezone.utc # The first calendar could not be read
+
+    logger.info(f"Finished busyness analysis: {sum(stats['events'] for stats in calendars.values())} events from {len(calendars)} calendar(s).")
+    return busyness_report(total, tz, calendars, errors)
+
+
+def aggregate_busyness(
+    events: List[GoogleCalendarEvent],
+    time_min: datetime,
+    time_max: datetime,
+    bucket: str = 'day',
+    tz: Optional[tzinfo] = None,
+) -> Dict[Any, Dict[str, Any]]:
+    """Aggregates event count and busy minutes per bucket for already-fetched events.
+
+    Events spanning bucket boundaries are split between the buckets they overlap; only the
+    part inside [time_min, time_max) counts. See busyness for the details.
+
+    Args:
+        events: Event instances (single_events=True).
+        time_min: Start of the analysis window.
+        time_max: End of the analysis window.
+        bucket: 'day', 'hour' or 'weekday'.
+        tz: Time zone defining day and hour boundaries (default: time_min's, or UTC).
+
+    Returns:
+        A dictionary mapping each bucket to {'event_count': int, 'total_duration_minutes': float},
+        sorted by bucket. 'day' only lists days with events; 'hour' and 'weekday' list every bucket.
+
+    Raises:
+        ValueError: If bucket is unknown.
+    """
+    if tz is None:
+        tz = time_min.tzinfo or timezone.utc
+    result = busyness.aggregate(events, time_min, time_max, tz, bucket)
+    logger.info(f"Finished busyness analysis. Aggregated {len(events)} events into {len(result)} '{bucket}' buckets.")
+    return result
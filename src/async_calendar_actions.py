@@ -0,0 +1,843 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+from datetime import datetime, time, timezone, tzinfo
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
+
+from googleapiclient.errors import HttpError
+from google.oauth2.credentials import Credentials
+
+from .models import (
+    GoogleCalendarEvent,
+    EventsResponse,
+    EventCreateRequest,
+    EventUpdateRequest,
+    CalendarListResponse,
+    CalendarListEntry,
+    MultiCalendarEvent,
+    MultiCalendarEventsResponse
+)
+from .async_google_client import get_async_client
+from . import calendar_sync
+from . import calendar_list_cache
+from . import field_masks
+from .field_masks import EVENT_FIELD_PRESETS
+from .calendar_actions import (
+    _get_calendar_service,
+    _build_find_events_kwargs,
+    _build_mirror_query_kwargs,
+    _build_event_body,
+    _build_update_body,
+    _build_attendee_patch_body,
+    _extract_attendee_statuses,
+    _build_freebusy_body,
+    _process_freebusy_result,
+    _select_mutual_slot,
+    _build_mutual_event_data,
+)
+from .analysis import (
+    ProjectedEventOccurrence, project_occurrences, iter_projected_occurrences, select_mirror_series, series_in_window,
+    MASTER_PAGE_SIZE,
+    fold_mirror_busyness, busyness_report,
+)
+from .busyness import BusynessAccumulator
+
+logger = logging.getLogger(__name__)
+
+# Async mirror of calendar_actions. Each function takes the same arguments and returns the
+# same values as its sync counterpart, but awaits the Google API call instead of blocking a
+# threadpool worker. Request bodies and response processing are shared with calendar_actions.
+
+# Multi-calendar search (search_all_calendars) runs one find_events per calendar concurrently.
+#   CALENDAR_FANOUT_CONCURRENCY: Maximum calendars fetched at once (default 10).
+#   CALENDAR_FANOUT_TIMEOUT: Seconds allowed per calendar before it is reported as timed out (default 10).
+CALENDAR_FANOUT_CONCURRENCY = int(os.getenv('CALENDAR_FANOUT_CONCURRENCY', 10))
+CALENDAR_FANOUT_TIMEOUT = float(os.getenv('CALENDAR_FANOUT_TIMEOUT', 10))
+
+def _log_api_error(action: str, error: HttpError):
+    """Logs a Google API error with its decoded content."""
+    error_content = "Unknown error content"
+    try:
+        error_content = error.content.decode('utf-8')
+    except Exception:
+        pass
+    logger.error(f"Google API error ({action}): {error.resp.status} - {error_content}")
+
+# --- Calendar Action Functions ---
+
+async def find_events(
+    credentials: Credentials,
+    calendar_id: str = 'primary',
+    time_min: Optional[datetime] = None,
+    time_max: Optional[datetime] = None,
+    query: Optional[str] = None,
+    max_results: int = 50,
+    single_events: bool = True,
+    order_by: str = 'startTime',
+    iCalUID: Optional[str] = None,
+    sharedExtendedProperty: Optional[str] = None,
+    privateExtendedProperty: Optional[str] = None,
+    showDeleted: bool = False,
+    eventTypes: Optional[List[str]] = None,
+    page_token: Optional[str] = None,
+    use_mirror: bool = False,
+    fields: Optional[str] = None
+) -> Optional[EventsResponse]:
+    """Async version of calendar_actions.find_events."""
+    if use_mirror:
+        try:
+            mirror = await calendar_sync.async_ensure_fresh(credentials, calendar_id, single_events)
+            # Mirror reads decode and filter the window locally, off the event loop
+            return await asyncio.to_thread(mirror.query, **_build_mirror_query_kwargs(
+                time_min, time_max, query, max_results, order_by, iCalUID, sharedExtendedProperty,
+                privateExtendedProperty, showDeleted, eventTypes, page_token, fields
+            ))
+        except HttpError as error:
+            logger.error(f"Google API error while syncing mirror for calendar '{calendar_id}': {error}", exc_info=True)
+            return None
+
+    service = _get_calendar_service(credentials)
+    list_kwargs = _build_find_events_kwargs(
+        calendar_id=calendar_id,
+        time_min=time_min,
+        time_max=time_max,
+        query=query,
+        max_results=max_results,
+        single_events=single_events,
+        order_by=order_by,
+        iCalUID=iCalUID,
+        sharedExtendedProperty=sharedExtendedProperty,
+        privateExtendedProperty=privateExtendedProperty,
+        showDeleted=showDeleted,
+        eventTypes=eventTypes,
+        page_token=page_token,
+        fields=fields,
+    )
+    logger.info(f"Fetching events (async) from calendar '{calendar_id}' with parameters: {list_kwargs}")
+    try:
+        events_result = await get_async_client(credentials).execute(service.events().list(**list_kwargs))
+        logger.info(f"Found {len(events_result.get('items', []))} events.")
+        return EventsResponse.from_google(events_result)
+    except HttpError as error:
+        _log_api_error('find_events', error)
+        return None
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while finding events: {e}", exc_info=True)
+        return None
+
+# --- Pagination ---
+
+async def iter_event_pages(
+    credentials: Credentials,
+    calendar_id: str = 'primary',
+    time_min: Optional[datetime] = None,
+    time_max: Optional[datetime] = None,
+    query: Optional[str] = None,
+    page_size: int = 250,
+    single_events: bool = True,
+    order_by: str = 'startTime',
+    iCalUID: Optional[str] = None,
+    sharedExtendedProperty: Optional[str] = None,
+    privateExtendedProperty: Optional[str] = None,
+    showDeleted: bool = False,
+    eventTypes: Optional[List[str]] = None,
+    page_token: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    fields: Optional[str] = None
+) -> AsyncIterator[EventsResponse]:
+    """Async version of calendar_actions.iter_event_pages (async generator).
+
+    Raises:
+        googleapiclient.errors.HttpError: If a page request fails.
+    """
+    service = _get_calendar_service(credentials)
+    client = get_async_client(credentials)
+    list_kwargs = _build_find_events_kwargs(
+        calendar_id=calendar_id,
+        time_min=time_min,
+        time_max=time_max,
+        query=query,
+        max_results=page_size,
+        single_events=single_events,
+        order_by=order_by,
+        iCalUID=iCalUID,
+        sharedExtendedProperty=sharedExtendedProperty,
+        privateExtendedProperty=privateExtendedProperty,
+        showDeleted=showDeleted,
+        eventTypes=eventTypes,
+        page_token=page_token,
+        fields=fields,
+    )
+    pages = 0
+    while True:
+        events_result = await client.execute(service.events().list(**list_kwargs))
+        pages += 1
+        logger.debug(f"Fetched page {pages} of calendar '{calendar_id}' ({len(events_result.get('items', []))} events).")
+        yield EventsResponse.from_google(events_result)
+        next_page_token = events_result.get('nextPageToken')
+        if not next_page_token or (max_pages and pages >= max_pages):
+            return
+        list_kwargs['pageToken'] = next_page_token
+
+async def iter_events(credentials: Credentials, **kwargs) -> AsyncIterator[GoogleCalendarEvent]:
+    """Yields individual events across all pages. Accepts the same arguments as iter_event_pages."""
+    async for page in iter_event_pages(credentials, **kwargs):
+        for event in page.items:
+            yield event
+
+async def create_event(
+    credentials: Credentials,
+    event_data: EventCreateRequest,
+    calendar_id: str = 'primary',
+    send_notifications: bool = True
+) -> Optional[GoogleCalendarEvent]:
+    """Async version of calendar_actions.create_event."""
+    service = _get_calendar_service(credentials)
+    event_body = _build_event_body(event_data)
+    if event_body is None:
+        return None
+
+    logger.info(f"Creating event (async) in calendar '{calendar_id}': {event_body.get('summary', '[No Summary]')}")
+    try:
+        created_event = await get_async_client(credentials).execute(service.events().insert(
+            calendarId=calendar_id,
+            body=event_body,
+            sendNotifications=send_notifications
+        ))
+        logger.info(f"Successfully created event with ID: {created_event.get('id')}")
+        return GoogleCalendarEvent.from_google(created_event)
+    except HttpError as error:
+        _log_api_error('create_event', error)
+        return None
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while creating event: {e}", exc_info=True)
+        return None
+
+async def quick_add_event(
+    credentials: Credentials,
+    text: str,
+    calendar_id: str = 'primary',
+    send_notifications: bool = False
+) -> Optional[GoogleCalendarEvent]:
+    """Async version of calendar_actions.quick_add_event."""
+    service = _get_calendar_service(credentials)
+    logger.info(f"Quick adding event (async) to calendar '{calendar_id}' with text: \"{text}\"")
+    try:
+        created_event = await get_async_client(credentials).execute(service.events().quickAdd(
+            calendarId=calendar_id,
+            text=text,
+            sendNotifications=send_notifications
+        ))
+        logger.info(f"Successfully quick-added event with ID: {created_event.get('id')}")
+        return GoogleCalendarEvent.from_google(created_event)
+    except HttpError as error:
+        _log_api_error('quick_add', error)
+        return None
+    except Exception as e:
+        logger.error(f"An unexpected error occurred during quick add: {e}", exc_info=True)
+        return None
+
+async def update_event(
+    credentials: Credentials,
+    event_id: str,
+    update_data: EventUpdateRequest,
+    calendar_id: str = 'primary',
+    send_notifications: bool = True
+) -> Optional[GoogleCalendarEvent]:
+    """Async version of calendar_actions.update_event."""
+    service = _get_calendar_service(credentials)
+    client = get_async_client(credentials)
+    update_body = _build_update_body(update_data)
+
+    try:
+        if not update_body:
+            logger.warning(f"Update called for event {event_id} with no fields to update.")
+            existing_event = await client.execute(service.events().get(calendarId=calendar_id, eventId=event_id))
+            return GoogleCalendarEvent.from_google(existing_event)
+
+        logger.info(f"Updating event (async) '{event_id}' in calendar '{calendar_id}'.")
+        updated_event = await client.execute(service.events().patch(
+            calendarId=calendar_id,
+            eventId=event_id,
+            body=update_body,
+            sendNotifications=send_notifications
+        ))
+        logger.info(f"Successfully updated event '{event_id}'.")
+        return GoogleCalendarEvent.from_google(updated_event)
+    except HttpError as error:
+        if error.resp.status == 404:
+            logger.error(f"Event '{event_id}' not found in calendar '{calendar_id}'.")
+        else:
+            _log_api_error('update_event', error)
+        return None
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while updating event '{event_id}': {e}", exc_info=True)
+        return None
+
+async def delete_event(
+    credentials: Credentials,
+    event_id: str,
+    calendar_id: str = 'primary',
+    send_notifications: bool = True
+) -> bool:
+    """Async version of calendar_actions.delete_event."""
+    service = _get_calendar_service(credentials)
+    logger.info(f"Attempting to delete event (async) '{event_id}' from calendar '{calendar_id}'.")
+    try:
+        await get_async_client(credentials).execute(service.events().delete(
+            calendarId=calendar_id,
+            eventId=event_id,
+            sendNotifications=send_notifications
+        ))
+        logger.info(f"Successfully deleted event '{event_id}'.")
+        return True
+    except HttpError as error:
+        if error.resp.status in (404, 410):
+            logger.error(f"Event '{event_id}' not found or already deleted in calendar '{calendar_id}'.")
+        else:
+            _log_api_error('delete_event', error)
+        return False
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while deleting event '{event_id}': {e}", exc_info=True)
+        return False
+
+async def add_attendee(
+    credentials: Credentials,
+    event_id: str,
+    attendee_emails: List[str],
+    calendar_id: str = 'primary',
+    send_notifications: bool = True
+) -> Optional[GoogleCalendarEvent]:
+    """Async version of calendar_actions.add_attendee."""
+    service = _get_calendar_service(credentials)
+    client = get_async_client(credentials)
+    logger.info(f"Attempting to add attendees (async) {attendee_emails} to event '{event_id}' in calendar '{calendar_id}'.")
+    try:
+        event = await client.execute(service.events().get(calendarId=calendar_id, eventId=event_id))
+
+        patch_body = _build_attendee_patch_body(event, attendee_emails)
+        if patch_body is None:
+            logger.warning(f"All provided attendees {attendee_emails} are already in event '{event_id}'. No update needed.")
+            return GoogleCalendarEvent.from_google(event)
+
+        updated_event = await client.execute(service.events().patch(
+            calendarId=calendar_id,
+            eventId=event_id,
+            body=patch_body,
+            sendNotifications=send_notifications
+        ))
+        logger.info(f"Successfully added attendees to event '{event_id}'.")
+        return GoogleCalendarEvent.from_google(updated_event)
+    except HttpError as error:
+        if error.resp.status == 404:
+            logger.error(f"Event '{event_id}' not found in calendar '{calendar_id}'. Cannot add attendees.")
+        else:
+            _log_api_error('add_attendee', error)
+        return None
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while adding attendees to event '{event_id}': {e}", exc_info=True)
+        return None
+
+# --- Multi-Calendar Search ---
+
+async def _fetch_calendar_events(
+    credentials: Credentials,
+    calendar_id: str,
+    time_min: Optional[datetime],
+    time_max: Optional[datetime],
+    query: Optional[str],
+    max_results: int,
+    use_mirror: bool,
+    fields: Optional[str] = None
+) -> Tuple[List[Tuple[datetime, Dict[str, Any]]], bool]:
+    """Fetches up to max_results expanded events of one calendar as (start, raw event) pairs sorted by start.
+
+    Returns:
+        The pairs, and whether more matching events were left out.
+
+    Raises:
+        googleapiclient.errors.HttpError: If a request fails.
+    """
+    # Events are merged by start time, so the start is fetched whatever the mask
+    item_fields = field_masks.with_required_fields(field_masks.resolve_event_fields(fields), ['start'])
+    if use_mirror:
+        mirror = await calendar_sync.async_ensure_fresh(credentials, calendar_id, single_events=True)
+        items = await asyncio.to_thread(lambda: [
+            field_masks.project(item, item_fields) for item in mirror.select_events(time_min=time_min, time_max=time_max, query=query)
+        ])
+        default_tz = mirror.calendar_tz()
+    else:
+        service = _get_calendar_service(credentials)
+        client = get_async_client(credentials)
+        list_kwargs = _build_find_events_kwargs(
+            calendar_id=calendar_id, time_min=time_min, time_max=time_max, query=query,
+            max_results=min(max_results + 1, 2500), single_events=True, order_by='startTime',
+            iCalUID=None, sharedExtendedProperty=None, privateExtendedProperty=None, showDeleted=False, eventTypes=None,
+            fields=item_fields,
+        )
+        items, time_zone = [], None
+        while len(items) <= max_results:
+            events_result = await client.execute(service.events().list(**list_kwargs))
+            time_zone = time_zone or events_result.get('timeZone')
+            items.extend(events_result.get('items', []))
+            if not events_result.get('nextPageToken'):
+                break
+            list_kwargs['pageToken'] = events_result['nextPageToken']
+        default_tz = calendar_sync.resolve_time_zone(time_zone)
+
+    pairs = []
+    for item in items[:max_results]:
+        try:
+            start = calendar_sync._parse_event_time(item.get('start'), default_tz)
+        except (ValueError, TypeError):
+            start = None
+        pairs.append((start or calendar_sync._MIN_TIME, item))
+    pairs.sort(key=lambda pair: pair[0])
+    return pairs, len(items) > max_results
+
+async def search_all_calendars(
+    credentials: Credentials,
+    time_min: Optional[datetime] = None,
+    time_max: Optional[datetime] = None,
+    query: Optional[str] = None,
+    calendar_ids: Optional[List[str]] = None,
+    min_access_role: Optional[str] = None,
+    max_results_per_calendar: int = 250,
+    use_mirror: bool = False,
+    concurrency: int = CALENDAR_FANOUT_CONCURRENCY,
+    timeout: float = CALENDAR_FANOUT_TIMEOUT,
+    fields: Optional[str] = None
+) -> Optional[MultiCalendarEventsResponse]:
+    """Finds events across many calendars concurrently and merges them by start time.
+
+    Args:
+        credentials: Valid Google OAuth2 credentials.
+        time_min: Start of the window (inclusive).
+        time_max: End of the window (exclusive).
+        query: Free text search query.
+        calendar_ids: Calendars to search. Defaults to every calendar in the calendar list.
+        min_access_role: When calendar_ids is not given, only search calendars with at least this access role.
+        max_results_per_calendar: Maximum events taken from each calendar.
+        use_mirror: Read each calendar from its local mirror instead of Google.
+        concurrency: Maximum calendars fetched at the same time.
+        timeout: Seconds allowed per calendar (not counting time waiting for a concurrency slot).
+        fields: Event fields preset or mask, as in find_events ('start' is always included).
+
+    Returns:
+        A MultiCalendarEventsResponse with the merged events. Calendars that fail or time out
+        are listed in `errors` and do not fail the search. None if the calendar list cannot be fetched.
+
+    Raises:
+        field_masks.InvalidFieldsError: If fields is neither a preset nor a well-formed mask.
+    """
+    field_masks.resolve_event_fields(fields) # Fail before fanning out
+    if calendar_ids is None:
+        calendar_list = await find_calendars(credentials, min_access_role=min_access_role)
+        if calendar_list is None:
+            return None
+        calendar_ids = [entry.id for entry in calendar_list.items]
+    calendar_ids = list(dict.fromkeys(calendar_ids))
+    logger.info(f"Searching {len(calendar_ids)} calendars (concurrency={concurrency}, timeout={timeout}s).")
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch(calendar_id: str):
+        async with semaphore:
+            return await asyncio.wait_for(
+                _fetch_calendar_events(credentials, calendar_id, time_min, time_max, query, max_results_per_calendar, use_mirror, fields),
+                timeout,
+            )
+
+    results = await asyncio.gather(*(fetch(calendar_id) for calendar_id in calendar_ids), return_exceptions=True)
+
+    response = MultiCalendarEventsResponse()
+    per_calendar: List[List[Tuple[datetime, int, int, Dict[str, Any]]]] = []
+    for calendar_id, result in zip(calendar_ids, results):
+        if isinstance(result, asyncio.TimeoutError):
+            logger.warning(f"Calendar '{calendar_id}' timed out after {timeout}s in multi-calendar search.")
+            response.errors[calendar_id] = f"Timed out after {timeout}s"
+        elif isinstance(result, HttpError):
+            _log_api_error(f"search_all_calendars '{calendar_id}'", result)
+            response.errors[calendar_id] = f"Google API error {result.resp.status}"
+        elif isinstance(result, Exception):
+            logger.error(f"Unexpected error searching calendar '{calendar_id}': {result}", exc_info=result)
+            response.errors[calendar_id] = str(result)
+        else:
+            pairs, truncated = result
+            response.calendars_searched.append(calendar_id)
+            if truncated:
+                response.truncated.append(calendar_id)
+            # (calendar position, index) break start-time ties, so raw dicts are never compared
+            position = len(per_calendar)
+            per_calendar.append([
+                (start, position, index, {**item, 'sourceCalendarId': calendar_id})
+                for index, (start, item) in enumerate(pairs)
+            ])
+
+    response.items = [MultiCalendarEvent.from_google(item) for _, _, _, item in heapq.merge(*per_calendar)]
+    logger.info(
+        f"Multi-calendar search found {len(response.items)} events in {len(response.calendars_searched)} calendars "
+        f"({len(response.errors)} failed)."
+    )
+    return response
+
+async def find_calendars(
+    credentials: Credentials,
+    min_access_role: Optional[str] = None,
+    use_cache: bool = True
+) -> Optional[CalendarListResponse]:
+    """Async version of calendar_actions.find_calendars."""
+    service = _get_calendar_service(credentials)
+    logger.info(f"Fetching calendar list (async). Min access role: {min_access_role}")
+    try:
+        if use_cache:
+            return await calendar_list_cache.async_get_calendar_list(credentials, min_access_role)
+        calendar_list = await get_async_client(credentials).execute(
+            service.calendarList().list(minAccessRole=min_access_role)
+        )
+        logger.info(f"Found {len(calendar_list.get('items', []))} calendars in the list.")
+        return CalendarListResponse.from_google(calendar_list)
+    except HttpError as error:
+        _log_api_error('find_calendars', error)
+        return None
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while fetching calendar list: {e}", exc_info=True)
+        return None
+
+async def create_calendar(
+    credentials: Credentials,
+    summary: str
+) -> Optional[CalendarListEntry]:
+    """Async version of calendar_actions.create_calendar."""
+    service = _get_calendar_service(credentials)
+    logger.info(f"Attempting to create a new calendar (async) with summary: '{summary}'")
+    try:
+        created_calendar = await get_async_client(credentials).execute(
+            service.calendars().insert(body={'summary': summary})
+        )
+        logger.info(f"Successfully created calendar with ID: {created_calendar.get('id')}")
+        calendar_list_cache.invalidate(credentials)
+        return CalendarListEntry.from_google(created_calendar)
+    except HttpError as error:
+        _log_api_error('create_calendar', error)
+        return None
+    except Exception as e:
+        logger.error(f"An unexpected error occurred while creating calendar '{summary}': {e}", exc_info=True)
+        return None
+
+async def check_attendee_status(
+    credentials: Credentials,
+    event_id: str,
+    calendar_id: str = 'primary',
+    attendee_emails: Optional[List[str]] = None
+) -> Optional[Dict[str, str]]:
+    """Async version of calendar_actions.check_attendee_status."""
+    service = _get_calendar_service(credentials)
+    logger.info(f"Checking attendee status (async) for event '{event_id}' in calendar '{calendar_id}'. Target emails: {attendee_emails or 'All'}")
+    try:
+        event = await get_async_client(credentials).execute(
+            service.events().get(calendarId=calendar_id, eventId=event_id, fields=EVENT_FIELD_PRESETS['attendees'])
+        )
+    except HttpError as error:
+        if error.resp.status == 404:
+            logger.error(f"Event '{event_id}' not found in calendar '{calendar_id}'. Cannot check status.")
+        else:
+            _log_api_error('check_attendee_status', error)
+        return None
+    except Exception as e:
+        logger.error(f"Unexpected error retrieving event '{event_id}': {e}", exc_info=True)
+        return None
+
+    status_map = _extract_attendee_statuses(event, attendee_emails)
+    logger.info(f"Attendee statuses retrieved for event '{event_id}': {len(status_map)} attendees found.")
+    return status_map
+
+async def find_availability(
+    credentials: Credentials,
+    time_min: datetime,
+    time_max: datetime,
+    calendar_ids: List[str]
+) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Async version of calendar_actions.find_availability."""
+    if not calendar_ids:
+        logger.warning("find_availability called with empty calendar_ids list.")
+        return {}
+
+    service = _get_calendar_service(credentials)
+    request_body = _build_freebusy_body(time_min, time_max, calendar_ids)
+    logger.info(f"Querying free/busy information (async) for calendars: {calendar_ids} between {request_body['timeMin']} and {request_body['timeMax']}")
+    try:
+        freebusy_result = await get_async_client(credentials).execute(service.freebusy().query(body=request_body))
+        processed_results = _process_freebusy_result(freebusy_result)
+        logger.info(f"Successfully retrieved free/busy information for {len(processed_results)} calendars.")
+        return processed_results
+    except HttpError as error:
+        _log_api_error('find_availability', error)
+        return None
+    except Exception as e:
+        logger.error(f"An unexpected error occurred during free/busy query: {e}", exc_info=True)
+        return None
+
+async def find_mutual_availability_and_schedule(
+    credentials: Credentials,
+    attendee_calendar_ids: List[str],
+    time_min: datetime,
+    time_max: datetime,
+    duration_minutes: int,
+    event_details: EventCreateRequest,
+    organizer_calendar_id: str = 'primary',
+    working_hours_start: Optional[time] = None,
+    working_hours_end: Optional[time] = None,
+    send_notifications: bool = True
+) -> Optional[GoogleCalendarEvent]:
+    """Async version of calendar_actions.find_mutual_availability_and_schedule."""
+    logger.info(f"Attempting to find mutual availability and schedule (async) for: {attendee_calendar_ids}")
+    availability_data = await find_availability(
+        credentials=credentials,
+        time_min=time_min,
+        time_max=time_max,
+        calendar_ids=attendee_calendar_ids
+    )
+    if availability_data is None:
+        logger.error("Failed to retrieve availability data.")
+        return None
+
+    available_slot = _select_mutual_slot(
+        availability_data=availability_data,
+        time_min=time_min,
+        time_max=time_max,
+        duration_minutes=duration_minutes,
+        working_hours_start=working_hours_start,
+        working_hours_end=working_hours_end
+    )
+    if not available_slot:
+        logger.warning("No mutually available time slot found meeting the criteria.")
+        return None
+
+    slot_start, slot_end = available_slot
+    final_event_data = _build_mutual_event_data(event_details, slot_start, slot_end, attendee_calendar_ids)
+    created_event = await create_event(
+        credentials=credentials,
+        event_data=final_event_data,
+        calendar_id=organizer_calendar_id,
+        send_notifications=send_notifications
+    )
+    if created_event:
+        logger.info(f"Successfully scheduled event '{created_event.summary}' (ID: {created_event.id}) at {slot_start}")
+    else:
+        logger.error("Failed to create the event after finding an available slot.")
+    return created_event
+
+# --- Analysis Wrappers ---
+# Fetching is async; the CPU-bound expansion/aggregation runs in a worker thread so large
+# windows do not stall the event loop.
+
+# Occurrences handed out per batch by iter_projected_recurring_events
+PROJECTION_BATCH_SIZE = 2500
+
+async def _fetch_recurring_masters(
+    credentials: Credentials,
+    time_min: datetime,
+    time_max: datetime,
+    calendar_id: str,
+    event_query: Optional[str],
+    use_mirror: bool
+) -> List[GoogleCalendarEvent]:
+    """Fetches the master events of series that can occur in the window (raises HttpError)."""
+    if use_mirror:
+        mirror = await calendar_sync.async_ensure_fresh(credentials, calendar_id, single_events=False)
+        master_events = await asyncio.to_thread(select_mirror_series, mirror, time_min, time_max, event_query)
+    else:
+        master_events = []
+        async for page in iter_event_pages(
+            credentials,
+            calendar_id=calendar_id,
+            time_min=time_min,
+            time_max=time_max,
+            query=event_query,
+            single_events=False,
+            showDeleted=False,
+            page_size=MASTER_PAGE_SIZE,
+            fields='recurrence'
+        ):
+            master_events.extend(event for event in page.items if series_in_window(event, time_min, time_max))
+    if not master_events:
+        logger.info("No master recurring events found matching the criteria.")
+    return master_events
+
+async def _get_recurring_masters(
+    credentials: Credentials,
+    time_min: datetime,
+    time_max: datetime,
+    calendar_id: str,
+    event_query: Optional[str],
+    use_mirror: bool
+) -> List[GoogleCalendarEvent]:
+    """Fetches the master events of series that can occur in the window ([] on API errors)."""
+    try:
+        return await _fetch_recurring_masters(credentials, time_min, time_max, calendar_id, event_query, use_mirror)
+    except HttpError as error:
+        logger.error(f"Google API error while fetching master events for calendar '{calendar_id}': {error}", exc_info=True)
+        return []
+
+async def get_projected_recurring_events(
+    credentials: Credentials,
+    time_min: datetime,
+    time_max: datetime,
+    calendar_id: str = 'primary',
+    event_query: Optional[str] = None,
+    use_mirror: bool = False
+) -> List[ProjectedEventOccurrence]:
+    """Async version of calendar_actions.get_projected_recurring_events."""
+    logger.info(f"Action: get_projected_recurring_events (async) called for calendar '{calendar_id}'")
+    master_events = await _get_recurring_masters(credentials, time_min, time_max, calendar_id, event_query, use_mirror)
+    if not master_events:
+        return []
+    return await asyncio.to_thread(project_occurrences, master_events, time_min, time_max)
+
+async def iter_projected_recurring_events(
+    credentials: Credentials,
+    time_min: datetime,
+    time_max: datetime,
+    calendar_id: str = 'primary',
+    event_query: Optional[str] = None,
+    use_mirror: bool = False,
+    batch_size: int = PROJECTION_BATCH_SIZE
+) -> AsyncIterator[List[ProjectedEventOccurrence]]:
+    """Yields the projected occurrences in start order, in batches of at most batch_size.
+
+    Takes the same arguments as get_projected_recurring_events. Master events are fetched
+    when iteration starts; expansion and merging run in a worker thread one batch at a time,
+    so only one batch of occurrence objects exists at once.
+
+    Raises:
+        HttpError: If fetching the master events fails. Unlike get_projected_recurring_events,
+            API errors are not turned into an empty result, so a stream can report them.
+    """
+    logger.info(f"Action: iter_projected_recurring_events (async) called for calendar '{calendar_id}'")
+    master_events = await _fetch_recurring_masters(credentials, time_min, time_max, calendar_id, event_query, use_mirror)
+    if not master_events:
+        return
+    occurrences = iter_projected_occurrences(master_events, time_min, time_max)
+    while True:
+        batch = await asyncio.to_thread(lambda: list(itertools.islice(occurrences, batch_size)))
+        if not batch:
+            return
+        yield batch
+
+async def _fold_calendar_busyness(
+    credentials: Credentials,
+    calendar_id: str,
+    time_min: datetime,
+    time_max: datetime,
+    use_mirror: bool,
+    bucket: str,
+    time_zone: "asyncio.Future[tzinfo]",
+    sets_time_zone: bool
+) -> Tuple[BusynessAccumulator, int]:
+    """Folds one calendar's events into a new accumulator, one page at a time.
+
+    Args:
+        time_zone: Resolves to the time zone of the buckets, shared by every calendar.
+        sets_time_zone: This is the first calendar: resolve time_zone to its time zone if unset.
+        Other arguments are as in get_busyness_analysis.
+
+    Returns:
+        The accumulator, and the number of pages fetched from Google (0 for mirror reads).
+
+    Raises:
+        googleapiclient.errors.HttpError: If a request fails.
+    """
+    if use_mirror:
+        mirror = await calendar_sync.async_ensure_fresh(credentials, calendar_id, single_events=True)
+        if sets_time_zone and not time_zone.done():
+            time_zone.set_result(mirror.calendar_tz())
+        accumulator = BusynessAccumulator(time_min, time_max, await time_zone, bucket)
+        await asyncio.to_thread(fold_mirror_busyness, mirror, accumulator, time_min, time_max)
+        return accumulator, 0
+
+    accumulator = None
+    pages = 0
+    # The next page is only requested after this one is folded, so one page per calendar is in memory
+    async for page in iter_event_pages(
+        credentials,
+        calendar_id=calendar_id,
+        time_min=time_min,
+        time_max=time_max,
+        single_events=True,
+        showDeleted=False,
+        page_size=2500,
+        fields='timing-only' # Aggregation only reads start/end
+    ):
+        if accumulator is None:
+            if sets_time_zone and not time_zone.done():
+                time_zone.set_result(calendar_sync.resolve_time_zone(page.timeZone))
+            accumulator = BusynessAccumulator(time_min, time_max, await time_zone, bucket)
+        await asyncio.to_thread(accumulator.add, page.items)
+        pages += 1
+    return accumulator, pages
+
+async def get_busyness_analysis(
+    credentials: Credentials,
+    time_min: datetime,
+    time_max: datetime,
+    calendar_id: str = 'primary',
+    use_mirror: bool = False,
+    bucket: str = 'day',
+    time_zone: Optional[str] = None,
+    calendar_ids: Optional[List[str]] = None,
+    concurrency: int = CALENDAR_FANOUT_CONCURRENCY
+) -> Optional[Dict[str, Any]]:
+    """Async version of calendar_actions.get_busyness_analysis.
+
+    Calendars are folded concurrently (at most `concurrency` at once), each into its own
+    accumulator; the accumulators are merged at the end. Returns None if no calendar could be read.
+    """
+    calendar_ids = list(dict.fromkeys(calendar_ids or [calendar_id]))
+    logger.info(f"Action: get_busyness_analysis (async) called for {len(calendar_ids)} calendar(s) (bucket: {bucket})")
+    try:
+        # Every calendar buckets in the same time zone: the requested one, or the first calendar's
+        bucket_time_zone: "asyncio.Future[tzinfo]" = asyncio.get_running_loop().create_future()
+        if time_zone:
+            bucket_time_zone.set_result(calendar_sync.resolve_time_zone(time_zone))
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fold(index: int, current_id: str):
+            try:
+                async with semaphore: # The first calendar is scheduled first, so it always gets a slot
+                    return await _fold_calendar_busyness(
+                        credentials, current_id, time_min, time_max, use_mirror, bucket, bucket_time_zone, index == 0
+                    )
+            finally:
+                if index == 0 and not bucket_time_zone.done():
+                    bucket_time_zone.set_result(timezone.utc) # The first calendar could not be read
+
+        results = await asyncio.gather(*(fold(index, current_id) for index, current_id in enumerate(calendar_ids)), return_exceptions=True)
+
+        total = None
+        calendars: Dict[str, Dict[str, int]] = {}
+        errors: Dict[str, str] = {}
+        for current_id, result in zip(calendar_ids, results):
+            if isinstance(result, HttpError):
+                _log_api_error(f"get_busyness_analysis '{current_id}'", result)
+                errors[current_id] = f"Google API error {result.resp.status}"
+            elif isinstance(result, Exception):
+                logger.error(f"Unexpected error analyzing busyness of calendar '{current_id}': {result}", exc_info=result)
+                errors[current_id] = str(result)
+            else:
+                accumulator, pages = result
+                calendars[current_id] = {'pages': pages, 'events': accumulator.events}
+                if total is None:
+                    total = accumulator
+                else:
+                    total.merge(accumulator)
+        if not calendars:
+            logger.error(f"Busyness analysis failed for every calendar: {errors}")
+            return None
+        logger.info(f"Busyness analysis consumed {sum(stats['events'] for stats in calendars.values())} events from {len(calendars)} calendar(s).")
+        return busyness_report(total, bucket_time_zone.result(), calendars, errors)
+    except Exception as e:
+        logger.error(f"Error during busyness analysis execution: {e}", exc_info=True)
+        return None
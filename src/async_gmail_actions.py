@@ -0,0 +1,258 @@
+import asyncio
+import logging
+from typing import Optional, List, Dict, Any, AsyncIterator, Callable, Tuple
+
+from googleapiclient.errors import HttpError
+from google.oauth2.credentials import Credentials
+
+from .async_google_client import get_async_client
+from .google_services import get_batch_uri
+from .gmail_actions import (
+    GMAIL_BATCH_SIZE,
+    GMAIL_BATCH_CONCURRENCY,
+    GMAIL_HYDRATE_RETRIES,
+    GMAIL_BATCH_MODIFY_SIZE,
+    GMAIL_LIST_PAGE_SIZE,
+    DEFAULT_METADATA_HEADERS,
+    _get_gmail_service,
+    _build_list_kwargs,
+    _build_metadata_request,
+    _build_get_kwargs,
+    _chunked,
+    _merge_hydrated,
+    _error_status,
+    _is_retryable,
+    _hydration_delay,
+    _hydration_error,
+    _validate_bulk_modify,
+    _unique_ids,
+    _build_batch_modify_body,
+    _new_bulk_report,
+    _record_batch,
+    build_raw_message,
+)
+
+logger = logging.getLogger(__name__)
+
+# Async mirror of gmail_actions. Requests are built with the cached Gmail service client and
+# executed over the shared async transport. build_raw_message is pure and re-exported as-is.
+
+__all__ = [
+    'list_messages',
+    'get_message',
+    'send_message_raw',
+    'list_labels',
+    'build_raw_message',
+    'modify_message_labels',
+    'bulk_modify_message_labels',
+]
+
+# --- Helpers ---
+
+async def _hydrate_messages(credentials: Credentials, service, user_id: str, messages: List[Dict[str, Any]], metadata_headers: List[str]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Fetches format=metadata for the listed messages, at most GMAIL_BATCH_CONCURRENCY batch calls at once.
+
+    Failed parts are retried like in gmail_actions._hydrate_messages; a round retrying 401s
+    refreshes the token first. Returns the messages and their hydrationErrors entries.
+    """
+    client = get_async_client(credentials)
+    batch_uri = get_batch_uri('gmail', 'v1')
+    semaphore = asyncio.Semaphore(GMAIL_BATCH_CONCURRENCY)
+    hydrated: Dict[str, Dict[str, Any]] = {}
+    failed: Dict[str, Optional[HttpError]] = {} # Failures of the current round
+    gave_up: Dict[str, Optional[HttpError]] = {} # Failures not worth (or out of) retries
+
+    async def _execute_chunk(chunk: List[str], refresh_credentials: bool):
+        async with semaphore:
+            try:
+                results = await client.execute_batch(
+                    [_build_metadata_request(service, user_id, message_id, metadata_headers) for message_id in chunk],
+                    batch_uri,
+                    refresh_credentials=refresh_credentials,
+                )
+            except HttpError as e: # The batch call itself failed: every part failed with it
+                results = [(None, e)] * len(chunk)
+        for message_id, (response, exception) in zip(chunk, results):
+            if response is not None:
+                hydrated[message_id] = response
+            else:
+                failed[message_id] = exception # None: missing from the batch response
+
+    pending = [message['id'] for message in messages]
+    batch_calls = 0
+    refresh_credentials = False
+    for attempt in range(GMAIL_HYDRATE_RETRIES + 1):
+        if attempt:
+            delay = _hydration_delay(attempt - 1)
+            logger.info(f"Retrying hydration of {len(pending)} messages in {delay:.1f}s (round {attempt}/{GMAIL_HYDRATE_RETRIES}).")
+            await asyncio.sleep(delay)
+        failed.clear()
+        chunks = list(_chunked(pending, GMAIL_BATCH_SIZE))
+        await asyncio.gather(*(_execute_chunk(chunk, refresh_credentials) for chunk in chunks))
+        batch_calls += len(chunks)
+        pending = [message_id for message_id, exception in failed.items() if _is_retryable(exception)]
+        gave_up.update((message_id, exception) for message_id, exception in failed.items() if not _is_retryable(exception))
+        if not pending:
+            break
+        refresh_credentials = any(_error_status(failed[message_id]) == 401 for message_id in pending)
+
+    gave_up.update((message_id, failed[message_id]) for message_id in pending) # Still failing after the last round
+    errors = [_hydration_error(message_id, exception) for message_id, exception in gave_up.items()]
+    for error in errors:
+        logger.warning(f"Failed to hydrate message {error['id']}: {error['error']}")
+    logger.info(f"Hydrated {len(hydrated)}/{len(messages)} messages in {batch_calls} batch call(s).")
+    return _merge_hydrated(messages, hydrated), errors
+
+async def _iter_matching_ids(credentials: Credentials, service, user_id: str, query: Optional[str], label_ids: Optional[List[str]], max_messages: Optional[int], report: Dict[str, Any]) -> AsyncIterator[str]:
+    """Pages through messages.list and yields matching message IDs, counting pages and matches."""
+    client = get_async_client(credentials)
+    page_token = None
+    while True:
+        page_size = min(GMAIL_LIST_PAGE_SIZE, max_messages - report['matched']) if max_messages else GMAIL_LIST_PAGE_SIZE
+        kwargs = _build_list_kwargs(user_id, query, page_size, label_ids)
+        if page_token:
+            kwargs['pageToken'] = page_token
+        resp = await client.execute(service.users().messages().list(**kwargs))
+        report['pages'] += 1
+        for message in resp.get('messages', []):
+            report['matched'] += 1
+            yield message['id']
+        page_token = resp.get('nextPageToken')
+        if not page_token or (max_messages and report['matched'] >= max_messages):
+            return
+
+# --- Actions ---
+
+async def list_messages(
+    credentials: Credentials,
+    user_id: str = 'me',
+    query: Optional[str] = None,
+    max_results: int = 50,
+    label_ids: Optional[List[str]] = None,
+    hydrate: bool = False,
+    metadata_headers: Optional[List[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """Lists messages, optionally hydrated with their metadata (async version of gmail_actions.list_messages)."""
+    service = _get_gmail_service(credentials)
+    try:
+        resp = await get_async_client(credentials).execute(
+            service.users().messages().list(**_build_list_kwargs(user_id, query, max_results, label_ids))
+        )
+        if hydrate:
+            resp['hydrationErrors'] = []
+            if resp.get('messages'):
+                resp['messages'], resp['hydrationErrors'] = await _hydrate_messages(credentials, service, user_id, resp['messages'], metadata_headers or DEFAULT_METADATA_HEADERS)
+        return resp
+    except HttpError as e:
+        logger.error(f"Gmail API error (list_messages): {e}", exc_info=True)
+        return None
+    except Exception as e:
+        logger.error(f"Unexpected error in list_messages: {e}", exc_info=True)
+        return None
+
+
+async def get_message(credentials: Credentials, message_id: str, user_id: str = 'me', format: str = 'full', fields: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    service = _get_gmail_service(credentials)
+    try:
+        return await get_async_client(credentials).execute(
+            service.users().messages().get(**_build_get_kwargs(user_id, message_id, format, fields))
+        )
+    except HttpError as e:
+        logger.error(f"Gmail API error (get_message): {e}", exc_info=True)
+        return None
+    except Exception as e:
+        logger.error(f"Unexpected error in get_message: {e}", exc_info=True)
+        return None
+
+
+async def send_message_raw(credentials: Credentials, raw_message_base64url: str, user_id: str = 'me') -> Optional[Dict[str, Any]]:
+    """
+    Send a message using a base64url-encoded raw RFC 2822 message.
+    Caller is responsible for composing and encoding the raw message.
+    """
+    service = _get_gmail_service(credentials)
+    try:
+        body = {"raw": raw_message_base64url}
+        return await get_async_client(credentials).execute(service.users().messages().send(userId=user_id, body=body))
+    except HttpError as e:
+        logger.error(f"Gmail API error (send_message_raw): {e}", exc_info=True)
+        return None
+    except Exception as e:
+        logger.error(f"Unexpected error in send_message_raw: {e}", exc_info=True)
+        return None
+
+
+async def list_labels(credentials: Credentials, user_id: str = 'me') -> Optional[Dict[str, Any]]:
+    service = _get_gmail_service(credentials)
+    try:
+        return await get_async_client(credentials).execute(service.users().labels().list(userId=user_id))
+    except HttpError as e:
+        logger.error(f"Gmail API error (list_labels): {e}", exc_info=True)
+        return None
+    except Exception as e:
+        logger.error(f"Unexpected error in list_labels: {e}", exc_info=True)
+        return None
+
+
+async def modify_message_labels(credentials: Credentials, message_id: str, add_labels: Optional[List[str]] = None, remove_labels: Optional[List[str]] = None, user_id: str = 'me') -> Optional[Dict[str, Any]]:
+    """Adds and/or removes labels from a Gmail message (async version of gmail_actions.modify_message_labels)."""
+    service = _get_gmail_service(credentials)
+    try:
+        body: Dict[str, Any] = {}
+        if add_labels:
+            body['addLabelIds'] = add_labels
+        if remove_labels:
+            body['removeLabelIds'] = remove_labels
+        return await get_async_client(credentials).execute(
+            service.users().messages().modify(userId=user_id, id=message_id, body=body)
+        )
+    except HttpError as e:
+        logger.error(f"Gmail API error (modify_message_labels): {e}", exc_info=True)
+        return None
+    except Exception as e:
+        logger.error(f"Unexpected error in modify_message_labels: {e}", exc_info=True)
+        return None
+
+
+async def bulk_modify_message_labels(
+    credentials: Credentials,
+    message_ids: Optional[List[str]] = None,
+    query: Optional[str] = None,
+    label_ids: Optional[List[str]] = None,
+    add_labels: Optional[List[str]] = None,
+    remove_labels: Optional[List[str]] = None,
+    user_id: str = 'me',
+    max_messages: Optional[int] = None,
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Optional[Dict[str, Any]]:
+    """Async version of gmail_actions.bulk_modify_message_labels.
+
+    Raises:
+        ValueError: If no labels are given, or the selection is missing or ambiguous.
+    """
+    _validate_bulk_modify(message_ids, query, label_ids, add_labels, remove_labels)
+    service = _get_gmail_service(credentials)
+    client = get_async_client(credentials)
+    report = _new_bulk_report()
+    try:
+        if message_ids:
+            selected = _unique_ids(message_ids, max_messages)
+            report['matched'] = len(selected)
+        else:
+            # Collect the full selection before modifying (see gmail_actions.bulk_modify_message_labels)
+            selected = [message_id async for message_id in _iter_matching_ids(credentials, service, user_id, query, label_ids, max_messages, report)]
+        logger.info(f"Bulk modify: {report['matched']} messages selected ({report['pages']} list page(s)).")
+        for chunk in _chunked(selected, GMAIL_BATCH_MODIFY_SIZE):
+            body = _build_batch_modify_body(chunk, add_labels, remove_labels)
+            await client.execute(service.users().messages().batchModify(userId=user_id, body=body))
+            _record_batch(report, len(chunk), progress_callback)
+        report['completed'] = True
+        logger.info(f"Bulk modify finished: {report['modified']} messages in {report['batches']} batchModify call(s), {report['pages']} list page(s).")
+        return report
+    except HttpError as e:
+        logger.error(f"Gmail API error (bulk_modify_message_labels) after {report['modified']} messages: {e}", exc_info=True)
+        report['error'] = str(e)
+        return report
+    except Exception as e:
+        logger.error(f"Unexpected error in bulk_modify_message_labels: {e}", exc_info=True)
+        return None
@@ -0,0 +1,181 @@
+import asyncio
+import io
+import logging
+import os
+from email.generator import Generator
+from email.mime.multipart import MIMEMultipart
+from email.mime.nonmultipart import MIMENonMultipart
+from email.parser import FeedParser
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import httplib2
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from googleapiclient.errors import BatchError, HttpError
+from googleapiclient.http import BatchHttpRequest, HttpRequest
+
+from .http_transport import IDLE_TIMEOUT_SECONDS, REQUEST_TIMEOUT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# --- Async Google API Execution ---
+# Requests are still *built* with the cached googleapiclient service clients (no I/O is done
+# until execute() is called), so URL templates, parameter validation and response decoding
+# all come from the discovery documents. Only the transport differs: AsyncGoogleClient sends
+# the built HttpRequest over a pooled httpx.AsyncClient instead of blocking a thread.
+#
+# Configuration (environment variables):
+#   GOOGLE_ASYNC_MAX_CONNECTIONS: Maximum concurrent connections to Google APIs (default 100).
+#   GOOGLE_HTTP_IDLE_TIMEOUT / GOOGLE_HTTP_TIMEOUT: Shared with the sync transport.
+
+ASYNC_MAX_CONNECTIONS = int(os.getenv('GOOGLE_ASYNC_MAX_CONNECTIONS', 100))
+
+
+class AsyncGoogleClient:
+    """Executes googleapiclient HttpRequest objects asynchronously over a pooled httpx client."""
+
+    def __init__(self, credentials: Credentials):
+        self.credentials = credentials
+        self._client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=ASYNC_MAX_CONNECTIONS,
+                keepalive_expiry=IDLE_TIMEOUT_SECONDS,
+            ),
+            timeout=REQUEST_TIMEOUT_SECONDS,
+        )
+        self._refresh_lock = asyncio.Lock()
+
+    async def _ensure_valid_credentials(self, force_refresh: bool = False):
+        """Refreshes the credentials (in a worker thread) if they are invalid or force_refresh is set."""
+        if self.credentials.valid and not force_refresh:
+            return
+        async with self._refresh_lock:
+            # Another task may have refreshed while we were waiting for the lock
+            if self.credentials.valid and not force_refresh:
+                return
+            logger.info("Refreshing Google credentials for async client.")
+            await asyncio.to_thread(self.credentials.refresh, Request())
+
+    async def send(self, method: str, uri: str, body: Any = None, headers: Dict[str, str] = None) -> httpx.Response:
+        """Sends an authorized request, refreshing the credentials and retrying once on 401."""
+        headers = dict(headers or {})
+        headers.pop('content-length', None) # httpx computes it from the body
+        response = None
+        for attempt in range(2):
+            await self._ensure_valid_credentials(force_refresh=attempt > 0)
+            self.credentials.apply(headers)
+            response = await self._client.request(method, uri, content=body, headers=headers)
+            if response.status_code != 401:
+                break
+            logger.warning(f"Received 401 from {uri}. Refreshing credentials and retrying.")
+        return response
+
+    async def execute(self, http_request: HttpRequest) -> Any:
+        """Executes a googleapiclient HttpRequest and returns the decoded response.
+
+        Raises:
+            googleapiclient.errors.HttpError: For non-2xx responses, like HttpRequest.execute().
+        """
+        response = await self.send(http_request.method, http_request.uri, http_request.body, http_request.headers)
+        return http_request.postproc(to_httplib2_response(response), response.content)
+
+    async def execute_batch(self, http_requests: List[HttpRequest], batch_uri: str, refresh_credentials: bool = False) -> List[Tuple[Any, Optional[HttpError]]]:
+        """Executes up to 100 requests as a single multipart/mixed batch call.
+
+        The wire format is googleapiclient's (its BatchHttpRequest serializes each part), only
+        the POST is awaited instead of sent through httplib2.
+
+        Args:
+            http_requests: Requests built with a service client (not executed).
+            batch_uri: The API's batch endpoint (see google_services.get_batch_uri).
+            refresh_credentials: Refresh the token even if it looks valid (retrying parts
+                rejected with 401).
+
+        Returns:
+            One (response, error) pair per request, in request order. A request missing from
+            the batch response is reported as (None, None).
+
+        Raises:
+            googleapiclient.errors.HttpError: If the batch call itself fails.
+            googleapiclient.errors.BatchError: If the response is not multipart.
+        """
+        # Each part carries its own Authorization header, written when it is serialized, so the
+        # token must be refreshed first (send() only refreshes the outer request's)
+        await self._ensure_valid_credentials(force_refresh=refresh_credentials)
+        batch = BatchHttpRequest(batch_uri=batch_uri)
+        message = MIMEMultipart('mixed')
+        setattr(message, '_write_headers', lambda self: None) # The boundary goes in the HTTP header
+        for index, http_request in enumerate(http_requests):
+            part = MIMENonMultipart('application', 'http')
+            part['Content-Transfer-Encoding'] = 'binary'
+            part['Content-ID'] = batch._id_to_header(str(index))
+            part.set_payload(batch._serialize_request(http_request))
+            message.attach(part)
+        fp = io.StringIO()
+        Generator(fp, mangle_from_=False).flatten(message, unixfrom=False)
+        headers = {'content-type': f'multipart/mixed; boundary="{message.get_boundary()}"'}
+
+        response = await self.send('POST', batch_uri, fp.getvalue(), headers)
+        if response.status_code >= 300:
+            raise HttpError(to_httplib2_response(response), response.content, uri=batch_uri)
+
+        parser = FeedParser()
+        parser.feed(f"content-type: {response.headers['content-type']}\r\n\r\n{response.text}")
+        mime_response = parser.close()
+        if not mime_response.is_multipart():
+            raise BatchError("Response not in multipart/mixed format.", resp=to_httplib2_response(response), content=response.content)
+
+        results: List[Tuple[Any, Optional[HttpError]]] = [(None, None)] * len(http_requests)
+        for part in mime_response.get_payload():
+            index = int(batch._header_to_id(part['Content-ID']))
+            part_response, content = batch._deserialize_response(part.get_payload())
+            try:
+                results[index] = (http_requests[index].postproc(part_response, content.encode('utf-8')), None)
+            except HttpError as error:
+                results[index] = (None, error)
+        return results
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+def to_httplib2_response(response: httpx.Response) -> httplib2.Response:
+    """Converts an httpx response into the httplib2.Response shape googleapiclient expects."""
+    info = {key.lower(): value for key, value in response.headers.items()}
+    info['status'] = str(response.status_code)
+    http_response = httplib2.Response(info)
+    http_response.reason = response.reason_phrase
+    return http_response
+
+
+# Keyed by id(credentials): a client holds its credentials, so a weak key would never be
+# collected. release_async_client drops the client of replaced credentials.
+_clients: Dict[int, AsyncGoogleClient] = {}
+
+
+def get_async_client(credentials: Credentials) -> AsyncGoogleClient:
+    """Returns the async client shared by all async actions using these credentials."""
+    client = _clients.get(id(credentials))
+    if client is None:
+        client = AsyncGoogleClient(credentials)
+        _clients[id(credentials)] = client
+        logger.info(f"Created async Google API client (max_connections={ASYNC_MAX_CONNECTIONS}).")
+    return client
+
+
+async def release_async_client(credentials: Credentials) -> bool:
+    """Closes and drops the client of credentials that are being replaced; returns whether there was one."""
+    client = _clients.pop(id(credentials), None)
+    if client is None:
+        return False
+    await client.aclose()
+    return True
+
+
+async def aclose_async_clients():
+    """Closes all async clients (called on server shutdown)."""
+    for client in list(_clients.values()):
+        await client.aclose()
+    _clients.clear()
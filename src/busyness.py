@@ -0,0 +1,253 @@
+from datetime import datetime, date, time, timedelta, timezone, tzinfo
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# --- Busyness Engine ---
+# Vectorized event count / busy minutes per time bucket, used by analyze_busyness. Events are
+# converted once to arrays of UTC epoch seconds; every bucket total is then computed with
+# sorted-array searches instead of per-event Python loops:
+#   - Bucket edges are local midnights (or local hour starts) in the analysis time zone, so
+#     days follow DST changes (23- and 25-hour days) and the repeated hour of a DST fall-back
+#     counts towards the hour it repeats.
+#   - Busy seconds in [edge_j, edge_j+1) are C(edge_j+1) - C(edge_j), where C(t) is the total
+#     time of all events before t. C is evaluated at every edge with searchsorted over the
+#     sorted starts and ends and their prefix sums, so an event spanning several buckets is
+#     split between them exactly.
+#   - Events overlapping a bucket are #(start < right edge) - #(end <= left edge). An event
+#     is counted once in every bucket it overlaps.
+#   - 'hour' and 'weekday' are profiles: the per-local-hour and per-local-day totals are
+#     summed by hour of day (0-23) and weekday (0 = Monday) with bincount.
+# Only the part of each event inside [time_min, time_max) is counted. All-day events are
+# counted in the days they cover but add no busy minutes, and are ignored by 'hour' buckets.
+#
+# The totals are sums over events, so BusynessAccumulator folds them one page at a time:
+# analyze_busyness never holds more than a page of events, however long the window is.
+
+BUCKETS = ('day', 'hour', 'weekday')
+
+_DAY = 86400
+
+
+def _to_utc_epoch(value: datetime) -> float:
+    return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def _local_midnight(day: date, tz: tzinfo) -> float:
+    return datetime.combine(day, time(), tzinfo=tz).timestamp()
+
+
+def event_arrays(events: Iterable[Any], tz: tzinfo) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Converts events to epoch arrays in a single pass.
+
+    Args:
+        events: GoogleCalendarEvent instances (anything with start/end EventDateTime fields).
+        tz: Time zone all-day dates are placed in.
+
+    Returns:
+        (starts, ends) of timed events and (starts, ends) of all-day events, as float64 UTC
+        epoch seconds. Events without a usable start are dropped; a missing or earlier end is
+        treated as the start (a zero-length event).
+    """
+    timed: List[Tuple[float, float]] = []
+    all_day: List[Tuple[float, float]] = []
+    for event in events:
+        start, end = event.start, event.end
+        if start is None:
+            continue
+        if start.dateTime is not None:
+            start_ts = _to_utc_epoch(start.dateTime)
+            end_ts = _to_utc_epoch(end.dateTime) if end is not None and end.dateTime is not None else start_ts
+            timed.append((start_ts, max(start_ts, end_ts)))
+        elif start.date is not None:
+            start_ts = _local_midnight(start.date, tz)
+            end_ts = _local_midnight(end.date, tz) if end is not None and end.date is not None else start_ts + _DAY
+            all_day.append((start_ts, max(start_ts, end_ts)))
+    timed_array = np.array(timed, dtype=np.float64).reshape(-1, 2)
+    all_day_array = np.array(all_day, dtype=np.float64).reshape(-1, 2)
+    return timed_array[:, 0], timed_array[:, 1], all_day_array[:, 0], all_day_array[:, 1]
+
+
+def _day_edges(time_min: datetime, time_max: datetime, tz: tzinfo) -> Tuple[np.ndarray, List[date]]:
+    """Returns the edges of the local days covering the window (clipped to it) and their dates."""
+    first = time_min.astimezone(tz).date()
+    last = time_max.astimezone(tz).date()
+    if _local_midnight(last, tz) >= time_max.timestamp():
+        last -= timedelta(days=1) # The window ends at midnight: the last day is not part of it
+    days = [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+    edges = [_local_midnight(day, tz) for day in days]
+    edges.append(_local_midnight(last + timedelta(days=1), tz))
+    return _clip_edges(np.array(edges), time_min, time_max), days
+
+
+def _hour_edges(time_min: datetime, time_max: datetime, tz: tzinfo) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the edges of the local hours covering the window (clipped to it) and their hours of day."""
+    _, days = _day_edges(time_min, time_max, tz)
+    midnights = np.array([_local_midnight(day, tz) for day in days])
+    regular = np.diff(np.append(midnights, _local_midnight(days[-1] + timedelta(days=1), tz))) == _DAY
+    edges: List[np.ndarray] = []
+    hours: List[np.ndarray] = []
+    # Days without a DST change: 24 hours from midnight, vectorized
+    edges.append((midnights[regular, None] + np.arange(24) * 3600.0).ravel())
+    hours.append(np.tile(np.arange(24), int(regular.sum())))
+    # DST days: ask the time zone for each hour start; a skipped hour collapses onto the next one
+    for day in np.array(days, dtype=object)[~regular]:
+        starts: Dict[float, int] = {}
+        for hour in range(24):
+            starts[datetime.combine(day, time(hour), tzinfo=tz).timestamp()] = hour
+        edges.append(np.array(list(starts.keys())))
+        hours.append(np.array(list(starts.values())))
+    all_edges = np.concatenate(edges)
+    all_hours = np.concatenate(hours)
+    order = np.argsort(all_edges, kind='stable')
+    all_edges, all_hours = all_edges[order], all_hours[order]
+    # Keep the hours overlapping the window, closed by the window end
+    lo = max(int(np.searchsorted(all_edges, time_min.timestamp(), side='right')) - 1, 0)
+    hi = int(np.searchsorted(all_edges, time_max.timestamp(), side='left'))
+    return _clip_edges(np.append(all_edges[lo:hi], time_max.timestamp()), time_min, time_max), all_hours[lo:hi]
+
+
+def _clip_edges(edges: np.ndarray, time_min: datetime, time_max: datetime) -> np.ndarray:
+    edges = edges.astype(np.float64)
+    edges[0] = max(edges[0], time_min.timestamp())
+    edges[-1] = min(edges[-1], time_max.timestamp())
+    return edges
+
+
+def _bucket_totals(starts: np.ndarray, ends: np.ndarray, edges: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns (events overlapping, busy seconds) for each bucket [edges[j], edges[j+1])."""
+    origin = edges[0] # Keeps the prefix sums small enough to stay exact
+    sorted_starts = np.sort(starts - origin)
+    sorted_ends = np.sort(ends - origin)
+    relative_edges = edges - origin
+    start_sums = np.concatenate(([0.0], np.cumsum(sorted_starts)))
+    end_sums = np.concatenate(([0.0], np.cumsum(sorted_ends)))
+    started = np.searchsorted(sorted_starts, relative_edges, side='left')
+    ended = np.searchsorted(sorted_ends, relative_edges, side='left')
+    # Time of all events before each edge: sum(t - start) over started events minus sum(t - end) over ended ones
+    covered = relative_edges * started - start_sums[started] - (relative_edges * ended - end_sums[ended])
+    seconds = np.maximum(np.diff(covered), 0.0)
+    # Zero-length events still count in the bucket holding their start
+    count_ends = np.sort(np.where(ends > starts, ends, np.nextafter(starts, np.inf)) - origin)
+    counts = started[1:] - np.searchsorted(count_ends, relative_edges[:-1], side='right')
+    return counts, seconds
+
+
+def time_zone_name(tz: tzinfo) -> str:
+    """Returns the IANA name of a time zone (or its fixed-offset name, e.g. 'UTC')."""
+    return getattr(tz, 'key', None) or tz.tzname(None) or str(tz)
+
+
+class BusynessAccumulator:
+    """Streaming fold of busyness totals over batches (pages) of events.
+
+    Bucket totals are sums over events, so adding pages one at a time gives exactly the totals
+    of adding them all at once. Memory is bounded by the number of buckets in the window, not
+    by the number of events. Accumulators over the same window, time zone and bucket (e.g. one
+    per calendar) can be merged.
+    """
+
+    def __init__(self, time_min: datetime, time_max: datetime, tz: tzinfo, bucket: str = 'day'):
+        """Sets up empty totals.
+
+        Args:
+            time_min: Start of the analysis window.
+            time_max: End of the analysis window.
+            tz: Time zone defining day and hour boundaries.
+            bucket: 'day', 'hour' (hour-of-day profile) or 'weekday' (weekday profile).
+
+        Raises:
+            ValueError: If bucket is unknown.
+        """
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket '{bucket}'. Expected one of: {', '.join(BUCKETS)}.")
+        self.time_min = time_min if time_min.tzinfo else time_min.replace(tzinfo=timezone.utc)
+        self.time_max = time_max if time_max.tzinfo else time_max.replace(tzinfo=timezone.utc)
+        self.tz = tz
+        self.bucket = bucket
+        self.events = 0 # Events added (including ones outside the window or without a start)
+        self._days: List[date] = []
+        self._hours = np.zeros(0, dtype=np.int64)
+        if self.time_max <= self.time_min:
+            self._edges = np.zeros(1)
+        elif bucket == 'hour':
+            self._edges, self._hours = _hour_edges(self.time_min, self.time_max, tz)
+        else:
+            self._edges, self._days = _day_edges(self.time_min, self.time_max, tz)
+        self._counts = np.zeros(len(self._edges) - 1, dtype=np.int64)
+        self._seconds = np.zeros(len(self._edges) - 1)
+
+    def add(self, events: List[Any]) -> None:
+        """Adds a batch of events (GoogleCalendarEvent models, e.g. one page) to the totals."""
+        self.events += len(events)
+        if not len(self._counts):
+            return
+        starts, ends, all_day_starts, all_day_ends = event_arrays(events, self.tz)
+        counts, seconds = _bucket_totals(starts, ends, self._edges)
+        if self.bucket != 'hour' and len(all_day_starts):
+            counts = counts + _bucket_totals(all_day_starts, all_day_ends, self._edges)[0]
+        self._counts += counts
+        self._seconds += seconds
+
+    def merge(self, other: 'BusynessAccumulator') -> None:
+        """Adds another accumulator's totals (same window, time zone and bucket) to this one."""
+        if other.bucket != self.bucket or not np.array_equal(other._edges, self._edges):
+            raise ValueError("Only accumulators with the same window, time zone and bucket can be merged.")
+        self.events += other.events
+        self._counts += other._counts
+        self._seconds += other._seconds
+
+    def result(self) -> Dict[Any, Dict[str, Any]]:
+        """Returns the totals: {key: {'event_count': int, 'total_duration_minutes': float}} in key order.
+
+        Keys are dates for 'day' (only days with events), hours 0-23 for 'hour' and weekdays
+        0-6 (0 = Monday) for 'weekday'. An empty window has no buckets.
+        """
+        if not len(self._counts):
+            return {}
+        counts, seconds = self._counts, self._seconds
+        if self.bucket == 'hour':
+            counts = np.bincount(self._hours, weights=counts, minlength=24)
+            seconds = np.bincount(self._hours, weights=seconds, minlength=24)
+            keys: List[Any] = list(range(24))
+        elif self.bucket == 'weekday':
+            weekdays = np.array([day.weekday() for day in self._days])
+            counts = np.bincount(weekdays, weights=counts, minlength=7)
+            seconds = np.bincount(weekdays, weights=seconds, minlength=7)
+            keys = list(range(7))
+        else:
+            present = np.flatnonzero(counts)
+            keys = [self._days[index] for index in present]
+            counts, seconds = counts[present], seconds[present]
+        minutes = np.round(seconds / 60.0, 3)
+        return {
+            key: {'event_count': int(count), 'total_duration_minutes': float(busy)}
+            for key, count, busy in zip(keys, counts.tolist(), minutes.tolist())
+        }
+
+
+def aggregate(
+    events: Iterable[Any],
+    time_min: datetime,
+    time_max: datetime,
+    tz: tzinfo,
+    bucket: str = 'day'
+) -> Dict[Any, Dict[str, Any]]:
+    """Computes event counts and busy minutes per bucket for events already in memory.
+
+    Args:
+        events: Event instances (single_events=True), e.g. GoogleCalendarEvent models.
+        time_min: Start of the analysis window.
+        time_max: End of the analysis window.
+        tz: Time zone defining day and hour boundaries.
+        bucket: 'day', 'hour' (hour-of-day profile) or 'weekday' (weekday profile).
+
+    Returns:
+        The totals, as BusynessAccumulator.result().
+
+    Raises:
+        ValueError: If bucket is unknown.
+    """
+    accumulator = BusynessAccumulator(time_min, time_max, tz, bucket)
+    accumulator.add(list(events))
+    return accumulator.result()
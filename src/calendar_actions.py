@@ -1,10 +1,9 @@
 import logging
-from datetime import datetime, date, timedelta, time, timezone
-from typing import Optional, List, Dict, Any, Tuple
+from datetime import datetime, timedelta, time, timezone
+from typing import Optional, List, Dict, Any, Tuple, Iterator
 from dateutil import parser # For robust datetime parsing
 import json
 
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from google.oauth2.credentials import Credentials
 
@@ -18,6 +17,11 @@ from .models import (
     CalendarListResponse,
     CalendarListEntry
 )
+from .google_services import get_service
+from .interval_index import IntervalIndex
+from .field_masks import resolve_event_fields, events_list_fields, EVENT_FIELD_PRESETS
+from . import calendar_sync
+from . import calendar_list_cache
 
 # Import analysis functions
 try:
@@ -34,15 +38,288 @@ logger = logging.getLogger(__name__)
 # --- Helper Function to Build Service ---
 
 def _get_calendar_service(credentials: Credentials):
-    """Builds the Google Calendar API service client."""
+    """Returns a (cached) Google Calendar API service client."""
     try:
-        service = build('calendar', 'v3', credentials=credentials)
-        logger.debug("Google Calendar service client created successfully.")
+        service = get_service('calendar', 'v3', credentials)
         return service
     except Exception as e:
         logger.error(f"Failed to build Google Calendar service: {e}", exc_info=True)
         raise  # Re-raise the exception to be handled by the caller
 
+# --- Request/Response Helpers ---
+# Shared by the sync actions below and the async mirror in async_calendar_actions.py.
+
+def _format_datetime_field(dt_obj: datetime) -> str:
+    """Formats a datetime as RFC3339, assuming UTC if it is naive."""
+    if dt_obj.tzinfo is None:
+        return dt_obj.isoformat() + 'Z'
+    else:
+        return dt_obj.isoformat()
+
+def _build_find_events_kwargs(
+    calendar_id: str,
+    time_min: Optional[datetime],
+    time_max: Optional[datetime],
+    query: Optional[str],
+    max_results: int,
+    single_events: bool,
+    order_by: str,
+    iCalUID: Optional[str],
+    sharedExtendedProperty: Optional[str],
+    privateExtendedProperty: Optional[str],
+    showDeleted: bool,
+    eventTypes: Optional[List[str]],
+    page_token: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Builds the keyword arguments for events().list from find_events parameters.
+
+    Raises:
+        field_masks.InvalidFieldsError: If fields is neither a preset nor a well-formed mask.
+    """
+    # Format datetime objects to RFC3339 string format required by the API
+    time_min_str = time_min.isoformat() + 'Z' if time_min and time_min.tzinfo is None else (time_min.isoformat() if time_min else None)
+    time_max_str = time_max.isoformat() + 'Z' if time_max and time_max.tzinfo is None else (time_max.isoformat() if time_max else None)
+
+    # Build the arguments dictionary dynamically to avoid passing None values for optional params
+    list_kwargs = {
+        'calendarId': calendar_id,
+        'timeMin': time_min_str,
+        'timeMax': time_max_str,
+        'q': query,
+        'maxResults': max_results,
+        'singleEvents': single_events,
+        'orderBy': order_by,
+        'showDeleted': showDeleted,
+        # Conditionally add parameters if they are provided
+        **(({'iCalUID': iCalUID}) if iCalUID else {}),
+        **(({'sharedExtendedProperty': sharedExtendedProperty}) if sharedExtendedProperty else {}),
+        **(({'privateExtendedProperty': privateExtendedProperty}) if privateExtendedProperty else {}),
+        **(({'eventTypes': eventTypes}) if eventTypes else {}),
+        **(({'pageToken': page_token}) if page_token else {}),
+        'fields': events_list_fields(resolve_event_fields(fields)),
+    }
+    # The API rejects orderBy=startTime unless recurring events are expanded (singleEvents=True)
+    if not single_events and order_by == 'startTime':
+        list_kwargs['orderBy'] = None
+    # Filter out None values from list_kwargs to avoid API errors for empty optional params
+    list_kwargs = {k: v for k, v in list_kwargs.items() if v is not None}
+    return list_kwargs
+
+def _build_mirror_query_kwargs(
+    time_min: Optional[datetime],
+    time_max: Optional[datetime],
+    query: Optional[str],
+    max_results: int,
+    order_by: str,
+    iCalUID: Optional[str],
+    sharedExtendedProperty: Optional[str],
+    privateExtendedProperty: Optional[str],
+    showDeleted: bool,
+    eventTypes: Optional[List[str]],
+    page_token: Optional[str],
+    fields: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Maps find_events parameters onto CalendarMirror.query()."""
+    return {
+        'max_results': max_results,
+        'page_token': page_token,
+        'fields': resolve_event_fields(fields),
+        'time_min': time_min,
+        'time_max': time_max,
+        'query': query,
+        'order_by': order_by,
+        'iCalUID': iCalUID,
+        'sharedExtendedProperty': sharedExtendedProperty,
+        'privateExtendedProperty': privateExtendedProperty,
+        'showDeleted': showDeleted,
+        'eventTypes': eventTypes,
+    }
+
+def _build_event_body(event_data: EventCreateRequest) -> Optional[Dict[str, Any]]:
+    """Builds the events().insert body from an EventCreateRequest. Returns None if start/end are invalid."""
+    # --- Manually Construct Event Body --- 
+    # Ensure datetime objects are formatted as strings for JSON serialization
+    event_body: Dict[str, Any] = {}
+
+    # Required fields
+    if not event_data.start or not event_data.end:
+        logger.error("Event creation failed: Start and End times are required.")
+        return None
+    
+    event_body['start'] = {}
+    if event_data.start.dateTime:
+        event_body['start']['dateTime'] = _format_datetime_field(event_data.start.dateTime)
+        if event_data.start.timeZone:
+            event_body['start']['timeZone'] = event_data.start.timeZone
+    elif event_data.start.date:
+        event_body['start']['date'] = str(event_data.start.date) # Ensure date is string
+    else:
+        logger.error("Event creation failed: Start time requires either dateTime or date.")
+        return None
+
+    event_body['end'] = {}
+    if event_data.end.dateTime:
+        event_body['end']['dateTime'] = _format_datetime_field(event_data.end.dateTime)
+        if event_data.end.timeZone:
+            event_body['end']['timeZone'] = event_data.end.timeZone
+    elif event_data.end.date:
+        event_body['end']['date'] = str(event_data.end.date) # Ensure date is string
+    else:
+        logger.error("Event creation failed: End time requires either dateTime or date.")
+        return None
+        
+    # Optional fields
+    if event_data.summary:
+        event_body['summary'] = event_data.summary
+    if event_data.description:
+        event_body['description'] = event_data.description
+    if event_data.location:
+        event_body['location'] = event_data.location
+    if event_data.attendees:
+        event_body['attendees'] = [{'email': email} for email in event_data.attendees]
+    if event_data.recurrence:
+        event_body['recurrence'] = event_data.recurrence
+    if event_data.reminders:
+        # Pydantic should handle nested model serialization correctly here if reminders is a model
+        # If it needs specific formatting, adjust here. Assuming .dict() is okay for reminders.
+        event_body['reminders'] = event_data.reminders.dict(by_alias=True, exclude_unset=True)
+    # Add other optional fields from EventCreateRequest if needed (e.g., colorId, transparency, etc.)
+
+    return event_body
+
+def _build_update_body(update_data: EventUpdateRequest) -> Dict[str, Any]:
+    """Builds the events().patch body containing only the fields present in update_data."""
+    # Manually construct the update body dictionary
+    update_body: Dict[str, Any] = {}
+
+    # Populate update_body only with fields present in update_data
+    if update_data.summary is not None:
+        update_body['summary'] = update_data.summary
+    if update_data.description is not None:
+        update_body['description'] = update_data.description
+    if update_data.location is not None:
+        update_body['location'] = update_data.location
+
+    # Handle start time - need to format if present
+    if update_data.start is not None:
+        start_details = {}
+        if update_data.start.dateTime:
+            start_details['dateTime'] = _format_datetime_field(update_data.start.dateTime)
+            if update_data.start.timeZone:
+                start_details['timeZone'] = update_data.start.timeZone
+        elif update_data.start.date:
+            start_details['date'] = str(update_data.start.date)
+        # Add check if neither date nor dateTime provided in start? Unlikely via model validation.
+        if start_details: # Only add 'start' if we have valid sub-fields
+            update_body['start'] = start_details
+
+    # Handle end time - need to format if present
+    if update_data.end is not None:
+        end_details = {}
+        if update_data.end.dateTime:
+            end_details['dateTime'] = _format_datetime_field(update_data.end.dateTime)
+            if update_data.end.timeZone:
+                end_details['timeZone'] = update_data.end.timeZone
+        elif update_data.end.date:
+            end_details['date'] = str(update_data.end.date)
+        # Add check if neither date nor dateTime provided in end?
+        if end_details: # Only add 'end' if we have valid sub-fields
+            update_body['end'] = end_details
+            
+    # Handle attendees - PATCH replaces the attendee list
+    if update_data.attendees is not None:
+        # Convert EventAttendee models back to simple dicts for API
+        update_body['attendees'] = [
+            attendee.dict(by_alias=True, exclude_unset=True) 
+            for attendee in update_data.attendees
+        ]
+    # Add other updatable fields from EventUpdateRequest if needed
+
+    return update_body
+
+def _build_attendee_patch_body(event: Dict[str, Any], attendee_emails: List[str]) -> Optional[Dict[str, Any]]:
+    """Builds the events().patch body that appends new attendees. Returns None if nothing is new."""
+    # Get current attendees, ensuring it's a list
+    current_attendees = event.get('attendees', [])
+    if not isinstance(current_attendees, list):
+        current_attendees = [] # Ensure it's a list if API returns something unexpected
+
+    # Create a set of current attendee emails for efficient lookup
+    current_emails = {attendee.get('email') for attendee in current_attendees if attendee.get('email')}
+
+    # Prepare the list of new attendee objects to add
+    new_attendees_to_add = [
+        {'email': email} for email in attendee_emails if email not in current_emails
+    ]
+
+    if not new_attendees_to_add:
+        return None
+
+    # Combine current and new attendees
+    return {'attendees': current_attendees + new_attendees_to_add}
+
+def _extract_attendee_statuses(event: Dict[str, Any], attendee_emails: Optional[List[str]]) -> Dict[str, str]:
+    """Maps attendee emails to their responseStatus, optionally restricted to attendee_emails."""
+    attendees = event.get('attendees', [])
+    status_map: Dict[str, str] = {}
+    target_emails_set = set(attendee_emails) if attendee_emails is not None else None
+
+    for attendee in attendees:
+        email = attendee.get('email')
+        status = attendee.get('responseStatus')
+        if not email or not status:
+            continue # Skip attendees without email or status
+
+        # If specific emails were requested, check if this attendee is one of them
+        if target_emails_set is not None:
+            if email in target_emails_set:
+                status_map[email] = status
+        else:
+            # Otherwise, include all attendees
+            status_map[email] = status
+
+    return status_map
+
+def _build_freebusy_body(time_min: datetime, time_max: datetime, calendar_ids: List[str]) -> Dict[str, Any]:
+    """Builds the freebusy().query body for a list of calendars."""
+    # Ensure time_min and time_max are in RFC3339 format
+    # Add 'Z' for UTC if timezone is naive, otherwise format appropriately
+    time_min_str = time_min.isoformat() + ('Z' if time_min.tzinfo is None else '')
+    time_max_str = time_max.isoformat() + ('Z' if time_max.tzinfo is None else '')
+
+    request_body = {
+        "timeMin": time_min_str,
+        "timeMax": time_max_str,
+        "items": [{"id": cal_id} for cal_id in calendar_ids]
+        # Optional: Add groupExpansionMax, calendarExpansionMax if needed
+    }
+    return request_body
+
+def _process_freebusy_result(freebusy_result: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Converts a freebusy().query response into {calendar_id: {'busy': [...], 'errors': [...]}}."""
+    processed_results: Dict[str, Dict[str, Any]] = {}
+    calendars_data = freebusy_result.get('calendars', {})
+
+    for cal_id, data in calendars_data.items():
+        busy_intervals = []
+        for interval in data.get('busy', []):
+            try:
+                # Parse RFC3339 strings back to datetime objects
+                start_dt = parser.isoparse(interval.get('start'))
+                end_dt = parser.isoparse(interval.get('end'))
+                busy_intervals.append({'start': start_dt, 'end': end_dt})
+            except (TypeError, ValueError) as parse_error:
+                logger.warning(f"Could not parse busy interval for {cal_id}: {interval}. Error: {parse_error}")
+                # Optionally add this interval with raw strings or skip it
+
+        processed_results[cal_id] = {
+            'busy': busy_intervals,
+            'errors': data.get('errors', []) # Keep API errors as is
+        }
+
+    return processed_results
+
 # --- Calendar Action Functions ---
 
 def find_events(
@@ -58,7 +335,10 @@ def find_events(
     sharedExtendedProperty: Optional[str] = None, # Filter by shared extended properties (key=value or key)
     privateExtendedProperty: Optional[str] = None, # Filter by private extended properties (key=value or key)
     showDeleted: bool = False, # Show deleted events
-    eventTypes: Optional[List[str]] = None # Filter by event types (e.g., ['default', 'focusTime'])
+    eventTypes: Optional[List[str]] = None, # Filter by event types (e.g., ['default', 'focusTime'])
+    page_token: Optional[str] = None, # nextPageToken from a previous call
+    use_mirror: bool = False, # Serve from the incrementally synced local mirror
+    fields: Optional[str] = None # Partial response: preset name or field mask (see field_masks)
 ) -> Optional[EventsResponse]:
     """Finds events in a specified calendar based on various criteria.
 
@@ -76,36 +356,52 @@ def find_events(
         privateExtendedProperty: Filter by private extended properties. Format "key=value" or "key".
         showDeleted: Whether to include deleted events in the results.
         eventTypes: List of event types to return (e.g., ['default', 'focusTime', 'outOfOffice']).
+        page_token: Token from a previous response's nextPageToken to fetch the following page.
+        use_mirror: Answer from the calendar's local mirror (see calendar_sync), which is
+            brought up to date with an incremental sync instead of re-downloading the window.
+        fields: Return only these event fields: a preset from field_masks.EVENT_FIELD_PRESETS
+            (e.g., 'timing-only') or a Google field mask such as 'id,start,end'. None for full events.
 
     Returns:
-        An EventsResponse object containing the list of events, or None if an error occurs.
+        An EventsResponse object containing one page of events (see nextPageToken; use
+        iter_event_pages to follow it), or None if an error occurs.
+
+    Raises:
+        field_masks.InvalidFieldsError: If fields is neither a preset nor a well-formed mask.
+        calendar_sync.InvalidPageTokenError: With use_mirror, if page_token is not a valid
+            mirror page token.
     """
+    if use_mirror:
+        try:
+            mirror = calendar_sync.ensure_fresh(credentials, calendar_id, single_events)
+            return mirror.query(**_build_mirror_query_kwargs(
+                time_min, time_max, query, max_results, order_by, iCalUID, sharedExtendedProperty,
+                privateExtendedProperty, showDeleted, eventTypes, page_token, fields
+            ))
+        except HttpError as error:
+            logger.error(f"Google API error while syncing mirror for calendar '{calendar_id}': {error}", exc_info=True)
+            return None
+
     service = _get_calendar_service(credentials)
     if not service:
         return None
 
-    # Format datetime objects to RFC3339 string format required by the API
-    time_min_str = time_min.isoformat() + 'Z' if time_min and time_min.tzinfo is None else (time_min.isoformat() if time_min else None)
-    time_max_str = time_max.isoformat() + 'Z' if time_max and time_max.tzinfo is None else (time_max.isoformat() if time_max else None)
-
-    # Build the arguments dictionary dynamically to avoid passing None values for optional params
-    list_kwargs = {
-        'calendarId': calendar_id,
-        'timeMin': time_min_str,
-        'timeMax': time_max_str,
-        'q': query,
-        'maxResults': max_results,
-        'singleEvents': single_events,
-        'orderBy': order_by,
-        'showDeleted': showDeleted,
-        # Conditionally add parameters if they are provided
-        **(({'iCalUID': iCalUID}) if iCalUID else {}),
-        **(({'sharedExtendedProperty': sharedExtendedProperty}) if sharedExtendedProperty else {}),
-        **(({'privateExtendedProperty': privateExtendedProperty}) if privateExtendedProperty else {}),
-        **(({'eventTypes': eventTypes}) if eventTypes else {}),
-    }
-    # Filter out None values from list_kwargs to avoid API errors for empty optional params
-    list_kwargs = {k: v for k, v in list_kwargs.items() if v is not None}
+    list_kwargs = _build_find_events_kwargs(
+        calendar_id=calendar_id,
+        time_min=time_min,
+        time_max=time_max,
+        query=query,
+        max_results=max_results,
+        single_events=single_events,
+        order_by=order_by,
+        iCalUID=iCalUID,
+        sharedExtendedProperty=sharedExtendedProperty,
+        privateExtendedProperty=privateExtendedProperty,
+        showDeleted=showDeleted,
+        eventTypes=eventTypes,
+        page_token=page_token,
+        fields=fields,
+    )
 
     logger.info(
         f"Fetching events from calendar '{calendar_id}' with parameters: {list_kwargs}"
@@ -122,7 +418,7 @@ def find_events(
         logger.info(f"Found {len(events_result.get('items', []))} events.")
 
         # Parse the result using Pydantic models for validation and structure
-        events_response = EventsResponse(**events_result)
+        events_response = EventsResponse.from_google(events_result)
         return events_response
 
     except HttpError as error:
@@ -138,6 +434,79 @@ def find_events(
         logger.error(f"An unexpected error occurred while finding events: {e}", exc_info=True)
         return None
 
+# --- Pagination ---
+
+def iter_event_pages(
+    credentials: Credentials,
+    calendar_id: str = 'primary',
+    time_min: Optional[datetime] = None,
+    time_max: Optional[datetime] = None,
+    query: Optional[str] = None,
+    page_size: int = 250,
+    single_events: bool = True,
+    order_by: str = 'startTime',
+    iCalUID: Optional[str] = None,
+    sharedExtendedProperty: Optional[str] = None,
+    privateExtendedProperty: Optional[str] = None,
+    showDeleted: bool = False,
+    eventTypes: Optional[List[str]] = None,
+    page_token: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    fields: Optional[str] = None
+) -> Iterator[EventsResponse]:
+    """Lazily yields pages of events, following nextPageToken until the listing is exhausted.
+
+    Each page is fetched only when the caller asks for it, so memory stays bounded by one
+    page regardless of how long the time range is.
+
+    Args:
+        credentials: Valid Google OAuth2 credentials.
+        calendar_id: Calendar identifier.
+        page_size: Events per page (maxResults, API maximum 2500).
+        page_token: Resume from this nextPageToken instead of the first page.
+        max_pages: Stop after this many pages (None for all).
+        fields: Event fields preset or mask, as in find_events.
+        Other arguments are the find_events filters.
+
+    Yields:
+        EventsResponse objects, one per API page.
+
+    Raises:
+        googleapiclient.errors.HttpError: If a page request fails.
+    """
+    service = _get_calendar_service(credentials)
+    list_kwargs = _build_find_events_kwargs(
+        calendar_id=calendar_id,
+        time_min=time_min,
+        time_max=time_max,
+        query=query,
+        max_results=page_size,
+        single_events=single_events,
+        order_by=order_by,
+        iCalUID=iCalUID,
+        sharedExtendedProperty=sharedExtendedProperty,
+        privateExtendedProperty=privateExtendedProperty,
+        showDeleted=showDeleted,
+        eventTypes=eventTypes,
+        page_token=page_token,
+        fields=fields,
+    )
+    pages = 0
+    while True:
+        events_result = service.events().list(**list_kwargs).execute()
+        pages += 1
+        logger.debug(f"Fetched page {pages} of calendar '{calendar_id}' ({len(events_result.get('items', []))} events).")
+        yield EventsResponse.from_google(events_result)
+        next_page_token = events_result.get('nextPageToken')
+        if not next_page_token or (max_pages and pages >= max_pages):
+            return
+        list_kwargs['pageToken'] = next_page_token
+
+def iter_events(credentials: Credentials, **kwargs) -> Iterator[GoogleCalendarEvent]:
+    """Yields individual events across all pages. Accepts the same arguments as iter_event_pages."""
+    for page in iter_event_pages(credentials, **kwargs):
+        yield from page.items
+
 def create_event(
     credentials: Credentials,
     event_data: EventCreateRequest, # Use the Pydantic model for input validation
@@ -159,63 +528,10 @@ def create_event(
     if not service:
         return None
 
-    # --- Manually Construct Event Body --- 
-    # Ensure datetime objects are formatted as strings for JSON serialization
-    event_body: Dict[str, Any] = {}
-
-    def format_datetime_field(dt_obj: datetime) -> str:
-        if dt_obj.tzinfo is None:
-            # Assume UTC if timezone is naive
-            return dt_obj.isoformat() + 'Z'
-        else:
-            return dt_obj.isoformat()
-
-    # Required fields
-    if not event_data.start or not event_data.end:
-        logger.error("Event creation failed: Start and End times are required.")
-        return None # Or raise an error
-    
-    event_body['start'] = {}
-    if event_data.start.dateTime:
-        event_body['start']['dateTime'] = format_datetime_field(event_data.start.dateTime)
-        if event_data.start.timeZone:
-            event_body['start']['timeZone'] = event_data.start.timeZone
-    elif event_data.start.date:
-        event_body['start']['date'] = str(event_data.start.date) # Ensure date is string
-    else:
-        logger.error("Event creation failed: Start time requires either dateTime or date.")
+    event_body = _build_event_body(event_data)
+    if event_body is None:
         return None
 
-    event_body['end'] = {}
-    if event_data.end.dateTime:
-        event_body['end']['dateTime'] = format_datetime_field(event_data.end.dateTime)
-        if event_data.end.timeZone:
-            event_body['end']['timeZone'] = event_data.end.timeZone
-    elif event_data.end.date:
-        event_body['end']['date'] = str(event_data.end.date) # Ensure date is string
-    else:
-        logger.error("Event creation failed: End time requires either dateTime or date.")
-        return None
-        
-    # Optional fields
-    if event_data.summary:
-        event_body['summary'] = event_data.summary
-    if event_data.description:
-        event_body['description'] = event_data.description
-    if event_data.location:
-        event_body['location'] = event_data.location
-    if event_data.attendees:
-        event_body['attendees'] = [{'email': email} for email in event_data.attendees]
-    if event_data.recurrence:
-        event_body['recurrence'] = event_data.recurrence
-    if event_data.reminders:
-        # Pydantic should handle nested model serialization correctly here if reminders is a model
-        # If it needs specific formatting, adjust here. Assuming .dict() is okay for reminders.
-        event_body['reminders'] = event_data.reminders.dict(by_alias=True, exclude_unset=True)
-    # Add other optional fields from EventCreateRequest if needed (e.g., colorId, transparency, etc.)
-
-    # --- End Manual Construction ---
-
     logger.info(f"Creating event in calendar '{calendar_id}': {event_body.get('summary', '[No Summary]')}")
     # Use json.dumps for accurate debug logging of what will be serialized
     try:
@@ -236,7 +552,7 @@ def create_event(
         logger.info(f"Successfully created event with ID: {created_event.get('id')}")
 
         # Parse the created event using Pydantic model
-        parsed_event = GoogleCalendarEvent(**created_event)
+        parsed_event = GoogleCalendarEvent.from_google(created_event)
         return parsed_event
 
     except HttpError as error:
@@ -285,7 +601,7 @@ def quick_add_event(
         logger.info(f"Successfully quick-added event with ID: {created_event.get('id')}")
 
         # Parse the created event using Pydantic model
-        parsed_event = GoogleCalendarEvent(**created_event)
+        parsed_event = GoogleCalendarEvent.from_google(created_event)
         return parsed_event
 
     except HttpError as error:
@@ -324,58 +640,7 @@ def update_event(
     if not service:
         return None
 
-    # Manually construct the update body dictionary
-    update_body: Dict[str, Any] = {}
-
-    # Helper function (can be reused or defined locally)
-    def format_datetime_field(dt_obj: datetime) -> str:
-        if dt_obj.tzinfo is None:
-            return dt_obj.isoformat() + 'Z'
-        else:
-            return dt_obj.isoformat()
-
-    # Populate update_body only with fields present in update_data
-    if update_data.summary is not None:
-        update_body['summary'] = update_data.summary
-    if update_data.description is not None:
-        update_body['description'] = update_data.description
-    if update_data.location is not None:
-        update_body['location'] = update_data.location
-
-    # Handle start time - need to format if present
-    if update_data.start is not None:
-        start_details = {}
-        if update_data.start.dateTime:
-            start_details['dateTime'] = format_datetime_field(update_data.start.dateTime)
-            if update_data.start.timeZone:
-                start_details['timeZone'] = update_data.start.timeZone
-        elif update_data.start.date:
-            start_details['date'] = str(update_data.start.date)
-        # Add check if neither date nor dateTime provided in start? Unlikely via model validation.
-        if start_details: # Only add 'start' if we have valid sub-fields
-            update_body['start'] = start_details
-
-    # Handle end time - need to format if present
-    if update_data.end is not None:
-        end_details = {}
-        if update_data.end.dateTime:
-            end_details['dateTime'] = format_datetime_field(update_data.end.dateTime)
-            if update_data.end.timeZone:
-                end_details['timeZone'] = update_data.end.timeZone
-        elif update_data.end.date:
-            end_details['date'] = str(update_data.end.date)
-        # Add check if neither date nor dateTime provided in end?
-        if end_details: # Only add 'end' if we have valid sub-fields
-            update_body['end'] = end_details
-            
-    # Handle attendees - PATCH replaces the attendee list
-    if update_data.attendees is not None:
-        # Convert EventAttendee models back to simple dicts for API
-        update_body['attendees'] = [
-            attendee.dict(by_alias=True, exclude_unset=True) 
-            for attendee in update_data.attendees
-        ]
-    # Add other updatable fields from EventUpdateRequest if needed
+    update_body = _build_update_body(update_data)
 
     if not update_body:
         logger.warning(f"Update called for event {event_id} with no fields to update.")
@@ -384,7 +649,7 @@ def update_event(
         # Let's retrieve the existing event to provide some feedback.
         try:
             existing_event = service.events().get(calendarId=calendar_id, eventId=event_id).execute()
-            return GoogleCalendarEvent(**existing_event)
+            return GoogleCalendarEvent.from_google(existing_event)
         except HttpError as e:
             logger.error(f"Failed to retrieve event {event_id} after empty update request: {e}")
             return None
@@ -403,7 +668,7 @@ def update_event(
         logger.info(f"Successfully updated event '{event_id}'.")
 
         # Parse the updated event using Pydantic model
-        parsed_event = GoogleCalendarEvent(**updated_event)
+        parsed_event = GoogleCalendarEvent.from_google(updated_event)
         return parsed_event
 
     except HttpError as error:
@@ -520,32 +785,12 @@ def add_attendee(
         logger.error(f"Unexpected error retrieving event '{event_id}': {e}", exc_info=True)
         return None
 
-    # 2. Modify the attendee list
-    # Get current attendees, ensuring it's a list
-    current_attendees = event.get('attendees', [])
-    if not isinstance(current_attendees, list):
-        current_attendees = [] # Ensure it's a list if API returns something unexpected
-
-    # Create a set of current attendee emails for efficient lookup
-    current_emails = {attendee.get('email') for attendee in current_attendees if attendee.get('email')}
-
-    # Prepare the list of new attendee objects to add
-    new_attendees_to_add = [
-        {'email': email} for email in attendee_emails if email not in current_emails
-    ]
-
-    if not new_attendees_to_add:
+    # 2. Modify the attendee list and prepare the patch body
+    patch_body = _build_attendee_patch_body(event, attendee_emails)
+    if patch_body is None:
         logger.warning(f"All provided attendees {attendee_emails} are already in event '{event_id}'. No update needed.")
         # Return the current event data as no changes were made
-        return GoogleCalendarEvent(**event)
-
-    # Combine current and new attendees
-    updated_attendee_list = current_attendees + new_attendees_to_add
-
-    # 3. Prepare the patch body
-    patch_body = {
-        'attendees': updated_attendee_list
-    }
+        return GoogleCalendarEvent.from_google(event)
 
     # 4. Patch the event
     logger.debug(f"Patching event '{event_id}' with updated attendees: {patch_body}")
@@ -560,7 +805,7 @@ def add_attendee(
         logger.info(f"Successfully added attendees to event '{event_id}'.")
 
         # Parse the updated event using Pydantic model
-        parsed_event = GoogleCalendarEvent(**updated_event)
+        parsed_event = GoogleCalendarEvent.from_google(updated_event)
         return parsed_event
 
     except HttpError as error:
@@ -578,13 +823,16 @@ def add_attendee(
 
 def find_calendars(
     credentials: Credentials,
-    min_access_role: Optional[str] = None # e.g., 'reader', 'writer', 'owner'
+    min_access_role: Optional[str] = None, # e.g., 'reader', 'writer', 'owner'
+    use_cache: bool = True
 ) -> Optional[CalendarListResponse]:
     """Lists the calendars on the user's calendar list.
 
     Args:
         credentials: Valid Google OAuth2 credentials.
         min_access_role: The minimum access role for the user in the returned calendars.
+        use_cache: Answer from the calendar list cache (see calendar_list_cache) instead of
+                   calling calendarList().list. The uncached call returns only the first page.
 
     Returns:
         A CalendarListResponse object containing the list of calendars, or None if an error occurs.
@@ -595,9 +843,10 @@ def find_calendars(
 
     logger.info(f"Fetching calendar list. Min access role: {min_access_role}")
 
-    # Paginate? For simplicity, get first page for now.
-    # Add maxResults if needed.
     try:
+        if use_cache:
+            return calendar_list_cache.get_calendar_list(credentials, min_access_role)
+
         calendar_list = service.calendarList().list(
             minAccessRole=min_access_role
         ).execute()
@@ -605,7 +854,7 @@ def find_calendars(
         logger.info(f"Found {len(calendar_list.get('items', []))} calendars in the list.")
 
         # Parse the result using Pydantic model
-        parsed_list = CalendarListResponse(**calendar_list)
+        parsed_list = CalendarListResponse.from_google(calendar_list)
         return parsed_list
 
     except HttpError as error:
@@ -648,10 +897,11 @@ def create_calendar(
     try:
         created_calendar = service.calendars().insert(body=calendar_body).execute()
         logger.info(f"Successfully created calendar with ID: {created_calendar.get('id')}")
+        calendar_list_cache.invalidate(credentials)
 
         # The response is a Calendar resource, parse it using CalendarListEntry model
         # (Structure is identical for relevant fields)
-        parsed_calendar = CalendarListEntry(**created_calendar)
+        parsed_calendar = CalendarListEntry.from_google(created_calendar)
         return parsed_calendar
 
     except HttpError as error:
@@ -695,7 +945,8 @@ def check_attendee_status(
     logger.info(f"Checking attendee status for event '{event_id}' in calendar '{calendar_id}'. Target emails: {attendee_emails or 'All'}")
 
     try:
-        event = service.events().get(calendarId=calendar_id, eventId=event_id).execute()
+        # Only the attendee list is needed
+        event = service.events().get(calendarId=calendar_id, eventId=event_id, fields=EVENT_FIELD_PRESETS['attendees']).execute()
         logger.debug(f"Retrieved event '{event_id}' for status check.")
 
     except HttpError as error:
@@ -719,22 +970,7 @@ def check_attendee_status(
         logger.info(f"Event '{event_id}' has no attendees.")
         return {}
 
-    status_map: Dict[str, str] = {}
-    target_emails_set = set(attendee_emails) if attendee_emails is not None else None
-
-    for attendee in attendees:
-        email = attendee.get('email')
-        status = attendee.get('responseStatus')
-        if not email or not status:
-            continue # Skip attendees without email or status
-
-        # If specific emails were requested, check if this attendee is one of them
-        if target_emails_set is not None:
-            if email in target_emails_set:
-                status_map[email] = status
-        else:
-            # Otherwise, include all attendees
-            status_map[email] = status
+    status_map = _extract_attendee_statuses(event, attendee_emails)
 
     logger.info(f"Attendee statuses retrieved for event '{event_id}': {len(status_map)} attendees found.")
     return status_map
@@ -768,17 +1004,8 @@ def find_availability(
         logger.warning("find_availability called with empty calendar_ids list.")
         return {}
 
-    # Ensure time_min and time_max are in RFC3339 format
-    # Add 'Z' for UTC if timezone is naive, otherwise format appropriately
-    time_min_str = time_min.isoformat() + ('Z' if time_min.tzinfo is None else '')
-    time_max_str = time_max.isoformat() + ('Z' if time_max.tzinfo is None else '')
-
-    request_body = {
-        "timeMin": time_min_str,
-        "timeMax": time_max_str,
-        "items": [{"id": cal_id} for cal_id in calendar_ids]
-        # Optional: Add groupExpansionMax, calendarExpansionMax if needed
-    }
+    request_body = _build_freebusy_body(time_min, time_max, calendar_ids)
+    time_min_str, time_max_str = request_body['timeMin'], request_body['timeMax']
 
     logger.info(f"Querying free/busy information for calendars: {calendar_ids} between {time_min_str} and {time_max_str}")
     logger.debug(f"Free/busy request body: {request_body}")
@@ -788,25 +1015,7 @@ def find_availability(
         logger.debug(f"Free/busy raw response: {freebusy_result}")
 
         # Process the response into a more usable format
-        processed_results: Dict[str, Dict[str, Any]] = {}
-        calendars_data = freebusy_result.get('calendars', {})
-
-        for cal_id, data in calendars_data.items():
-            busy_intervals = []
-            for interval in data.get('busy', []):
-                try:
-                    # Parse RFC3339 strings back to datetime objects
-                    start_dt = parser.isoparse(interval.get('start'))
-                    end_dt = parser.isoparse(interval.get('end'))
-                    busy_intervals.append({'start': start_dt, 'end': end_dt})
-                except (TypeError, ValueError) as parse_error:
-                    logger.warning(f"Could not parse busy interval for {cal_id}: {interval}. Error: {parse_error}")
-                    # Optionally add this interval with raw strings or skip it
-
-            processed_results[cal_id] = {
-                'busy': busy_intervals,
-                'errors': data.get('errors', []) # Keep API errors as is
-            }
+        processed_results = _process_freebusy_result(freebusy_result)
 
         logger.info(f"Successfully retrieved free/busy information for {len(processed_results)} calendars.")
         return processed_results
@@ -897,8 +1106,8 @@ def _find_first_available_slot(
              logger.warning(f"Could not normalize busy interval {interval} to UTC: {busy_tz_err}")
              # Skip this interval or handle error appropriately
 
-    # Sort busy intervals (important for gap logic)
-    busy_intervals_utc.sort(key=lambda x: x['start'])
+    # Index busy intervals so each candidate slot is checked in O(log n) instead of a full scan
+    busy_index = IntervalIndex((busy['start'], busy['end'], busy) for busy in busy_intervals_utc)
 
     # --- Refactored Slot Finding Logic ---
     current_search_time = effective_start
@@ -931,19 +1140,14 @@ def _find_first_available_slot(
             break # Stop searching
 
         # Check for overlap with any busy interval
-        overlap_found = False
-        for busy in busy_intervals_utc:
-            # Check if the potential slot overlaps with this busy interval
-            # Overlap definition: (SlotStart < BusyEnd) and (SlotEnd > BusyStart)
-            if current_search_time < busy['end'] and potential_end_time > busy['start']:
-                # Overlap found. Move search time to the end of this busy interval.
-                logger.debug(f"Potential slot {current_search_time} - {potential_end_time} overlaps with busy {busy['start']} - {busy['end']}. Jumping search time.")
-                current_search_time = busy['end']
-                overlap_found = True
-                break # Break inner loop, restart outer while loop check
-        
-        if overlap_found:
-            continue # Restart the while loop with the adjusted current_search_time
+        # Overlap definition: (SlotStart < BusyEnd) and (SlotEnd > BusyStart)
+        busy_until = busy_index.latest_end_overlapping(current_search_time, potential_end_time)
+        if busy_until is not None:
+            # Every slot starting before the end of an overlapping busy interval still overlaps it,
+            # so jump past the latest-ending one and restart the while loop check.
+            logger.debug(f"Potential slot {current_search_time} - {potential_end_time} overlaps busy time until {busy_until}. Jumping search time.")
+            current_search_time = busy_until
+            continue
 
         # If we reach here, the slot [current_search_time, potential_end_time] is free
         # Check working hours
@@ -963,6 +1167,68 @@ def _find_first_available_slot(
     logger.info("No suitable available slot found within the time window.")
     return None
 
+def _select_mutual_slot(
+    availability_data: Dict[str, Dict[str, Any]],
+    time_min: datetime,
+    time_max: datetime,
+    duration_minutes: int,
+    working_hours_start: Optional[time] = None,
+    working_hours_end: Optional[time] = None,
+) -> Optional[Tuple[datetime, datetime]]:
+    """Merges the busy intervals of all calendars and returns the first free slot, if any."""
+    all_busy_intervals: List[Dict[str, datetime]] = []
+    for cal_id, data in availability_data.items():
+        if data.get('errors'):
+            logger.warning(f"Encountered errors fetching availability for {cal_id}: {data['errors']}")
+            # Decide how to handle errors: fail, proceed without this calendar, etc.
+            # For now, let's log a warning and proceed, potentially scheduling over their busy time.
+            # A stricter approach would be to return None here.
+        all_busy_intervals.extend(data.get('busy', []))
+
+    merged_busy = _merge_intervals(all_busy_intervals)
+    logger.debug(f"Merged busy intervals: {merged_busy}")
+
+    duration = timedelta(minutes=duration_minutes)
+    return _find_first_available_slot(
+        time_min=time_min,
+        time_max=time_max,
+        duration=duration,
+        busy_intervals=merged_busy,
+        working_hours_start=working_hours_start,
+        working_hours_end=working_hours_end
+    )
+
+def _build_mutual_event_data(
+    event_details: EventCreateRequest,
+    slot_start: datetime,
+    slot_end: datetime,
+    attendee_calendar_ids: List[str],
+) -> EventCreateRequest:
+    """Returns a copy of event_details scheduled at the slot, with all attendees included."""
+    # Create a copy to avoid modifying the original input
+    final_event_data = event_details.copy(deep=True)
+
+    final_event_data.start = EventDateTime(dateTime=slot_start)
+    final_event_data.end = EventDateTime(dateTime=slot_end)
+
+    # Ensure all required attendees are in the event data
+    existing_attendees = set(final_event_data.attendees) if final_event_data.attendees else set()
+    for email in attendee_calendar_ids:
+        # Skip adding 'primary' as an attendee email
+        if email == 'primary':
+            continue
+
+        if email not in existing_attendees:
+            if final_event_data.attendees is None:
+                final_event_data.attendees = []
+            # Assuming EventCreateRequest uses a simple list of emails for input
+            # If it expects EventAttendee models, adjust accordingly.
+            # Based on create_event, it expects a list of emails which it converts.
+            final_event_data.attendees.append(email)
+            existing_attendees.add(email) # Keep track
+
+    return final_event_data
+
 def find_mutual_availability_and_schedule(
     credentials: Credentials,
     attendee_calendar_ids: List[str],
@@ -1014,26 +1280,12 @@ def find_mutual_availability_and_schedule(
         logger.error("Failed to retrieve availability data.")
         return None
 
-    # 2. Aggregate and merge all busy intervals
-    all_busy_intervals: List[Dict[str, datetime]] = []
-    for cal_id, data in availability_data.items():
-        if data.get('errors'):
-            logger.warning(f"Encountered errors fetching availability for {cal_id}: {data['errors']}")
-            # Decide how to handle errors: fail, proceed without this calendar, etc.
-            # For now, let's log a warning and proceed, potentially scheduling over their busy time.
-            # A stricter approach would be to return None here.
-        all_busy_intervals.extend(data.get('busy', []))
-
-    merged_busy = _merge_intervals(all_busy_intervals)
-    logger.debug(f"Merged busy intervals: {merged_busy}")
-
-    # 3. Find the first available slot
-    duration = timedelta(minutes=duration_minutes)
-    available_slot = _find_first_available_slot(
+    # 2. Aggregate and merge all busy intervals, then find the first available slot
+    available_slot = _select_mutual_slot(
+        availability_data=availability_data,
         time_min=time_min,
         time_max=time_max,
-        duration=duration,
-        busy_intervals=merged_busy,
+        duration_minutes=duration_minutes,
         working_hours_start=working_hours_start,
         working_hours_end=working_hours_end
     )
@@ -1045,32 +1297,11 @@ def find_mutual_availability_and_schedule(
     slot_start, slot_end = available_slot
     logger.info(f"Found available slot: {slot_start} - {slot_end}")
 
-    # 4. Prepare full event data
-    # Create a copy to avoid modifying the original input
-    final_event_data = event_details.copy(deep=True)
-
-    final_event_data.start = EventDateTime(dateTime=slot_start)
-    final_event_data.end = EventDateTime(dateTime=slot_end)
-
-    # Ensure all required attendees are in the event data
-    existing_attendees = {att.email for att in final_event_data.attendees} if final_event_data.attendees else set()
-    for email in attendee_calendar_ids:
-        # Skip adding 'primary' as an attendee email
-        if email == 'primary': 
-            continue
-            
-        if email not in existing_attendees:
-            if final_event_data.attendees is None:
-                final_event_data.attendees = []
-            # Assuming EventCreateRequest uses a simple list of emails for input
-            # If it expects EventAttendee models, adjust accordingly.
-            # Based on create_event, it expects a list of emails which it converts.
-            final_event_data.attendees.append(email)
-            existing_attendees.add(email) # Keep track
-
+    # 3. Prepare full event data
+    final_event_data = _build_mutual_event_data(event_details, slot_start, slot_end, attendee_calendar_ids)
     logger.debug(f"Final event data for creation: {final_event_data.dict(by_alias=True)}")
 
-    # 5. Create the event
+    # 4. Create the event
     created_event = create_event(
         credentials=credentials,
         event_data=final_event_data,
@@ -1092,7 +1323,8 @@ def get_projected_recurring_events(
     time_min: datetime,
     time_max: datetime,
     calendar_id: str = 'primary',
-    event_query: Optional[str] = None
+    event_query: Optional[str] = None,
+    use_mirror: bool = False
 ) -> List[ProjectedEventOccurrence]:
     """Wrapper function to find recurring events and project their occurrences.
 
@@ -1104,6 +1336,7 @@ def get_projected_recurring_events(
         time_max: End of the projection window (timezone-aware recommended).
         calendar_id: The calendar to search within.
         event_query: Optional text query to filter master recurring events (e.g., "Birthday").
+        use_mirror: Read master events from the calendar's local mirror.
 
     Returns:
         A list of ProjectedEventOccurrence objects representing calculated occurrences.
@@ -1115,7 +1348,8 @@ def get_projected_recurring_events(
         time_min=time_min,
         time_max=time_max,
         calendar_id=calendar_id,
-        event_query=event_query
+        event_query=event_query,
+        use_mirror=use_mirror
     )
 
 def get_busyness_analysis(
@@ -1123,8 +1357,12 @@ def get_busyness_analysis(
     time_min: datetime,
     time_max: datetime,
     calendar_id: str = 'primary',
-) -> Optional[Dict[date, Dict[str, Any]]]:
-    """Wrapper function to analyze daily event busyness.
+    use_mirror: bool = False,
+    bucket: str = 'day',
+    time_zone: Optional[str] = None,
+    calendar_ids: Optional[List[str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """Wrapper function to analyze event busyness per day, hour of day or weekday.
 
     This calls the core logic in the analysis module.
 
@@ -1133,20 +1371,33 @@ def get_busyness_analysis(
         time_min: Start of the analysis window (timezone-aware recommended).
         time_max: End of the analysis window (timezone-aware recommended).
         calendar_id: The calendar to analyze.
+        use_mirror: Read events from the calendar's local mirror.
+        bucket: 'day', 'hour' (hour-of-day profile) or 'weekday' (weekday profile).
+        time_zone: IANA time zone defining day and hour boundaries (default: the first calendar's).
+        calendar_ids: Calendars to analyze together, instead of calendar_id.
 
     Returns:
-        A dictionary mapping each date to its busyness stats, or None on error.
+        The analysis report (bucket totals, time zone, per-calendar pages/events and errors;
+        see analysis.analyze_busyness), or None on error or if no calendar could be read.
     """
     logger.info(f"Action: get_busyness_analysis called for calendar '{calendar_id}'")
     # Directly call the analysis function
     # Add error handling if analyze_busyness itself can raise specific exceptions
     try:
-        return analyze_busyness(
+        report = analyze_busyness(
             credentials=credentials,
             time_min=time_min,
             time_max=time_max,
             calendar_id=calendar_id,
+            use_mirror=use_mirror,
+            bucket=bucket,
+            time_zone=time_zone,
+            calendar_ids=calendar_ids,
         )
+        if not report['calendars']:
+            logger.error(f"Busyness analysis failed for every calendar: {report['errors']}")
+            return None
+        return report
     except Exception as e:
         # Log the specific error from the analysis function
         logger.error(f"Error during busyness analysis execution: {e}", exc_info=True)
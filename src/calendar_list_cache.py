@@ -0,0 +1,294 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from typing import Optional, List, Dict, Any
+
+from googleapiclient.errors import HttpError
+from google.oauth2.credentials import Credentials
+
+from .models import CalendarListResponse, CalendarListEntry
+from .google_services import get_service
+from .async_google_client import get_async_client
+
+logger = logging.getLogger(__name__)
+
+# --- Calendar List Cache ---
+# The calendar list changes rarely but is read constantly (GET /calendars, multi-calendar
+# search). One CalendarListCache per credentials holds the whole list, hidden entries included,
+# and is refreshed incrementally with calendarList().list(syncToken=...). A 410 Gone (expired
+# token) falls back to a full refresh.
+#
+# Reads never wait for a refresh once the cache has been filled. When the cache is older than
+# CALENDAR_LIST_TTL, the cached list is served and a refresh starts in the background. Only the
+# first read and the first read after invalidate() (called by create_calendar) refresh
+# inline. min_access_role is applied locally, because the API does not allow it with a syncToken.
+#
+# Configuration (environment variables):
+#   CALENDAR_LIST_TTL: Seconds before a read triggers a background refresh (default 300).
+
+CALENDAR_LIST_TTL = float(os.getenv('CALENDAR_LIST_TTL', 300))
+
+_ACCESS_ROLE_RANK = {'freeBusyReader': 0, 'reader': 1, 'writer': 2, 'owner': 3}
+
+
+class CalendarListCache:
+    """The user's calendar list, kept current with incremental syncToken refreshes."""
+
+    def __init__(self):
+        self.sync_token: Optional[str] = None
+        self.last_refreshed: Optional[float] = None # time.monotonic() of the last successful refresh
+        self.invalidated = False
+        self.invalidations = 0 # Bumped by invalidate(); a refresh only clears what it started after
+        self.full_refreshes = 0
+        self.incremental_refreshes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, CalendarListEntry] = {}
+        self._lock = threading.Lock() # Guards the cache state
+        self._refresh_lock = threading.Lock() # Serializes refresh() calls
+        self._async_refresh_lock: Optional[asyncio.Lock] = None # Serializes async_refresh() calls
+        self._refreshing = False # A background refresh is scheduled or running
+
+    # --- Refresh plumbing (shared by the sync and async drivers) ---
+
+    def list_kwargs(self, sync_token: Optional[str], page_token: Optional[str]) -> Dict[str, Any]:
+        """Builds calendarList().list arguments for a full (no token) or incremental refresh page."""
+        kwargs: Dict[str, Any] = {'maxResults': 250}
+        if sync_token:
+            kwargs['syncToken'] = sync_token # Deleted and hidden entries are always included
+        else:
+            kwargs['showHidden'] = True
+        if page_token:
+            kwargs['pageToken'] = page_token
+        return kwargs
+
+    @property
+    def filled(self) -> bool:
+        return self.last_refreshed is not None
+
+    def needs_inline_refresh(self) -> bool:
+        return not self.filled or self.invalidated
+
+    def is_stale(self, ttl: float) -> bool:
+        return self.last_refreshed is None or time.monotonic() - self.last_refreshed >= ttl
+
+    def invalidate(self):
+        """Makes the next read refresh (incrementally) before answering."""
+        with self._lock:
+            self.invalidated = True
+            self.invalidations += 1
+
+    def expire_sync_token(self):
+        """Drops the sync token so the next refresh is a full one (used on 410 Gone)."""
+        with self._lock:
+            self.sync_token = None
+
+    def apply_pages(self, start_token: Optional[str], pages: List[Dict[str, Any]], invalidations: int) -> bool:
+        """Applies the pages of one refresh. A full refresh (start_token None) replaces the list.
+
+        `invalidations` is the counter value when the refresh started; an invalidation that
+        arrived while the refresh was in flight stays pending.
+        Returns False (and applies nothing) if another refresh already advanced the cache.
+        """
+        changed: List[Dict[str, Any]] = [item for page in pages for item in page.get('items', [])]
+        # Validate before taking the lock; deleted entries only need their ID
+        parsed = [(item['id'], None if item.get('deleted') else CalendarListEntry.from_google(item)) for item in changed if item.get('id')]
+        with self._lock:
+            if start_token != self.sync_token:
+                return False
+            if start_token is None:
+                self._entries = {}
+                self.full_refreshes += 1
+            else:
+                self.incremental_refreshes += 1
+            for calendar_id, entry in parsed:
+                if entry is None:
+                    self._entries.pop(calendar_id, None)
+                else:
+                    self._entries[calendar_id] = entry
+            self.sync_token = pages[-1].get('nextSyncToken') if pages else None
+            self.last_refreshed = time.monotonic()
+            if invalidations == self.invalidations:
+                self.invalidated = False
+        logger.info(f"Calendar list {'full' if start_token is None else 'incremental'} refresh applied {len(parsed)} change(s); {len(self._entries)} calendars cached.")
+        return True
+
+    def async_lock(self) -> asyncio.Lock:
+        if self._async_refresh_lock is None:
+            self._async_refresh_lock = asyncio.Lock()
+        return self._async_refresh_lock
+
+    # --- Reads ---
+
+    def snapshot(self, min_access_role: Optional[str] = None, show_hidden: bool = False) -> CalendarListResponse:
+        """Returns the cached list as a calendarList().list response, filtered like the API would."""
+        min_rank = _ACCESS_ROLE_RANK.get(min_access_role, 0) if min_access_role else None
+        with self._lock:
+            entries = list(self._entries.values())
+        items = [
+            entry for entry in entries
+            if (show_hidden or not entry.hidden)
+            and (min_rank is None or _ACCESS_ROLE_RANK.get(entry.accessRole, -1) >= min_rank)
+        ]
+        return CalendarListResponse(items=items)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'calendars': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total) if total else 0.0,
+                'full_refreshes': self.full_refreshes,
+                'incremental_refreshes': self.incremental_refreshes,
+                'seconds_since_refresh': round(time.monotonic() - self.last_refreshed, 1) if self.last_refreshed is not None else None,
+            }
+
+
+# --- Cache Registry ---
+
+_caches: "weakref.WeakKeyDictionary[Credentials, CalendarListCache]" = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def get_cache(credentials: Credentials) -> CalendarListCache:
+    with _caches_lock:
+        cache = _caches.get(credentials)
+        if cache is None:
+            cache = CalendarListCache()
+            _caches[credentials] = cache
+        return cache
+
+
+def invalidate(credentials: Credentials):
+    """Invalidates the calendar list cache of these credentials (e.g., after creating a calendar)."""
+    get_cache(credentials).invalidate()
+
+
+def get_cache_stats() -> List[Dict[str, Any]]:
+    """Returns per-credentials cache statistics (for /health)."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return [cache.stats() for cache in caches]
+
+
+# --- Refresh Drivers ---
+
+def refresh(credentials: Credentials, cache: CalendarListCache) -> CalendarListCache:
+    """Brings the cache up to date (full refresh the first time, incremental afterwards).
+
+    Raises:
+        googleapiclient.errors.HttpError: If the refresh fails (other than an expired token).
+    """
+    service = get_service('calendar', 'v3', credentials)
+    with cache._refresh_lock:
+        while True:
+            start_token, invalidations = cache.sync_token, cache.invalidations
+            try:
+                pages, page_token = [], None
+                while True:
+                    page = service.calendarList().list(**cache.list_kwargs(start_token, page_token)).execute()
+                    pages.append(page)
+                    page_token = page.get('nextPageToken')
+                    if not page_token:
+                        break
+            except HttpError as error:
+                if error.resp.status == 410 and start_token is not None:
+                    logger.warning("Calendar list sync token expired (410). Running a full refresh.")
+                    cache.expire_sync_token()
+                    continue
+                raise
+            cache.apply_pages(start_token, pages, invalidations)
+            return cache
+
+
+async def async_refresh(credentials: Credentials, cache: CalendarListCache) -> CalendarListCache:
+    """Async version of refresh."""
+    service = get_service('calendar', 'v3', credentials)
+    client = get_async_client(credentials)
+    async with cache.async_lock():
+        while True:
+            start_token, invalidations = cache.sync_token, cache.invalidations
+            try:
+                pages, page_token = [], None
+                while True:
+                    page = await client.execute(service.calendarList().list(**cache.list_kwargs(start_token, page_token)))
+                    pages.append(page)
+                    page_token = page.get('nextPageToken')
+                    if not page_token:
+                        break
+            except HttpError as error:
+                if error.resp.status == 410 and start_token is not None:
+                    logger.warning("Calendar list sync token expired (410). Running a full refresh.")
+                    cache.expire_sync_token()
+                    continue
+                raise
+            cache.apply_pages(start_token, pages, invalidations)
+            return cache
+
+
+def get_calendar_list(
+    credentials: Credentials,
+    min_access_role: Optional[str] = None,
+    ttl: float = CALENDAR_LIST_TTL
+) -> CalendarListResponse:
+    """Returns the calendar list from the cache; see the module notes for when it refreshes.
+
+    Raises:
+        googleapiclient.errors.HttpError: If an inline refresh fails.
+    """
+    cache = get_cache(credentials)
+    if cache.needs_inline_refresh():
+        cache.misses += 1
+        refresh(credentials, cache)
+    else:
+        cache.hits += 1
+        if cache.is_stale(ttl) and not cache._refreshing:
+            cache._refreshing = True
+
+            def background_refresh():
+                try:
+                    refresh(credentials, cache)
+                except Exception as e:
+                    logger.warning(f"Background calendar list refresh failed: {e}")
+                finally:
+                    cache._refreshing = False
+
+            threading.Thread(target=background_refresh, name='calendar-list-refresh', daemon=True).start()
+    return cache.snapshot(min_access_role)
+
+
+_background_tasks: set = set() # Keeps background refresh tasks referenced until they finish
+
+
+async def async_get_calendar_list(
+    credentials: Credentials,
+    min_access_role: Optional[str] = None,
+    ttl: float = CALENDAR_LIST_TTL
+) -> CalendarListResponse:
+    """Async version of get_calendar_list (background refreshes run as event loop tasks)."""
+    cache = get_cache(credentials)
+    if cache.needs_inline_refresh():
+        cache.misses += 1
+        await async_refresh(credentials, cache)
+    else:
+        cache.hits += 1
+        if cache.is_stale(ttl) and not cache._refreshing:
+            cache._refreshing = True
+
+            async def background_refresh():
+                try:
+                    await async_refresh(credentials, cache)
+                except Exception as e:
+                    logger.warning(f"Background calendar list refresh failed: {e}")
+                finally:
+                    cache._refreshing = False
+
+            task = asyncio.get_running_loop().create_task(background_refresh())
+            _background_tasks.add(task)
+            task.add_done_callback(_background_tasks.discard)
+    return cache.snapshot(min_access_role)
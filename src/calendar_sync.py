@@ -0,0 +1,617 @@
+import asyncio
+import base64
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from datetime import datetime, date, timezone, tzinfo
+from typing import Optional, List, Dict, Any, Tuple, Callable, Iterator
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil import parser as date_parser
+from googleapiclient.errors import HttpError
+from google.oauth2.credentials import Credentials
+
+from .models import EventsResponse
+from .google_services import get_service
+from .event_store import EventStore, EventRow, PageKey, get_event_store
+from .interval_index import IntervalIndex
+from . import field_masks
+from . import text_search
+from .text_search import TextIndex
+from .async_google_client import get_async_client
+
+logger = logging.getLogger(__name__)
+
+# --- Incremental Calendar Sync ---
+# A CalendarMirror keeps a local copy of one calendar's events and keeps it current with
+# events().list(syncToken=...): after the initial full download, each sync only transfers the
+# events that changed since the previous one (usually nothing). Reads with use_mirror=True in
+# find_events, analyze_busyness and project_recurring_events filter the mirror locally instead
+# of re-downloading the window from Google.
+#
+# There is one mirror per (credentials, calendar_id, single_events): expanded instances serve
+# find_events/analyze_busyness and master events serve recurring projections. Mirrors always
+# sync with showDeleted=True; cancelled events are kept as tombstones so showDeleted reads work,
+# and are filtered out otherwise. A 410 Gone (expired sync token) triggers a full resync.
+#
+# When the event store is enabled (EVENT_STORE_PATH, opt-in; see event_store), a mirror keeps its events
+# and sync token in SQLite instead of memory and answers window queries from its indexes. A
+# mirror created after a restart resumes from the stored sync token. In-memory mirrors answer
+# window queries from an IntervalIndex, rebuilt on the first read after a sync changed events.
+#
+# Text queries (`query`) are answered from a full-text index over the mirrored events (see
+# text_search): the store's FTS5 table, or a TextIndex for in-memory mirrors, rebuilt lazily
+# like the IntervalIndex. Repeated searches therefore never go to Google.
+#
+# Configuration (environment variables):
+#   CALENDAR_SYNC_MAX_STALENESS: Seconds a mirror may go without an incremental sync before
+#                                a read syncs it again (default 30; 0 syncs on every read).
+
+SYNC_MAX_STALENESS_SECONDS = float(os.getenv('CALENDAR_SYNC_MAX_STALENESS', 30))
+SYNC_PAGE_SIZE = 2500 # API maximum
+MIRROR_PAGE_TOKEN_PREFIX = 'mirror:'
+STORE_PAGE_MIN_FETCH = 100 # Rows per event store query while filling a page filtered in Python
+
+_MIN_TIME = datetime.min.replace(tzinfo=timezone.utc)
+_MAX_TIME = datetime.max.replace(tzinfo=timezone.utc)
+
+# Calendar-level fields of events().list responses, carried over to mirror reads
+_CALENDAR_METADATA_FIELDS = ('summary', 'description', 'timeZone', 'accessRole', 'defaultReminders')
+
+
+def _to_aware(value: datetime) -> datetime:
+    """Treats naive datetimes as UTC, matching how find_events formats them for the API."""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _parse_event_time(value: Optional[Dict[str, Any]], default_tz: tzinfo) -> Optional[datetime]:
+    """Parses an event start/end ({'dateTime': ...} or {'date': ...}) into an aware datetime."""
+    if not value:
+        return None
+    if value.get('dateTime'):
+        return _to_aware(date_parser.isoparse(value['dateTime']))
+    if value.get('date'):
+        day = date.fromisoformat(value['date'])
+        # All-day events are bounded by midnight in the event's (or calendar's) time zone
+        tz = default_tz
+        if value.get('timeZone'):
+            try:
+                tz = ZoneInfo(value['timeZone'])
+            except ZoneInfoNotFoundError:
+                pass
+        return datetime(day.year, day.month, day.day, tzinfo=tz)
+    return None
+
+
+def resolve_time_zone(name: Optional[str]) -> tzinfo:
+    """Returns the named IANA time zone, or UTC if it is missing or unknown."""
+    if name:
+        try:
+            return ZoneInfo(name)
+        except ZoneInfoNotFoundError:
+            logger.warning(f"Unknown time zone '{name}'; using UTC.")
+    return timezone.utc
+
+
+class InvalidPageTokenError(ValueError):
+    """Raised when a mirror read gets a page token that is malformed or not from a mirror read."""
+
+
+def _page_order(order_by_updated: bool) -> str:
+    return 'updated' if order_by_updated else 'start'
+
+
+def mirror_page_token(key: PageKey, order_by_updated: bool) -> str:
+    """Returns the 'mirror:...' page token of the page after the event with this key."""
+    document = json.dumps([_page_order(order_by_updated), *key], separators=(',', ':'))
+    return MIRROR_PAGE_TOKEN_PREFIX + base64.urlsafe_b64encode(document.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def parse_mirror_page_token(page_token: str, order_by_updated: bool = False) -> PageKey:
+    """Returns the key of the last event before the page a mirror page token points at.
+
+    Raises:
+        InvalidPageTokenError: If the token is not a mirror token (e.g., a Google page token),
+            is malformed, or was issued for the other ordering.
+    """
+    if not page_token.startswith(MIRROR_PAGE_TOKEN_PREFIX):
+        raise InvalidPageTokenError("Not a mirror page token; with use_mirror, pass the nextPageToken of a use_mirror response.")
+    encoded = page_token[len(MIRROR_PAGE_TOKEN_PREFIX):]
+    try:
+        order, value, event_id = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+    except (ValueError, TypeError) as e:
+        raise InvalidPageTokenError(f"Malformed mirror page token '{page_token}'.") from e
+    value_type = str if order_by_updated else (int, float)
+    if order != _page_order(order_by_updated):
+        raise InvalidPageTokenError("Mirror page token belongs to a query with a different orderBy.")
+    if not (isinstance(event_id, str) and event_id and (value is None or (isinstance(value, value_type) and not isinstance(value, bool)))):
+        raise InvalidPageTokenError(f"Malformed mirror page token '{page_token}'.")
+    return (value if order_by_updated or value is None else float(value), event_id)
+
+
+def _sort_key(key: PageKey) -> Tuple[Any, ...]:
+    """Orders page keys like SQLite does: a missing start/updated sorts first."""
+    value, event_id = key
+    return (0, '', event_id) if value is None else (1, value, event_id)
+
+
+def _extended_property_matches(event: Dict[str, Any], scope: str, selector: str) -> bool:
+    properties = (event.get('extendedProperties') or {}).get(scope) or {}
+    key, _, value = selector.partition('=')
+    if key not in properties:
+        return False
+    return not value or properties[key] == value
+
+
+def _row_filter(
+    lower: Optional[datetime],
+    upper: Optional[datetime],
+    showDeleted: bool = False,
+    iCalUID: Optional[str] = None,
+    eventTypes: Optional[List[str]] = None,
+    sharedExtendedProperty: Optional[str] = None,
+    privateExtendedProperty: Optional[str] = None
+) -> Callable[[EventRow], bool]:
+    """Returns a predicate applying find_events-style filters to (event, start, end) rows."""
+    def matches(row: EventRow) -> bool:
+        event, start, end = row
+        if not showDeleted and event.get('status') == 'cancelled':
+            return False
+        if lower and (end is None or end <= lower):
+            return False
+        if upper and (start is None or start >= upper):
+            return False
+        if iCalUID and event.get('iCalUID') != iCalUID:
+            return False
+        if eventTypes and event.get('eventType', 'default') not in eventTypes:
+            return False
+        if sharedExtendedProperty and not _extended_property_matches(event, 'shared', sharedExtendedProperty):
+            return False
+        if privateExtendedProperty and not _extended_property_matches(event, 'private', privateExtendedProperty):
+            return False
+        return True
+    return matches
+
+
+class CalendarMirror:
+    """Local copy of one calendar's events, kept current with incremental syncToken syncs."""
+
+    def __init__(self, calendar_id: str, single_events: bool = True, store: Optional[EventStore] = None):
+        self.calendar_id = calendar_id
+        self.single_events = single_events
+        self.store = store # Persistent backend; events are kept in memory when None
+        self.sync_token: Optional[str] = None
+        self.last_synced: Optional[float] = None # time.monotonic() of the last successful sync
+        self.full_syncs = 0
+        self.incremental_syncs = 0
+        self.resyncs = 0 # Full resyncs forced by 410 Gone
+        self._events: Dict[str, Dict[str, Any]] = {}
+        self._bounds: Dict[str, Tuple[Optional[datetime], Optional[datetime]]] = {}
+        self._metadata: Dict[str, Any] = {}
+        self._index: Optional[IntervalIndex] = None # Window index over _events; None when stale
+        self._text_index: Optional[TextIndex] = None # Text index over _events; None when stale
+        self._lock = threading.Lock() # Guards the mirror state
+        self._sync_lock = threading.Lock() # Serializes sync_mirror() calls
+        self._async_sync_lock: Optional[asyncio.Lock] = None # Serializes async_sync_mirror() calls
+        if store is not None:
+            self.sync_token, self._metadata = store.load_state(calendar_id, single_events)
+            if self.sync_token:
+                logger.info(f"Mirror '{calendar_id}' (single_events={single_events}) resumed from the event store.")
+
+    # --- Sync plumbing (shared by the sync and async drivers) ---
+
+    def list_kwargs(self, sync_token: Optional[str], page_token: Optional[str]) -> Dict[str, Any]:
+        """Builds events().list arguments for a full (no token) or incremental sync page."""
+        kwargs: Dict[str, Any] = {
+            'calendarId': self.calendar_id,
+            'maxResults': SYNC_PAGE_SIZE,
+            'singleEvents': self.single_events,
+            'showDeleted': True,
+        }
+        if sync_token:
+            kwargs['syncToken'] = sync_token
+        if page_token:
+            kwargs['pageToken'] = page_token
+        return kwargs
+
+    def is_stale(self, max_staleness: float) -> bool:
+        return self.last_synced is None or time.monotonic() - self.last_synced >= max_staleness
+
+    def mark_stale(self):
+        """Makes the next read sync first (used when a push notification reports a change)."""
+        with self._lock:
+            self.last_synced = None
+
+    def invalidate(self):
+        """Drops the sync token so the next sync is a full one (used on 410 Gone)."""
+        with self._lock:
+            self.sync_token = None
+            self.resyncs += 1
+
+    def apply_pages(self, start_token: Optional[str], pages: List[Dict[str, Any]]) -> bool:
+        """Applies the pages of one sync run. A full sync (start_token None) replaces the mirror.
+
+        Returns False (and applies nothing) if another sync already advanced the mirror past
+        start_token while this one was in flight.
+        """
+        next_sync_token = pages[-1].get('nextSyncToken') if pages else None
+        changes: Dict[str, Dict[str, Any]] = {}
+        for page in pages:
+            for item in page.get('items', []):
+                if item.get('id'):
+                    changes[item['id']] = {**changes.get(item['id'], {}), **item} if item.get('status') == 'cancelled' else item
+
+        with self._lock:
+            if start_token != self.sync_token:
+                logger.debug(f"Mirror '{self.calendar_id}' was synced concurrently; discarding this run.")
+                return False
+            self._metadata.update({field: pages[0][field] for field in _CALENDAR_METADATA_FIELDS if field in pages[0]})
+            default_tz = self.calendar_tz()
+
+            if start_token is not None:
+                # Deltas for deleted events may carry only id/status; keep the known fields
+                cancelled_ids = [event_id for event_id, item in changes.items() if item.get('status') == 'cancelled']
+                if self.store is not None:
+                    previous = self.store.get_events(self.calendar_id, self.single_events, cancelled_ids)
+                else:
+                    previous = {event_id: self._events[event_id] for event_id in cancelled_ids if event_id in self._events}
+                for event_id, known in previous.items():
+                    changes[event_id] = {**known, **changes[event_id]}
+
+            rows = []
+            for item in changes.values():
+                try:
+                    bounds = (_parse_event_time(item.get('start'), default_tz), _parse_event_time(item.get('end'), default_tz))
+                except (ValueError, TypeError):
+                    bounds = (None, None)
+                rows.append((item, *bounds))
+
+            if self.store is not None:
+                self.store.apply_sync(
+                    self.calendar_id, self.single_events, rows, next_sync_token, self._metadata, replace=start_token is None
+                )
+            else:
+                if start_token is None:
+                    self._events, self._bounds = {}, {}
+                for item, start, end in rows:
+                    self._events[item['id']] = item
+                    self._bounds[item['id']] = (start, end)
+                if rows or start_token is None:
+                    self._index = None
+                    self._text_index = None
+            if start_token is None:
+                self.full_syncs += 1
+            else:
+                self.incremental_syncs += 1
+            self.sync_token = next_sync_token
+            self.last_synced = time.monotonic()
+        logger.info(
+            f"Mirror '{self.calendar_id}' (single_events={self.single_events}) "
+            f"{'full' if start_token is None else 'incremental'} sync applied {len(rows)} change(s)."
+        )
+        return True
+
+    def _window_index(self) -> IntervalIndex:
+        """Returns the index over the mirrored events with known bounds (caller holds self._lock)."""
+        if self._index is None:
+            self._index = IntervalIndex(
+                (start, end, (self._events[event_id], start, end))
+                for event_id, (start, end) in self._bounds.items()
+                if start is not None and end is not None
+            )
+        return self._index
+
+    def _search_index(self) -> TextIndex:
+        """Returns the text index over the mirrored events (caller holds self._lock)."""
+        if self._text_index is None:
+            self._text_index = TextIndex(self._events.items())
+        return self._text_index
+
+    def calendar_tz(self) -> tzinfo:
+        """Returns the calendar's time zone (UTC until the first sync)."""
+        return resolve_time_zone(self._metadata.get('timeZone'))
+
+    def async_lock(self) -> asyncio.Lock:
+        if self._async_sync_lock is None:
+            self._async_sync_lock = asyncio.Lock()
+        return self._async_sync_lock
+
+    # --- Reads ---
+
+    def _memory_candidates(self, lower: Optional[datetime], upper: Optional[datetime], terms: List[Any]) -> List[EventRow]:
+        """Returns the rows of an in-memory mirror that may match a read (filtered by the caller)."""
+        with self._lock:
+            if terms:
+                matched_ids = self._search_index().search(terms)
+                return [(self._events[event_id], *self._bounds.get(event_id, (None, None))) for event_id in matched_ids]
+            if lower is None and upper is None:
+                return [(event, *self._bounds.get(event_id, (None, None))) for event_id, event in self._events.items()]
+            return self._window_index().overlapping(lower or _MIN_TIME, upper or _MAX_TIME)
+
+    def select_events(
+        self,
+        time_min: Optional[datetime] = None,
+        time_max: Optional[datetime] = None,
+        query: Optional[str] = None,
+        order_by: Optional[str] = 'startTime',
+        iCalUID: Optional[str] = None,
+        sharedExtendedProperty: Optional[str] = None,
+        privateExtendedProperty: Optional[str] = None,
+        showDeleted: bool = False,
+        eventTypes: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Returns the mirrored events matching find_events-style filters, as raw API dicts.
+
+        Like the API, time_min bounds the event end (exclusive) and time_max bounds the event
+        start (exclusive). `query` is a full-text query over the summary, description, location
+        and people of the event: words, prefixes (`stand*`) and phrases (`"design review"`), all
+        of which must match (see text_search).
+        """
+        lower = _to_aware(time_min) if time_min else None
+        upper = _to_aware(time_max) if time_max else None
+        terms = text_search.parse_query(query)
+        if query and query.strip() and not terms:
+            return [] # Only punctuation: nothing can match
+        if self.store is not None:
+            candidates = self.store.select_events(
+                self.calendar_id, self.single_events, lower, upper, include_cancelled=showDeleted, ical_uid=iCalUID,
+                text_match=text_search.fts_expression(terms) if terms else None
+            )
+        else:
+            candidates = self._memory_candidates(lower, upper, terms)
+
+        matches = _row_filter(lower, upper, showDeleted, iCalUID, eventTypes, sharedExtendedProperty, privateExtendedProperty)
+        selected = [(event, start) for event, start, end in candidates if matches((event, start, end))]
+        if order_by == 'updated':
+            selected.sort(key=lambda pair: pair[0].get('updated') or '')
+        elif order_by == 'startTime' or terms: # Text matches are ranked by time
+            selected.sort(key=lambda pair: pair[1] or _MIN_TIME)
+        return [event for event, _ in selected]
+
+    def _select_page(
+        self,
+        after: Optional[PageKey],
+        limit: int,
+        time_min: Optional[datetime] = None,
+        time_max: Optional[datetime] = None,
+        query: Optional[str] = None,
+        order_by: Optional[str] = 'startTime',
+        iCalUID: Optional[str] = None,
+        sharedExtendedProperty: Optional[str] = None,
+        privateExtendedProperty: Optional[str] = None,
+        showDeleted: bool = False,
+        eventTypes: Optional[List[str]] = None
+    ) -> List[Tuple[Dict[str, Any], PageKey]]:
+        """Returns up to `limit` events matching select_events filters after the key `after`.
+
+        Events are in key order: (start, event ID), or (updated, event ID) when order_by is
+        'updated'. A store-backed mirror pages in SQL (see EventStore.select_page), fetching
+        more rows only when filters applied here (eventTypes, extended properties) drop some.
+        """
+        order_by_updated = order_by == 'updated'
+        lower = _to_aware(time_min) if time_min else None
+        upper = _to_aware(time_max) if time_max else None
+        terms = text_search.parse_query(query)
+        if query and query.strip() and not terms:
+            return [] # Only punctuation: nothing can match
+        matches = _row_filter(lower, upper, showDeleted, iCalUID, eventTypes, sharedExtendedProperty, privateExtendedProperty)
+
+        if self.store is None:
+            def key_of(row: EventRow) -> PageKey:
+                event, start, _ = row
+                return (event.get('updated') if order_by_updated else (start.timestamp() if start else None), event.get('id', ''))
+            keyed = ((row[0], key_of(row)) for row in self._memory_candidates(lower, upper, terms) if matches(row))
+            if after is not None:
+                position = _sort_key(after)
+                keyed = (pair for pair in keyed if _sort_key(pair[1]) > position)
+            return heapq.nsmallest(limit, keyed, key=lambda pair: _sort_key(pair[1]))
+
+        selected: List[Tuple[Dict[str, Any], PageKey]] = []
+        text_match = text_search.fts_expression(terms) if terms else None
+        while len(selected) < limit:
+            fetch = max(limit - len(selected), STORE_PAGE_MIN_FETCH)
+            rows = self.store.select_page(
+                self.calendar_id, self.single_events, lower, upper, include_cancelled=showDeleted, ical_uid=iCalUID,
+                text_match=text_match, order_by_updated=order_by_updated, after=after, limit=fetch
+            )
+            for row, key in rows:
+                after = key
+                if matches(row):
+                    selected.append((row[0], key))
+                    if len(selected) == limit:
+                        break
+            if len(rows) < fetch:
+                break
+        return selected
+
+    def iter_pages(self, page_size: int, **filters) -> Iterator[List[Dict[str, Any]]]:
+        """Yields the events matching select_events filters in pages of up to page_size, in key order.
+
+        A store-backed mirror reads each page with a keyset query after the previous page's last
+        key, so only one page is loaded at a time. An in-memory mirror already holds every event;
+        its matches are selected once and yielded in slices. Accepts the select_events filters
+        as keyword arguments.
+        """
+        if self.store is None:
+            events = self.select_events(**filters)
+            for offset in range(0, len(events), page_size):
+                yield events[offset:offset + page_size]
+            return
+        after = None
+        while True:
+            selected = self._select_page(after, page_size, **filters)
+            if selected:
+                yield [event for event, _ in selected]
+            if len(selected) < page_size:
+                return
+            after = selected[-1][1]
+
+    def query(self, max_results: int = 250, page_token: Optional[str] = None, fields: Optional[str] = None, **filters) -> EventsResponse:
+        """Returns one page of matching events shaped like an events().list response.
+
+        Pages are keyset-paginated: nextPageToken ('mirror:...', see mirror_page_token) carries
+        the key of the page's last event, and the next page starts after it, so a page costs the
+        same however deep it is. Events are ordered by start time, or by last modification when
+        order_by is 'updated'. `fields` is a per-event field mask (see field_masks), applied
+        locally to the page. Accepts the select_events filters as keyword arguments.
+
+        Raises:
+            InvalidPageTokenError: If page_token is malformed or not a mirror page token.
+        """
+        order_by_updated = filters.get('order_by') == 'updated'
+        after = parse_mirror_page_token(page_token, order_by_updated) if page_token else None
+        selected = self._select_page(after, max_results + 1, **filters)
+        page = [field_masks.project(event, fields) for event, _ in selected[:max_results]]
+        with self._lock:
+            metadata = {field: self._metadata[field] for field in _CALENDAR_METADATA_FIELDS if field in self._metadata}
+        return EventsResponse.from_google({
+            **metadata,
+            'items': page,
+            'nextPageToken': mirror_page_token(selected[max_results - 1][1], order_by_updated) if len(selected) > max_results else None,
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        events = self.store.count_events(self.calendar_id, self.single_events) if self.store is not None else len(self._events)
+        with self._lock:
+            return {
+                'calendar_id': self.calendar_id,
+                'single_events': self.single_events,
+                'persistent': self.store is not None,
+                'events': events,
+                'full_syncs': self.full_syncs,
+                'incremental_syncs': self.incremental_syncs,
+                'resyncs': self.resyncs,
+                'seconds_since_sync': round(time.monotonic() - self.last_synced, 1) if self.last_synced is not None else None,
+            }
+
+
+# --- Mirror Registry ---
+
+_mirrors: "weakref.WeakKeyDictionary[Credentials, Dict[Tuple[str, bool], CalendarMirror]]" = weakref.WeakKeyDictionary()
+_mirrors_lock = threading.Lock()
+
+
+def get_mirror(credentials: Credentials, calendar_id: str = 'primary', single_events: bool = True) -> CalendarMirror:
+    """Returns the (possibly not yet synced) mirror for a calendar."""
+    with _mirrors_lock:
+        per_credentials = _mirrors.setdefault(credentials, {})
+        key = (calendar_id, single_events)
+        mirror = per_credentials.get(key)
+        if mirror is None:
+            mirror = CalendarMirror(calendar_id, single_events, store=get_event_store())
+            per_credentials[key] = mirror
+        return mirror
+
+
+def get_calendar_mirrors(calendar_id: str) -> List[Tuple[Credentials, CalendarMirror]]:
+    """Returns every existing mirror of a calendar, with the credentials it syncs with."""
+    with _mirrors_lock:
+        return [
+            (credentials, mirror)
+            for credentials, per_credentials in _mirrors.items()
+            for (mirrored_calendar_id, _), mirror in per_credentials.items()
+            if mirrored_calendar_id == calendar_id
+        ]
+
+
+def get_mirror_stats() -> List[Dict[str, Any]]:
+    """Returns per-mirror sync statistics (for /health)."""
+    with _mirrors_lock:
+        mirrors = [mirror for per_credentials in _mirrors.values() for mirror in per_credentials.values()]
+    return [mirror.stats() for mirror in mirrors]
+
+
+# --- Sync Drivers ---
+
+def sync_mirror(credentials: Credentials, mirror: CalendarMirror, max_staleness: Optional[float] = None) -> CalendarMirror:
+    """Brings a mirror up to date (full sync the first time, incremental afterwards).
+
+    Args:
+        credentials: Valid Google OAuth2 credentials.
+        mirror: The mirror to sync.
+        max_staleness: If set, skip the sync when the mirror was synced within this many
+            seconds (checked after waiting for any sync already in progress).
+
+    Raises:
+        googleapiclient.errors.HttpError: If the sync fails (other than an expired token).
+    """
+    service = get_service('calendar', 'v3', credentials)
+    with mirror._sync_lock:
+        if max_staleness is not None and not mirror.is_stale(max_staleness):
+            return mirror # Synced by a concurrent caller while we waited for the lock
+        while True:
+            start_token = mirror.sync_token
+            try:
+                pages, page_token = [], None
+                while True:
+                    page = service.events().list(**mirror.list_kwargs(start_token, page_token)).execute()
+                    pages.append(page)
+                    page_token = page.get('nextPageToken')
+                    if not page_token:
+                        break
+            except HttpError as error:
+                if error.resp.status == 410 and start_token is not None:
+                    logger.warning(f"Sync token for mirror '{mirror.calendar_id}' expired (410). Running a full resync.")
+                    mirror.invalidate()
+                    continue
+                raise
+            mirror.apply_pages(start_token, pages)
+            return mirror
+
+
+async def async_sync_mirror(credentials: Credentials, mirror: CalendarMirror, max_staleness: Optional[float] = None) -> CalendarMirror:
+    """Async version of sync_mirror."""
+    service = get_service('calendar', 'v3', credentials)
+    client = get_async_client(credentials)
+    async with mirror.async_lock():
+        if max_staleness is not None and not mirror.is_stale(max_staleness):
+            return mirror # Synced by a concurrent caller while we waited for the lock
+        while True:
+            start_token = mirror.sync_token
+            try:
+                pages, page_token = [], None
+                while True:
+                    page = await client.execute(service.events().list(**mirror.list_kwargs(start_token, page_token)))
+                    pages.append(page)
+                    page_token = page.get('nextPageToken')
+                    if not page_token:
+                        break
+            except HttpError as error:
+                if error.resp.status == 410 and start_token is not None:
+                    logger.warning(f"Sync token for mirror '{mirror.calendar_id}' expired (410). Running a full resync.")
+                    mirror.invalidate()
+                    continue
+                raise
+            # Applying a full sync writes every event (SQLite, compression), off the event loop
+            await asyncio.to_thread(mirror.apply_pages, start_token, pages)
+            return mirror
+
+
+def ensure_fresh(
+    credentials: Credentials,
+    calendar_id: str = 'primary',
+    single_events: bool = True,
+    max_staleness: float = SYNC_MAX_STALENESS_SECONDS
+) -> CalendarMirror:
+    """Returns the calendar's mirror, syncing it first if it is older than max_staleness seconds."""
+    mirror = get_mirror(credentials, calendar_id, single_events)
+    if mirror.is_stale(max_staleness):
+        sync_mirror(credentials, mirror, max_staleness)
+    return mirror
+
+
+async def async_ensure_fresh(
+    credentials: Credentials,
+    calendar_id: str = 'primary',
+    single_events: bool = True,
+    max_staleness: float = SYNC_MAX_STALENESS_SECONDS
+) -> CalendarMirror:
+    """Async version of ensure_fresh."""
+    mirror = get_mirror(credentials, calendar_id, single_events)
+    if mirror.is_stale(max_staleness):
+        await async_sync_mirror(credentials, mirror, max_staleness)
+    return mirror
@@ -0,0 +1,184 @@
+import os
+import zlib
+from typing import Optional, List, Tuple
+
+try:
+    import brotli
+except ImportError: # Optional: brotlicffi has the same API; without either only gzip is offered
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+# --- Response Compression ---
+# CompressionMiddleware compresses response bodies with brotli (when installed) or gzip,
+# whichever the client prefers in Accept-Encoding (brotli wins ties). It is a plain ASGI
+# middleware, so it also works for streamed responses:
+#   - A response sent in one body message (regular JSON responses) is compressed only when it
+#     is at least COMPRESSION_MINIMUM_SIZE bytes, and gets an exact Content-Length.
+#   - A streamed response (NDJSON event streams, anything sent in several body messages) is
+#     compressed chunk by chunk, and each chunk is flushed. A client can decode every NDJSON
+#     line as soon as it arrives instead of waiting for the compressor's buffer to fill.
+# Responses that already have a Content-Encoding, and content types that do not compress
+# (anything other than text/*, JSON and XML), are passed through unchanged.
+#
+# Configuration (environment variables):
+#   COMPRESSION_ENABLED: Set to 'false' to disable compression (default true).
+#   COMPRESSION_MINIMUM_SIZE: Smallest single-message body, in bytes, to compress (default 1024).
+#   COMPRESSION_GZIP_LEVEL: gzip level, 1 (fastest) to 9 (smallest) (default 6).
+#   COMPRESSION_BROTLI_QUALITY: brotli quality, 0 to 11 (default 4; higher is much slower).
+
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+COMPRESSION_MINIMUM_SIZE = int(os.getenv('COMPRESSION_MINIMUM_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+
+
+def _compressible(content_type: str) -> bool:
+    content_type = content_type.split(';', 1)[0].strip().lower()
+    return content_type.startswith('text/') or content_type.endswith(('json', 'xml'))
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Picks 'br' or 'gzip' from an Accept-Encoding header, or None for identity."""
+    offered = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip().lower()] = quality
+    candidates = (['br'] if brotli is not None else []) + ['gzip']
+    wildcard = offered.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for encoding in candidates:
+        quality = offered.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _Compressor:
+    """Incremental gzip or brotli compressor with per-chunk flushing."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+            self._gzip = None
+        else:
+            self._brotli = None
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS) # 16+: gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        """Compresses a chunk and flushes it, so the output decodes without later chunks."""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._gzip.compress(data) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b'') -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._gzip.compress(data) + self._gzip.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing large and streamed responses (see the module notes)."""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = ''
+        for name, value in scope.get('headers', []):
+            if name == b'accept-encoding':
+                accept_encoding = value.decode('latin-1')
+                break
+        encoding = negotiate_encoding(accept_encoding) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSender(self, encoding, send))
+
+
+class _CompressingSender:
+    """Wraps the ASGI send callable of one response."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[dict] = None
+        self.mode: Optional[str] = None # None until the first body message: 'identity', 'whole' or 'stream'
+        self.compressor: Optional[_Compressor] = None
+
+    def _compressed_headers(self, length: Optional[int] = None) -> List[Tuple[bytes, bytes]]:
+        headers = [(name, value) for name, value in self.start_message.get('headers', []) if name != b'content-length']
+        headers.append((b'content-encoding', self.encoding.encode('latin-1')))
+        for index, (name, value) in enumerate(headers):
+            if name == b'vary':
+                if b'accept-encoding' not in value.lower():
+                    headers[index] = (name, value + b', Accept-Encoding')
+                break
+        else:
+            headers.append((b'vary', b'Accept-Encoding'))
+        if length is not None:
+            headers.append((b'content-length', str(length).encode('latin-1')))
+        return headers
+
+    def _eligible(self) -> bool:
+        content_type, already_encoded = '', False
+        for name, value in self.start_message.get('headers', []):
+            if name == b'content-type':
+                content_type = value.decode('latin-1')
+            elif name == b'content-encoding':
+                already_encoded = True
+        return not already_encoded and _compressible(content_type)
+
+    async def __call__(self, message: dict):
+        message_type = message['type']
+        if message_type == 'http.response.start':
+            self.start_message = message # Held until the first body message decides the mode
+            return
+        if message_type != 'http.response.body':
+            await self.send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+        if self.mode is None:
+            if not self._eligible() or (not more_body and len(body) < self.middleware.minimum_size):
+                self.mode = 'identity'
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            if not more_body:
+                self.mode = 'whole'
+                compressed = self.compressor.finish(body)
+                await self.send({**self.start_message, 'headers': self._compressed_headers(len(compressed))})
+                await self.send({'type': 'http.response.body', 'body': compressed, 'more_body': False})
+                return
+            self.mode = 'stream'
+            await self.send({**self.start_message, 'headers': self._compressed_headers()})
+        elif self.mode == 'identity':
+            await self.send(message)
+            return
+
+        chunk = self.compressor.compress(body) if more_body else self.compressor.finish(body)
+        await self.send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
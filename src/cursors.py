@@ -0,0 +1,74 @@
+import base64
+import hashlib
+import json
+from typing import Optional, Any
+
+from .calendar_sync import MIRROR_PAGE_TOKEN_PREFIX
+
+# --- Opaque Pagination Cursors ---
+# find_events hands out a `next_cursor` with every page that has a successor. A cursor wraps
+# where the next page starts: Google's nextPageToken for live reads, or the keyset position
+# (the last event's sort key) in the local mirror/event store for use_mirror reads. It also records a fingerprint of the query,
+# so a cursor cannot be replayed against a different calendar, time range or filter (Google
+# rejects such page tokens with an opaque 400; here the client gets a clear one).
+#
+# Cursors are URL-safe base64 of a small JSON document. They are opaque to clients and not
+# signed: tampering can only produce another page of the same query or a 400.
+
+CURSOR_VERSION = 2
+_SOURCE_GOOGLE = 'g'
+_SOURCE_MIRROR = 'm'
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a cursor is malformed or belongs to a different query."""
+
+
+def query_fingerprint(*parts: Any) -> str:
+    """Returns a short, stable fingerprint of the parameters that define a paginated query."""
+    digest = hashlib.sha256(json.dumps(parts, separators=(',', ':'), default=str).encode('utf-8')).hexdigest()
+    return digest[:16]
+
+
+def encode_cursor(next_page_token: Optional[str], fingerprint: str) -> Optional[str]:
+    """Wraps a response's nextPageToken into a cursor (None when there is no next page)."""
+    if not next_page_token:
+        return None
+    if next_page_token.startswith(MIRROR_PAGE_TOKEN_PREFIX):
+        position, source = next_page_token[len(MIRROR_PAGE_TOKEN_PREFIX):], _SOURCE_MIRROR
+    else:
+        position, source = next_page_token, _SOURCE_GOOGLE
+    document = json.dumps({'v': CURSOR_VERSION, 's': source, 'p': position, 'f': fingerprint}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(document.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, fingerprint: str) -> str:
+    """Unwraps a cursor into the page token to pass to find_events.
+
+    Args:
+        cursor: A next_cursor from a previous response.
+        fingerprint: query_fingerprint() of the current request.
+
+    Returns:
+        The Google pageToken, or the mirror page token, the cursor points at.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed, from another version, or for a different query.
+    """
+    try:
+        document = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        version, source, position, cursor_fingerprint = document['v'], document['s'], document['p'], document['f']
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError(f"Malformed cursor: {e}") from e
+    if version != CURSOR_VERSION:
+        raise InvalidCursorError(f"Unsupported cursor version {version}.")
+    if cursor_fingerprint != fingerprint:
+        raise InvalidCursorError("Cursor belongs to a different query; repeat the original parameters or start without a cursor.")
+    if not (isinstance(position, str) and position):
+        raise InvalidCursorError("Malformed cursor position.")
+    if source == _SOURCE_MIRROR:
+        return f"{MIRROR_PAGE_TOKEN_PREFIX}{position}"
+    if source == _SOURCE_GOOGLE:
+        return position
+    raise InvalidCursorError("Malformed cursor source.")
+
@@ -0,0 +1,424 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Tuple, Iterable
+
+from .text_search import fts_fields
+
+logger = logging.getLogger(__name__)
+
+# --- Persistent Event Store ---
+# SQLite storage behind the calendar mirrors (see calendar_sync). A mirror with a store keeps
+# its events and sync token on disk instead of in memory, so after a restart the first read is
+# an incremental sync rather than a full re-download.
+#
+# Each event is stored once per (calendar_id, expanded) partition - expanded instances and
+# master events are kept apart, like the mirrors. The raw event resource is stored as
+# zlib-compressed compact JSON; start/end (UTC epoch seconds), iCalUID, updated and status
+# are kept in indexed columns so window and lookup queries never decode payloads they skip.
+#
+# Time-window queries use the (calendar_id, expanded, start_ts, end_ts) index. Besides
+# start_ts < time_max, they bound start_ts >= time_min - max_span, where max_span is the
+# longest event seen in the partition, so the index range scan covers only the window.
+# Paged reads (select_page) seek that index to the last key of the previous page, on
+# (start_ts, event_id), and LIMIT the scan, so every page costs the same however deep it is.
+#
+# Text queries use an FTS5 table over each event's summary, description, location and people
+# (see text_search), kept in the same transactions as the events: every upsert re-indexes the
+# changed events and full syncs/clears drop the partition's entries. event_text_docs maps the
+# FTS rowids to event keys. The FTS table stores text_search.tokenize() output and splits it on
+# spaces only, so it matches exactly like the in-memory TextIndex. Stores created with schema
+# version 1 (no text index) or 2 (text tokenized by SQLite) are re-indexed on open.
+#
+# Configuration (environment variables):
+#   EVENT_STORE_PATH: SQLite database file, e.g. .calendar-events.sqlite3. Unset or empty (the
+#                     default) keeps mirrors in memory only; the store holds account event data,
+#                     so it is opt-in. The store belongs to the account in TOKEN_FILE_PATH and is
+#                     not keyed by account: use one file per account and delete it when switching.
+
+EVENT_STORE_PATH = os.getenv('EVENT_STORE_PATH', '')
+SCHEMA_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    calendar_id TEXT NOT NULL,
+    expanded INTEGER NOT NULL,
+    event_id TEXT NOT NULL,
+    start_ts REAL,
+    end_ts REAL,
+    ical_uid TEXT,
+    updated TEXT,
+    status TEXT,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (calendar_id, expanded, event_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_events_window ON events (calendar_id, expanded, start_ts, end_ts);
+CREATE INDEX IF NOT EXISTS idx_events_ical_uid ON events (ical_uid);
+CREATE INDEX IF NOT EXISTS idx_events_updated ON events (calendar_id, expanded, updated);
+CREATE TABLE IF NOT EXISTS sync_state (
+    calendar_id TEXT NOT NULL,
+    expanded INTEGER NOT NULL,
+    sync_token TEXT,
+    metadata TEXT,
+    max_span REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (calendar_id, expanded)
+);
+CREATE TABLE IF NOT EXISTS event_text_docs (
+    doc_id INTEGER PRIMARY KEY,
+    calendar_id TEXT NOT NULL,
+    expanded INTEGER NOT NULL,
+    event_id TEXT NOT NULL,
+    UNIQUE (calendar_id, expanded, event_id)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS event_text USING fts5(
+    summary, description, location, people,
+    tokenize='unicode61 remove_diacritics 0', prefix='2 3'
+);
+"""
+
+_DOC_ID = "(SELECT doc_id FROM event_text_docs WHERE calendar_id = ? AND expanded = ? AND event_id = ?)"
+
+# (event resource, start, end) - start/end are aware datetimes, or None when unparseable
+EventRow = Tuple[Dict[str, Any], Optional[datetime], Optional[datetime]]
+# (start_ts or updated, event_id) - the position of an event in a keyset-paginated select_page
+PageKey = Tuple[Optional[Any], str]
+
+
+def _encode_payload(event: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(event, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+
+
+def _decode_payload(payload: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(payload))
+
+
+def _to_timestamp(value: Optional[datetime]) -> Optional[float]:
+    return value.timestamp() if value is not None else None
+
+
+def _from_timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value, tz=timezone.utc) if value is not None else None
+
+
+class EventStore:
+    """SQLite-backed storage for mirrored calendar events and their sync state."""
+
+    def __init__(self, path: str):
+        self.path = path
+        # One connection shared across threads; every use is serialized by self._lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+            if version not in (0, 1, 2, SCHEMA_VERSION):
+                raise RuntimeError(f"Event store {path} has schema version {version}; expected {SCHEMA_VERSION}. Delete the file to rebuild it.")
+            if version == 2:
+                self._conn.execute("DROP TABLE IF EXISTS event_text") # Recreated with the version 3 tokenizer
+            self._conn.executescript(_SCHEMA)
+            if version in (1, 2):
+                self._index_existing_events()
+            self._conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+        logger.info(f"Opened event store at {path}.")
+
+    # --- Writes ---
+
+    def _index_existing_events(self):
+        """Builds the text index of a version 1 or 2 store (called on open, within its transaction)."""
+        cursor = self._conn.execute("SELECT calendar_id, expanded, payload FROM events")
+        indexed = 0
+        while True:
+            batch = cursor.fetchmany(1000)
+            if not batch:
+                break
+            partitions: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+            for calendar_id, expanded, payload in batch:
+                partitions.setdefault((calendar_id, expanded), []).append(_decode_payload(payload))
+            for (calendar_id, expanded), events in partitions.items():
+                self._index_text(calendar_id, bool(expanded), events)
+            indexed += len(batch)
+        logger.info(f"Built the text index of event store {self.path} ({indexed} events).")
+
+    def _index_text(self, calendar_id: str, expanded: bool, events: List[Dict[str, Any]]):
+        """Replaces the text index entries of events within the caller's transaction."""
+        keys = [(calendar_id, int(expanded), event['id']) for event in events]
+        self._conn.executemany(
+            "INSERT INTO event_text_docs (calendar_id, expanded, event_id) VALUES (?, ?, ?) "
+            "ON CONFLICT (calendar_id, expanded, event_id) DO NOTHING",
+            keys,
+        )
+        self._conn.executemany(f"DELETE FROM event_text WHERE rowid = {_DOC_ID}", keys)
+        self._conn.executemany(
+            f"INSERT INTO event_text (rowid, summary, description, location, people) SELECT {_DOC_ID}, ?, ?, ?, ?",
+            [(*key, *fts_fields(event)) for key, event in zip(keys, events)],
+        )
+
+    def _drop_partition(self, calendar_id: str, expanded: bool):
+        """Deletes a partition's events and text index entries within the caller's transaction."""
+        key = (calendar_id, int(expanded))
+        self._conn.execute(
+            "DELETE FROM event_text WHERE rowid IN (SELECT doc_id FROM event_text_docs WHERE calendar_id = ? AND expanded = ?)", key
+        )
+        self._conn.execute("DELETE FROM event_text_docs WHERE calendar_id = ? AND expanded = ?", key)
+        self._conn.execute("DELETE FROM events WHERE calendar_id = ? AND expanded = ?", key)
+
+    def _upsert(self, calendar_id: str, expanded: bool, rows: Iterable[EventRow]) -> float:
+        """Upserts rows within the caller's transaction. Returns the longest event span written."""
+        max_span = 0.0
+        params = []
+        events = []
+        for event, start, end in rows:
+            events.append(event)
+            start_ts, end_ts = _to_timestamp(start), _to_timestamp(end)
+            if start_ts is not None and end_ts is not None:
+                max_span = max(max_span, end_ts - start_ts)
+            params.append((
+                calendar_id, int(expanded), event['id'], start_ts, end_ts,
+                event.get('iCalUID'), event.get('updated'), event.get('status'), _encode_payload(event),
+            ))
+        self._conn.executemany(
+            "INSERT INTO events (calendar_id, expanded, event_id, start_ts, end_ts, ical_uid, updated, status, payload) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (calendar_id, expanded, event_id) DO UPDATE SET "
+            "start_ts=excluded.start_ts, end_ts=excluded.end_ts, ical_uid=excluded.ical_uid, "
+            "updated=excluded.updated, status=excluded.status, payload=excluded.payload",
+            params,
+        )
+        self._index_text(calendar_id, expanded, events)
+        return max_span
+
+    def upsert_events(self, calendar_id: str, expanded: bool, rows: Iterable[EventRow]) -> None:
+        """Inserts or replaces events in a single transaction."""
+        with self._lock, self._conn:
+            max_span = self._upsert(calendar_id, expanded, rows)
+            self._conn.execute(
+                "INSERT INTO sync_state (calendar_id, expanded, max_span) VALUES (?, ?, ?) "
+                "ON CONFLICT (calendar_id, expanded) DO UPDATE SET max_span=MAX(max_span, excluded.max_span)",
+                (calendar_id, int(expanded), max_span),
+            )
+
+    def apply_sync(
+        self,
+        calendar_id: str,
+        expanded: bool,
+        rows: List[EventRow],
+        sync_token: Optional[str],
+        metadata: Dict[str, Any],
+        replace: bool = False
+    ) -> None:
+        """Applies one sync run (event changes plus the new sync token) in a single transaction.
+
+        Args:
+            calendar_id: Calendar the rows belong to.
+            expanded: Whether the rows are expanded instances (singleEvents=True).
+            rows: Changed events with their parsed start/end.
+            sync_token: The nextSyncToken to store with the changes.
+            metadata: Calendar-level fields (summary, timeZone, ...) to store.
+            replace: Drop the partition's existing events first (full sync).
+        """
+        with self._lock, self._conn:
+            if replace:
+                self._drop_partition(calendar_id, expanded)
+            max_span = self._upsert(calendar_id, expanded, rows)
+            self._conn.execute(
+                "INSERT INTO sync_state (calendar_id, expanded, sync_token, metadata, max_span) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (calendar_id, expanded) DO UPDATE SET sync_token=excluded.sync_token, metadata=excluded.metadata, "
+                f"max_span={'excluded.max_span' if replace else 'MAX(max_span, excluded.max_span)'}",
+                (calendar_id, int(expanded), sync_token, json.dumps(metadata), max_span),
+            )
+
+    def clear(self, calendar_id: str, expanded: bool) -> None:
+        """Drops a partition's events and sync state."""
+        with self._lock, self._conn:
+            self._drop_partition(calendar_id, expanded)
+            self._conn.execute("DELETE FROM sync_state WHERE calendar_id = ? AND expanded = ?", (calendar_id, int(expanded)))
+
+    # --- Reads ---
+
+    def load_state(self, calendar_id: str, expanded: bool) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Returns the stored (sync_token, metadata) of a partition, or (None, {})."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sync_token, metadata FROM sync_state WHERE calendar_id = ? AND expanded = ?",
+                (calendar_id, int(expanded)),
+            ).fetchone()
+        if row is None:
+            return None, {}
+        return row[0], json.loads(row[1]) if row[1] else {}
+
+    def get_events(self, calendar_id: str, expanded: bool, event_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Returns the stored events with the given IDs, keyed by ID."""
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for i in range(0, len(event_ids), 500): # Stay under SQLite's bound-parameter limit
+                chunk = event_ids[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                for event_id, payload in self._conn.execute(
+                    f"SELECT event_id, payload FROM events WHERE calendar_id = ? AND expanded = ? AND event_id IN ({placeholders})",
+                    (calendar_id, int(expanded), *chunk),
+                ):
+                    found[event_id] = _decode_payload(payload)
+        return found
+
+    def _window_clauses(
+        self,
+        calendar_id: str,
+        expanded: bool,
+        time_min: Optional[datetime],
+        time_max: Optional[datetime],
+        include_cancelled: bool,
+        ical_uid: Optional[str],
+        text_match: Optional[str]
+    ) -> Tuple[List[str], List[Any]]:
+        """Returns the WHERE clauses and parameters of a window query (caller holds self._lock)."""
+        clauses = ["calendar_id = ?", "expanded = ?"]
+        params: List[Any] = [calendar_id, int(expanded)]
+        if time_min is not None:
+            max_span = self._conn.execute(
+                "SELECT max_span FROM sync_state WHERE calendar_id = ? AND expanded = ?", (calendar_id, int(expanded))
+            ).fetchone()
+            clauses.append("start_ts >= ? AND end_ts > ?")
+            params.extend([time_min.timestamp() - (max_span[0] if max_span else 0.0), time_min.timestamp()])
+        if time_max is not None:
+            clauses.append("start_ts < ?")
+            params.append(time_max.timestamp())
+        if not include_cancelled:
+            clauses.append("status IS NOT 'cancelled'")
+        if ical_uid:
+            clauses.append("ical_uid = ?")
+            params.append(ical_uid)
+        if text_match:
+            clauses.append(
+                # Nested INs make SQLite run the MATCH once, not once per indexed event
+                "event_id IN (SELECT event_id FROM event_text_docs WHERE calendar_id = ? AND expanded = ? "
+                "AND doc_id IN (SELECT rowid FROM event_text WHERE event_text MATCH ?))"
+            )
+            params.extend([calendar_id, int(expanded), text_match])
+        return clauses, params
+
+    def select_events(
+        self,
+        calendar_id: str,
+        expanded: bool,
+        time_min: Optional[datetime] = None,
+        time_max: Optional[datetime] = None,
+        include_cancelled: bool = False,
+        ical_uid: Optional[str] = None,
+        text_match: Optional[str] = None
+    ) -> List[EventRow]:
+        """Returns the events overlapping [time_min, time_max), ordered by start.
+
+        time_min/time_max must be timezone-aware. Events without parseable bounds are only
+        returned when neither bound is given. text_match is an FTS5 expression (see
+        text_search.fts_expression) the event text must match.
+        """
+        # Text matches are looked up by primary key and sorted, rather than scanning the whole window
+        order = '+start_ts' if text_match else 'start_ts'
+        with self._lock:
+            clauses, params = self._window_clauses(calendar_id, expanded, time_min, time_max, include_cancelled, ical_uid, text_match)
+            rows = self._conn.execute(
+                f"SELECT payload, start_ts, end_ts FROM events WHERE {' AND '.join(clauses)} ORDER BY {order}",
+                params,
+            ).fetchall()
+        return [(_decode_payload(payload), _from_timestamp(start_ts), _from_timestamp(end_ts)) for payload, start_ts, end_ts in rows]
+
+    def select_page(
+        self,
+        calendar_id: str,
+        expanded: bool,
+        time_min: Optional[datetime] = None,
+        time_max: Optional[datetime] = None,
+        include_cancelled: bool = False,
+        ical_uid: Optional[str] = None,
+        text_match: Optional[str] = None,
+        order_by_updated: bool = False,
+        after: Optional[PageKey] = None,
+        limit: int = 250
+    ) -> List[Tuple[EventRow, PageKey]]:
+        """Returns up to `limit` events of a select_events window, keyset-paginated.
+
+        Events are ordered by (start_ts, event_id), or (updated, event_id) with order_by_updated,
+        and each comes with that key; passing the last key as `after` returns the next page.
+        Events without a start (or updated) sort first. Only the page's payloads are decoded.
+        """
+        column = 'updated' if order_by_updated else 'start_ts'
+        with self._lock:
+            clauses, params = self._window_clauses(calendar_id, expanded, time_min, time_max, include_cancelled, ical_uid, text_match)
+            if after is not None:
+                if after[0] is None:
+                    clauses.append(f"({column} IS NOT NULL OR event_id > ?)")
+                    params.append(after[1])
+                else:
+                    # Row values let SQLite seek the index to the key instead of skipping rows
+                    clauses.append(f"({column}, event_id) > (?, ?)")
+                    params.extend(after)
+            order = f"+{column}" if text_match else column
+            # Order and limit the keys first, then read the payloads of the page's rows only
+            rows = self._conn.execute(
+                f"SELECT events.payload, events.start_ts, events.end_ts, page.key, page.event_id FROM ("
+                f"SELECT {column} AS key, event_id FROM events WHERE {' AND '.join(clauses)} ORDER BY {order}, event_id LIMIT ?"
+                f") AS page CROSS JOIN events ON events.calendar_id = ? AND events.expanded = ? AND events.event_id = page.event_id "
+                f"ORDER BY page.key, page.event_id",
+                [*params, limit, calendar_id, int(expanded)],
+            ).fetchall()
+        return [
+            ((_decode_payload(payload), _from_timestamp(start_ts), _from_timestamp(end_ts)), (key, event_id))
+            for payload, start_ts, end_ts, key, event_id in rows
+        ]
+
+    def count_events(self, calendar_id: str, expanded: bool) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM events WHERE calendar_id = ? AND expanded = ?", (calendar_id, int(expanded))
+            ).fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the store path, event count and database size."""
+        with self._lock:
+            events = self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        return {'path': self.path, 'events': events, 'size_bytes': page_count * page_size}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# --- Store Registry ---
+
+_store: Optional[EventStore] = None
+_store_lock = threading.Lock()
+
+
+def get_event_store() -> Optional[EventStore]:
+    """Returns the process-wide event store, opening it on first use (None if disabled)."""
+    global _store
+    if not EVENT_STORE_PATH:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = EventStore(EVENT_STORE_PATH)
+        return _store
+
+
+def get_event_store_stats() -> Optional[Dict[str, Any]]:
+    """Returns event store metrics (for /health), or None if the store is disabled or not yet opened."""
+    with _store_lock:
+        store = _store
+    return store.stats() if store is not None else None
+
+
+def close_event_store():
+    """Closes the process-wide event store (called on server shutdown)."""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
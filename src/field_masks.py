@@ -0,0 +1,167 @@
+import re
+from functools import lru_cache
+from typing import Optional, Dict, Any, Iterable
+
+# --- Partial-Response Field Masks ---
+# Google APIs accept a `fields=` parameter that trims responses to the listed fields, which cuts
+# both transfer size and the time spent validating resources into models. find_events,
+# iter_event_pages, search_all_calendars and get_message take a `fields` argument: either a
+# preset name below or a raw field mask in Google's syntax for a single resource
+# ('id,start,end', 'attendees(email,responseStatus)', 'payload/headers').
+#
+# For events().list the mask applies to each item; the calendar-level envelope (time zone,
+# page tokens) is always kept so pagination keeps working. Mirror reads (use_mirror) apply the
+# same mask locally with project().
+
+EVENT_FIELD_PRESETS: Dict[str, Optional[str]] = {
+    'full': None,
+    'timing-only': 'id,status,start,end',
+    'summary': 'id,status,summary,location,start,end,recurringEventId,htmlLink',
+    'attendees': 'id,status,attendees(email,responseStatus,optional,organizer,self)',
+    'recurrence': 'id,etag,updated,status,summary,start,end,recurrence',
+}
+
+MESSAGE_FIELD_PRESETS: Dict[str, Optional[str]] = {
+    'full': None,
+    'ids': 'id,threadId',
+    'labels': 'id,threadId,labelIds',
+    'headers': 'id,threadId,labelIds,snippet,internalDate,payload/headers',
+}
+
+# Calendar-level fields of an events().list response, kept whatever the item mask is
+_EVENTS_LIST_ENVELOPE = 'kind,summary,description,updated,timeZone,accessRole,defaultReminders,nextPageToken,nextSyncToken'
+
+_MASK_PATTERN = re.compile(r'^[A-Za-z0-9_*,/()]+$')
+_NAME_PATTERN = re.compile(r'[A-Za-z0-9_*]+')
+
+
+class InvalidFieldsError(ValueError):
+    """Raised when a fields value is neither a preset nor a well-formed field mask."""
+
+
+def _resolve(fields: Optional[str], presets: Dict[str, Optional[str]]) -> Optional[str]:
+    if fields is None:
+        return None
+    fields = fields.strip()
+    if not fields:
+        return None
+    if fields in presets:
+        return presets[fields]
+    if not _MASK_PATTERN.match(fields):
+        raise InvalidFieldsError(f"Unknown fields preset or malformed field mask: '{fields}'. Presets: {', '.join(presets)}.")
+    parse_fields(fields) # Rejects unbalanced parentheses and empty names
+    return fields
+
+
+def resolve_event_fields(fields: Optional[str]) -> Optional[str]:
+    """Resolves an event `fields` value (preset name or mask) to a mask; None means the full resource.
+
+    Raises:
+        InvalidFieldsError: If the value is not a preset and not a well-formed mask.
+    """
+    return _resolve(fields, EVENT_FIELD_PRESETS)
+
+
+def resolve_message_fields(fields: Optional[str]) -> Optional[str]:
+    """Resolves a Gmail message `fields` value (preset name or mask); None means the full resource.
+
+    Raises:
+        InvalidFieldsError: If the value is not a preset and not a well-formed mask.
+    """
+    return _resolve(fields, MESSAGE_FIELD_PRESETS)
+
+
+def events_list_fields(item_fields: Optional[str]) -> Optional[str]:
+    """Wraps a per-event mask into the fields parameter of an events().list call."""
+    if item_fields is None:
+        return None
+    return f"{_EVENTS_LIST_ENVELOPE},items({item_fields})"
+
+
+def with_required_fields(item_fields: Optional[str], required: Iterable[str]) -> Optional[str]:
+    """Adds top-level fields the caller depends on (e.g., 'start' for sorting) to a mask."""
+    if item_fields is None:
+        return None
+    present = parse_fields(item_fields)
+    if '*' in present:
+        return item_fields
+    missing = [name for name in required if name not in present]
+    return ','.join([item_fields, *missing]) if missing else item_fields
+
+
+# --- Local Projection ---
+
+@lru_cache(maxsize=256)
+def parse_fields(mask: str) -> Dict[str, Any]:
+    """Parses a field mask into a tree: {name: None (whole value) or {sub-name: ...}}.
+
+    The returned tree is cached and shared; do not modify it.
+
+    Raises:
+        InvalidFieldsError: If the mask is malformed.
+    """
+    tree, position = _parse_selection(mask, 0)
+    if position != len(mask):
+        raise InvalidFieldsError(f"Malformed field mask '{mask}' at position {position}.")
+    return tree
+
+
+def _parse_selection(mask: str, position: int) -> Any:
+    tree: Dict[str, Any] = {}
+    while True:
+        path = []
+        while True:
+            match = _NAME_PATTERN.match(mask, position)
+            if not match:
+                raise InvalidFieldsError(f"Malformed field mask '{mask}' at position {position}.")
+            path.append(match.group())
+            position = match.end()
+            if position < len(mask) and mask[position] == '/':
+                position += 1
+                continue
+            break
+        subtree = None
+        if position < len(mask) and mask[position] == '(':
+            subtree, position = _parse_selection(mask, position + 1)
+            if position >= len(mask) or mask[position] != ')':
+                raise InvalidFieldsError(f"Unbalanced parentheses in field mask '{mask}'.")
+            position += 1
+        _merge_path(tree, path, subtree)
+        if position < len(mask) and mask[position] == ',':
+            position += 1
+            continue
+        return tree, position
+
+
+def _merge_path(tree: Dict[str, Any], path: list, subtree: Optional[Dict[str, Any]]):
+    node = tree
+    for name in path[:-1]:
+        child = node.get(name, {})
+        if child is None:
+            return # An ancestor is already selected whole
+        node[name] = child
+        node = child
+    leaf = path[-1]
+    if subtree is None or node.get(leaf, {}) is None:
+        node[leaf] = None
+    else:
+        existing = node.setdefault(leaf, {})
+        for name, value in subtree.items():
+            _merge_path(existing, [name], value)
+
+
+def _apply(value: Any, tree: Optional[Dict[str, Any]]) -> Any:
+    if tree is None or '*' in tree:
+        return value
+    if isinstance(value, list):
+        return [_apply(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {name: _apply(value[name], subtree) for name, subtree in tree.items() if name in value}
+
+
+def project(resource: Dict[str, Any], mask: Optional[str]) -> Dict[str, Any]:
+    """Trims a resource to a field mask, the way the API's `fields=` parameter would."""
+    if mask is None:
+        return resource
+    return _apply(resource, parse_fields(mask))
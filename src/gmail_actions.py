@@ -1,35 +1,263 @@
 import base64
 import logging
-from typing import Optional, List, Dict, Any
+import os
+import random
+import time
+from typing import Optional, List, Dict, Any, Iterator, Callable, Tuple
 
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from google.oauth2.credentials import Credentials
 
+from .google_services import get_service
+from .field_masks import resolve_message_fields
+
 logger = logging.getLogger(__name__)
 
+# --- Batch Hydration Settings ---
+# list_messages(hydrate=True) fetches format=metadata for every listed message through Gmail's
+# batch endpoint, GMAIL_BATCH_SIZE requests per batch call (Google allows at most 100, but Gmail
+# rate-limits the parts of larger batches). Parts that fail with a rate-limit, auth or server
+# error are retried with exponential backoff; parts that still fail are reported in the
+# response's hydrationErrors and left as {id, threadId} stubs.
+#
+# Configuration (environment variables):
+#   GMAIL_BATCH_SIZE: Requests per batch call (default 50, at most 100).
+#   GMAIL_BATCH_CONCURRENCY: Batch calls in flight at once on the async path (default 2).
+#   GMAIL_HYDRATE_RETRIES: Retry rounds for failed parts (default 3).
+#   GMAIL_HYDRATE_BACKOFF: Seconds before the first retry, doubled each round (default 1).
+GMAIL_BATCH_SIZE = max(1, min(int(os.getenv('GMAIL_BATCH_SIZE', 50)), 100))
+GMAIL_BATCH_CONCURRENCY = max(1, int(os.getenv('GMAIL_BATCH_CONCURRENCY', 2)))
+GMAIL_HYDRATE_RETRIES = max(0, int(os.getenv('GMAIL_HYDRATE_RETRIES', 3)))
+GMAIL_HYDRATE_BACKOFF = float(os.getenv('GMAIL_HYDRATE_BACKOFF', 1.0))
+DEFAULT_METADATA_HEADERS = ['From', 'To', 'Subject', 'Date']
+
+# Part statuses worth retrying: expired token, rate limits and transient server errors
+_RETRYABLE_STATUSES = {401, 429, 500, 502, 503, 504}
+_RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+
+# --- Bulk Modify Settings ---
+# users.messages.batchModify accepts at most 1000 IDs per call; query-driven bulk operations
+# page through matching IDs GMAIL_LIST_PAGE_SIZE at a time (messages.list maximum is 500).
+GMAIL_BATCH_MODIFY_SIZE = 1000
+GMAIL_LIST_PAGE_SIZE = 500
+
 # --- Helper: Build Gmail service ---
 
 def _get_gmail_service(credentials: Credentials):
     try:
-        service = build('gmail', 'v1', credentials=credentials)
-        logger.debug("Gmail service client created successfully.")
+        service = get_service('gmail', 'v1', credentials)
         return service
     except Exception as e:
         logger.error(f"Failed to build Gmail service: {e}", exc_info=True)
         raise
 
+# --- Helpers: Batch hydration (shared with async_gmail_actions) ---
+
+def _build_list_kwargs(user_id: str, query: Optional[str], max_results: int, label_ids: Optional[List[str]]) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {"userId": user_id, "maxResults": max_results}
+    if query:
+        kwargs["q"] = query
+    if label_ids:
+        kwargs["labelIds"] = label_ids
+    return kwargs
+
+
+def _build_get_kwargs(user_id: str, message_id: str, format: str, fields: Optional[str]) -> Dict[str, Any]:
+    """Builds messages().get arguments; fields is a preset from field_masks.MESSAGE_FIELD_PRESETS or a field mask."""
+    kwargs: Dict[str, Any] = {'userId': user_id, 'id': message_id, 'format': format}
+    mask = resolve_message_fields(fields)
+    if mask:
+        kwargs['fields'] = mask
+    return kwargs
+
+
+def _build_metadata_request(service, user_id: str, message_id: str, metadata_headers: List[str]):
+    return service.users().messages().get(userId=user_id, id=message_id, format='metadata', metadataHeaders=metadata_headers)
+
+
+def _chunked(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _merge_hydrated(messages: List[Dict[str, Any]], hydrated: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Replaces each {id, threadId} stub with its metadata, keeping list order.
+
+    Messages that failed to hydrate are kept as stubs so the listing stays complete.
+    """
+    return [hydrated.get(message['id'], message) for message in messages]
+
+
+def _error_status(exception: Optional[HttpError]) -> Optional[int]:
+    return exception.resp.status if exception is not None and exception.resp is not None else None
+
+
+def _is_retryable(exception: Optional[HttpError]) -> bool:
+    """True for parts worth sending again: missing from the batch response, or a transient error."""
+    if exception is None:
+        return True # The part was missing from the batch response
+    status = _error_status(exception)
+    if status in _RETRYABLE_STATUSES:
+        return True
+    return status == 403 and any(reason in str(exception.content) for reason in _RATE_LIMIT_REASONS)
+
+
+def _hydration_delay(attempt: int) -> float:
+    """Exponential backoff with jitter before retry round attempt (0-based)."""
+    return GMAIL_HYDRATE_BACKOFF * (2 ** attempt) * (0.5 + random.random() / 2)
+
+
+def _hydration_error(message_id: str, exception: Optional[HttpError]) -> Dict[str, Any]:
+    """A hydrationErrors entry for a message whose metadata could not be fetched."""
+    if exception is None:
+        return {'id': message_id, 'status': None, 'error': 'Missing from the batch response'}
+    return {'id': message_id, 'status': _error_status(exception), 'error': str(exception)}
+
+
+def _hydrate_messages(service, user_id: str, messages: List[Dict[str, Any]], metadata_headers: List[str]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Fetches format=metadata for the listed messages with batch calls of up to GMAIL_BATCH_SIZE.
+
+    Returns:
+        The messages (hydrated, or stubs where hydration failed) and one hydrationErrors entry
+        per failed message.
+    """
+    hydrated: Dict[str, Dict[str, Any]] = {}
+    failed: Dict[str, Optional[HttpError]] = {} # Failures of the current round
+    gave_up: Dict[str, Optional[HttpError]] = {} # Failures not worth (or out of) retries
+
+    def _on_response(request_id: str, response: Dict[str, Any], exception: Optional[HttpError]):
+        if exception is not None:
+            failed[request_id] = exception
+        elif response is not None:
+            hydrated[request_id] = response
+
+    pending = [message['id'] for message in messages]
+    batch_calls = 0
+    for attempt in range(GMAIL_HYDRATE_RETRIES + 1):
+        if attempt:
+            delay = _hydration_delay(attempt - 1)
+            logger.info(f"Retrying hydration of {len(pending)} messages in {delay:.1f}s (round {attempt}/{GMAIL_HYDRATE_RETRIES}).")
+            time.sleep(delay)
+        failed.clear()
+        for chunk in _chunked(pending, GMAIL_BATCH_SIZE):
+            # The batch refreshes the credentials before serializing its parts, and retries
+            # parts rejected with 401 once itself
+            batch = service.new_batch_http_request(callback=_on_response)
+            for message_id in chunk:
+                batch.add(_build_metadata_request(service, user_id, message_id, metadata_headers), request_id=message_id)
+            try:
+                batch.execute()
+            except HttpError as e: # The batch call itself failed: every part failed with it
+                failed.update((message_id, e) for message_id in chunk)
+            batch_calls += 1
+        missing = {message_id: None for message_id in pending if message_id not in hydrated and message_id not in failed}
+        failed.update(missing)
+        pending = [message_id for message_id, exception in failed.items() if _is_retryable(exception)]
+        gave_up.update((message_id, exception) for message_id, exception in failed.items() if not _is_retryable(exception))
+        if not pending:
+            break
+
+    gave_up.update((message_id, failed[message_id]) for message_id in pending) # Still failing after the last round
+    errors = [_hydration_error(message_id, exception) for message_id, exception in gave_up.items()]
+    for error in errors:
+        logger.warning(f"Failed to hydrate message {error['id']}: {error['error']}")
+    logger.info(f"Hydrated {len(hydrated)}/{len(messages)} messages in {batch_calls} batch call(s).")
+    return _merge_hydrated(messages, hydrated), errors
+
+# --- Helpers: Bulk label modification (shared with async_gmail_actions) ---
+
+def _validate_bulk_modify(
+    message_ids: Optional[List[str]],
+    query: Optional[str],
+    label_ids: Optional[List[str]],
+    add_labels: Optional[List[str]],
+    remove_labels: Optional[List[str]]
+):
+    if not add_labels and not remove_labels:
+        raise ValueError("At least one of add_labels or remove_labels is required.")
+    if message_ids and (query or label_ids):
+        raise ValueError("Provide either message_ids or a query/label_ids selection, not both.")
+    if not message_ids and not query and not label_ids:
+        raise ValueError("Provide message_ids or a query/label_ids selection.")
+
+
+def _unique_ids(message_ids: List[str], max_messages: Optional[int]) -> List[str]:
+    unique = list(dict.fromkeys(message_ids))
+    return unique[:max_messages] if max_messages else unique
+
+
+def _build_batch_modify_body(message_ids: List[str], add_labels: Optional[List[str]], remove_labels: Optional[List[str]]) -> Dict[str, Any]:
+    body: Dict[str, Any] = {'ids': list(message_ids)}
+    if add_labels:
+        body['addLabelIds'] = add_labels
+    if remove_labels:
+        body['removeLabelIds'] = remove_labels
+    return body
+
+
+def _new_bulk_report() -> Dict[str, Any]:
+    return {'matched': 0, 'modified': 0, 'pages': 0, 'batches': 0, 'completed': False, 'error': None}
+
+
+def _record_batch(report: Dict[str, Any], batch_size: int, progress_callback: Optional[Callable[[Dict[str, Any]], None]]):
+    report['batches'] += 1
+    report['modified'] += batch_size
+    logger.info(f"Bulk modify: batch {report['batches']} applied to {batch_size} messages ({report['modified']}/{report['matched']} so far).")
+    if progress_callback:
+        progress_callback(dict(report))
+
+
+def _iter_matching_ids(service, user_id: str, query: Optional[str], label_ids: Optional[List[str]], max_messages: Optional[int], report: Dict[str, Any]) -> Iterator[str]:
+    """Pages through messages.list and yields matching message IDs, counting pages and matches."""
+    page_token = None
+    while True:
+        page_size = min(GMAIL_LIST_PAGE_SIZE, max_messages - report['matched']) if max_messages else GMAIL_LIST_PAGE_SIZE
+        kwargs = _build_list_kwargs(user_id, query, page_size, label_ids)
+        if page_token:
+            kwargs['pageToken'] = page_token
+        resp = service.users().messages().list(**kwargs).execute()
+        report['pages'] += 1
+        for message in resp.get('messages', []):
+            report['matched'] += 1
+            yield message['id']
+        page_token = resp.get('nextPageToken')
+        if not page_token or (max_messages and report['matched'] >= max_messages):
+            return
+
 # --- Actions ---
 
-def list_messages(credentials: Credentials, user_id: str = 'me', query: Optional[str] = None, max_results: int = 50, label_ids: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+def list_messages(
+    credentials: Credentials,
+    user_id: str = 'me',
+    query: Optional[str] = None,
+    max_results: int = 50,
+    label_ids: Optional[List[str]] = None,
+    hydrate: bool = False,
+    metadata_headers: Optional[List[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """Lists messages, optionally hydrated with their metadata.
+
+    Args:
+        credentials: OAuth2 credentials
+        user_id: Gmail user, default 'me'
+        query: Gmail search query
+        max_results: Maximum messages to return
+        label_ids: Only return messages with all of these label IDs
+        hydrate: Replace the {id, threadId} stubs with format=metadata messages (labelIds,
+            snippet, selected headers, ...), fetched through Gmail's batch endpoint
+        metadata_headers: Headers to include when hydrating (default From, To, Subject, Date)
+
+    Returns:
+        The messages.list response; with hydrate, plus hydrationErrors ({id, status, error}
+        for each message left as a stub). None on API errors.
+    """
     service = _get_gmail_service(credentials)
     try:
-        kwargs: Dict[str, Any] = {"userId": user_id, "maxResults": max_results}
-        if query:
-            kwargs["q"] = query
-        if label_ids:
-            kwargs["labelIds"] = label_ids
-        resp = service.users().messages().list(**kwargs).execute()
+        resp = service.users().messages().list(**_build_list_kwargs(user_id, query, max_results, label_ids)).execute()
+        if hydrate:
+            resp['hydrationErrors'] = []
+            if resp.get('messages'):
+                resp['messages'], resp['hydrationErrors'] = _hydrate_messages(service, user_id, resp['messages'], metadata_headers or DEFAULT_METADATA_HEADERS)
         return resp
     except HttpError as e:
         logger.error(f"Gmail API error (list_messages): {e}", exc_info=True)
@@ -39,10 +267,10 @@ def list_messages(credentials: Credentials, user_id: str = 'me', query: Optional
         return None
 
 
-def get_message(credentials: Credentials, message_id: str, user_id: str = 'me', format: str = 'full') -> Optional[Dict[str, Any]]:
+def get_message(credentials: Credentials, message_id: str, user_id: str = 'me', format: str = 'full', fields: Optional[str] = None) -> Optional[Dict[str, Any]]:
     service = _get_gmail_service(credentials)
     try:
-        resp = service.users().messages().get(userId=user_id, id=message_id, format=format).execute()
+        resp = service.users().messages().get(**_build_get_kwargs(user_id, message_id, format, fields)).execute()
         return resp
     except HttpError as e:
         logger.error(f"Gmail API error (get_message): {e}", exc_info=True)
@@ -122,3 +350,67 @@ def modify_message_labels(credentials: Credentials, message_id: str, add_labels:
     except Exception as e:
         logger.error(f"Unexpected error in modify_message_labels: {e}", exc_info=True)
         return None
+
+
+def bulk_modify_message_labels(
+    credentials: Credentials,
+    message_ids: Optional[List[str]] = None,
+    query: Optional[str] = None,
+    label_ids: Optional[List[str]] = None,
+    add_labels: Optional[List[str]] = None,
+    remove_labels: Optional[List[str]] = None,
+    user_id: str = 'me',
+    max_messages: Optional[int] = None,
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Optional[Dict[str, Any]]:
+    """Adds and/or removes labels on many messages with users.messages.batchModify.
+
+    Messages are selected either by explicit IDs or by a Gmail search query / label filter,
+    in which case all matching IDs are paged through first. IDs are then sent in chunks of
+    GMAIL_BATCH_MODIFY_SIZE (1000), so 5000 messages take 5 modify calls.
+
+    Args:
+        credentials: OAuth2 credentials
+        message_ids: Explicit message IDs to modify (duplicates are ignored)
+        query: Gmail search query selecting the messages to modify
+        label_ids: Only select messages with all of these label IDs (combinable with query)
+        add_labels: Label IDs to add
+        remove_labels: Label IDs to remove
+        user_id: Gmail user, default 'me'
+        max_messages: Optional cap on the number of messages modified
+        progress_callback: Called with a copy of the progress report after each batch
+
+    Returns:
+        A report: {'matched', 'modified', 'pages', 'batches', 'completed', 'error'}. If a
+        call fails part-way, 'completed' is False and 'error' describes the failure; messages
+        counted in 'modified' were already changed. None on unexpected errors.
+
+    Raises:
+        ValueError: If no labels are given, or the selection is missing or ambiguous.
+    """
+    _validate_bulk_modify(message_ids, query, label_ids, add_labels, remove_labels)
+    service = _get_gmail_service(credentials)
+    report = _new_bulk_report()
+    try:
+        if message_ids:
+            selected = _unique_ids(message_ids, max_messages)
+            report['matched'] = len(selected)
+        else:
+            # Collect the full selection before modifying: removing a label the query matches on
+            # would otherwise shift later result pages while we are still reading them.
+            selected = list(_iter_matching_ids(service, user_id, query, label_ids, max_messages, report))
+        logger.info(f"Bulk modify: {report['matched']} messages selected ({report['pages']} list page(s)).")
+        for chunk in _chunked(selected, GMAIL_BATCH_MODIFY_SIZE):
+            body = _build_batch_modify_body(chunk, add_labels, remove_labels)
+            service.users().messages().batchModify(userId=user_id, body=body).execute()
+            _record_batch(report, len(chunk), progress_callback)
+        report['completed'] = True
+        logger.info(f"Bulk modify finished: {report['modified']} messages in {report['batches']} batchModify call(s), {report['pages']} list page(s).")
+        return report
+    except HttpError as e:
+        logger.error(f"Gmail API error (bulk_modify_message_labels) after {report['modified']} messages: {e}", exc_info=True)
+        report['error'] = str(e)
+        return report
+    except Exception as e:
+        logger.error(f"Unexpected error in bulk_modify_message_labels: {e}", exc_info=True)
+        return None
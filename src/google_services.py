@@ -0,0 +1,161 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, Any, Tuple
+
+import requests
+from googleapiclient.discovery import build_from_document, DISCOVERY_URI
+from google.oauth2.credentials import Credentials
+
+from .http_transport import get_shared_http
+
+logger = logging.getLogger(__name__)
+
+# --- Bundled Discovery Documents ---
+# Pinned copies of the Calendar v3 and Gmail v1 discovery documents ship with the server
+# (src/discovery_documents/<api>.<version>.json). They are parsed once per process and
+# clients are built from the parsed dict with build_from_document(), so building a client
+# never touches the network and never re-parses JSON.
+# Set DISCOVERY_REFRESH_ON_STARTUP=true to fetch the latest documents from Google when the
+# server starts; the bundled copy is kept if the fetch fails (e.g., restricted egress).
+
+DISCOVERY_DOCUMENTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'discovery_documents')
+DISCOVERY_REFRESH_ON_STARTUP = os.getenv('DISCOVERY_REFRESH_ON_STARTUP', 'false').lower() == 'true'
+BUNDLED_APIS = [('calendar', 'v3'), ('gmail', 'v1')]
+
+_discovery_documents: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_discovery_lock = threading.Lock()
+
+
+def get_discovery_document(api_name: str, api_version: str) -> Dict[str, Any]:
+    """Returns the parsed discovery document for an API, loading the bundled copy on first use."""
+    key = (api_name, api_version)
+    document = _discovery_documents.get(key)
+    if document is not None:
+        return document
+    with _discovery_lock:
+        document = _discovery_documents.get(key)
+        if document is None:
+            path = os.path.join(DISCOVERY_DOCUMENTS_DIR, f"{api_name}.{api_version}.json")
+            with open(path, 'r', encoding='utf-8') as f:
+                document = json.load(f)
+            _discovery_documents[key] = document
+            logger.info(f"Loaded bundled discovery document for {api_name} {api_version} (revision {document.get('revision')}).")
+    return document
+
+
+def get_batch_uri(api_name: str, api_version: str) -> str:
+    """Returns the batch endpoint for an API, as googleapiclient derives it from the discovery document."""
+    document = get_discovery_document(api_name, api_version)
+    return f"{document['rootUrl']}{document.get('batchPath', 'batch')}"
+
+
+def refresh_discovery_documents(timeout: float = 10.0) -> Dict[str, bool]:
+    """Fetches the latest discovery documents from Google and replaces the in-memory copies.
+
+    Returns:
+        A dictionary mapping '<api>.<version>' to whether the refresh succeeded.
+    """
+    results: Dict[str, bool] = {}
+    for api_name, api_version in BUNDLED_APIS:
+        url = DISCOVERY_URI.format(api=api_name, apiVersion=api_version)
+        try:
+            response = requests.get(url, timeout=timeout)
+            response.raise_for_status()
+            document = response.json()
+            with _discovery_lock:
+                _discovery_documents[(api_name, api_version)] = document
+            logger.info(f"Refreshed discovery document for {api_name} {api_version} (revision {document.get('revision')}).")
+            results[f"{api_name}.{api_version}"] = True
+        except Exception as e:
+            logger.warning(f"Could not refresh discovery document for {api_name} {api_version}: {e}. Using bundled copy.")
+            results[f"{api_name}.{api_version}"] = False
+    return results
+
+# --- Service Client Registry ---
+# Building a client for every action re-creates the Resource tree and a transport.
+# Clients are built once per (api, version, credentials) and reused.
+#
+# Plain httplib2.Http is NOT thread-safe, so clients never use it: every client is built
+# on the pooled transport from http_transport.get_shared_http(), which is thread-safe and
+# shared by Calendar and Gmail. That makes a single client safe to share across the
+# FastAPI threadpool.
+#
+# Clients are keyed by id(credentials). A client references its credentials through its
+# transport, so a weak key would never be collected; instead, whoever replaces a credentials
+# object (server.get_current_credentials after a re-fetch) releases the old one explicitly.
+# The cached client keeps its credentials alive, so their id cannot be reused while cached.
+
+class ServiceRegistry:
+    """Caches Google API service clients per (api, version, credentials)."""
+
+    def __init__(self):
+        self._services: Dict[Tuple[str, str, int], Any] = {}
+        self._lock = threading.Lock()
+        self._builds = 0
+        self._reuses = 0
+
+    def get(self, api_name: str, api_version: str, credentials: Credentials):
+        """Returns a cached service client, building it on first use.
+
+        Clients stay cached until release() is called for their credentials.
+        """
+        key = (api_name, api_version, id(credentials))
+        with self._lock:
+            service = self._services.get(key)
+            if service is not None:
+                self._reuses += 1
+                return service
+
+            service = build_from_document(
+                get_discovery_document(api_name, api_version),
+                http=get_shared_http(credentials),
+            )
+            self._services[key] = service
+            self._builds += 1
+        logger.debug(f"Built new '{api_name}' {api_version} service client.")
+        return service
+
+    def release(self, credentials: Credentials) -> int:
+        """Drops the clients built for a credentials object that is being replaced; returns how many."""
+        with self._lock:
+            keys = [key for key in self._services if key[2] == id(credentials)]
+            for key in keys:
+                del self._services[key]
+        return len(keys)
+
+    def clear(self):
+        """Drops all cached clients."""
+        with self._lock:
+            self._services.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns client build/reuse counters, the overall reuse rate and the cached client count."""
+        with self._lock:
+            builds, reuses, cached = self._builds, self._reuses, len(self._services)
+        total = builds + reuses
+        return {
+            'cached': cached,
+            'builds': builds,
+            'reuses': reuses,
+            'reuse_rate': (reuses / total) if total else 0.0,
+        }
+
+
+_registry = ServiceRegistry()
+
+
+def get_service(api_name: str, api_version: str, credentials: Credentials):
+    """Returns a reusable service client for the given API and credentials."""
+    return _registry.get(api_name, api_version, credentials)
+
+
+def release_service_clients(credentials: Credentials) -> int:
+    """Drops the cached clients of replaced credentials (see the registry notes above)."""
+    return _registry.release(credentials)
+
+
+def get_service_stats() -> Dict[str, Any]:
+    """Returns service client registry metrics (builds, reuses, reuse_rate)."""
+    return _registry.stats()
@@ -0,0 +1,125 @@
+import logging
+import os
+import threading
+import time
+from typing import Optional, Dict, Any, Tuple
+
+import httplib2
+from requests.adapters import HTTPAdapter
+from google.auth.transport.requests import AuthorizedSession
+from google.oauth2.credentials import Credentials
+
+logger = logging.getLogger(__name__)
+
+# --- Pooled Keep-Alive Transport ---
+# googleapiclient expects an httplib2.Http-like object (request() returning (response, content)).
+# PooledHttp provides that interface on top of a google.auth AuthorizedSession, whose urllib3
+# connection pools keep TLS connections to googleapis.com alive between calls. One transport
+# is shared per credentials object by every Calendar and Gmail client, and it is thread-safe,
+# unlike httplib2.Http. Transports are keyed by id(credentials) and hold their credentials, so
+# they are only dropped by release_shared_http (called when credentials are replaced).
+#
+# Configuration (environment variables):
+#   GOOGLE_HTTP_POOL_CONNECTIONS: Number of per-host connection pools to keep (default 10).
+#   GOOGLE_HTTP_POOL_MAXSIZE:     Maximum connections kept per host (default 10).
+#   GOOGLE_HTTP_POOL_BLOCK:       Block instead of opening extra connections when a host's
+#                                 pool is exhausted, enforcing the per-host limit (default true).
+#   GOOGLE_HTTP_IDLE_TIMEOUT:     Seconds a transport may sit idle before its pooled
+#                                 connections are closed and re-established (default 60).
+#   GOOGLE_HTTP_TIMEOUT:          Per-request timeout in seconds (default 60).
+
+POOL_CONNECTIONS = int(os.getenv('GOOGLE_HTTP_POOL_CONNECTIONS', 10))
+POOL_MAXSIZE = int(os.getenv('GOOGLE_HTTP_POOL_MAXSIZE', 10))
+POOL_BLOCK = os.getenv('GOOGLE_HTTP_POOL_BLOCK', 'true').lower() == 'true'
+IDLE_TIMEOUT_SECONDS = float(os.getenv('GOOGLE_HTTP_IDLE_TIMEOUT', 60))
+REQUEST_TIMEOUT_SECONDS = float(os.getenv('GOOGLE_HTTP_TIMEOUT', 60))
+
+
+class PooledHttp:
+    """httplib2.Http-compatible adapter over a pooled, keep-alive AuthorizedSession."""
+
+    def __init__(
+        self,
+        credentials: Credentials,
+        pool_connections: int = POOL_CONNECTIONS,
+        pool_maxsize: int = POOL_MAXSIZE,
+        pool_block: bool = POOL_BLOCK,
+        idle_timeout: float = IDLE_TIMEOUT_SECONDS,
+        timeout: float = REQUEST_TIMEOUT_SECONDS,
+    ):
+        # Exposed so googleapiclient (e.g., batch requests) can find and refresh the credentials.
+        self.credentials = credentials
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._session = AuthorizedSession(credentials)
+        self._adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self._session.mount('https://', self._adapter)
+        self._session.mount('http://', self._adapter)
+        self._last_used = time.monotonic()
+        self._idle_lock = threading.Lock()
+
+    def _evict_if_idle(self):
+        """Closes pooled connections if the transport has been idle longer than idle_timeout."""
+        with self._idle_lock:
+            now = time.monotonic()
+            if self.idle_timeout and now - self._last_used > self.idle_timeout:
+                logger.debug(f"Transport idle for {now - self._last_used:.1f}s. Closing pooled connections.")
+                self._adapter.poolmanager.clear()
+            self._last_used = now
+
+    def request(
+        self,
+        uri: str,
+        method: str = 'GET',
+        body: Optional[Any] = None,
+        headers: Optional[Dict[str, str]] = None,
+        redirections: int = httplib2.DEFAULT_MAX_REDIRECTS,
+        connection_type: Optional[Any] = None,
+    ) -> Tuple[httplib2.Response, bytes]:
+        """Performs a request and returns (response, content) like httplib2.Http.request()."""
+        self._evict_if_idle()
+        response = self._session.request(
+            method,
+            uri,
+            data=body,
+            headers=headers,
+            timeout=self.timeout,
+            allow_redirects=redirections > 0,
+        )
+        info = {key.lower(): value for key, value in response.headers.items()}
+        info['status'] = str(response.status_code)
+        http_response = httplib2.Response(info)
+        http_response.reason = response.reason
+        return http_response, response.content
+
+    def close(self):
+        """Closes the session and all pooled connections."""
+        self._session.close()
+
+
+_transports: Dict[int, PooledHttp] = {}
+_transports_lock = threading.Lock()
+
+
+def get_shared_http(credentials: Credentials) -> PooledHttp:
+    """Returns the pooled transport shared by all API clients using these credentials."""
+    with _transports_lock:
+        http = _transports.get(id(credentials))
+        if http is None:
+            http = PooledHttp(credentials)
+            _transports[id(credentials)] = http
+            logger.info(
+                f"Created pooled Google API transport (pool_connections={POOL_CONNECTIONS}, "
+                f"pool_maxsize={POOL_MAXSIZE}, idle_timeout={IDLE_TIMEOUT_SECONDS}s)."
+            )
+        return http
+
+
+def release_shared_http(credentials: Credentials) -> bool:
+    """Closes and drops the transport of credentials that are being replaced; returns whether there was one."""
+    with _transports_lock:
+        http = _transports.pop(id(credentials), None)
+    if http is None:
+        return False
+    http.close()
+    return True
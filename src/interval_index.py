@@ -0,0 +1,88 @@
+from bisect import bisect_left
+from typing import Any, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+# --- Interval Index ---
+# Static index over half-open [start, end) intervals, used for overlap queries on busy periods
+# (slot finding) and on mirrored events (calendar_sync window reads).
+#
+# Intervals are kept in arrays sorted by start and viewed as an implicit balanced binary search
+# tree (the node of a range [lo, hi) is its midpoint). Each node stores the maximum end of its
+# subtree, so a query skips any subtree that ends before the query window and, because starts
+# are sorted, everything right of a node that starts after it. An overlap query visits
+# O(log n + k) nodes for k results in practice; range queries on start are a pair of bisects.
+#
+# The index is immutable: build a new one when the intervals change. Bounds can be any
+# mutually comparable values (aware datetimes, epoch floats, ...).
+
+
+class IntervalIndex(Generic[T]):
+    """Immutable index answering overlap, stabbing and start-range queries over intervals."""
+
+    __slots__ = ('_starts', '_ends', '_items', '_max_end')
+
+    def __init__(self, intervals: Iterable[Tuple[Any, Any, T]]):
+        """Builds the index.
+
+        Args:
+            intervals: (start, end, item) triples. Intervals are half-open: [start, end).
+        """
+        entries = sorted(intervals, key=lambda entry: entry[0])
+        self._starts = [entry[0] for entry in entries]
+        self._ends = [entry[1] for entry in entries]
+        self._items: List[T] = [entry[2] for entry in entries]
+        self._max_end: List[Any] = list(self._ends)
+        self._build(0, len(entries))
+
+    def _build(self, lo: int, hi: int) -> Optional[Any]:
+        """Fills _max_end for the subtree over [lo, hi); returns its maximum end."""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        max_end = self._ends[mid]
+        for child in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child is not None and child > max_end:
+                max_end = child
+        self._max_end[mid] = max_end
+        return max_end
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _search(self, low: Any, high: Any, include_high: bool) -> List[int]:
+        """Positions of intervals with end > low and start < high (start <= high if include_high), in start order."""
+        starts, ends, max_end = self._starts, self._ends, self._max_end
+        found: List[int] = []
+        stack = [(0, len(starts))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if not max_end[mid] > low:
+                continue # Everything in this subtree ends at or before the window
+            stack.append((lo, mid))
+            if starts[mid] < high or (include_high and starts[mid] == high):
+                if ends[mid] > low:
+                    found.append(mid)
+                stack.append((mid + 1, hi))
+        found.sort()
+        return found
+
+    def overlapping(self, start: Any, end: Any) -> List[T]:
+        """Returns the items whose interval overlaps [start, end), ordered by start."""
+        return [self._items[i] for i in self._search(start, end, include_high=False)]
+
+    def stabbing(self, point: Any) -> List[T]:
+        """Returns the items whose interval contains point (start <= point < end), ordered by start."""
+        return [self._items[i] for i in self._search(point, point, include_high=True)]
+
+    def starting_in(self, start: Any, end: Any) -> List[T]:
+        """Returns the items whose interval starts within [start, end), ordered by start."""
+        return self._items[bisect_left(self._starts, start):bisect_left(self._starts, end)]
+
+    def latest_end_overlapping(self, start: Any, end: Any) -> Optional[Any]:
+        """Returns the latest end among intervals overlapping [start, end), or None if there are none."""
+        positions = self._search(start, end, include_high=False)
+        return max(self._ends[i] for i in positions) if positions else None
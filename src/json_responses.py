@@ -0,0 +1,44 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json, to_jsonable_python
+
+try:
+    import orjson
+except ImportError: # Optional: pydantic-core serializes everything without it
+    orjson = None
+
+# --- Fast JSON Responses ---
+# FastJSONResponse is the app's default response class. It renders content without going
+# through jsonable_encoder and stdlib json:
+#   - Pydantic models (e.g., EventsResponse) are serialized by pydantic-core's Rust serializer
+#     with aliases, the same output as FastAPI's response_model serialization.
+#   - Dicts and lists (Gmail resources, health, stats) are serialized by orjson, which handles
+#     datetime/date values and non-string keys (e.g., dates) natively; anything else, such as
+#     a nested model, is converted by pydantic-core. Without orjson, pydantic-core serializes
+#     them instead.
+#
+# Endpoints that return large models (event lists, projections, busyness) return
+# FastJSONResponse(model) directly. FastAPI then skips its response_model round trip (dump to
+# a dict, validate again, serialize); response_model still documents the schema.
+
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson is not None else 0
+
+
+def _orjson_default(value: Any) -> Any:
+    return to_jsonable_python(value, by_alias=True)
+
+
+def dumps(content: Any) -> bytes:
+    """Serializes response content to JSON bytes (see the module notes)."""
+    if orjson is None or isinstance(content, BaseModel):
+        return to_json(content, by_alias=True)
+    return orjson.dumps(content, default=_orjson_default, option=_ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with pydantic-core / orjson instead of stdlib json."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
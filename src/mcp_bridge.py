@@ -1,19 +1,25 @@
-import requests
+import httpx
 import json
 import logging
+import os
 from typing import Optional, List, Dict, Any
 from datetime import datetime
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 # Base URL for the FastAPI server
 BASE_URL = "http://127.0.0.1:8000"
+# Timeout (seconds) for calls to the FastAPI server; analysis/scheduling calls can take a while
+MCP_HTTP_TIMEOUT = float(os.getenv('MCP_HTTP_TIMEOUT', 120))
 
 def create_mcp_server():
     """Creates and configures the MCP server with tools that map to the FastAPI endpoints."""
     mcp = FastMCP("calendar-mcp")
+    # One pooled async client shared by all tools, so tool calls neither block the event loop
+    # nor open a new connection to the FastAPI server each time.
+    http_client = httpx.AsyncClient(timeout=MCP_HTTP_TIMEOUT)
     
     @mcp.tool()
     async def list_calendars(min_access_role: str = None) -> str:
@@ -27,7 +33,7 @@ def create_mcp_server():
             if min_access_role:
                 params["min_access_role"] = min_access_role
             
-            response = requests.get(f"{BASE_URL}/calendars", params=params)
+            response = await http_client.get(f"{BASE_URL}/calendars", params=params)
             if response.status_code != 200:
                 error_msg = f"Error: {response.status_code} - {response.text}"
                 logger.error(error_msg)
@@ -43,18 +49,32 @@ def create_mcp_server():
     @mcp.tool()
     async def find_events(calendar_id: str, time_min: str = None, 
                          time_max: str = None, query: str = None,
-                         max_results: int = 50) -> str:
-        """Find events in a specified calendar.
+                         max_results: int = 50, use_mirror: bool = False,
+                         cursor: str = None, fields: str = None) -> str:
+        """Find events in a specified calendar, one page at a time.
+        If the result has a 'next_cursor', call again with the same arguments and that cursor
+        to get the following page.
         
         Args:
             calendar_id: Calendar identifier (e.g., 'primary', email address, or calendar ID).
             time_min: Start time (inclusive, ISO format).
             time_max: End time (exclusive, ISO format).
-            query: Free text search query.
+            query: Free text search query. With use_mirror, matches whole words, 'prefix*'
+                and '"exact phrases"' from a local full-text index.
             max_results: Maximum number of events to return (default 50).
+            use_mirror: Answer from the locally synced mirror (fast for repeated queries).
+            cursor: 'next_cursor' from a previous call, to fetch the following page.
+            fields: Return only some event fields: 'timing-only' (id, status, start, end),
+                'summary', 'attendees', or a Google field mask such as 'id,summary,start'.
         """
         try:
             params = {"max_results": max_results}
+            if use_mirror:
+                params["use_mirror"] = "true"
+            if cursor:
+                params["cursor"] = cursor
+            if fields:
+                params["fields"] = fields
             if time_min:
                 params["time_min"] = time_min
             if time_max:
@@ -62,7 +82,7 @@ def create_mcp_server():
             if query:
                 params["q"] = query
             
-            response = requests.get(f"{BASE_URL}/calendars/{calendar_id}/events", params=params)
+            response = await http_client.get(f"{BASE_URL}/calendars/{calendar_id}/events", params=params)
             if response.status_code != 200:
                 error_msg = f"Error: {response.status_code} - {response.text}"
                 logger.error(error_msg)
@@ -74,6 +94,54 @@ def create_mcp_server():
             logger.error(error_msg, exc_info=True)
             return json.dumps({"error": error_msg})
 
+    @mcp.tool()
+    async def find_events_all_calendars(time_min: str = None, time_max: str = None,
+                                        query: str = None, calendar_ids: List[str] = None,
+                                        min_access_role: str = None,
+                                        max_results_per_calendar: int = 250,
+                                        use_mirror: bool = False, fields: str = None) -> str:
+        """Find events across all calendars (or the given ones) at once, merged by start time.
+        Each event carries the calendar it came from in 'sourceCalendarId'.
+
+        Args:
+            time_min: Start time (inclusive, ISO format).
+            time_max: End time (exclusive, ISO format).
+            query: Free text search query.
+            calendar_ids: Calendars to search (default: every calendar in the calendar list).
+            min_access_role: Only search calendars with at least this role ('freeBusyReader', 'reader', 'writer', 'owner').
+            max_results_per_calendar: Maximum events taken from each calendar (default 250).
+            use_mirror: Answer from the locally synced mirrors (fast for repeated queries).
+            fields: Return only some event fields ('timing-only', 'summary', 'attendees' or a field mask).
+        """
+        try:
+            params = {"max_results_per_calendar": max_results_per_calendar}
+            if use_mirror:
+                params["use_mirror"] = "true"
+            if fields:
+                params["fields"] = fields
+            if time_min:
+                params["time_min"] = time_min
+            if time_max:
+                params["time_max"] = time_max
+            if query:
+                params["q"] = query
+            if calendar_ids:
+                params["calendar_ids"] = calendar_ids
+            if min_access_role:
+                params["min_access_role"] = min_access_role
+
+            response = await http_client.get(f"{BASE_URL}/events", params=params)
+            if response.status_code != 200:
+                error_msg = f"Error: {response.status_code} - {response.text}"
+                logger.error(error_msg)
+                return json.dumps({"error": error_msg})
+
+            return json.dumps(response.json(), indent=2)
+        except Exception as e:
+            error_msg = f"An error occurred: {str(e)}"
+            logger.error(error_msg, exc_info=True)
+            return json.dumps({"error": error_msg})
+
     @mcp.tool()
     async def create_event(calendar_id: str, summary: str, start_time: str, 
                           end_time: str, description: str = None,
@@ -104,7 +172,7 @@ def create_mcp_server():
             if attendee_emails:
                 data["attendees"] = attendee_emails
             
-            response = requests.post(
+            response = await http_client.post(
                 f"{BASE_URL}/calendars/{calendar_id}/events", 
                 json=data
             )
@@ -129,7 +197,7 @@ def create_mcp_server():
         """
         try:
             data = {"text": text}
-            response = requests.post(
+            response = await http_client.post(
                 f"{BASE_URL}/calendars/{calendar_id}/events/quickAdd", 
                 json=data
             )
@@ -172,7 +240,7 @@ def create_mcp_server():
             if location:
                 data["location"] = location
             
-            response = requests.patch(
+            response = await http_client.patch(
                 f"{BASE_URL}/calendars/{calendar_id}/events/{event_id}", 
                 json=data
             )
@@ -196,7 +264,7 @@ def create_mcp_server():
             event_id: Event identifier.
         """
         try:
-            response = requests.delete(f"{BASE_URL}/calendars/{calendar_id}/events/{event_id}")
+            response = await http_client.delete(f"{BASE_URL}/calendars/{calendar_id}/events/{event_id}")
             if response.status_code != 204:
                 error_msg = f"Error: {response.status_code} - {response.text}"
                 logger.error(error_msg)
@@ -219,7 +287,7 @@ def create_mcp_server():
         """
         try:
             data = {"attendee_emails": attendee_emails}
-            response = requests.post(
+            response = await http_client.post(
                 f"{BASE_URL}/calendars/{calendar_id}/events/{event_id}/attendees", 
                 json=data
             )
@@ -252,7 +320,7 @@ def create_mcp_server():
             if attendee_emails:
                 data["attendee_emails"] = attendee_emails
             
-            response = requests.post(f"{BASE_URL}/events/check_attendee_status", json=data)
+            response = await http_client.post(f"{BASE_URL}/events/check_attendee_status", json=data)
             if response.status_code != 200:
                 error_msg = f"Error: {response.status_code} - {response.text}"
                 logger.error(error_msg)
@@ -279,7 +347,7 @@ def create_mcp_server():
                 "time_max": time_max,
                 "items": [{"id": cal_id} for cal_id in calendar_ids]
             }
-            response = requests.post(f"{BASE_URL}/freeBusy", json=data)
+            response = await http_client.post(f"{BASE_URL}/freeBusy", json=data)
             if response.status_code != 200:
                 error_msg = f"Error: {response.status_code} - {response.text}"
                 logger.error(error_msg)
@@ -320,7 +388,7 @@ def create_mcp_server():
             if description:
                 data["event_details"]["description"] = description
             
-            response = requests.post(f"{BASE_URL}/schedule_mutual", json=data)
+            response = await http_client.post(f"{BASE_URL}/schedule_mutual", json=data)
             if response.status_code != 201:
                 error_msg = f"Error: {response.status_code} - {response.text}"
                 logger.error(error_msg)
@@ -333,21 +401,35 @@ def create_mcp_server():
             return json.dumps({"error": error_msg})
     
     @mcp.tool()
-    async def analyze_busyness(time_min: str, time_max: str, calendar_id: str = "primary") -> str:
-        """Analyzes event count and total duration per day within a specified time window.
+    async def analyze_busyness(time_min: str, time_max: str, calendar_id: str = "primary",
+                               use_mirror: bool = False, bucket: str = "day",
+                               time_zone: str = None, calendar_ids: List[str] = None) -> str:
+        """Analyzes event count and total duration per day, hour of day or weekday within a time window.
         
         Args:
             time_min: Start of the analysis window (ISO format).
             time_max: End of the analysis window (ISO format).
             calendar_id: Calendar identifier (default: primary).
+            use_mirror: Read from the locally synced mirror (fast for repeated queries).
+            bucket: 'day' (per date), 'hour' (busiest hours of the day) or 'weekday' (busiest weekdays).
+            time_zone: IANA time zone for day/hour boundaries (default: the first calendar's).
+            calendar_ids: Analyze several calendars together (summed) instead of calendar_id.
+        
+        The result reports the pages and events consumed per calendar, and calendars that failed.
         """
         try:
             data = {
                 "time_min": time_min,
                 "time_max": time_max,
-                "calendar_id": calendar_id
+                "calendar_id": calendar_id,
+                "use_mirror": use_mirror,
+                "bucket": bucket
             }
-            response = requests.post(f"{BASE_URL}/analyze_busyness", json=data)
+            if time_zone:
+                data["time_zone"] = time_zone
+            if calendar_ids:
+                data["calendar_ids"] = calendar_ids
+            response = await http_client.post(f"{BASE_URL}/analyze_busyness", json=data)
             if response.status_code != 200:
                 error_msg = f"Error: {response.status_code} - {response.text}"
                 logger.error(error_msg)
@@ -361,7 +443,8 @@ def create_mcp_server():
     
     # --- Gmail tools ---
     @mcp.tool()
-    async def gmail_list_messages(q: str = None, max_results: int = 50, label_ids: List[str] = None, user_id: str = 'me') -> str:
+    async def gmail_list_messages(q: str = None, max_results: int = 50, label_ids: List[str] = None, user_id: str = 'me',
+                                  hydrate: bool = False, metadata_headers: List[str] = None) -> str:
         """List Gmail messages for the user.
         
         Args:
@@ -369,6 +452,8 @@ def create_mcp_server():
             max_results: Maximum messages to return (1-500)
             label_ids: Optional list of label IDs (e.g., ['INBOX','UNREAD'] or custom 'Label_XXXX')
             user_id: Gmail user id; 'me' refers to the authenticated user
+            hydrate: Return each message's labels, snippet and headers instead of only IDs
+            metadata_headers: Headers to include when hydrating (default From, To, Subject, Date)
         """
         try:
             params: Dict[str, Any] = {"max_results": max_results, "user_id": user_id}
@@ -377,7 +462,11 @@ def create_mcp_server():
             if label_ids:
                 for lid in label_ids:
                     params.setdefault('label_ids', []).append(lid)
-            resp = requests.get(f"{BASE_URL}/gmail/messages", params=params)
+            if hydrate:
+                params["hydrate"] = "true"
+                if metadata_headers:
+                    params["metadata_headers"] = metadata_headers
+            resp = await http_client.get(f"{BASE_URL}/gmail/messages", params=params)
             if resp.status_code != 200:
                 return json.dumps({"error": f"{resp.status_code}: {resp.text}"})
             return json.dumps(resp.json(), indent=2)
@@ -386,17 +475,20 @@ def create_mcp_server():
             return json.dumps({"error": str(e)})
 
     @mcp.tool()
-    async def gmail_get_message(message_id: str, format: str = 'full', user_id: str = 'me') -> str:
+    async def gmail_get_message(message_id: str, format: str = 'full', user_id: str = 'me', fields: str = None) -> str:
         """Get a Gmail message.
         
         Args:
             message_id: Gmail message ID
             format: One of 'minimal','full','raw','metadata'
             user_id: Gmail user id; 'me' refers to the authenticated user
+            fields: Return only some fields: 'ids', 'labels', 'headers', or a field mask such as 'id,snippet'
         """
         try:
             params = {"format": format, "user_id": user_id}
-            resp = requests.get(f"{BASE_URL}/gmail/messages/{message_id}", params=params)
+            if fields:
+                params["fields"] = fields
+            resp = await http_client.get(f"{BASE_URL}/gmail/messages/{message_id}", params=params)
             if resp.status_code != 200:
                 return json.dumps({"error": f"{resp.status_code}: {resp.text}"})
             return json.dumps(resp.json(), indent=2)
@@ -414,7 +506,7 @@ def create_mcp_server():
         """
         try:
             data = {"raw": raw_base64url, "user_id": user_id}
-            resp = requests.post(f"{BASE_URL}/gmail/messages:sendRaw", json=data)
+            resp = await http_client.post(f"{BASE_URL}/gmail/messages:sendRaw", json=data)
             if resp.status_code != 200:
                 return json.dumps({"error": f"{resp.status_code}: {resp.text}"})
             return json.dumps(resp.json(), indent=2)
@@ -441,7 +533,7 @@ def create_mcp_server():
                 "body_text": body_text,
                 "user_id": user_id,
             }
-            resp = requests.post(f"{BASE_URL}/gmail/messages:composeAndSend", json=data)
+            resp = await http_client.post(f"{BASE_URL}/gmail/messages:composeAndSend", json=data)
             if resp.status_code != 200:
                 return json.dumps({"error": f"{resp.status_code}: {resp.text}"})
             return json.dumps(resp.json(), indent=2)
@@ -465,7 +557,7 @@ def create_mcp_server():
                 data["add_labels"] = add_labels
             if remove_labels is not None:
                 data["remove_labels"] = remove_labels
-            resp = requests.post(f"{BASE_URL}/gmail/messages/{message_id}:modify", json=data)
+            resp = await http_client.post(f"{BASE_URL}/gmail/messages/{message_id}:modify", json=data)
             if resp.status_code != 200:
                 return json.dumps({"error": f"{resp.status_code}: {resp.text}"})
             return json.dumps(resp.json(), indent=2)
@@ -473,6 +565,51 @@ def create_mcp_server():
             logger.error("gmail_modify_labels error", exc_info=True)
             return json.dumps({"error": str(e)})
 
+    @mcp.tool()
+    async def gmail_bulk_modify_labels(message_ids: List[str] = None, query: str = None, label_ids: List[str] = None,
+                                       add_labels: List[str] = None, remove_labels: List[str] = None,
+                                       max_messages: int = None, user_id: str = 'me', ctx: Context = None) -> str:
+        """Add and/or remove labels on many messages at once (up to 1000 per Gmail call).
+
+        Sends an MCP progress notification (messages modified out of messages matched) after
+        each Gmail call.
+        
+        Args:
+            message_ids: Explicit message IDs to modify (use this or query/label_ids)
+            query: Gmail search query selecting the messages (e.g., 'from:alerts@example.com older_than:30d')
+            label_ids: Only select messages with all of these label IDs
+            add_labels: Labels to add (e.g., ['Label_XXXX'])
+            remove_labels: Labels to remove (e.g., ['INBOX','UNREAD'])
+            max_messages: Optional cap on the number of messages modified
+            user_id: Gmail user id; 'me' refers to the authenticated user
+        """
+        try:
+            data: Dict[str, Any] = {"user_id": user_id}
+            for key, value in (("message_ids", message_ids), ("query", query), ("label_ids", label_ids),
+                               ("add_labels", add_labels), ("remove_labels", remove_labels), ("max_messages", max_messages)):
+                if value is not None:
+                    data[key] = value
+            report: Dict[str, Any] = {}
+            async with http_client.stream("POST", f"{BASE_URL}/gmail/messages:batchModify:stream", json=data) as resp:
+                if resp.status_code != 200:
+                    await resp.aread()
+                    return json.dumps({"error": f"{resp.status_code}: {resp.text}"})
+                async for line in resp.aiter_lines():
+                    if not line:
+                        continue
+                    batches = report.get('batches', 0)
+                    report = json.loads(line)
+                    # The final report repeats the last batch's progress
+                    if ctx is not None and report.get('batches', 0) > batches:
+                        await ctx.report_progress(report['modified'], report['matched'] or None)
+            if not report.get('completed'):
+                # Part of the selection may already be modified; return the progress so the caller can resume
+                return json.dumps({**report, "error": report.get('error') or "Bulk label modification stopped early"}, indent=2)
+            return json.dumps(report, indent=2)
+        except Exception as e:
+            logger.error("gmail_bulk_modify_labels error", exc_info=True)
+            return json.dumps({"error": str(e)})
+
     @mcp.tool()
     async def gmail_list_labels(user_id: str = 'me') -> str:
         """List Gmail labels for the user.
@@ -482,7 +619,7 @@ def create_mcp_server():
         """
         try:
             params = {"user_id": user_id}
-            resp = requests.get(f"{BASE_URL}/gmail/labels", params=params)
+            resp = await http_client.get(f"{BASE_URL}/gmail/labels", params=params)
             if resp.status_code != 200:
                 return json.dumps({"error": f"{resp.status_code}: {resp.text}"})
             return json.dumps(resp.json(), indent=2)
@@ -1,8 +1,34 @@
 import datetime # Import the module itself
-from pydantic import BaseModel, Field, EmailStr
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, EmailStr, ValidationInfo, WrapValidator, field_validator
+from typing import Optional, List, Dict, Any, Annotated, Literal
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 # from datetime import datetime, date # Keep original import commented for reference
 
+# --- Trusted Construction ---
+# Resources that come straight from a Google API response are validated with
+# GoogleResource.from_google(), which passes TRUSTED_CONTEXT. Under that context GoogleEmailStr
+# skips email syntax checks: Google already validated those addresses, and the check dominates
+# the cost of validating large event lists (every creator, organizer and attendee). All other
+# fields are validated and coerced as usual, so the models look the same either way.
+# Client-supplied request bodies are validated without the context and stay strict.
+
+TRUSTED_CONTEXT = {'trusted_source': 'google'}
+
+def _validate_email_unless_trusted(value: Any, handler, info: ValidationInfo) -> Any:
+    if isinstance(value, str) and info.context and info.context.get('trusted_source'):
+        return value
+    return handler(value)
+
+GoogleEmailStr = Annotated[EmailStr, WrapValidator(_validate_email_unless_trusted)]
+
+class GoogleResource(BaseModel):
+    """Base for models of Google API resources; adds the trusted construction path."""
+
+    @classmethod
+    def from_google(cls, data: Dict[str, Any]):
+        """Builds the model from an API response, skipping checks Google has already done."""
+        return cls.model_validate(data, context=TRUSTED_CONTEXT)
+
 # Based on Google Calendar API v3 Event resource documentation:
 # https://developers.google.com/calendar/api/v3/reference/events#resource
 
@@ -19,7 +45,7 @@ class EventDateTime(BaseModel):
 class EventAttendee(BaseModel):
     """Represents an attendee of an event."""
     id: Optional[str] = None
-    email: Optional[EmailStr] = None
+    email: Optional[GoogleEmailStr] = None
     displayName: Optional[str] = None  # Renamed from 'display_name'
     organizer: Optional[bool] = None
     self: Optional[bool] = None
@@ -36,7 +62,7 @@ class EventAttendee(BaseModel):
 class EventCreator(BaseModel):
     """Represents the creator of an event."""
     id: Optional[str] = None
-    email: Optional[EmailStr] = None
+    email: Optional[GoogleEmailStr] = None
     display_name: Optional[str] = Field(None, alias='displayName')
     self: Optional[bool] = None # Whether the creator corresponds to the calendar on which this copy of the event appears.
 
@@ -46,7 +72,7 @@ class EventCreator(BaseModel):
 class EventOrganizer(BaseModel):
     """Represents the organizer of an event."""
     id: Optional[str] = None
-    email: Optional[EmailStr] = None
+    email: Optional[GoogleEmailStr] = None
     display_name: Optional[str] = Field(None, alias='displayName')
     self: Optional[bool] = None # Whether the organizer corresponds to the calendar on which this copy of the event appears.
 
@@ -71,9 +97,10 @@ class EventReminders(BaseModel):
 
 # --- Main Event Model --- 
 
-class GoogleCalendarEvent(BaseModel):
+class GoogleCalendarEvent(GoogleResource):
     """Pydantic model representing a Google Calendar event resource."""
     kind: str = "calendar#event"
+    etag: Optional[str] = Field(None, description="ETag of the resource; changes whenever the event does.")
     id: Optional[str] = Field(None, description="Opaque identifier of the event.")
     status: Optional[str] = Field(None, description="Status of the event ('confirmed', 'tentative', 'cancelled').")
     html_link: Optional[str] = Field(None, alias='htmlLink', description="URL for the event in the Google Calendar UI.")
@@ -144,7 +171,7 @@ class NotificationSettings(BaseModel):
     class Config:
         populate_by_name = True # Changed from allow_population_by_field_name
 
-class CalendarListEntry(BaseModel):
+class CalendarListEntry(GoogleResource):
     """Represents an entry in the user's calendar list."""
     kind: str = "calendar#calendarListEntry"
     etag: str
@@ -165,7 +192,7 @@ class CalendarListEntry(BaseModel):
     primary: Optional[bool] = None
     deleted: Optional[bool] = None
 
-class CalendarListResponse(BaseModel):
+class CalendarListResponse(GoogleResource):
     """Response containing a list of calendars."""
     kind: str = "calendar#calendarList"
     items: List[CalendarListEntry] = []
@@ -173,7 +200,7 @@ class CalendarListResponse(BaseModel):
     nextSyncToken: Optional[str] = None
 
 # Re-inserting EventsResponse definition
-class EventsResponse(BaseModel):
+class EventsResponse(GoogleResource):
     """Response containing a list of events."""
     kind: str = "calendar#events"
     summary: Optional[str] = None
@@ -185,6 +212,18 @@ class EventsResponse(BaseModel):
     items: List[GoogleCalendarEvent] = []
     nextPageToken: Optional[str] = None
     nextSyncToken: Optional[str] = None
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor for the next page (pass as `cursor`); absent on the last page.")
+
+class MultiCalendarEvent(GoogleCalendarEvent):
+    """An event found by a multi-calendar search, tagged with the calendar it came from."""
+    source_calendar_id: str = Field(..., alias='sourceCalendarId', description="ID of the calendar the event was found in.")
+
+class MultiCalendarEventsResponse(BaseModel):
+    """Events from several calendars, merged into one list ordered by start time."""
+    items: List[MultiCalendarEvent] = []
+    calendars_searched: List[str] = Field([], description="Calendars that were searched successfully.")
+    errors: Dict[str, str] = Field({}, description="Calendars that failed or timed out, mapped to the reason.")
+    truncated: List[str] = Field([], description="Calendars with more matching events than max_results_per_calendar.")
 
 class CalendarList(BaseModel):
     """Represents the user's list of calendars."""
@@ -263,7 +302,8 @@ class ProjectRecurringRequest(BaseModel):
     time_min: datetime.datetime
     time_max: datetime.datetime
     calendar_id: str = 'primary'
-    event_query: Optional[str] = None
+    event_query: Optional[str] = Field(None, description="Text query selecting master recurring events; with use_mirror, answered from the local full-text index")
+    use_mirror: bool = Field(False, description="Read from the incrementally synced local mirror instead of Google")
 
 # Define ProjectedEventOccurrence within models.py for consistency
 class ProjectedEventOccurrenceModel(BaseModel):
@@ -280,11 +320,64 @@ class AnalyzeBusynessRequest(BaseModel):
     time_min: datetime.datetime
     time_max: datetime.datetime
     calendar_id: str = 'primary'
+    calendar_ids: Optional[List[str]] = Field(None, description="Analyze these calendars together (summed), instead of calendar_id")
+    use_mirror: bool = Field(False, description="Read from the incrementally synced local mirror instead of Google")
+    bucket: Literal['day', 'hour', 'weekday'] = Field('day', description="Bucket size: 'day' (per date), 'hour' (hour-of-day profile) or 'weekday' (weekday profile)")
+    time_zone: Optional[str] = Field(None, description="IANA time zone for day/hour boundaries (default: the time zone of the first calendar)")
+
+    @field_validator('time_zone')
+    @classmethod
+    def _known_time_zone(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None:
+            try:
+                ZoneInfo(value)
+            except (ZoneInfoNotFoundError, ValueError):
+                raise ValueError(f"Unknown time zone '{value}'")
+        return value
 
 class DailyBusynessStats(BaseModel):
     event_count: int
     total_duration_minutes: float
 
+class BusynessSourceStats(BaseModel):
+    pages: int = Field(..., description="Pages of events fetched from Google (0 for mirror reads)")
+    events: int = Field(..., description="Event instances folded into the totals")
+
 class AnalyzeBusynessResponse(BaseModel):
+    bucket: str = 'day'
+    time_zone: Optional[str] = Field(None, description="Time zone of the day/hour boundaries")
+    calendars: Dict[str, BusynessSourceStats] = Field(default_factory=dict, description="Pages and events consumed per analyzed calendar")
+    errors: Dict[str, str] = Field(default_factory=dict, description="Calendars that could not be read (left out of the totals), with the reason")
+    pages_fetched: int = 0
+    events_analyzed: int = 0
     # Use string representation for date keys in JSON
-    busyness_by_date: Dict[str, DailyBusynessStats] = Field(..., description="Mapping of date string (YYYY-MM-DD) to busyness stats") 
\ No newline at end of file
+    busyness_by_date: Optional[Dict[str, DailyBusynessStats]] = Field(None, description="bucket='day': mapping of date string (YYYY-MM-DD) to busyness stats, for days with events")
+    busyness_by_bucket: Optional[Dict[str, DailyBusynessStats]] = Field(None, description="bucket='hour' ('00:00'-'23:00') or 'weekday' ('Monday'-'Sunday'): busyness stats for every bucket")
+
+# --- Push Notifications ---
+class WatchRequest(BaseModel):
+    kind: str = Field('calendar', description="'calendar' (events.watch) or 'gmail' (users.watch)")
+    calendar_id: str = Field('primary', description="Calendar to watch (kind='calendar')")
+    ttl_seconds: Optional[int] = Field(None, ge=60, description="Requested channel lifetime (kind='calendar'; default PUSH_CHANNEL_TTL)")
+    topic_name: Optional[str] = Field(None, description="Pub/Sub topic (kind='gmail'; default GMAIL_PUSH_TOPIC)")
+    label_ids: Optional[List[str]] = Field(None, description="Only notify for changes to these labels (kind='gmail')")
+    user_id: str = 'me'
+
+class WatchChannelInfo(BaseModel):
+    kind: str
+    channel_id: str
+    calendar_id: Optional[str] = None
+    user_id: Optional[str] = None
+    resource_id: Optional[str] = None
+    expiration: Optional[datetime.datetime] = None
+    history_id: Optional[str] = None
+    ttl_seconds: Optional[int] = None
+    topic_name: Optional[str] = None
+    label_ids: Optional[List[str]] = None
+    notifications: int = 0
+    last_notified: Optional[datetime.datetime] = None
+    renewal_error: Optional[str] = None
+    synced_history_id: Optional[str] = None
+    history_changes: Optional[Dict[str, int]] = None
+    history_resets: int = 0
+    last_history_sync: Optional[datetime.datetime] = None
@@ -0,0 +1,533 @@
+import asyncio
+import base64
+import json
+import logging
+import os
+import secrets
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Tuple
+
+from googleapiclient.errors import HttpError
+from google.oauth2.credentials import Credentials
+
+from .google_services import get_service
+from .async_google_client import get_async_client
+from . import calendar_sync
+
+logger = logging.getLogger(__name__)
+
+# --- Push Notifications ---
+# Watch channels let Google tell the server about changes instead of the server polling.
+#
+# Calendar: events().watch() registers a web_hook channel for one calendar. Google POSTs an
+# empty notification with X-Goog-* headers to PUSH_NOTIFICATION_ADDRESS + /notifications/calendar
+# whenever the calendar's events change. The receiver marks the calendar's mirrors stale and
+# syncs them in the background (one incremental syncToken sync per burst of notifications).
+#
+# Gmail: users().watch() publishes changes to a Cloud Pub/Sub topic (GMAIL_PUSH_TOPIC). A push
+# subscription on that topic should deliver to /notifications/gmail (append ?token=<GMAIL_PUSH_TOKEN>
+# to the subscription endpoint if set). The receiver records the mailbox's latest historyId and
+# reads users().history().list() from the last synced historyId in the background, tallying the
+# changes per channel. Nothing in the server caches Gmail data, so there is nothing to invalidate;
+# the history sync is what keeps the channel's synced_history_id current.
+#
+# Channels expire (Calendar: PUSH_CHANNEL_TTL, Gmail: 7 days). A background task renews channels
+# that expire within PUSH_RENEW_BEFORE seconds: Calendar channels are replaced by a new channel
+# (created before the old one is stopped, so no change is missed), Gmail watches are re-issued.
+# Renewals reuse the options each channel was opened with (address/TTL, topic/labels).
+# Channels are kept in memory and stopped on shutdown; PUSH_WATCH_CALENDARS and GMAIL_PUSH_TOPIC
+# recreate them on startup.
+#
+# Configuration (environment variables):
+#   PUSH_NOTIFICATION_ADDRESS: Public HTTPS base URL of this server (required for Calendar watches).
+#   PUSH_WATCH_CALENDARS: Comma-separated calendar IDs to watch on startup.
+#   PUSH_CHANNEL_TTL: Requested Calendar channel lifetime in seconds (default 604800, 7 days).
+#   PUSH_CHANNEL_TOKEN: Shared verification token for Calendar channels (default: random per channel).
+#   PUSH_RENEW_BEFORE: Renew channels expiring within this many seconds (default 3600).
+#   PUSH_RENEW_INTERVAL: Seconds between renewal checks (default 300).
+#   GMAIL_PUSH_TOPIC: Pub/Sub topic for Gmail watches (projects/<project>/topics/<topic>).
+#   GMAIL_PUSH_TOKEN: If set, Gmail notifications must carry ?token=<value>.
+#
+# scripts/simulate_push_notifications.py posts synthetic notifications for local testing.
+
+PUSH_NOTIFICATION_ADDRESS = os.getenv('PUSH_NOTIFICATION_ADDRESS', '').rstrip('/')
+PUSH_WATCH_CALENDARS = [c.strip() for c in os.getenv('PUSH_WATCH_CALENDARS', '').split(',') if c.strip()]
+PUSH_CHANNEL_TTL = int(os.getenv('PUSH_CHANNEL_TTL', 7 * 24 * 3600))
+PUSH_CHANNEL_TOKEN = os.getenv('PUSH_CHANNEL_TOKEN', '')
+PUSH_RENEW_BEFORE = float(os.getenv('PUSH_RENEW_BEFORE', 3600))
+PUSH_RENEW_INTERVAL = float(os.getenv('PUSH_RENEW_INTERVAL', 300))
+GMAIL_PUSH_TOPIC = os.getenv('GMAIL_PUSH_TOPIC', '')
+GMAIL_PUSH_TOKEN = os.getenv('GMAIL_PUSH_TOKEN', '')
+
+CALENDAR_RECEIVER_PATH = '/notifications/calendar'
+GMAIL_RECEIVER_PATH = '/notifications/gmail'
+GMAIL_HISTORY_TYPES = ('messagesAdded', 'messagesDeleted', 'labelsAdded', 'labelsRemoved')
+
+
+class PushNotificationError(Exception):
+    """Raised when a notification cannot be accepted (unknown channel or bad token)."""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class WatchChannel:
+    """An active Calendar events() channel or Gmail users() watch."""
+
+    def __init__(
+        self,
+        kind: str,
+        channel_id: str,
+        expiration: Optional[datetime],
+        calendar_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        resource_id: Optional[str] = None,
+        token: Optional[str] = None,
+        history_id: Optional[str] = None,
+        address: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+        topic_name: Optional[str] = None,
+        label_ids: Optional[List[str]] = None,
+        synced_history_id: Optional[str] = None
+    ):
+        self.kind = kind # 'calendar' or 'gmail'
+        self.channel_id = channel_id
+        self.expiration = expiration
+        self.calendar_id = calendar_id
+        self.user_id = user_id
+        self.resource_id = resource_id
+        self.token = token
+        self.history_id = history_id
+        # The options the channel was opened with, reused when it is renewed
+        self.address = address # Calendar receiver URL
+        self.ttl_seconds = ttl_seconds # Requested Calendar channel lifetime
+        self.topic_name = topic_name # Gmail Pub/Sub topic
+        self.label_ids = label_ids # Gmail label filter
+        self.notifications = 0
+        self.last_message_number = 0
+        self.last_notified: Optional[datetime] = None
+        self.renewal_error: Optional[str] = None # Why the last renewal attempt failed
+        # Gmail history sync state: changes are read from synced_history_id onwards
+        self.synced_history_id = synced_history_id
+        self.history_changes: Optional[Dict[str, int]] = dict.fromkeys(GMAIL_HISTORY_TYPES, 0) if kind == 'gmail' else None
+        self.history_resets = 0 # Times the synced historyId had expired and was reset
+        self.last_history_sync: Optional[datetime] = None
+
+    def expires_within(self, seconds: float) -> bool:
+        return self.expiration is not None and (self.expiration.timestamp() - time.time()) <= seconds
+
+    def info(self) -> Dict[str, Any]:
+        """Returns the channel's public state (without its verification token)."""
+        return {
+            'kind': self.kind,
+            'channel_id': self.channel_id,
+            'calendar_id': self.calendar_id,
+            'user_id': self.user_id,
+            'resource_id': self.resource_id,
+            'expiration': self.expiration,
+            'history_id': self.history_id,
+            'ttl_seconds': self.ttl_seconds,
+            'topic_name': self.topic_name,
+            'label_ids': self.label_ids,
+            'notifications': self.notifications,
+            'last_notified': self.last_notified,
+            'renewal_error': self.renewal_error,
+            'synced_history_id': self.synced_history_id,
+            'history_changes': self.history_changes,
+            'history_resets': self.history_resets,
+            'last_history_sync': self.last_history_sync,
+        }
+
+
+def _parse_expiration(value: Optional[str]) -> Optional[datetime]:
+    """Parses an expiration in milliseconds since the epoch, as returned by watch calls."""
+    return datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc) if value else None
+
+
+# --- Channel Registry ---
+
+_channels: Dict[str, WatchChannel] = {}
+_pending_syncs: Dict[Any, asyncio.Task] = {} # id(mirror) or Gmail channel ID -> background sync task
+_resync_requested: set = set() # Keys notified again while their sync was running
+
+
+def get_channels() -> List[WatchChannel]:
+    return list(_channels.values())
+
+
+def get_channel(channel_id: str) -> Optional[WatchChannel]:
+    return _channels.get(channel_id)
+
+
+def register_channel(channel: WatchChannel) -> WatchChannel:
+    """Adds a channel to the registry (used by the watch calls, and by local tests to register synthetic channels)."""
+    _channels[channel.channel_id] = channel
+    return channel
+
+# --- Watch Management ---
+
+async def watch_calendar(
+    credentials: Credentials,
+    calendar_id: str = 'primary',
+    address: Optional[str] = None,
+    ttl_seconds: int = PUSH_CHANNEL_TTL
+) -> WatchChannel:
+    """Opens a web_hook channel for a calendar's events.
+
+    Args:
+        credentials: Valid Google OAuth2 credentials.
+        calendar_id: Calendar to watch.
+        address: Receiver URL. Defaults to PUSH_NOTIFICATION_ADDRESS + /notifications/calendar.
+        ttl_seconds: Requested channel lifetime (Google may grant less).
+
+    Raises:
+        ValueError: If no receiver address is configured.
+        googleapiclient.errors.HttpError: If Google rejects the watch (e.g., unverified domain).
+    """
+    address = address or (PUSH_NOTIFICATION_ADDRESS + CALENDAR_RECEIVER_PATH if PUSH_NOTIFICATION_ADDRESS else None)
+    if not address:
+        raise ValueError("PUSH_NOTIFICATION_ADDRESS is not set; cannot open a Calendar watch channel.")
+    service = get_service('calendar', 'v3', credentials)
+    token = PUSH_CHANNEL_TOKEN or secrets.token_urlsafe(32)
+    body = {
+        'id': str(uuid.uuid4()),
+        'type': 'web_hook',
+        'address': address,
+        'token': token,
+        'params': {'ttl': str(ttl_seconds)},
+    }
+    result = await get_async_client(credentials).execute(service.events().watch(calendarId=calendar_id, body=body))
+    channel = register_channel(WatchChannel(
+        kind='calendar',
+        channel_id=result['id'],
+        expiration=_parse_expiration(result.get('expiration')),
+        calendar_id=calendar_id,
+        resource_id=result.get('resourceId'),
+        token=token,
+        address=address,
+        ttl_seconds=ttl_seconds,
+    ))
+    logger.info(f"Watching calendar '{calendar_id}' on channel {channel.channel_id} (expires {channel.expiration}).")
+    return channel
+
+
+async def watch_gmail(
+    credentials: Credentials,
+    topic_name: str = GMAIL_PUSH_TOPIC,
+    user_id: str = 'me',
+    label_ids: Optional[List[str]] = None
+) -> WatchChannel:
+    """Starts (or re-issues) a Gmail watch publishing mailbox changes to a Pub/Sub topic.
+
+    Raises:
+        ValueError: If no topic is given.
+        googleapiclient.errors.HttpError: If Google rejects the watch (e.g., missing topic permissions).
+    """
+    if not topic_name:
+        raise ValueError("GMAIL_PUSH_TOPIC is not set; cannot start a Gmail watch.")
+    service = get_service('gmail', 'v1', credentials)
+    body: Dict[str, Any] = {'topicName': topic_name}
+    if label_ids:
+        body['labelIds'] = label_ids
+        body['labelFilterBehavior'] = 'include'
+    result = await get_async_client(credentials).execute(service.users().watch(userId=user_id, body=body))
+    # A mailbox has at most one watch; re-issuing it replaces the previous one
+    channel_id = f"gmail:{user_id}"
+    previous = _channels.get(channel_id)
+    channel = WatchChannel(
+        kind='gmail',
+        channel_id=channel_id,
+        expiration=_parse_expiration(result.get('expiration')),
+        user_id=user_id,
+        history_id=result.get('historyId'),
+        topic_name=topic_name,
+        label_ids=label_ids,
+        synced_history_id=result.get('historyId'),
+    )
+    if previous is not None and previous.kind == 'gmail':
+        # Keep syncing from where the previous watch left off, so changes in between are not skipped
+        channel.synced_history_id = previous.synced_history_id or channel.synced_history_id
+        channel.history_changes = previous.history_changes
+        channel.history_resets = previous.history_resets
+        channel.last_history_sync = previous.last_history_sync
+        channel.notifications = previous.notifications
+        channel.last_notified = previous.last_notified
+    register_channel(channel)
+    logger.info(f"Watching Gmail mailbox '{user_id}' via {topic_name} (historyId {channel.history_id}, expires {channel.expiration}).")
+    return channel
+
+
+async def stop_channel(credentials: Credentials, channel: WatchChannel) -> None:
+    """Stops a channel at Google and removes it from the registry.
+
+    Raises:
+        googleapiclient.errors.HttpError: If the stop call fails (the channel is still removed locally).
+    """
+    _channels.pop(channel.channel_id, None)
+    client = get_async_client(credentials)
+    if channel.kind == 'calendar':
+        service = get_service('calendar', 'v3', credentials)
+        await client.execute(service.channels().stop(body={'id': channel.channel_id, 'resourceId': channel.resource_id}))
+    else:
+        service = get_service('gmail', 'v1', credentials)
+        await client.execute(service.users().stop(userId=channel.user_id))
+    logger.info(f"Stopped {channel.kind} channel {channel.channel_id}.")
+
+
+async def stop_all_channels(credentials: Credentials) -> None:
+    """Stops every registered channel, logging (not raising) failures."""
+    for channel in get_channels():
+        try:
+            await stop_channel(credentials, channel)
+        except Exception as e:
+            logger.warning(f"Could not stop {channel.kind} channel {channel.channel_id}: {e}")
+
+
+async def renew_expiring_channels(credentials: Credentials, renew_before: float = PUSH_RENEW_BEFORE) -> int:
+    """Renews channels that expire within renew_before seconds. Returns the number renewed.
+
+    Channels are re-opened with the options they were created with (receiver address and TTL,
+    or topic and label filter). A failed renewal is logged and recorded in the channel's
+    renewal_error (listed by GET /notifications/channels); it is retried on the next check.
+    """
+    renewed = 0
+    for channel in get_channels():
+        if not channel.expires_within(renew_before):
+            continue
+        try:
+            if channel.kind == 'calendar':
+                # Open the replacement first so no change falls between the two channels
+                await watch_calendar(
+                    credentials, channel.calendar_id, channel.address, channel.ttl_seconds or PUSH_CHANNEL_TTL
+                )
+                try:
+                    await stop_channel(credentials, channel)
+                except HttpError as e:
+                    logger.warning(f"Could not stop replaced channel {channel.channel_id}: {e}")
+            else:
+                await watch_gmail(credentials, channel.topic_name or GMAIL_PUSH_TOPIC, channel.user_id, channel.label_ids)
+            renewed += 1
+        except Exception as e:
+            channel.renewal_error = f"{type(e).__name__}: {e}"
+            logger.error(f"Failed to renew {channel.kind} channel {channel.channel_id} (expires {channel.expiration}): {e}", exc_info=True)
+    if renewed:
+        logger.info(f"Renewed {renewed} push notification channel(s).")
+    return renewed
+
+
+async def start_configured_watches(credentials: Credentials) -> None:
+    """Opens the channels configured by PUSH_WATCH_CALENDARS and GMAIL_PUSH_TOPIC, logging failures."""
+    if PUSH_WATCH_CALENDARS and PUSH_NOTIFICATION_ADDRESS:
+        for calendar_id in PUSH_WATCH_CALENDARS:
+            try:
+                await watch_calendar(credentials, calendar_id)
+            except Exception as e:
+                logger.error(f"Could not watch calendar '{calendar_id}': {e}")
+    elif PUSH_WATCH_CALENDARS:
+        logger.warning("PUSH_WATCH_CALENDARS is set but PUSH_NOTIFICATION_ADDRESS is not; skipping Calendar watches.")
+    if GMAIL_PUSH_TOPIC:
+        try:
+            await watch_gmail(credentials, GMAIL_PUSH_TOPIC)
+        except Exception as e:
+            logger.error(f"Could not start Gmail watch: {e}")
+
+
+async def run_renewal_loop(get_credentials: Callable[[], Awaitable[Credentials]], interval: float = PUSH_RENEW_INTERVAL) -> None:
+    """Renews expiring channels every `interval` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        if not _channels:
+            continue
+        try:
+            await renew_expiring_channels(await get_credentials())
+        except Exception as e:
+            logger.error(f"Push channel renewal check failed: {e}")
+
+# --- Receivers ---
+
+def _schedule_sync(key: Any, description: str, run: Callable[[], Awaitable[Any]]) -> bool:
+    """Starts run() as a background task. Returns whether a new task was started.
+
+    If a sync with the same key is already running, it may have read the data before this change,
+    so it is asked to run once more instead; any number of notifications during a sync cost one
+    extra sync.
+    """
+    if key in _pending_syncs:
+        _resync_requested.add(key)
+        return False
+
+    async def sync():
+        try:
+            while True:
+                _resync_requested.discard(key)
+                await run()
+                if key not in _resync_requested:
+                    break
+        except Exception as e:
+            # Mirrors stay stale, so their next read retries; the Gmail history is re-read on the next notification
+            logger.error(f"Background sync of {description} after a push notification failed: {e}")
+        finally:
+            _pending_syncs.pop(key, None)
+            _resync_requested.discard(key)
+
+    _pending_syncs[key] = asyncio.get_running_loop().create_task(sync())
+    return True
+
+
+def _schedule_mirror_sync(credentials: Credentials, mirror: calendar_sync.CalendarMirror) -> bool:
+    """Starts a background incremental sync of a mirror (see _schedule_sync)."""
+    return _schedule_sync(
+        id(mirror), f"mirror '{mirror.calendar_id}'", lambda: calendar_sync.async_sync_mirror(credentials, mirror)
+    )
+
+
+async def _list_history(credentials: Credentials, user_id: str, start_history_id: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Returns a mailbox's history records after start_history_id, and its current historyId.
+
+    Raises:
+        googleapiclient.errors.HttpError: 404 if start_history_id is too old to list from.
+    """
+    service = get_service('gmail', 'v1', credentials)
+    client = get_async_client(credentials)
+    records, latest, page_token = [], None, None
+    while True:
+        kwargs: Dict[str, Any] = {'userId': user_id, 'startHistoryId': start_history_id}
+        if page_token:
+            kwargs['pageToken'] = page_token
+        response = await client.execute(service.users().history().list(**kwargs))
+        records.extend(response.get('history', []))
+        latest = response.get('historyId', latest)
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return records, latest
+
+
+async def sync_gmail_history(credentials: Credentials, channel: WatchChannel) -> Dict[str, int]:
+    """Reads a Gmail channel's mailbox history since its synced_history_id and tallies the changes.
+
+    Returns the number of changes of each GMAIL_HISTORY_TYPES kind found by this run (also added
+    to channel.history_changes). Gmail keeps about a week of history; if synced_history_id has
+    expired (404), the channel restarts from the latest notified historyId and counts a reset.
+    """
+    counts = dict.fromkeys(GMAIL_HISTORY_TYPES, 0)
+    start = channel.synced_history_id or channel.history_id
+    if not start:
+        return counts
+    try:
+        records, latest = await _list_history(credentials, channel.user_id, start)
+    except HttpError as e:
+        if e.resp.status != 404:
+            raise
+        logger.warning(f"Gmail history of '{channel.user_id}' since {start} has expired; restarting from {channel.history_id}.")
+        channel.history_resets += 1
+        records, latest = [], channel.history_id
+    for record in records:
+        for history_type in GMAIL_HISTORY_TYPES:
+            counts[history_type] += len(record.get(history_type, []))
+    for history_type, count in counts.items():
+        channel.history_changes[history_type] += count
+    if latest and int(latest) > int(start):
+        channel.synced_history_id = str(latest)
+    channel.last_history_sync = datetime.now(timezone.utc)
+    logger.info(f"Synced Gmail history of '{channel.user_id}' from {start} to {channel.synced_history_id}: {counts}.")
+    return counts
+
+
+def _schedule_gmail_sync(get_credentials: Callable[[], Awaitable[Credentials]], channel_id: str) -> bool:
+    """Starts a background history sync of a Gmail channel (see _schedule_sync).
+
+    The channel is looked up when the sync runs, since a renewal may have replaced it meanwhile.
+    """
+    async def run():
+        channel = _channels.get(channel_id)
+        if channel is not None:
+            await sync_gmail_history(await get_credentials(), channel)
+
+    return _schedule_sync(channel_id, f"Gmail channel '{channel_id}'", run)
+
+
+def handle_calendar_notification(headers: Dict[str, str]) -> Dict[str, Any]:
+    """Processes a Calendar push notification (identified by its X-Goog-* headers).
+
+    Marks the calendar's mirrors stale and schedules an incremental sync for each. Must run
+    on the event loop. Header names must be lower-case.
+
+    Raises:
+        PushNotificationError: If the channel is unknown (404) or the token does not match (403).
+    """
+    channel_id = headers.get('x-goog-channel-id', '')
+    channel = _channels.get(channel_id)
+    if channel is None or channel.kind != 'calendar':
+        raise PushNotificationError(f"Unknown channel '{channel_id}'.", 404)
+    if not secrets.compare_digest(headers.get('x-goog-channel-token', ''), channel.token or ''):
+        raise PushNotificationError(f"Invalid token for channel '{channel_id}'.", 403)
+
+    state = headers.get('x-goog-resource-state', '')
+    try:
+        message_number = int(headers.get('x-goog-message-number', '0'))
+    except ValueError:
+        message_number = 0
+    channel.notifications += 1
+    channel.last_notified = datetime.now(timezone.utc)
+    if state == 'sync':
+        logger.info(f"Channel {channel_id} for calendar '{channel.calendar_id}' is active.")
+        return {'channel_id': channel_id, 'state': state, 'syncs_scheduled': 0}
+    if message_number and message_number <= channel.last_message_number:
+        logger.debug(f"Ignoring duplicate notification {message_number} on channel {channel_id}.")
+        return {'channel_id': channel_id, 'state': state, 'syncs_scheduled': 0}
+    channel.last_message_number = max(channel.last_message_number, message_number)
+
+    scheduled = 0
+    for credentials, mirror in calendar_sync.get_calendar_mirrors(channel.calendar_id):
+        mirror.mark_stale()
+        scheduled += _schedule_mirror_sync(credentials, mirror)
+    logger.info(f"Calendar '{channel.calendar_id}' changed ({state}); scheduled {scheduled} mirror sync(s).")
+    return {'channel_id': channel_id, 'state': state, 'syncs_scheduled': scheduled}
+
+
+def handle_gmail_notification(
+    envelope: Any,
+    token: Optional[str] = None,
+    get_credentials: Optional[Callable[[], Awaitable[Credentials]]] = None
+) -> Dict[str, Any]:
+    """Processes a Gmail notification delivered by a Pub/Sub push subscription.
+
+    Records the mailbox's latest historyId on the Gmail channels and, if get_credentials is given,
+    schedules a history sync for each (see sync_gmail_history); must then run on the event loop.
+
+    Pub/Sub redelivers every message that is not acknowledged with a 2xx, so malformed messages
+    and messages arriving while no Gmail watch is active are acknowledged and ignored (the
+    result carries 'ignored' with the reason) instead of being rejected.
+
+    Raises:
+        PushNotificationError: If the token is wrong (403).
+    """
+    if GMAIL_PUSH_TOKEN and not secrets.compare_digest(token or '', GMAIL_PUSH_TOKEN):
+        raise PushNotificationError("Invalid Gmail push token.", 403)
+    try:
+        data = json.loads(base64.b64decode(envelope['message']['data']))
+        email_address, history_id = data['emailAddress'], str(data['historyId'])
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Ignoring malformed Gmail Pub/Sub message: {e}")
+        return {'ignored': f"Malformed Pub/Sub message: {e}"}
+    if not (history_id.isascii() and history_id.isdigit()):
+        logger.warning(f"Ignoring Gmail Pub/Sub message with invalid historyId '{history_id}'.")
+        return {'ignored': f"Invalid historyId '{history_id}'."}
+
+    channels = [channel for channel in _channels.values() if channel.kind == 'gmail']
+    if not channels:
+        logger.info(f"Ignoring Gmail notification for {email_address}: no Gmail watch is active.")
+        return {'ignored': "No Gmail watch is active."}
+    scheduled = 0
+    for channel in channels:
+        channel.notifications += 1
+        channel.last_notified = datetime.now(timezone.utc)
+        if not channel.history_id or int(history_id) > int(channel.history_id):
+            channel.history_id = history_id
+        if get_credentials is not None:
+            scheduled += _schedule_gmail_sync(get_credentials, channel.channel_id)
+    logger.info(f"Gmail mailbox {email_address} changed (historyId {history_id}); scheduled {scheduled} history sync(s).")
+    return {'email_address': email_address, 'history_id': history_id, 'history_syncs_scheduled': scheduled}
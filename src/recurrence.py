@@ -0,0 +1,355 @@
+import logging
+import re
+from datetime import datetime, date, time, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil import rrule
+from dateutil import parser as date_parser
+
+logger = logging.getLogger(__name__)
+
+# --- Recurrence Expansion ---
+# Expands a master event's `recurrence` (RRULE, EXRULE, RDATE and EXDATE lines) the way Google's
+# events.instances / singleEvents=true does, so projections can be computed locally:
+#   - Timed series expand in the wall-clock time of start.timeZone: a 09:00 New York meeting
+#     stays at 09:00 across DST changes. Without a timeZone, the offset of start.dateTime is used.
+#     All-day series expand as dates.
+#   - DTSTART is always the first instance (RFC 5545), even when the rule does not match it; with
+#     COUNT it counts as one of the instances.
+#   - RRULE/EXRULE are parsed by dateutil. UNTIL is normalized to the series' value type first
+#     (UTC for timed series; DATE and floating values are read in the series' zone).
+#   - RDATE/EXDATE values may be DATE, DATE-TIME (UTC, TZID or floating, i.e. the series' zone) or,
+#     for RDATE, PERIOD, whose end or duration sets that instance's duration. A DATE EXDATE on a
+#     timed series removes every instance on that local date.
+#   - TZIDs resolve through zone(), a cache of ZoneInfo objects. Unknown zones fall back to the
+#     series' zone.
+#   - An instance is in a window when it overlaps it (end > time_min and start < time_max), as
+#     with events.instances. All-day instances are placed in the window's time zone.
+#
+# Expansion cost does not grow with the age of a series: rules without COUNT are re-anchored to
+# a period boundary just before the window (the rule parts dateutil would derive from DTSTART
+# are made explicit first, so the re-anchored rule yields the same instances), instead of
+# walking every earlier occurrence.
+
+_RANGE_FREQUENCIES = (rrule.YEARLY, rrule.MONTHLY, rrule.WEEKLY, rrule.DAILY) # Frequencies that can be re-anchored
+_DURATION_PATTERN = re.compile(r'^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$')
+
+DateOrTime = Union[date, datetime]
+
+
+class CompiledRule(NamedTuple):
+    """An RRULE or EXRULE parsed by dateutil, with the parts expansion needs."""
+    rule: rrule.rrule
+    frequency: int # rrule.YEARLY ... rrule.SECONDLY
+    interval: int
+    count: Optional[int]
+
+    @property
+    def can_rebase(self) -> bool:
+        return self.frequency in _RANGE_FREQUENCIES and self.count is None
+
+
+@lru_cache(maxsize=512)
+def zone(name: Optional[str]) -> Optional[tzinfo]:
+    """Returns the ZoneInfo for an IANA time zone name (cached), or None if it is empty or unknown."""
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Unknown recurrence time zone '{name}'; using the series' time zone.")
+        return None
+
+
+def parse_property(line: str) -> Tuple[str, Dict[str, str], str]:
+    """Splits a content line such as 'EXDATE;TZID=Europe/Zurich:20240101T100000' into (name, params, value)."""
+    head, _, value = line.partition(':')
+    name, *params = head.split(';')
+    parsed = {}
+    for param in params:
+        key, _, param_value = param.partition('=')
+        parsed[key.strip().upper()] = param_value.strip().strip('"')
+    return name.strip().upper(), parsed, value.strip()
+
+
+def parse_duration(text: str) -> timedelta:
+    """Parses an RFC 5545 duration ('PT1H30M', 'P1D', 'P2W').
+
+    Raises:
+        ValueError: If the text is not a duration.
+    """
+    match = _DURATION_PATTERN.match(text.strip().upper())
+    if not match or text.strip().upper() in ('P', 'PT', '+P', '-P'):
+        raise ValueError(f"Invalid duration '{text}'")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    duration = timedelta(weeks=int(weeks or 0), days=int(days or 0), hours=int(hours or 0), minutes=int(minutes or 0), seconds=int(seconds or 0))
+    return -duration if sign == '-' else duration
+
+
+def _parse_value(text: str, value_type: Optional[str], tz: Optional[tzinfo]) -> DateOrTime:
+    """Parses a DATE or DATE-TIME value; floating and TZID date-times get `tz` (None keeps them naive)."""
+    text = text.strip()
+    if value_type == 'DATE' or (len(text) == 8 and text.isdigit()):
+        return datetime.strptime(text, '%Y%m%d').date()
+    utc = text.endswith('Z')
+    try:
+        value = datetime.strptime(text.rstrip('Z'), '%Y%m%dT%H%M%S')
+    except ValueError:
+        value = date_parser.isoparse(text) # Tolerate extended ISO 8601
+        if value.tzinfo:
+            return value
+    if utc:
+        return value.replace(tzinfo=timezone.utc)
+    return value.replace(tzinfo=tz) if tz else value
+
+
+class RecurrenceSet:
+    """A master event's recurrence, compiled once and expanded for any window.
+
+    Instances are only read after compilation, so one RecurrenceSet can be shared by
+    concurrent expansions (see analysis.RulesetCache).
+    """
+
+    __slots__ = ('dtstart', 'zone', 'all_day', 'duration', 'max_duration', 'rules', 'exrules', 'rdates', 'exdates', 'exdays', 'durations')
+
+    def __init__(self, dtstart: datetime, duration: timedelta, all_day: bool):
+        """Creates an empty set anchored at dtstart (aware for timed series, naive midnight for all-day)."""
+        self.dtstart = dtstart
+        self.zone: Optional[tzinfo] = None if all_day else dtstart.tzinfo
+        self.all_day = all_day
+        self.duration = duration
+        self.max_duration = duration
+        self.rules: List[CompiledRule] = []
+        self.exrules: List[CompiledRule] = []
+        self.rdates: Set[datetime] = set()
+        self.exdates: Set[datetime] = set()
+        self.exdays: Set[date] = set() # DATE EXDATEs of timed series
+        self.durations: Dict[datetime, timedelta] = {} # RDATE PERIOD instances with their own duration
+
+    # --- Compilation ---
+
+    def _instance_time(self, value: DateOrTime) -> datetime:
+        """Converts a parsed DATE or DATE-TIME to this series' instance representation."""
+        if self.all_day:
+            day = value.date() if isinstance(value, datetime) else value
+            return datetime.combine(day, time())
+        if not isinstance(value, datetime):
+            return datetime.combine(value, self.dtstart.time(), tzinfo=self.zone) # DATE RDATE: at the series' time of day
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=self.zone)
+        return value.astimezone(self.zone)
+
+    def _until(self, text: str) -> datetime:
+        """Normalizes an UNTIL value to the series' value type (dateutil rejects mixed types)."""
+        value = _parse_value(text, None, None)
+        if self.all_day:
+            if isinstance(value, datetime):
+                return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+            return datetime.combine(value, time())
+        if not isinstance(value, datetime):
+            return datetime.combine(value, time(23, 59, 59), tzinfo=self.zone) # Inclusive: the whole local day
+        return value if value.tzinfo else value.replace(tzinfo=self.zone)
+
+    def _compile_rule(self, value: str) -> CompiledRule:
+        parts: Dict[str, str] = {}
+        for part in value.split(';'):
+            key, separator, part_value = part.partition('=')
+            if separator:
+                parts[key.strip().upper()] = part_value.strip()
+        until = parts.pop('UNTIL', None)
+        rule = rrule.rrulestr(';'.join(f'{key}={part_value}' for key, part_value in parts.items()), dtstart=self.dtstart)
+        frequency = rrule.FREQNAMES.index(parts.get('FREQ', '').upper())
+        # Make the parts dateutil derives from DTSTART explicit, so moving DTSTART keeps the rule
+        explicit: Dict[str, Any] = {}
+        if frequency in _RANGE_FREQUENCIES:
+            if not any(key in parts for key in ('BYWEEKNO', 'BYYEARDAY', 'BYMONTHDAY', 'BYDAY')):
+                if frequency == rrule.YEARLY:
+                    if 'BYMONTH' not in parts:
+                        explicit['bymonth'] = self.dtstart.month
+                    explicit['bymonthday'] = self.dtstart.day
+                elif frequency == rrule.MONTHLY:
+                    explicit['bymonthday'] = self.dtstart.day
+                elif frequency == rrule.WEEKLY:
+                    explicit['byweekday'] = self.dtstart.weekday()
+            for key, default in (('BYHOUR', self.dtstart.hour), ('BYMINUTE', self.dtstart.minute), ('BYSECOND', self.dtstart.second)):
+                if key not in parts:
+                    explicit[f'by{key[2:].lower()}'] = default
+        if until is not None:
+            explicit['until'] = self._until(until)
+        if explicit:
+            rule = rule.replace(**explicit)
+        count = int(parts['COUNT']) if 'COUNT' in parts else None
+        return CompiledRule(rule, frequency, int(parts.get('INTERVAL') or 1), count)
+
+    def add_line(self, line: str):
+        """Adds one RRULE, EXRULE, RDATE or EXDATE line.
+
+        Raises:
+            ValueError: If the line cannot be parsed.
+        """
+        name, params, value = parse_property(line)
+        if name in ('RRULE', 'EXRULE'):
+            (self.rules if name == 'RRULE' else self.exrules).append(self._compile_rule(value))
+            return
+        if name not in ('RDATE', 'EXDATE'):
+            logger.debug(f"Ignoring unsupported recurrence property '{name}'.")
+            return
+        value_type = params.get('VALUE', '').upper() or None
+        tz = (zone(params['TZID']) if 'TZID' in params else None) or self.zone
+        for item in value.split(','):
+            if not item.strip():
+                continue
+            if name == 'RDATE' and (value_type == 'PERIOD' or '/' in item):
+                start_text, _, end_text = item.partition('/')
+                start = self._instance_time(_parse_value(start_text, None, tz))
+                if end_text.strip().upper().lstrip('+-').startswith('P'):
+                    duration = parse_duration(end_text)
+                else:
+                    duration = self._instance_time(_parse_value(end_text, None, tz)) - start
+                self.rdates.add(start)
+                self.durations[start] = duration
+                self.max_duration = max(self.max_duration, duration)
+                continue
+            parsed = _parse_value(item, value_type, tz)
+            if name == 'RDATE':
+                self.rdates.add(self._instance_time(parsed))
+            elif not self.all_day and not isinstance(parsed, datetime):
+                self.exdays.add(parsed)
+            else:
+                self.exdates.add(self._instance_time(parsed))
+
+    def anchor_first_instance(self):
+        """Applies the RFC 5545 rule that DTSTART is the first instance, even if the RRULE skips it."""
+        if not self.rules:
+            return
+        compiled = self.rules[0]
+        if next(iter(compiled.rule), None) == self.dtstart:
+            return
+        self.rdates.add(self.dtstart)
+        if compiled.count is not None: # DTSTART counts as one of the COUNT instances
+            if compiled.count > 1:
+                self.rules[0] = compiled._replace(rule=compiled.rule.replace(count=compiled.count - 1), count=compiled.count - 1)
+            else:
+                del self.rules[0]
+
+    # --- Expansion ---
+
+    def _rebased(self, compiled: CompiledRule, target: datetime) -> rrule.rrule:
+        """Returns the rule re-anchored at a period boundary before target (same instances from there on)."""
+        rule, interval = compiled.rule, compiled.interval
+        anchor = self.dtstart
+        local_target = target if self.all_day else target.astimezone(self.zone)
+        if local_target <= anchor:
+            return rule
+        if compiled.frequency in (rrule.DAILY, rrule.WEEKLY):
+            period_days = 1 if compiled.frequency == rrule.DAILY else 7
+            periods = (local_target.date() - anchor.date()).days // (period_days * interval) - 1
+            if periods <= 0:
+                return rule
+            return rule.replace(dtstart=anchor + timedelta(days=periods * interval * period_days))
+        if compiled.frequency == rrule.MONTHLY:
+            periods = ((local_target.year - anchor.year) * 12 + local_target.month - anchor.month) // interval - 1
+            if periods <= 0:
+                return rule
+            month_index = anchor.month - 1 + periods * interval
+            return rule.replace(dtstart=anchor.replace(year=anchor.year + month_index // 12, month=month_index % 12 + 1, day=1))
+        periods = (local_target.year - anchor.year) // interval - 1 # YEARLY
+        if periods <= 0:
+            return rule
+        return rule.replace(dtstart=anchor.replace(year=anchor.year + periods * interval, month=1, day=1))
+
+    def between(self, time_min: datetime, time_max: datetime) -> List[Tuple[datetime, datetime]]:
+        """Returns the (start, end) of the instances overlapping [time_min, time_max), sorted by start.
+
+        Timed instances are in the series' time zone. All-day instances are midnights in the
+        window's time zone (naive if time_min is naive).
+        """
+        window_tz = time_min.tzinfo
+        if self.all_day:
+            lower = time_min.replace(tzinfo=None)
+            upper = (time_max.astimezone(window_tz) if window_tz and time_max.tzinfo else time_max).replace(tzinfo=None)
+        else:
+            lower = time_min if time_min.tzinfo else time_min.replace(tzinfo=timezone.utc)
+            upper = time_max if time_max.tzinfo else time_max.replace(tzinfo=timezone.utc)
+        if upper <= lower:
+            return []
+        search_from = lower - self.max_duration # Earlier instances cannot reach the window
+
+        starts: Set[datetime] = set()
+        for compiled in self.rules:
+            rule = self._rebased(compiled, search_from) if compiled.can_rebase else compiled.rule
+            starts.update(rule.between(search_from, upper, inc=True))
+        starts.update(start for start in self.rdates if search_from <= start <= upper)
+        for compiled in self.exrules:
+            starts.difference_update(compiled.rule.between(search_from, upper, inc=True))
+        starts.difference_update(self.exdates)
+        if self.exdays:
+            starts = {start for start in starts if start.date() not in self.exdays}
+
+        instances = []
+        for start in sorted(starts):
+            duration = self.durations.get(start, self.duration)
+            if self.all_day:
+                end = start + duration
+            else:
+                end = (start.astimezone(timezone.utc) + duration).astimezone(self.zone) # Exact duration across DST
+            if end > lower and start < upper:
+                if self.all_day and window_tz:
+                    start, end = start.replace(tzinfo=window_tz), end.replace(tzinfo=window_tz)
+                instances.append((start, end))
+        return instances
+
+
+def series_start(start: Any, end: Any) -> Tuple[datetime, timedelta, bool]:
+    """Returns (dtstart, duration, all_day) for a master event's start and end (EventDateTime).
+
+    Timed starts are converted to start.timeZone when it names a known zone.
+
+    Raises:
+        ValueError: If start has neither dateTime nor date.
+    """
+    if start.dateTime:
+        value = start.dateTime if isinstance(start.dateTime, datetime) else date_parser.isoparse(start.dateTime)
+        series_zone = zone(start.timeZone) or value.tzinfo or timezone.utc
+        dtstart = value.astimezone(series_zone) if value.tzinfo else value.replace(tzinfo=series_zone)
+        if end is not None and end.dateTime:
+            end_value = end.dateTime if isinstance(end.dateTime, datetime) else date_parser.isoparse(end.dateTime)
+            if end_value.tzinfo is None:
+                end_value = end_value.replace(tzinfo=series_zone)
+            duration = end_value - dtstart
+        else:
+            duration = timedelta(hours=1)
+            logger.warning(f"Recurring event starting {dtstart} has no end.dateTime; assuming {duration}.")
+        return dtstart, duration, False
+    if start.date:
+        start_date = start.date if isinstance(start.date, date) else date.fromisoformat(start.date)
+        duration = timedelta(days=1)
+        if end is not None and end.date:
+            end_date = end.date if isinstance(end.date, date) else date.fromisoformat(end.date)
+            duration = end_date - start_date
+        return datetime.combine(start_date, time()), duration, True
+    raise ValueError("Event start has neither dateTime nor date")
+
+
+def compile_recurrence(recurrence: List[str], start: Any, end: Any) -> Optional[RecurrenceSet]:
+    """Compiles a master event's recurrence lines against its start and end (EventDateTime).
+
+    Returns:
+        The compiled RecurrenceSet, or None if there is no RRULE or RDATE (nothing to expand).
+
+    Raises:
+        ValueError: If the start or a recurrence line cannot be parsed.
+    """
+    dtstart, duration, all_day = series_start(start, end)
+    series = RecurrenceSet(dtstart, duration, all_day)
+    for line in recurrence:
+        series.add_line(line)
+    if not series.rules and not series.rdates:
+        return None
+    if series.rules:
+        series.anchor_first_instance()
+    else:
+        series.rdates.add(dtstart) # RDATE-only series: DTSTART plus the listed dates
+    return series
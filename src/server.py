@@ -1,10 +1,12 @@
+import asyncio
+import calendar
 import logging
 import uvicorn
 import sys
 import os
 from fastapi import FastAPI, HTTPException
 from datetime import datetime, date, time
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Set
 import json
 from dateutil import parser # Import dateutil parser
 from src.models import CalendarListResponse
@@ -21,20 +23,36 @@ if parent_dir not in sys.path:
 
 from fastapi import FastAPI, HTTPException, Body, Query, Path, Depends
 from fastapi.routing import APIRoute
+from fastapi.responses import StreamingResponse
+from starlette.requests import Request as HTTPRequest
 from fastapi.openapi.utils import get_openapi
 from pydantic import BaseModel, Field, EmailStr
+from pydantic_core import to_json
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
+from googleapiclient.errors import HttpError
 
 # Import functions and models directly using absolute imports
 try:
     # Use absolute imports for consistency
     from src.auth import get_credentials
-    import src.calendar_actions as calendar_actions
-    import src.gmail_actions as gmail_actions
+    import src.async_calendar_actions as async_calendar_actions
+    import src.async_gmail_actions as async_gmail_actions
+    from src.async_google_client import aclose_async_clients, release_async_client
+    from src.http_transport import release_shared_http
+    from src.google_services import get_service_stats, release_service_clients, refresh_discovery_documents, DISCOVERY_REFRESH_ON_STARTUP
+    from src import calendar_sync
+    from src.event_store import get_event_store_stats, close_event_store
+    from src import push_notifications
+    from src import calendar_list_cache
+    from src import cursors
+    from src import field_masks
+    from src.json_responses import FastJSONResponse
+    from src.compression import CompressionMiddleware, COMPRESSION_ENABLED
     from src.models import (
         GoogleCalendarEvent,
         EventsResponse,
+        MultiCalendarEventsResponse,
         EventCreateRequest,
         QuickAddEventRequest,
         EventUpdateRequest,
@@ -45,12 +63,13 @@ try:
         CheckAttendeeStatusRequest, CheckAttendeeStatusResponse,
         FreeBusyRequest, FreeBusyResponse,
         ScheduleMutualRequest,
-        ProjectRecurringRequest, ProjectRecurringResponse, ProjectedEventOccurrenceModel,
+        ProjectRecurringRequest, ProjectRecurringResponse,
         AnalyzeBusynessRequest, AnalyzeBusynessResponse, DailyBusynessStats,
         # Specific models needed for freeBusy conversion
-        CalendarBusyInfo, TimePeriod, FreeBusyError
+        CalendarBusyInfo, TimePeriod, FreeBusyError,
+        WatchRequest, WatchChannelInfo
     )
-    from src.analysis import ProjectedEventOccurrence
+    from src.analysis import get_recurrence_cache_stats, shutdown_expansion_pool
     logger.info("Successfully imported modules")
 except ImportError as e:
     logger.error(f"Could not import modules: {e}")
@@ -59,9 +78,13 @@ except ImportError as e:
 app = FastAPI(
     title="Google Calendar MCP Server",
     description="MCP server for interacting with Google Calendar API.",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=FastJSONResponse
 )
 
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
 # --- Global State / Initialization ---
 # Store credentials globally or pass them around
 # For simplicity, let's get them once on startup
@@ -72,6 +95,9 @@ global_credentials: Optional[Credentials] = None
 def startup_event():
     """Attempt to get credentials on server startup."""
     global global_credentials
+    if DISCOVERY_REFRESH_ON_STARTUP:
+        logger.info("DISCOVERY_REFRESH_ON_STARTUP is set. Refreshing bundled discovery documents...")
+        refresh_discovery_documents()
     logger.info("Server starting up. Attempting to authenticate with Google...")
     try:
         global_credentials = get_credentials()
@@ -85,16 +111,55 @@ def startup_event():
         # Set credentials to None to indicate failure
         global_credentials = None
 
+_renewal_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def start_push_notifications():
+    """Open the configured push notification channels and start the channel renewal task."""
+    global _renewal_task
+    if global_credentials and global_credentials.valid:
+        await push_notifications.start_configured_watches(global_credentials)
+    _renewal_task = asyncio.get_running_loop().create_task(push_notifications.run_renewal_loop(get_current_credentials))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop push channels, then close the pooled async Google API connections, the event store and the expansion pool."""
+    if _renewal_task:
+        _renewal_task.cancel()
+    if global_credentials and push_notifications.get_channels():
+        await push_notifications.stop_all_channels(global_credentials)
+    await aclose_async_clients()
+    close_event_store()
+    shutdown_expansion_pool()
+
 # --- Dependency for Credentials ---
 
-def get_current_credentials() -> Credentials:
-    """Dependency to provide valid credentials to endpoints. Attempts refresh if invalid."""
+async def _release_replaced_credentials(replaced: Credentials):
+    """Drops the clients cached for credentials that a re-fetch replaced.
+
+    The client caches are keyed by credentials object and never collect entries on their own.
+    """
+    released = release_service_clients(replaced)
+    # In-flight calls on the old transport fail like any call with the stale token would
+    released_http = await asyncio.to_thread(release_shared_http, replaced)
+    released_async = await release_async_client(replaced)
+    logger.info(
+        f"Released cached Google API clients of replaced credentials "
+        f"({released} service clients, transport: {released_http}, async client: {released_async})."
+    )
+
+async def get_current_credentials() -> Credentials:
+    """Dependency to provide valid credentials to endpoints. Attempts refresh if invalid.
+
+    Fetching and refreshing credentials is blocking I/O, so it runs in a worker thread; the
+    common path (credentials already valid) returns without leaving the event loop.
+    """
     global global_credentials
 
     if not global_credentials:
         logger.warning("Credentials not available (failed during startup?). Attempting to re-fetch.")
         try:
-            global_credentials = get_credentials()
+            global_credentials = await asyncio.to_thread(get_credentials)
             if not global_credentials:
                  raise HTTPException(
                     status_code=503, 
@@ -111,7 +176,7 @@ def get_current_credentials() -> Credentials:
     if not global_credentials.valid:
         logger.warning("Credentials are invalid or expired. Attempting refresh...")
         try:
-            global_credentials.refresh(Request()) # Requires: from google.auth.transport.requests import Request
+            await asyncio.to_thread(global_credentials.refresh, Request())
             if not global_credentials.valid:
                 logger.error("Credential refresh succeeded but credentials still invalid.")
                 raise HTTPException(
@@ -123,8 +188,11 @@ def get_current_credentials() -> Credentials:
             logger.error(f"Failed to refresh credentials within dependency: {e}", exc_info=True)
             # If refresh fails, try a full re-fetch as a last resort
             logger.warning("Refresh failed. Attempting a full re-fetch of credentials...")
+            replaced = global_credentials
             try:
-                global_credentials = get_credentials()
+                global_credentials = await asyncio.to_thread(get_credentials)
+                if global_credentials is not replaced:
+                    await _release_replaced_credentials(replaced)
                 if not global_credentials or not global_credentials.valid:
                     raise HTTPException(
                         status_code=503,
@@ -140,6 +208,21 @@ def get_current_credentials() -> Credentials:
 
     return global_credentials
 
+# --- Partial Response Helpers ---
+
+def _resolve_fields(fields: Optional[str], resolver) -> Optional[str]:
+    """Validates a `fields` query parameter with a field_masks resolver; malformed values are a 400."""
+    try:
+        return resolver(fields)
+    except field_masks.InvalidFieldsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _partial_response(result: BaseModel) -> FastJSONResponse:
+    """Serializes a response's items with only the fields that were returned, so partial responses stay small."""
+    payload = result.model_dump(mode='json', by_alias=True, exclude={'items'})
+    payload['items'] = [item.model_dump(mode='json', by_alias=True, exclude_unset=True) for item in result.items]
+    return FastJSONResponse(payload)
+
 # --- MCP Offerings Endpoint --- 
 
 def clean_schema_refs(schema: Dict[str, Any]) -> Dict[str, Any]:
@@ -180,7 +263,7 @@ def map_openapi_type_to_mcp(openapi_type: str, format: Optional[str] = None) ->
     return "any" # Default fallback
 
 @app.get("/services/offerings", tags=["MCP"], operation_id="list_mcp_offerings")
-def list_mcp_offerings():
+async def list_mcp_offerings():
     """MCP endpoint to list available tools (functions)."""
     offerings = []
     openapi_schema = app.openapi()
@@ -256,16 +339,24 @@ def list_mcp_offerings():
     return {"offerings": offerings}
 
 @app.get("/services/api_key", tags=["MCP"], operation_id="get_api_key")
-def get_api_key():
+async def get_api_key():
     """MCP endpoint to get API key - not required but part of MCP protocol."""
     return {"api_key": "not-required"}
 
 # --- Management Endpoint ---
 @app.get("/health", tags=["Management"], operation_id="health_check")
-def health_check():
-    """Basic health check endpoint."""
+async def health_check():
+    """Basic health check endpoint. Also reports Google API service client reuse, calendar mirror and cache metrics."""
     auth_status = "authenticated" if global_credentials and global_credentials.valid else "authentication_failed_or_pending"
-    return {"status": "ok", "authentication": auth_status}
+    return {
+        "status": "ok",
+        "authentication": auth_status,
+        "service_clients": get_service_stats(),
+        "calendar_mirrors": calendar_sync.get_mirror_stats(),
+        "event_store": get_event_store_stats(),
+        "calendar_list_cache": calendar_list_cache.get_cache_stats(),
+        "recurrence_cache": get_recurrence_cache_stats(),
+    }
 
 # --- CalendarList Endpoints ---
 @app.get(
@@ -275,13 +366,13 @@ def health_check():
     summary="List Calendars",
     operation_id="list_calendars"
 )
-def list_calendars_endpoint(
+async def list_calendars_endpoint(
     min_access_role: Optional[str] = Query(None, description="Minimum access role ('reader', 'writer', 'owner')."),
     creds: Credentials = Depends(get_current_credentials)
 ):
     """Lists the calendars on the user's calendar list."""
     logger.info(f"Endpoint 'list_calendars' called. Params: min_access_role='{min_access_role}'")
-    result = calendar_actions.find_calendars(credentials=creds, min_access_role=min_access_role)
+    result = await async_calendar_actions.find_calendars(credentials=creds, min_access_role=min_access_role)
     if result is None:
         logger.error("Action 'find_calendars' returned None. Raising HTTPException.")
         raise HTTPException(status_code=500, detail="Failed to retrieve calendar list from Google API.")
@@ -299,19 +390,40 @@ class CreateCalendarRequest(BaseModel):
     summary="Create Calendar",
     operation_id="create_calendar"
 )
-def create_calendar_endpoint(
+async def create_calendar_endpoint(
     request: CreateCalendarRequest,
     creds: Credentials = Depends(get_current_credentials)
 ):
     """Creates a new secondary calendar."""
     logger.info(f"Endpoint 'create_calendar' called. Summary: '{request.summary}'")
-    result = calendar_actions.create_calendar(credentials=creds, summary=request.summary)
+    result = await async_calendar_actions.create_calendar(credentials=creds, summary=request.summary)
     if result is None:
         logger.error(f"Action 'create_calendar' for summary '{request.summary}' returned None. Raising HTTPException.")
         raise HTTPException(status_code=500, detail="Failed to create calendar via Google API.")
     logger.info(f"Endpoint 'create_calendar' completed. Calendar ID: {result.id}")
     return result
 
+@app.post(
+    "/calendars/{calendar_id}/sync",
+    tags=["Calendars"],
+    summary="Sync Calendar Mirror",
+    operation_id="sync_calendar"
+)
+async def sync_calendar_endpoint(
+    calendar_id: str = Path(..., description="Calendar identifier."),
+    single_events: bool = Query(True, description="Sync the expanded-instances mirror (true) or the master-events mirror (false)."),
+    creds: Credentials = Depends(get_current_credentials)
+):
+    """Brings the calendar's local mirror up to date (full sync the first time, incremental after) and returns its stats."""
+    logger.info(f"Endpoint 'sync_calendar' called for calendar '{calendar_id}' (single_events={single_events}).")
+    mirror = calendar_sync.get_mirror(creds, calendar_id, single_events)
+    try:
+        await calendar_sync.async_sync_mirror(creds, mirror)
+    except HttpError as e:
+        logger.error(f"Failed to sync mirror for calendar '{calendar_id}': {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to sync calendar '{calendar_id}' from Google API.")
+    return mirror.stats()
+
 # --- Events Endpoints ---
 @app.get(
     "/calendars/{calendar_id}/events",
@@ -320,17 +432,21 @@ def create_calendar_endpoint(
     summary="Find Events",
     operation_id="find_events"
 )
-def find_events_endpoint(
+async def find_events_endpoint(
     calendar_id: str = Path(..., description="Calendar identifier (e.g., 'primary', email address, or calendar ID)."),
     time_min_str: Optional[str] = Query(None, alias="time_min", description="Start time (inclusive, RFC3339 format string)."),
     time_max_str: Optional[str] = Query(None, alias="time_max", description="End time (exclusive, RFC3339 format string)."),
-    query: Optional[str] = Query(None, alias="q", description="Free text search query."),
+    query: Optional[str] = Query(None, alias="q", description="Free text search query. With use_mirror, answered from the local full-text index: words, prefix* and \"phrases\"."),
     max_results: int = Query(50, ge=1, le=2500, description="Maximum results per page."),
     single_events: bool = Query(True, description="Expand recurring events."),
     order_by: str = Query('startTime', description="Order results by ('startTime' or 'updated')."),
+    page_token: Optional[str] = Query(None, description="nextPageToken from a previous response, to fetch the following page."),
+    use_mirror: bool = Query(False, description="Answer from the incrementally synced local mirror instead of re-downloading from Google."),
+    cursor: Optional[str] = Query(None, description="next_cursor from a previous response with the same parameters, to fetch the following page."),
+    fields: Optional[str] = Query(None, description="Partial response: a preset ('timing-only', 'summary', 'attendees', 'recurrence', 'full') or a Google field mask for each event, e.g. 'id,start,end'."),
     creds: Credentials = Depends(get_current_credentials)
 ):
-    """Finds events in a specified calendar."""
+    """Finds events in a specified calendar (one page; see next_cursor)."""
     logger.info(f"Endpoint 'find_events' called for calendar '{calendar_id}'.")
     logger.debug(f"Raw Params: time_min_str='{time_min_str}', time_max_str='{time_max_str}', q='{query}', max_results={max_results}, single_events={single_events}, order_by='{order_by}'")
 
@@ -346,24 +462,164 @@ def find_events_endpoint(
         logger.error(f"Failed to parse time strings: {e}")
         raise HTTPException(status_code=400, detail=f"Invalid time format provided: {e}")
 
+    fields = _resolve_fields(fields, field_masks.resolve_event_fields)
+
+    # Cursors are bound to the parameters that define the result set (not to max_results or fields)
+    fingerprint = cursors.query_fingerprint(calendar_id, time_min_str, time_max_str, query, single_events, order_by, use_mirror)
+    if cursor:
+        if page_token:
+            raise HTTPException(status_code=400, detail="Pass either cursor or page_token, not both.")
+        try:
+            page_token = cursors.decode_cursor(cursor, fingerprint)
+        except cursors.InvalidCursorError as e:
+            logger.warning(f"Rejected cursor for calendar '{calendar_id}': {e}")
+            raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
     # Now call the action function with parsed datetime objects
-    result = calendar_actions.find_events(
-        credentials=creds,
-        calendar_id=calendar_id,
-        time_min=time_min_dt, # Pass parsed datetime
-        time_max=time_max_dt, # Pass parsed datetime
-        query=query,
-        max_results=max_results,
-        single_events=single_events,
-        order_by=order_by
-    )
+    try:
+        result = await async_calendar_actions.find_events(
+            credentials=creds,
+            calendar_id=calendar_id,
+            time_min=time_min_dt, # Pass parsed datetime
+            time_max=time_max_dt, # Pass parsed datetime
+            query=query,
+            max_results=max_results,
+            single_events=single_events,
+            order_by=order_by,
+            page_token=page_token,
+            use_mirror=use_mirror,
+            fields=fields
+        )
+    except calendar_sync.InvalidPageTokenError as e:
+        logger.warning(f"Rejected page token for calendar '{calendar_id}': {e}")
+        raise HTTPException(status_code=400, detail=f"Invalid page token: {e}")
     if result is None:
         # Distinguish between API error and just no events?
         # For now, assume None means API error.
         logger.error(f"Action 'find_events' for calendar '{calendar_id}' returned None. Raising HTTPException.")
         raise HTTPException(status_code=500, detail="Failed to retrieve events from Google API.")
+    result.next_cursor = cursors.encode_cursor(result.nextPageToken, fingerprint)
     logger.info(f"Endpoint 'find_events' for calendar '{calendar_id}' completed. Found {len(result.items)} events.")
-    return result
+    return _partial_response(result) if fields else FastJSONResponse(result)
+
+@app.get(
+    "/calendars/{calendar_id}/events:stream",
+    tags=["Events"],
+    summary="Stream Events (NDJSON)",
+    operation_id="stream_events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "One event JSON object per line."}}
+)
+async def stream_events_endpoint(
+    calendar_id: str = Path(..., description="Calendar identifier (e.g., 'primary', email address, or calendar ID)."),
+    time_min_str: Optional[str] = Query(None, alias="time_min", description="Start time (inclusive, RFC3339 format string)."),
+    time_max_str: Optional[str] = Query(None, alias="time_max", description="End time (exclusive, RFC3339 format string)."),
+    query: Optional[str] = Query(None, alias="q", description="Free text search query."),
+    page_size: int = Query(250, ge=1, le=2500, description="Events fetched from Google per page."),
+    single_events: bool = Query(True, description="Expand recurring events."),
+    order_by: str = Query('startTime', description="Order results by ('startTime' or 'updated')."),
+    fields: Optional[str] = Query(None, description="Partial response: a preset ('timing-only', 'summary', 'attendees', 'recurrence', 'full') or a Google field mask for each event, e.g. 'id,start,end'."),
+    creds: Credentials = Depends(get_current_credentials)
+):
+    """Streams every matching event as newline-delimited JSON, following all result pages.
+
+    Events are written as each page arrives, so the first line reaches the client after the
+    first page and memory stays bounded by one page for any time range. Errors before the
+    first page return a normal HTTP error; a failure on a later page ends the stream with a
+    final {"error": ...} line.
+    """
+    logger.info(f"Endpoint 'stream_events' called for calendar '{calendar_id}'.")
+    try:
+        time_min_dt = parser.isoparse(time_min_str) if time_min_str else None
+        time_max_dt = parser.isoparse(time_max_str) if time_max_str else None
+    except ValueError as e:
+        logger.error(f"Failed to parse time strings: {e}")
+        raise HTTPException(status_code=400, detail=f"Invalid time format provided: {e}")
+    fields = _resolve_fields(fields, field_masks.resolve_event_fields)
+
+    pages = async_calendar_actions.iter_event_pages(
+        credentials=creds,
+        calendar_id=calendar_id,
+        time_min=time_min_dt,
+        time_max=time_max_dt,
+        query=query,
+        page_size=page_size,
+        single_events=single_events,
+        order_by=order_by,
+        fields=fields
+    )
+    # Fetch the first page before responding so request errors still get a proper status code
+    try:
+        first_page = await anext(pages)
+    except HttpError as e:
+        logger.error(f"Failed to fetch first page of events for calendar '{calendar_id}': {e}")
+        raise HTTPException(status_code=e.resp.status if 400 <= e.resp.status < 500 else 500, detail="Failed to retrieve events from Google API.")
+
+    async def ndjson_lines():
+        page_count, event_count = 0, 0
+        page = first_page
+        try:
+            while page is not None:
+                page_count += 1
+                event_count += len(page.items)
+                if page.items:
+                    yield ''.join(event.model_dump_json(by_alias=True, exclude_unset=bool(fields)) + '\n' for event in page.items)
+                page = await anext(pages, None)
+        except HttpError as e:
+            logger.error(f"Event stream for calendar '{calendar_id}' failed after {page_count} pages: {e}")
+            yield json.dumps({"error": f"Failed to retrieve page {page_count + 1} from Google API: {e.resp.status}"}) + '\n'
+            return
+        logger.info(f"Endpoint 'stream_events' for calendar '{calendar_id}' completed. Streamed {event_count} events in {page_count} pages.")
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+@app.get(
+    "/events",
+    response_model=MultiCalendarEventsResponse,
+    tags=["Events"],
+    summary="Find Events Across Calendars",
+    operation_id="find_events_all_calendars"
+)
+async def find_events_all_calendars_endpoint(
+    time_min_str: Optional[str] = Query(None, alias="time_min", description="Start time (inclusive, RFC3339 format string)."),
+    time_max_str: Optional[str] = Query(None, alias="time_max", description="End time (exclusive, RFC3339 format string)."),
+    query: Optional[str] = Query(None, alias="q", description="Free text search query. With use_mirror, answered from the local full-text index: words, prefix* and \"phrases\"."),
+    calendar_ids: Optional[List[str]] = Query(None, description="Calendars to search. Defaults to every calendar in the calendar list."),
+    min_access_role: Optional[str] = Query(None, description="When calendar_ids is not given, only search calendars with at least this access role."),
+    max_results_per_calendar: int = Query(250, ge=1, le=2500, description="Maximum events taken from each calendar."),
+    use_mirror: bool = Query(False, description="Read each calendar from its incrementally synced local mirror."),
+    fields: Optional[str] = Query(None, description="Partial response: a preset ('timing-only', 'summary', 'attendees', 'recurrence', 'full') or a Google field mask for each event, e.g. 'id,start,end'. 'start' is always included."),
+    creds: Credentials = Depends(get_current_credentials)
+):
+    """Finds events in many calendars concurrently and returns them merged by start time.
+
+    Each event carries its calendar in `sourceCalendarId`. Calendars that fail or exceed
+    CALENDAR_FANOUT_TIMEOUT are reported in `errors` instead of failing the request.
+    """
+    logger.info(f"Endpoint 'find_events_all_calendars' called for {len(calendar_ids) if calendar_ids else 'all'} calendars.")
+    try:
+        time_min_dt = parser.isoparse(time_min_str) if time_min_str else None
+        time_max_dt = parser.isoparse(time_max_str) if time_max_str else None
+    except ValueError as e:
+        logger.error(f"Failed to parse time strings: {e}")
+        raise HTTPException(status_code=400, detail=f"Invalid time format provided: {e}")
+    fields = _resolve_fields(fields, field_masks.resolve_event_fields)
+
+    result = await async_calendar_actions.search_all_calendars(
+        credentials=creds,
+        time_min=time_min_dt,
+        time_max=time_max_dt,
+        query=query,
+        calendar_ids=calendar_ids,
+        min_access_role=min_access_role,
+        max_results_per_calendar=max_results_per_calendar,
+        use_mirror=use_mirror,
+        fields=fields
+    )
+    if result is None:
+        raise HTTPException(status_code=500, detail="Failed to retrieve the calendar list from Google API.")
+    logger.info(f"Endpoint 'find_events_all_calendars' completed. Found {len(result.items)} events in {len(result.calendars_searched)} calendars.")
+    return _partial_response(result) if fields else FastJSONResponse(result)
 
 @app.post(
     "/calendars/{calendar_id}/events",
@@ -373,7 +629,7 @@ def find_events_endpoint(
     summary="Create Detailed Event",
     operation_id="create_event"
 )
-def create_event_endpoint(
+async def create_event_endpoint(
     event_data: EventCreateRequest,
     calendar_id: str = Path(..., description="Calendar identifier."),
     send_notifications: bool = Query(True, description="Send notifications to attendees."),
@@ -382,7 +638,7 @@ def create_event_endpoint(
     """Creates a new event with detailed information."""
     logger.info(f"Endpoint 'create_event' called for calendar '{calendar_id}'. Summary: '{event_data.summary}'")
     logger.debug(f"Event data: {event_data.dict(exclude_unset=True)}")
-    result = calendar_actions.create_event(
+    result = await async_calendar_actions.create_event(
         credentials=creds,
         event_data=event_data,
         calendar_id=calendar_id,
@@ -402,7 +658,7 @@ def create_event_endpoint(
     summary="Quick Add Event",
     operation_id="quick_add_event"
 )
-def quick_add_event_endpoint(
+async def quick_add_event_endpoint(
     request_data: QuickAddEventRequest,
     calendar_id: str = Path(..., description="Calendar identifier."),
     send_notifications: bool = Query(False, description="Send notifications to attendees."),
@@ -410,7 +666,7 @@ def quick_add_event_endpoint(
 ):
     """Creates an event from a simple text string."""
     logger.info(f"Endpoint 'quick_add_event' called for calendar '{calendar_id}'. Text: '{request_data.text}'")
-    result = calendar_actions.quick_add_event(
+    result = await async_calendar_actions.quick_add_event(
         credentials=creds,
         text=request_data.text,
         calendar_id=calendar_id,
@@ -430,7 +686,7 @@ def quick_add_event_endpoint(
     summary="Update Event (Patch)",
     operation_id="update_event"
 )
-def update_event_endpoint(
+async def update_event_endpoint(
     update_data: EventUpdateRequest,
     calendar_id: str = Path(..., description="Calendar identifier."),
     event_id: str = Path(..., description="Event identifier."),
@@ -440,7 +696,7 @@ def update_event_endpoint(
     """Updates specified fields of an existing event."""
     logger.info(f"Endpoint 'update_event' called for event '{event_id}' in calendar '{calendar_id}'.")
     logger.debug(f"Update data: {update_data.dict(exclude_unset=True)}")
-    result = calendar_actions.update_event(
+    result = await async_calendar_actions.update_event(
         credentials=creds,
         event_id=event_id,
         update_data=update_data,
@@ -464,7 +720,7 @@ def update_event_endpoint(
     summary="Delete Event",
     operation_id="delete_event"
 )
-def delete_event_endpoint(
+async def delete_event_endpoint(
     calendar_id: str = Path(..., description="Calendar identifier."),
     event_id: str = Path(..., description="Event identifier."),
     send_notifications: bool = Query(True, description="Send notifications to attendees."),
@@ -472,7 +728,7 @@ def delete_event_endpoint(
 ):
     """Deletes an event."""
     logger.info(f"Endpoint 'delete_event' called for event '{event_id}' in calendar '{calendar_id}'.")
-    success = calendar_actions.delete_event(
+    success = await async_calendar_actions.delete_event(
         credentials=creds,
         event_id=event_id,
         calendar_id=calendar_id,
@@ -493,7 +749,7 @@ def delete_event_endpoint(
     summary="Add Attendee(s)",
     operation_id="add_attendee"
 )
-def add_attendee_endpoint(
+async def add_attendee_endpoint(
     request_data: AddAttendeeRequest,
     calendar_id: str = Path(..., description="Calendar identifier."),
     event_id: str = Path(..., description="Event identifier."),
@@ -504,7 +760,7 @@ def add_attendee_endpoint(
        Note: This retrieves the event, adds the new emails to the existing list, and patches the event.
     """
     logger.info(f"Endpoint 'add_attendee' called for event '{event_id}'. Attendees: {request_data.attendee_emails}")
-    result = calendar_actions.add_attendee(
+    result = await async_calendar_actions.add_attendee(
         credentials=creds,
         event_id=event_id,
         attendee_emails=request_data.attendee_emails,
@@ -526,13 +782,13 @@ def add_attendee_endpoint(
     summary="Check Attendee Response Status",
     operation_id="check_attendee_status"
 )
-def check_attendee_status_endpoint(
+async def check_attendee_status_endpoint(
     request: CheckAttendeeStatusRequest,
     creds: Credentials = Depends(get_current_credentials)
 ):
     """Checks the response status ('accepted', 'declined', etc.) for attendees of a specific event."""
     logger.info(f"Endpoint 'check_attendee_status' called for event '{request.event_id}'. Calendar: '{request.calendar_id}'. Attendees: {request.attendee_emails or 'All'}")
-    status_dict = calendar_actions.check_attendee_status(
+    status_dict = await async_calendar_actions.check_attendee_status(
         credentials=creds,
         event_id=request.event_id,
         calendar_id=request.calendar_id,
@@ -552,7 +808,7 @@ def check_attendee_status_endpoint(
     summary="Query Free/Busy Information",
     operation_id="query_free_busy"
 )
-def query_free_busy_endpoint(
+async def query_free_busy_endpoint(
     request: FreeBusyRequest,
     creds: Credentials = Depends(get_current_credentials)
 ):
@@ -562,7 +818,7 @@ def query_free_busy_endpoint(
     logger.debug(f"Time range: {request.time_min} to {request.time_max}")
 
     # Call the action function (which now returns the complex dict)
-    busy_info_dict = calendar_actions.find_availability(
+    busy_info_dict = await async_calendar_actions.find_availability(
         credentials=creds,
         time_min=request.time_min,
         time_max=request.time_max,
@@ -597,7 +853,7 @@ def query_free_busy_endpoint(
     summary="Find Mutual Availability and Schedule",
     operation_id="schedule_mutual"
 )
-def schedule_mutual_endpoint(
+async def schedule_mutual_endpoint(
     request: ScheduleMutualRequest,
     creds: Credentials = Depends(get_current_credentials)
 ):
@@ -615,7 +871,7 @@ def schedule_mutual_endpoint(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid working hours format. Use HH:MM.")
 
-    created_event = calendar_actions.find_mutual_availability_and_schedule(
+    created_event = await async_calendar_actions.find_mutual_availability_and_schedule(
         credentials=creds,
         attendee_calendar_ids=request.attendee_calendar_ids,
         time_min=request.time_min,
@@ -643,65 +899,110 @@ def schedule_mutual_endpoint(
     summary="Project Recurring Event Occurrences",
     operation_id="project_recurring"
 )
-def project_recurring_endpoint(
+async def project_recurring_endpoint(
     request: ProjectRecurringRequest,
     creds: Credentials = Depends(get_current_credentials)
 ):
-    """Finds recurring events and projects their future occurrences within a time window."""
+    """Finds recurring events and projects their future occurrences within a time window.
+
+    The response is streamed: occurrences are merged into start order and written batch by
+    batch, so neither the full list nor its JSON is held in memory. The body is the same
+    ProjectRecurringResponse document as an unstreamed response. Errors before the first batch
+    (fetching the master events, expanding the first batch) return a normal HTTP error; a
+    failure on a later batch aborts the response, leaving an incomplete body.
+    """
     logger.info(f"Endpoint 'project_recurring' called. Calendar: '{request.calendar_id}'. Query: '{request.event_query}'")
     logger.debug(f"Time range: {request.time_min} to {request.time_max}")
-    # Note: calendar_actions.get_projected_recurring_events returns List[ProjectedEventOccurrence]
-    # We need to convert this to List[ProjectedEventOccurrenceModel] for the response.
-    occurrences: List[ProjectedEventOccurrence] = calendar_actions.get_projected_recurring_events(
+    batches = async_calendar_actions.iter_projected_recurring_events(
         credentials=creds,
         time_min=request.time_min,
         time_max=request.time_max,
         calendar_id=request.calendar_id,
-        event_query=request.event_query
+        event_query=request.event_query,
+        use_mirror=request.use_mirror
     )
-
-    # Convert ProjectedEventOccurrence (from analysis) to ProjectedEventOccurrenceModel (from models)
-    response_occurrences = [
-        ProjectedEventOccurrenceModel(**occ.__dict__) for occ in occurrences
-    ]
-
-    logger.info(f"Endpoint 'project_recurring' completed. Found {len(response_occurrences)} projected occurrences.")
-    return ProjectRecurringResponse(projected_occurrences=response_occurrences)
+    # Fetch the masters and the first batch before responding so failures still get a proper status code
+    try:
+        first_batch = await anext(batches, None)
+    except HttpError as e:
+        logger.error(f"Failed to fetch master events for calendar '{request.calendar_id}': {e}")
+        raise HTTPException(status_code=e.resp.status if 400 <= e.resp.status < 500 else 500, detail="Failed to retrieve recurring events from Google API.")
+
+    async def json_chunks():
+        occurrence_count = 0
+        batch = first_batch
+        yield b'{"projected_occurrences":['
+        try:
+            while batch is not None:
+                # Plain dicts through pydantic-core: the same JSON as ProjectedEventOccurrenceModel,
+                # without building a model per occurrence
+                items = to_json([occurrence.as_dict() for occurrence in batch])[1:-1]
+                yield (b',' + items) if occurrence_count else items
+                occurrence_count += len(batch)
+                batch = await anext(batches, None)
+        except Exception:
+            # Re-raised so the connection is aborted instead of closing the document as if complete
+            logger.error(f"Endpoint 'project_recurring' failed after streaming {occurrence_count} projected occurrences.", exc_info=True)
+            raise
+        yield b']}'
+        logger.info(f"Endpoint 'project_recurring' completed. Streamed {occurrence_count} projected occurrences.")
+
+    return StreamingResponse(json_chunks(), media_type="application/json")
 
 @app.post(
     "/analyze_busyness",
     response_model=AnalyzeBusynessResponse,
     tags=["Analysis"],
-    summary="Analyze Daily Event Count and Duration",
+    summary="Analyze Event Count and Duration per Day, Hour or Weekday",
     operation_id="analyze_busyness"
 )
-def analyze_busyness_endpoint(
+async def analyze_busyness_endpoint(
     request: AnalyzeBusynessRequest,
     creds: Credentials = Depends(get_current_credentials)
 ):
-    """Analyzes event count and total duration per day within a specified time window."""
-    logger.info(f"Endpoint 'analyze_busyness' called. Calendar: '{request.calendar_id}'")
+    """Analyzes event count and total duration per day, hour of day or weekday within a specified time window.
+
+    Events are folded in page by page (nothing is truncated). `calendars` reports the pages and
+    events consumed per calendar; calendars that fail are listed in `errors`.
+    """
+    calendar_ids = request.calendar_ids or [request.calendar_id]
+    logger.info(f"Endpoint 'analyze_busyness' called. Calendars: {calendar_ids}, bucket: '{request.bucket}'")
     logger.debug(f"Time range: {request.time_min} to {request.time_max}")
-    # We need a wrapper in calendar_actions for analyze_busyness from analysis.py
-    # Let's add one now.
-    busyness_dict = calendar_actions.get_busyness_analysis( # Call the wrapper function
+    report = await async_calendar_actions.get_busyness_analysis(
         credentials=creds,
         time_min=request.time_min,
         time_max=request.time_max,
-        calendar_id=request.calendar_id
+        use_mirror=request.use_mirror,
+        bucket=request.bucket,
+        time_zone=request.time_zone,
+        calendar_ids=calendar_ids
     )
 
-    if busyness_dict is None: # Wrapper returns None on error
+    if report is None: # Wrapper returns None on error
          logger.error("Action 'get_busyness_analysis' returned None. Raising HTTPException.")
          raise HTTPException(status_code=500, detail="Failed to analyze busyness.")
 
-    # Convert date keys to strings (YYYY-MM-DD) for JSON compatibility
-    response_data = {
-        dt.strftime('%Y-%m-%d'): DailyBusynessStats(**stats)
-        for dt, stats in busyness_dict.items()
-    }
-
-    return AnalyzeBusynessResponse(busyness_by_date=response_data)
+    response = AnalyzeBusynessResponse(
+        bucket=request.bucket,
+        time_zone=report['time_zone'],
+        calendars=report['calendars'],
+        errors=report['errors'],
+        pages_fetched=sum(stats['pages'] for stats in report['calendars'].values()),
+        events_analyzed=sum(stats['events'] for stats in report['calendars'].values()),
+    )
+    if request.bucket == 'day':
+        # Convert date keys to strings (YYYY-MM-DD) for JSON compatibility
+        response.busyness_by_date = {
+            dt.strftime('%Y-%m-%d'): DailyBusynessStats(**stats)
+            for dt, stats in report['buckets'].items()
+        }
+    else:
+        # Hours of day as 'HH:00', weekdays (0 = Monday) by name
+        response.busyness_by_bucket = {
+            (f"{key:02d}:00" if request.bucket == 'hour' else calendar.day_name[key]): DailyBusynessStats(**stats)
+            for key, stats in report['buckets'].items()
+        }
+    return FastJSONResponse(response)
 
 # Add other endpoints as needed
 
@@ -722,6 +1023,15 @@ class ModifyLabelsRequest(BaseModel):
     remove_labels: Optional[List[str]] = Field(None, description="Label IDs to remove")
     user_id: str = 'me'
 
+class BulkModifyLabelsRequest(BaseModel):
+    message_ids: Optional[List[str]] = Field(None, description="Explicit message IDs to modify")
+    query: Optional[str] = Field(None, description="Gmail search query selecting the messages to modify (instead of message_ids)")
+    label_ids: Optional[List[str]] = Field(None, description="Only select messages with all of these label IDs (combinable with query)")
+    add_labels: Optional[List[str]] = Field(None, description="Label IDs to add")
+    remove_labels: Optional[List[str]] = Field(None, description="Label IDs to remove")
+    max_messages: Optional[int] = Field(None, ge=1, description="Maximum number of messages to modify")
+    user_id: str = 'me'
+
 # --- Gmail Endpoints ---
 @app.get(
     "/gmail/messages",
@@ -729,17 +1039,27 @@ class ModifyLabelsRequest(BaseModel):
     summary="List Gmail messages",
     operation_id="gmail_list_messages"
 )
-def gmail_list_messages_endpoint(
+async def gmail_list_messages_endpoint(
     q: Optional[str] = Query(None, description="Gmail search query"),
     max_results: int = Query(50, ge=1, le=500),
     label_ids: Optional[List[str]] = Query(None, description="Filter by label IDs"),
     user_id: str = Query('me', description="User id"),
+    hydrate: bool = Query(False, description="Return message metadata (labels, snippet, headers) instead of only IDs, fetched in batch calls."),
+    metadata_headers: Optional[List[str]] = Query(None, description="Headers to include when hydrating (default From, To, Subject, Date)"),
     creds: Credentials = Depends(get_current_credentials)
 ):
-    result = gmail_actions.list_messages(credentials=creds, user_id=user_id, query=q, max_results=max_results, label_ids=label_ids)
+    result = await async_gmail_actions.list_messages(
+        credentials=creds,
+        user_id=user_id,
+        query=q,
+        max_results=max_results,
+        label_ids=label_ids,
+        hydrate=hydrate,
+        metadata_headers=metadata_headers
+    )
     if result is None:
         raise HTTPException(status_code=500, detail="Failed to list Gmail messages")
-    return result
+    return FastJSONResponse(result)
 
 @app.get(
     "/gmail/messages/{message_id}",
@@ -747,16 +1067,18 @@ def gmail_list_messages_endpoint(
     summary="Get Gmail message",
     operation_id="gmail_get_message"
 )
-def gmail_get_message_endpoint(
+async def gmail_get_message_endpoint(
     message_id: str = Path(..., description="Message ID"),
     format: str = Query('full', description="Gmail message format (minimal, full, raw, metadata)"),
     user_id: str = Query('me', description="User id"),
+    fields: Optional[str] = Query(None, description="Partial response: a preset ('ids', 'labels', 'headers', 'full') or a Google field mask, e.g. 'id,snippet'."),
     creds: Credentials = Depends(get_current_credentials)
 ):
-    result = gmail_actions.get_message(credentials=creds, message_id=message_id, user_id=user_id, format=format)
+    fields = _resolve_fields(fields, field_masks.resolve_message_fields)
+    result = await async_gmail_actions.get_message(credentials=creds, message_id=message_id, user_id=user_id, format=format, fields=fields)
     if result is None:
         raise HTTPException(status_code=404, detail="Message not found or API error")
-    return result
+    return FastJSONResponse(result)
 
 @app.post(
     "/gmail/messages:sendRaw",
@@ -764,11 +1086,11 @@ def gmail_get_message_endpoint(
     summary="Send Gmail message (raw)",
     operation_id="gmail_send_raw"
 )
-def gmail_send_raw_endpoint(
+async def gmail_send_raw_endpoint(
     request: SendRawEmailRequest,
     creds: Credentials = Depends(get_current_credentials)
 ):
-    result = gmail_actions.send_message_raw(credentials=creds, raw_message_base64url=request.raw, user_id=request.user_id)
+    result = await async_gmail_actions.send_message_raw(credentials=creds, raw_message_base64url=request.raw, user_id=request.user_id)
     if result is None:
         raise HTTPException(status_code=500, detail="Failed to send Gmail message")
     return result
@@ -779,17 +1101,17 @@ def gmail_send_raw_endpoint(
     summary="Compose and send simple text email",
     operation_id="gmail_compose_send"
 )
-def gmail_compose_send_endpoint(
+async def gmail_compose_send_endpoint(
     request: ComposeAndSendRequest,
     creds: Credentials = Depends(get_current_credentials)
 ):
-    raw = gmail_actions.build_raw_message(
+    raw = async_gmail_actions.build_raw_message(
         from_addr=request.from_addr,
         to_addrs=request.to_addrs,
         subject=request.subject,
         body_text=request.body_text,
     )
-    result = gmail_actions.send_message_raw(credentials=creds, raw_message_base64url=raw, user_id=request.user_id)
+    result = await async_gmail_actions.send_message_raw(credentials=creds, raw_message_base64url=raw, user_id=request.user_id)
     if result is None:
         raise HTTPException(status_code=500, detail="Failed to send Gmail message")
     return result
@@ -800,12 +1122,12 @@ def gmail_compose_send_endpoint(
     summary="Modify message labels",
     operation_id="gmail_modify_labels"
 )
-def gmail_modify_labels_endpoint(
+async def gmail_modify_labels_endpoint(
     message_id: str = Path(..., description="Message ID"),
     request: ModifyLabelsRequest = Body(...),
     creds: Credentials = Depends(get_current_credentials)
 ):
-    result = gmail_actions.modify_message_labels(
+    result = await async_gmail_actions.modify_message_labels(
         credentials=creds,
         message_id=message_id,
         add_labels=request.add_labels,
@@ -816,21 +1138,220 @@ def gmail_modify_labels_endpoint(
         raise HTTPException(status_code=500, detail="Failed to modify message labels")
     return result
 
+def _start_bulk_modify(
+    request: BulkModifyLabelsRequest,
+    creds: Credentials,
+    progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Awaitable[Optional[Dict[str, Any]]]:
+    return async_gmail_actions.bulk_modify_message_labels(
+        credentials=creds,
+        message_ids=request.message_ids,
+        query=request.query,
+        label_ids=request.label_ids,
+        add_labels=request.add_labels,
+        remove_labels=request.remove_labels,
+        user_id=request.user_id,
+        max_messages=request.max_messages,
+        progress_callback=progress_callback
+    )
+
+def _check_bulk_modify_result(result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Raises the HTTP error for a failed or partial bulk modification, or returns its report."""
+    if result is None:
+        raise HTTPException(status_code=500, detail="Failed to modify message labels")
+    if not result['completed']:
+        # Part of the selection may already be modified; return the progress so the caller can resume
+        raise HTTPException(status_code=500, detail={"message": "Bulk label modification stopped early", **result})
+    return result
+
+@app.post(
+    "/gmail/messages:batchModify",
+    tags=["Gmail"],
+    summary="Bulk modify message labels",
+    operation_id="gmail_bulk_modify_labels"
+)
+async def gmail_bulk_modify_labels_endpoint(
+    request: BulkModifyLabelsRequest,
+    creds: Credentials = Depends(get_current_credentials)
+):
+    """Adds/removes labels on many messages, selected by IDs or by a search query, with batchModify calls of up to 1000 IDs."""
+    logger.info(f"Endpoint 'gmail_bulk_modify_labels' called. IDs: {len(request.message_ids or [])}, query: '{request.query}', labels: {request.label_ids}")
+    try:
+        result = await _start_bulk_modify(request, creds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _check_bulk_modify_result(result)
+
+_bulk_modify_tasks: Set[asyncio.Task] = set() # Streamed modifications keep running if the client disconnects
+
+@app.post(
+    "/gmail/messages:batchModify:stream",
+    tags=["Gmail"],
+    summary="Bulk modify message labels, streaming progress (NDJSON)",
+    operation_id="gmail_bulk_modify_labels_stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "One progress report per line; the last line is the final report."}}
+)
+async def gmail_bulk_modify_labels_stream_endpoint(
+    request: BulkModifyLabelsRequest,
+    creds: Credentials = Depends(get_current_credentials)
+):
+    """Same as gmail_bulk_modify_labels, with a progress report line after each batchModify call.
+
+    Each line is the report so far ({'matched', 'modified', 'pages', 'batches', 'completed',
+    'error'}); the last line is the final report, with 'completed' true or 'error' set. Errors
+    before the first batch return a normal HTTP error, like the non-streaming endpoint; an
+    unexpected failure after it ends the stream with a final {"error": ...} line.
+    """
+    logger.info(f"Endpoint 'gmail_bulk_modify_labels_stream' called. IDs: {len(request.message_ids or [])}, query: '{request.query}', labels: {request.label_ids}")
+    updates: asyncio.Queue = asyncio.Queue()
+    task = asyncio.get_running_loop().create_task(_start_bulk_modify(request, creds, updates.put_nowait))
+    _bulk_modify_tasks.add(task)
+    task.add_done_callback(_bulk_modify_tasks.discard)
+    task.add_done_callback(lambda _: updates.put_nowait(None)) # After the last progress report
+    # Wait for the first batch (or the result) before responding so request errors still get a proper status code
+    first_update = await updates.get()
+    if first_update is None:
+        try:
+            result = task.result()
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        _check_bulk_modify_result(result)
+
+    async def ndjson_lines():
+        update = first_update
+        while update is not None:
+            yield json.dumps(update) + '\n'
+            update = await updates.get()
+        try:
+            result = task.result()
+        except Exception as e:
+            result = None
+            logger.error(f"Streamed bulk label modification failed: {e}")
+        yield json.dumps(result if result is not None else {"error": "Failed to modify message labels"}) + '\n'
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
 @app.get(
     "/gmail/labels",
     tags=["Gmail"],
     summary="List Gmail labels",
     operation_id="gmail_list_labels"
 )
-def gmail_list_labels_endpoint(
+async def gmail_list_labels_endpoint(
     user_id: str = Query('me', description="User id"),
     creds: Credentials = Depends(get_current_credentials)
 ):
-    result = gmail_actions.list_labels(credentials=creds, user_id=user_id)
+    result = await async_gmail_actions.list_labels(credentials=creds, user_id=user_id)
     if result is None:
         raise HTTPException(status_code=500, detail="Failed to list Gmail labels")
     return result
 
+# --- Push Notification Endpoints ---
+@app.post(
+    push_notifications.CALENDAR_RECEIVER_PATH,
+    tags=["Push Notifications"],
+    summary="Calendar push notification receiver",
+    operation_id="receive_calendar_notification",
+    include_in_schema=False
+)
+async def receive_calendar_notification_endpoint(request: HTTPRequest):
+    """Receives Calendar events.watch notifications and schedules incremental syncs of the calendar's mirrors."""
+    try:
+        return push_notifications.handle_calendar_notification({k.lower(): v for k, v in request.headers.items()})
+    except push_notifications.PushNotificationError as e:
+        logger.warning(f"Rejected Calendar notification: {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+@app.post(
+    push_notifications.GMAIL_RECEIVER_PATH,
+    tags=["Push Notifications"],
+    summary="Gmail push notification receiver",
+    operation_id="receive_gmail_notification",
+    include_in_schema=False
+)
+async def receive_gmail_notification_endpoint(
+    request: HTTPRequest,
+    token: Optional[str] = Query(None)
+):
+    """Receives Gmail users.watch notifications delivered by a Pub/Sub push subscription and schedules history syncs.
+
+    The body is parsed here rather than validated by FastAPI: a 422 would make Pub/Sub
+    redeliver a malformed message forever, so it is acknowledged and ignored instead.
+    """
+    try:
+        envelope = json.loads(await request.body())
+    except ValueError:
+        envelope = None
+    try:
+        return push_notifications.handle_gmail_notification(envelope, token, get_current_credentials)
+    except push_notifications.PushNotificationError as e:
+        logger.warning(f"Rejected Gmail notification: {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+@app.get(
+    "/notifications/channels",
+    response_model=List[WatchChannelInfo],
+    tags=["Push Notifications"],
+    summary="List push notification channels",
+    operation_id="list_watch_channels"
+)
+async def list_watch_channels_endpoint():
+    return [channel.info() for channel in push_notifications.get_channels()]
+
+@app.post(
+    "/notifications/channels",
+    response_model=WatchChannelInfo,
+    status_code=201,
+    tags=["Push Notifications"],
+    summary="Watch a calendar or mailbox",
+    operation_id="create_watch_channel"
+)
+async def create_watch_channel_endpoint(
+    request: WatchRequest,
+    creds: Credentials = Depends(get_current_credentials)
+):
+    """Opens a Calendar events.watch channel or starts a Gmail users.watch. Channels are renewed automatically."""
+    logger.info(f"Endpoint 'create_watch_channel' called. Kind: {request.kind}")
+    try:
+        if request.kind == 'calendar':
+            channel = await push_notifications.watch_calendar(
+                creds, request.calendar_id, ttl_seconds=request.ttl_seconds or push_notifications.PUSH_CHANNEL_TTL
+            )
+        elif request.kind == 'gmail':
+            channel = await push_notifications.watch_gmail(
+                creds, request.topic_name or push_notifications.GMAIL_PUSH_TOPIC, request.user_id, request.label_ids
+            )
+        else:
+            raise HTTPException(status_code=400, detail=f"Unknown watch kind '{request.kind}'.")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HttpError as e:
+        logger.error(f"Failed to create {request.kind} watch: {e}")
+        raise HTTPException(status_code=500, detail=f"Google API rejected the watch request: {e.resp.status}")
+    return channel.info()
+
+@app.delete(
+    "/notifications/channels/{channel_id}",
+    status_code=204,
+    tags=["Push Notifications"],
+    summary="Stop a push notification channel",
+    operation_id="stop_watch_channel"
+)
+async def stop_watch_channel_endpoint(
+    channel_id: str = Path(..., description="Channel ID (or 'gmail:<user_id>' for Gmail watches)."),
+    creds: Credentials = Depends(get_current_credentials)
+):
+    channel = push_notifications.get_channel(channel_id)
+    if channel is None:
+        raise HTTPException(status_code=404, detail=f"Channel '{channel_id}' not found.")
+    try:
+        await push_notifications.stop_channel(creds, channel)
+    except HttpError as e:
+        logger.error(f"Failed to stop channel '{channel_id}': {e}")
+        raise HTTPException(status_code=500, detail=f"Google API error while stopping channel: {e.resp.status}")
+    return None
+
 # --- Main Execution ---
 if __name__ == "__main__":
     logger.info("Starting Google Calendar MCP Server...")
@@ -0,0 +1,169 @@
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# --- Event Text Search ---
+# Full-text matching for mirror reads with a text query (find_events `q`, project_recurring's
+# `event_query`, search_all_calendars). The searchable text of an event is its summary,
+# description, location and people (organizer, creator and attendee emails and names).
+#
+# Query syntax (terms are ANDed, matching is case- and accent-insensitive):
+#   standup          whole word
+#   stand*           word prefix
+#   "design review"  phrase: consecutive words within one field
+#   "design rev"*    phrase whose last word is a prefix
+#   bob@example.com  punctuation splits words, so this matches as the phrase "bob example com"
+#
+# Mirrors backed by the event store answer queries from an SQLite FTS5 table (see event_store),
+# updated in the same transaction as the events; in-memory mirrors use a TextIndex. Both use
+# tokenize() (runs of letters and digits, casefolded and NFKD-normalized without accents): the
+# FTS5 table indexes fields already tokenized here (fts_fields), so its own tokenizer only splits
+# on the spaces, and results do not depend on which backend a mirror uses.
+
+_WORD_PATTERN = re.compile(r'[^\W_]+')
+_QUERY_PATTERN = re.compile(r'"([^"]*)"(\*?)|(\S+)')
+_FIELD_BREAK = '' # Separates fields in a token list; never equal to a query token, so phrases cannot span fields
+
+
+class SearchTerm(NamedTuple):
+    """One query term: a word or phrase, optionally ending in a prefix."""
+    tokens: Tuple[str, ...]
+    prefix: bool # The last token matches any word starting with it
+
+
+def _fold(text: str) -> str:
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Splits text into folded words (the tokens of both text search backends)."""
+    return _WORD_PATTERN.findall(_fold(text)) if text else []
+
+
+def parse_query(query: Optional[str]) -> List[SearchTerm]:
+    """Parses a text query into terms (see the module notes). Terms without words are dropped."""
+    terms = []
+    for match in _QUERY_PATTERN.finditer(query or ''):
+        phrase, phrase_star, word = match.groups()
+        if word is not None:
+            text, prefix = (word[:-1], True) if word.endswith('*') else (word, False)
+        else:
+            text, prefix = phrase, bool(phrase_star)
+        tokens = tuple(tokenize(text))
+        if tokens:
+            terms.append(SearchTerm(tokens, prefix))
+    return terms
+
+
+def fts_expression(terms: List[SearchTerm]) -> str:
+    """Renders parsed terms as an FTS5 MATCH expression."""
+    return ' AND '.join(f'"{" ".join(term.tokens)}"{"*" if term.prefix else ""}' for term in terms)
+
+
+def event_text_fields(event: Dict[str, Any]) -> Tuple[str, str, str, str]:
+    """Returns the searchable (summary, description, location, people) text of an event."""
+    people = []
+    for person in [event.get('organizer') or {}, event.get('creator') or {}] + (event.get('attendees') or []):
+        people.extend(value for value in (person.get('email'), person.get('displayName')) if value)
+    return event.get('summary') or '', event.get('description') or '', event.get('location') or '', ' '.join(people)
+
+
+def fts_fields(event: Dict[str, Any]) -> Tuple[str, ...]:
+    """Returns the searchable fields of an event as space-separated tokens, for the FTS5 table."""
+    return tuple(' '.join(tokenize(text)) for text in event_text_fields(event))
+
+
+def event_tokens(event: Dict[str, Any]) -> List[str]:
+    """Returns the words of an event's searchable fields, with field breaks between fields."""
+    tokens: List[str] = []
+    for text in event_text_fields(event):
+        tokens.extend(tokenize(text))
+        tokens.append(_FIELD_BREAK)
+    return tokens
+
+
+def _term_at(tokens: List[str], position: int, term: SearchTerm) -> bool:
+    last = len(term.tokens) - 1
+    for offset, token in enumerate(term.tokens):
+        candidate = tokens[position + offset]
+        if offset == last and term.prefix:
+            if not (candidate and candidate.startswith(token)):
+                return False
+        elif candidate != token:
+            return False
+    return True
+
+
+def _term_in(tokens: List[str], term: SearchTerm) -> bool:
+    if term.prefix and len(term.tokens) == 1:
+        return any(candidate and candidate.startswith(term.tokens[0]) for candidate in tokens)
+    last_start = len(tokens) - len(term.tokens)
+    position = -1
+    while True:
+        try:
+            position = tokens.index(term.tokens[0], position + 1) # Jump between occurrences of the first word
+        except ValueError:
+            return False
+        if position > last_start:
+            return False
+        if _term_at(tokens, position, term):
+            return True
+
+
+def tokens_match(tokens: List[str], terms: List[SearchTerm]) -> bool:
+    """Returns True if every term occurs in the token list (see event_tokens)."""
+    return all(_term_in(tokens, term) for term in terms)
+
+
+class TextIndex:
+    """Immutable inverted index over the searchable text of a set of events (in-memory mirrors)."""
+
+    __slots__ = ('_postings', '_vocabulary', '_tokens')
+
+    def __init__(self, events: Iterable[Tuple[str, Dict[str, Any]]]):
+        """Builds the index.
+
+        Args:
+            events: (event_id, event resource) pairs.
+        """
+        self._postings: Dict[str, Set[str]] = {}
+        self._tokens: Dict[str, List[str]] = {}
+        for event_id, event in events:
+            tokens = event_tokens(event)
+            self._tokens[event_id] = tokens
+            for token in tokens:
+                if token:
+                    self._postings.setdefault(token, set()).add(event_id)
+        self._vocabulary = sorted(self._postings)
+
+    def _documents(self, token: str, prefix: bool) -> Set[str]:
+        if not prefix:
+            return self._postings.get(token, set())
+        found: Set[str] = set()
+        for index in range(bisect_left(self._vocabulary, token), len(self._vocabulary)):
+            word = self._vocabulary[index]
+            if not word.startswith(token):
+                break
+            found |= self._postings[word]
+        return found
+
+    def search(self, terms: List[SearchTerm]) -> Set[str]:
+        """Returns the IDs of the events matching every term."""
+        candidates: Optional[Set[str]] = None
+        for term in terms:
+            last = len(term.tokens) - 1
+            for offset, token in enumerate(term.tokens):
+                documents = self._documents(token, term.prefix and offset == last)
+                candidates = set(documents) if candidates is None else candidates & documents
+                if not candidates:
+                    return set()
+        if candidates is None:
+            return set()
+        # Postings only prove each word occurs; phrases also need the words to be consecutive
+        if any(len(term.tokens) > 1 for term in terms):
+            candidates = {event_id for event_id in candidates if tokens_match(self._tokens[event_id], terms)}
+        return candidates